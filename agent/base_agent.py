@@ -1,6 +1,7 @@
 """Base agent class."""
 from uuid import uuid4
 import logging
+import random
 
 class BaseAgent():
     """
@@ -13,6 +14,8 @@ class BaseAgent():
         num_wins (int): Number of games won.
         num_losses (int): Number of games lost.
         in_game (bool): If player is currently in a game.
+        rng (Random): Source of random numbers for this agent's choices.
+            Engines set this to their own for each game.
 
     """
 
@@ -39,6 +42,7 @@ class BaseAgent():
         self.num_wins = 0
         self.num_losses = 0
         self.in_game = False
+        self.rng = random
 
     def hello(self):
         """Test Method."""
@@ -84,3 +88,6 @@ class BaseAgent():
     def make_move(self):
         """Make a move, must be overwritten by child class."""
         raise NotImplementedError
+
+    def close(self):
+        """Release anything this agent holds between games, like worker processes."""
@@ -4,13 +4,19 @@ import operator
 from copy import deepcopy
 import logging
 
+import numpy as np
+
 from agent.basic_pokemon_agent import PokemonAgent
 from agent.basic_pokemon_agent import calc_opp_position_helper, calc_position_helper
-from config import USAGE_STATS, POKEMON_DATA, MOVE_DATA
+from config import USAGE_STATS, POKEMON_DATA
 from config import (PAR_STATUS)
 from pokemon_helpers.calculate import calc_boost_factor
 from pokemon_helpers.calculate import calculate_status_damage
-from pokemon_helpers.moves import generate_move
+from pokemon_helpers.damage_stats import (ATK_MAX_EVS, ATK_POSITIVE_NATURE,
+                                          DEF_MAX_EVS, DEF_POSITIVE_NATURE,
+                                          HP_MAX_EVS, NUM_INVESTMENT_COLUMNS)
+from pokemon_helpers.moves import get_move
+from pokemon_helpers.turn_cache import TurnCache
 
 
 class BasicPlanningPokemonAgent(PokemonAgent):
@@ -22,14 +28,25 @@ class BasicPlanningPokemonAgent(PokemonAgent):
 
     Attributes:
         tier (str): Tier to look at usage stats for.
+        turn_cache (TurnCache): Cache of damage ranges and move outcomes
+            calculated while choosing moves.
 
     """
 
     def __init__(self, tier, **kwargs):
-        """Initialize a player with a specific tier."""
+        """
+        Initialize a player with a specific tier.
+
+        Args:
+            tier (str): Tier to look at usage stats for.
+            team (list): The team of pokemon this agent uses.
+            cache_size (int): Maximum number of results in the turn cache.
+
+        """
         team = kwargs["team"]
         super().__init__(team)
         self.tier = tier
+        self.turn_cache = TurnCache(kwargs.get("cache_size", 4096))
 
     def make_move(self):
         """
@@ -41,8 +58,16 @@ class BasicPlanningPokemonAgent(PokemonAgent):
         """
         player_opts, opp_opts = self.generate_possibilities()
         move_choice = self.optimal_move(player_opts, opp_opts)
+        logging.info("BasicPlanningPokemonAgent:make_move:%s:cache_hit_rate:%s",
+                     self.id, self.turn_cache.hit_rate())
         return move_choice
 
+    def print_info(self):
+        """Print information about this agent."""
+        super().print_info()
+        print("\tTurn Cache Hit Rate: {} ({})".format(
+            self.turn_cache.hit_rate(), self.turn_cache.hits + self.turn_cache.misses))
+
     def generate_possibilities(self):
         """
         Generate a two lists of possible player and opponent moves.
@@ -72,18 +97,47 @@ class BasicPlanningPokemonAgent(PokemonAgent):
                      self.id, len(self.game_state.gamestate["team"]))
 
         # Opponent's possible attacks
-        posn = 0
         opp_active_poke = self.game_state.opp_gamestate["data"]["active"]["name"]
+        opp_moves = self.infer_opp_moves(opp_active_poke)
+
+        for move in opp_moves:
+            opp_opts.append(("ATTACK", move))
+
+        # Opponent's possible switches
+        posn = 0
+        for opp_teammate in self.game_state.opp_gamestate["data"]["team"]:
+            logging.info("BasicPlanningPokemonAgent:generate_possibilities:%s:opp_teammate:%s",
+                         self.id, opp_teammate["name"])
+            opp_opts.append(("SWITCH", posn))
+            posn += 1
+
+        logging.info("BasicPlanningPokemonAgent:generate_possibilities:%s:opp_num_teammates:%s",
+                     self.id, len(self.game_state.opp_gamestate["data"]["team"]))
+
+        return player_opts, opp_opts
+
+    def infer_opp_moves(self, opp_poke_name):
+        """
+        Determine the moves the opponent's pokemon might have.
+
+        Args:
+            opp_poke_name (str): Name of the opponent's pokemon.
+
+        Returns:
+            List of up to four move IDs: the moves seen so far, then the most
+                common moves for this pokemon in the tier.
+
+        """
         opp_moves = []
-        if opp_active_poke in self.game_state.opp_gamestate["moves"]:
-            for move in self.game_state.opp_gamestate["moves"][opp_active_poke]:
+        if opp_poke_name in self.game_state.opp_gamestate["moves"]:
+            for move in self.game_state.opp_gamestate["moves"][opp_poke_name]:
                 opp_moves.append(move["id"])
                 logging.info("BasicPlanningPokemonAgent:generate_possibilities:%s:opp_known_move:%s"
                              , self.id, move["id"])
 
         if len(opp_moves) < 4:
             # Infer remaining moves from tier's data
-            common_moves = USAGE_STATS[self.tier][opp_active_poke]["Moves"]
+            common_moves = USAGE_STATS[self.tier][opp_poke_name]["Moves"]
             common_moves = sorted(common_moves.items(),
                                   key=operator.itemgetter(1), reverse=True)
             common_moves = [move[0] for move in common_moves if move[0] != ""]
@@ -98,21 +152,7 @@ class BasicPlanningPokemonAgent(PokemonAgent):
         logging.info("BasicPlanningPokemonAgent:generate_possibilities:%s:opp_moves:%s",
                      self.id, "|".join(opp_moves))
 
-        for move in opp_moves:
-            opp_opts.append(("ATTACK", move))
-
-        # Opponent's possible switches
-        posn = 0
-        for opp_teammate in self.game_state.opp_gamestate["data"]["team"]:
-            logging.info("BasicPlanningPokemonAgent:generate_possibilities:%s:opp_teammate:%s",
-                         self.id, opp_teammate["name"])
-            opp_opts.append(("SWITCH", posn))
-            posn += 1
-
-        logging.info("BasicPlanningPokemonAgent:generate_possibilities:%s:opp_num_teammates:%s",
-                     self.id, len(self.game_state.opp_gamestate["data"]["team"]))
-
-        return player_opts, opp_opts
+        return opp_moves
 
     def optimal_move(self, player_opts, opp_opts):
         """
@@ -181,29 +221,38 @@ class BasicPlanningPokemonAgent(PokemonAgent):
         p_poke = my_gs["active"]
         p_move = p_poke.moves[p_opt[1]]
         o_poke_name = opp_gs["data"]["active"]["name"]
-        o_poke = POKEMON_DATA[o_poke_name]
-        params = self.game_state.opp_gamestate["investment"][o_poke_name]
 
+        return list(self.attack_dmg_range(p_poke, p_move, o_poke_name))
+
+    def attack_dmg_range(self, p_poke, p_move, o_poke_name):
+        """
+        Calculate the (weighted) damage range for an attack on a pokemon.
+
+        Args:
+            p_poke (Pokemon): This player's attacking pokemon.
+            p_move (BaseMove): The move being used.
+            o_poke_name (str): Name of the opponent's defending pokemon.
+
+        Returns:
+            Tuple with the expected damage range for the attack.
+
+        """
         # We do not handle status moves at this point in time.
         if p_move["category"] == "Status":
-            return [0, 0]
+            return (0, 0)
 
-        # Get sum of damage ranges
-        dmg_range = None
-        param_combs = atk_param_combinations(p_poke, params, p_move)
-        for param_comb in param_combs:
-            dmg_val = self.dmg_stat_calc.calculate_range(p_move, p_poke, o_poke, param_comb)
-            if not dmg_range:
-                dmg_range = [0, 0]
-
-            dmg_range[0] += dmg_val[0]
-            dmg_range[1] += dmg_val[1]
+        o_poke = POKEMON_DATA[o_poke_name]
+        params = self.game_state.opp_gamestate["investment"][o_poke_name]
 
-        # Each combination is weighted equally
-        dmg_range[0] = dmg_range[0] / len(param_combs)
-        dmg_range[1] = dmg_range[1] / len(param_combs)
+        param_combs = atk_param_combinations(p_poke, params, p_move)
+        atk_stat = "spa" if p_move["category"] == "Special" else "atk"
+        cache_key = ("attacking_dmg_range", p_poke.name, p_move.id, p_poke.status,
+                     p_poke.boosts[atk_stat], o_poke_name, param_combs.tobytes())
 
-        return dmg_range
+        return self.turn_cache.get(
+            cache_key,
+            lambda: mean_dmg_range(self.dmg_stat_calc.calculate_ranges(p_move, p_poke,
+                                                                       o_poke, param_combs)))
 
     def defending_dmg_range(self, my_gs, opp_gs, o_opt):
         """
@@ -220,31 +269,43 @@ class BasicPlanningPokemonAgent(PokemonAgent):
 
         """
         p_poke = my_gs["active"]
-        o_move = generate_move(MOVE_DATA[o_opt[1]])
+        o_move = get_move(o_opt[1])
         o_poke_name = opp_gs["data"]["active"]["name"]
-        o_poke = POKEMON_DATA[o_poke_name]
-        o_poke["status"] = opp_gs["data"]["active"]["status"]
-        params = self.game_state.opp_gamestate["investment"][o_poke_name]
+        o_status = opp_gs["data"]["active"]["status"]
+
+        return list(self.defend_dmg_range(p_poke, o_move, o_poke_name, o_status))
 
+    def defend_dmg_range(self, p_poke, o_move, o_poke_name, o_status):
+        """
+        Calculate the (weighted) damage range for an attack on this player's pokemon.
+
+        Args:
+            p_poke (Pokemon): This player's defending pokemon.
+            o_move (BaseMove): The move being used by the opponent.
+            o_poke_name (str): Name of the opponent's attacking pokemon.
+            o_status (str): Status of the opponent's attacking pokemon.
+
+        Returns:
+            Tuple with the expected damage range for the attack.
+
+        """
         # We do not handle status moves at this point in time.
         if o_move["category"] == "Status":
-            return [0, 0]
+            return (0, 0)
 
-        dmg_range = None
-        param_combs = def_param_combinations(p_poke, params, o_move)
-        for param_comb in param_combs:
-            dmg_val = self.dmg_stat_calc.calculate_range(o_move, o_poke, p_poke, param_comb)
-            if not dmg_range:
-                dmg_range = [0, 0]
+        params = self.game_state.opp_gamestate["investment"][o_poke_name]
 
-            dmg_range[0] += dmg_val[0]
-            dmg_range[1] += dmg_val[1]
+        param_combs = def_param_combinations(p_poke, params, o_move)
+        def_stat = "spd" if o_move["category"] == "Special" else "def"
+        cache_key = ("defending_dmg_range", o_poke_name, o_status, o_move.id,
+                     p_poke.name, p_poke.boosts[def_stat], param_combs.tobytes())
 
-        # Each combination is weighted equally
-        dmg_range[0] = dmg_range[0] / len(param_combs)
-        dmg_range[1] = dmg_range[1] / len(param_combs)
+        def calculate():
+            o_poke = dict(POKEMON_DATA[o_poke_name], status=o_status)
+            dmg_ranges = self.dmg_stat_calc.calculate_ranges(o_move, o_poke, p_poke, param_combs)
+            return mean_dmg_range(dmg_ranges)
 
-        return dmg_range
+        return self.turn_cache.get(cache_key, calculate)
 
     def update_opp_gs_atk(self, my_gs, opp_gs, p_opt):
         """
@@ -309,17 +370,43 @@ class BasicPlanningPokemonAgent(PokemonAgent):
 
         """
         p_poke = my_gs["active"]
-        o_poke_name = opp_gs["data"]["active"]["name"]
-
         p_move = p_poke.moves[p_opt[1]]
-        o_move = generate_move(MOVE_DATA[o_opt[1]])
+        o_move = get_move(o_opt[1])
+        o_active = opp_gs["data"]["active"]
+
+        return self.is_faster(p_poke, p_move, o_move, o_active["name"],
+                              o_active["status"], o_active["boosts"]["spe"])
+
+    def is_faster(self, p_poke, p_move, o_move, o_poke_name, o_status, o_spe_boost):
+        """
+        Determine whether this player's attack goes before the opponent's.
+
+        Args:
+            p_poke (Pokemon): This player's active pokemon.
+            p_move (BaseMove): The move being used by this player.
+            o_move (BaseMove): The move being used by the opponent.
+            o_poke_name (str): Name of the opponent's active pokemon.
+            o_status (str): Status of the opponent's active pokemon.
+            o_spe_boost (int): Speed boost of the opponent's active pokemon.
+
+        Returns:
+            Boolean whether or not this player is faster than the opponent.
+
+        """
+        # Moves of different priority will always go in priority order
+        if p_move["priority"] != o_move["priority"]:
+            return p_move["priority"] > o_move["priority"]
 
         # Same priority is decided by speed
-        if p_move["priority"] == o_move["priority"]:
+        p_speed = p_poke.effective_stat("spe")
+        speed_pairs = self.game_state.opp_gamestate["investment"][o_poke_name]["spe"]
+        cache_key = ("is_faster", p_speed, o_poke_name, o_status, o_spe_boost,
+                     speed_pairs[0], speed_pairs[1])
+
+        def calculate():
             logging.info("BasicPlanningPokemonAgent:determine_faster:%s:player_speed:%s",
-                         self.id, p_poke.effective_stat("spe"))
+                         self.id, p_speed)
 
-            speed_pairs = self.game_state.opp_gamestate["investment"][o_poke_name]["spe"]
             min_opp_spe, max_opp_spe = speed_pairs
             logging.info("BasicPlanningPokemonAgent:determine_faster:%s:opp_min_speed:%s",
                          self.id, min_opp_spe)
@@ -328,11 +415,11 @@ class BasicPlanningPokemonAgent(PokemonAgent):
 
             # Factor in status
             opp_modifier = 1
-            if opp_gs["data"]["active"]["status"] == PAR_STATUS:
+            if o_status == PAR_STATUS:
                 opp_modifier = opp_modifier * 0.5
 
             # Factor in Boosts
-            opp_modifier = opp_modifier * calc_boost_factor(opp_gs["data"]["active"], "spe")
+            opp_modifier = opp_modifier * calc_boost_factor({"boosts": {"spe": o_spe_boost}}, "spe")
             logging.info("BasicPlanningPokemonAgent:determine_faster:%s:opp_speed_modifier:%s",
                          self.id, opp_modifier)
 
@@ -340,10 +427,9 @@ class BasicPlanningPokemonAgent(PokemonAgent):
             opp_speed = opp_modifier * self._infer_from_speed_range(min_opp_spe, max_opp_spe)
             logging.info("BasicPlanningPokemonAgent:determine_faster:%s:opp_effective_speed:%s",
                          self.id, opp_speed)
-            return p_poke.effective_stat("spe") > opp_speed
+            return p_speed > opp_speed
 
-        # Moves of different priority will always go in priority order
-        return p_move["priority"] > o_move["priority"]
+        return self.turn_cache.get(cache_key, calculate)
 
     @staticmethod
     def _infer_from_speed_range(min_speed, max_speed):
@@ -363,20 +449,16 @@ class BasicPlanningPokemonAgent(PokemonAgent):
             List of possible outcomes and their weights.
 
         """
-        possible_outcomes = [move_opt + (True, )]
-        outcome_weights = [1]
-        if move_opt[0] == "ATTACK":
-            if player_flag:
-                chosen_move = self.game_state.gamestate["active"].moves[move_opt[1]]
-            else:
-                chosen_move = generate_move(MOVE_DATA[move_opt[1]])
+        if move_opt[0] != "ATTACK":
+            return [move_opt + (True, )], [1]
 
-            acc = chosen_move["accuracy"]
-            if not isinstance(acc, bool) and acc < 100:
-                outcome_weights = [(1.0 * val)/100 for val in [acc, 100 - acc]]
-                possible_outcomes = [move_opt + (val == acc, ) for val in [acc, 100 - acc]]
+        if player_flag:
+            chosen_move = self.game_state.gamestate["active"].moves[move_opt[1]]
+        else:
+            chosen_move = get_move(move_opt[1])
 
-        return possible_outcomes, outcome_weights
+        return self.turn_cache.get(("calc_move_outcomes", move_opt, chosen_move.id),
+                                   lambda: move_outcomes(move_opt, chosen_move))
 
     def position_func(self, *args, **kwargs):
         """
@@ -471,6 +553,43 @@ class BasicPlanningPokemonAgent(PokemonAgent):
         return my_gs, opp_gs
 
 
+def move_outcomes(move_opt, move):
+    """
+    Generate the possible hit/miss outcomes of an attack.
+
+    Args:
+        move_opt (tuple): The ATTACK option being made.
+        move (BaseMove): The move used by this option.
+
+    Returns:
+        List of possible outcomes and their weights.
+
+    """
+    possible_outcomes = [move_opt + (True, )]
+    outcome_weights = [1]
+
+    acc = move["accuracy"]
+    if not isinstance(acc, bool) and acc < 100:
+        outcome_weights = [(1.0 * val)/100 for val in [acc, 100 - acc]]
+        possible_outcomes = [move_opt + (val == acc, ) for val in [acc, 100 - acc]]
+
+    return possible_outcomes, outcome_weights
+
+
+def mean_dmg_range(dmg_ranges):
+    """
+    Average damage ranges, weighting each investment combination equally.
+
+    Args:
+        dmg_ranges (numpy.array): (min, max) damage range for each combination.
+
+    Returns:
+        Tuple with the average minimum and maximum damage.
+
+    """
+    return tuple((dmg_ranges.sum(axis=0) / len(dmg_ranges)).tolist())
+
+
 def atk_param_combinations(active_poke, opp_params, move):
     """
     Calculate possible parameter combinations for when we're attacking.
@@ -481,7 +600,8 @@ def atk_param_combinations(active_poke, opp_params, move):
         move (dict): The move that is being attacked with.
 
     Returns:
-        List of possible investment combinations when attacking.
+        Array of possible investment combinations when attacking,
+            in the format used by DamageStatCalc.calculate_ranges.
 
     """
     results = []
@@ -493,24 +613,22 @@ def atk_param_combinations(active_poke, opp_params, move):
         stat = "spa"
         opp_stat = "spd"
 
-    result_dict = {}
-    result_dict["atk"] = {}
-
     # Set the values for the player's pokemon investment
-    if stat in active_poke.evs and active_poke.evs[stat] > 128:
-        result_dict["atk"]["max_evs"] = True
-    if active_poke.increase_stat == stat:
-        result_dict["atk"]["positive_nature"] = True
+    atk_max_evs = stat in active_poke.evs and active_poke.evs[stat] > 128
+    atk_positive_nature = active_poke.increase_stat == stat
 
     # Set the values for the opponent's investment
     for hp_params in opp_params["hp"]:
         for def_params in opp_params[opp_stat]:
-            temp_results = deepcopy(result_dict)
-            temp_results["hp"] = hp_params
-            temp_results["def"] = def_params
-            results.append(temp_results)
+            comb = [False] * NUM_INVESTMENT_COLUMNS
+            comb[ATK_MAX_EVS] = atk_max_evs
+            comb[ATK_POSITIVE_NATURE] = atk_positive_nature
+            comb[DEF_MAX_EVS] = def_params.get("max_evs", False)
+            comb[DEF_POSITIVE_NATURE] = def_params.get("positive_nature", False)
+            comb[HP_MAX_EVS] = hp_params.get("max_evs", False)
+            results.append(comb)
 
-    return results
+    return np.array(results, dtype=bool)
 
 
 def def_param_combinations(active_poke, opp_params, move):
@@ -523,7 +641,8 @@ def def_param_combinations(active_poke, opp_params, move):
         move (dict): The move that is being attacked with.
 
     Returns:
-        List of possible investment combinations when on the defensive.
+        Array of possible investment combinations when on the defensive,
+            in the format used by DamageStatCalc.calculate_ranges.
 
     """
     results = []
@@ -535,26 +654,23 @@ def def_param_combinations(active_poke, opp_params, move):
         stat = "spd"
         opp_stat = "spa"
 
-    result_dict = {}
-    result_dict["def"] = {}
-    result_dict["hp"] = {}
-
     # Information for Defense Stat
-    if stat in active_poke.evs and active_poke.evs[stat] > 128:
-        result_dict["def"]["max_evs"] = True
-    if active_poke.increase_stat == stat:
-        result_dict["def"]["positive_nature"] = True
+    def_max_evs = stat in active_poke.evs and active_poke.evs[stat] > 128
+    def_positive_nature = active_poke.increase_stat == stat
 
     # Information for HP Stat
-    if "hp" in active_poke.evs and active_poke.evs["hp"] > 128:
-        result_dict["hp"]["max_evs"] = True
+    hp_max_evs = "hp" in active_poke.evs and active_poke.evs["hp"] > 128
 
     for atk_params in opp_params[opp_stat]:
-        temp_results = deepcopy(result_dict)
-        temp_results["atk"] = atk_params
-        results.append(temp_results)
-
-    return results
+        comb = [False] * NUM_INVESTMENT_COLUMNS
+        comb[ATK_MAX_EVS] = atk_params.get("max_evs", False)
+        comb[ATK_POSITIVE_NATURE] = atk_params.get("positive_nature", False)
+        comb[DEF_MAX_EVS] = def_max_evs
+        comb[DEF_POSITIVE_NATURE] = def_positive_nature
+        comb[HP_MAX_EVS] = hp_max_evs
+        results.append(comb)
+
+    return np.array(results, dtype=bool)
 
 
 def update_gs_switch(gamestate, opt, my_gs=True):
@@ -1,7 +1,5 @@
 """Class for a pokemon player."""
 
-from random import random
-from random import uniform
 import logging
 
 from agent.base_agent import BaseAgent
@@ -80,11 +78,11 @@ class PokemonAgent(BaseAgent):
         logging.info("PokemonAgent:make_move:%s:can_switch:%s",
                      self.id, can_switch)
 
-        if can_switch and random() < 0.5:
-            switch = int(uniform(0, self._num_remaining_pokemon()))
+        if can_switch and self.rng.random() < 0.5:
+            switch = int(self.rng.uniform(0, self._num_remaining_pokemon()))
             response = "SWITCH", switch
         else:
-            move_ind = int(uniform(0, len(moves)))
+            move_ind = int(self.rng.uniform(0, len(moves)))
             response = moves[move_ind]
 
         logging.info("PokemonAgent:make_move:%s:chosen_move:%s",
@@ -105,7 +103,7 @@ class PokemonAgent(BaseAgent):
         if not self._num_remaining_pokemon():
             raise RuntimeError("No members left, cannot switch")
 
-        choice = uniform(0, self._num_remaining_pokemon())
+        choice = self.rng.uniform(0, self._num_remaining_pokemon())
         choice = int(choice)
 
         logging.info("PokemonAgent:switch_faint:%s:num_remaining_pkmn:%s",
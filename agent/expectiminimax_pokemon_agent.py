@@ -0,0 +1,617 @@
+"""Pokemon agent who searches several turns ahead with expectiminimax."""
+
+from collections import namedtuple
+from math import inf
+from time import time
+import logging
+
+from agent.basic_planning_pokemon_agent import BasicPlanningPokemonAgent
+from agent.basic_planning_pokemon_agent import move_outcomes
+from pokemon_helpers.calculate import calculate_status_damage
+from pokemon_helpers.moves import get_move
+from pokemon_helpers.pokemon import default_boosts
+
+# Immutable state of a battle during the search.
+# Player entries are (slot, current_hp, keeps_boosts), where slot is the
+# position of the pokemon in ExpectiminimaxPokemonAgent.search_pokemon.
+# Opponent entries are (name, pct_hp, status, status_turns, spe_boost).
+SearchState = namedtuple("SearchState", ["my_active", "my_team", "opp_active", "opp_team"])
+
+
+class SearchTimeout(RuntimeError):
+    """Raised when a search runs past its deadline."""
+
+
+class ExpectiminimaxPokemonAgent(BasicPlanningPokemonAgent):
+    """
+    Class for PokemonAgent who searches several turns ahead.
+
+    Each turn of the search maximizes over this player's options, minimizes
+    over the opponent's options and averages over moves hitting or missing.
+    Turns are applied with the same model as BasicPlanningPokemonAgent.apply_moves,
+    on an immutable SearchState instead of copies of the gamestate.
+
+    Attributes:
+        search_depth (int): Maximum number of turns to search ahead.
+        time_limit (float): Seconds allowed per move. Deeper searches that
+            pass this are abandoned, and the deepest completed search is used.
+        nodes_searched (int): Total number of search nodes visited.
+        search_time (float): Total seconds spent searching.
+        search_pokemon (list): Pairs of this player's pokemon for the current
+            search, with their current boosts and with boosts reset.
+        positions (set): Positions already reached in this battle.
+
+    """
+
+    def __init__(self, tier, **kwargs):
+        """
+        Initialize a player with a specific tier.
+
+        Args:
+            tier (str): Tier to look at usage stats for.
+            team (list): The team of pokemon this agent uses.
+            search_depth (int): Maximum number of turns to search ahead.
+            time_limit (float): Seconds allowed to choose each move.
+            cache_size (int): Maximum number of results in the turn cache.
+
+        """
+        super().__init__(tier, **kwargs)
+        self.search_depth = kwargs.get("search_depth", 3)
+        self.time_limit = kwargs.get("time_limit", 1.0)
+        self.nodes_searched = 0
+        self.search_time = 0
+
+        self.positions = set()
+
+        # Data for the current search
+        self.search_pokemon = []
+        self.deadline = inf
+        self.values = {}
+        self.options = {}
+        self.opp_moves = {}
+
+    def init_opp_gamestate(self, opp_team, opp_active):
+        """
+        Initialize the investment data for the opponent's team.
+
+        Args:
+            opp_team (list): List with the opponent's Pokemon.
+            opp_active (Pokemon): Opponent's active Pokemon.
+
+        """
+        super().init_opp_gamestate(opp_team, opp_active)
+        self.positions = set()
+
+    def make_move(self):
+        """
+        Choose the move to make.
+
+        Returns:
+            Tuple of move type (SWITCH or ATTACK) and position.
+
+        """
+        player_opts, opp_opts = self.generate_possibilities()
+        move_choice = self.search(player_opts, opp_opts)
+        logging.info("ExpectiminimaxPokemonAgent:make_move:%s:nodes_per_second:%s",
+                     self.id, self.nodes_per_second())
+        logging.info("ExpectiminimaxPokemonAgent:make_move:%s:cache_hit_rate:%s",
+                     self.id, self.turn_cache.hit_rate())
+        return move_choice
+
+    def nodes_per_second(self):
+        """
+        Search speed of this agent.
+
+        Returns:
+            Number of search nodes visited per second, or None if this
+                agent has not searched yet.
+
+        """
+        if not self.search_time:
+            return None
+        return self.nodes_searched / self.search_time
+
+    def print_info(self):
+        """Print information about this agent."""
+        super().print_info()
+        print("\tNodes/Second: {} ({})".format(self.nodes_per_second(), self.nodes_searched))
+
+    def search(self, player_opts, opp_opts):
+        """
+        Search for the best move with iterative deepening.
+
+        Searches one turn ahead, then two, up to search_depth turns, until
+        time_limit runs out. The first search always completes.
+
+        Args:
+            player_opts (list): List of the player's moves for this turn.
+            opp_opts (list): List of the opponent's moves for this turn.
+
+        Returns:
+            Player move with the best value in the deepest completed search.
+
+        """
+        start_time = time()
+        root = self.init_search()
+
+        best_move = None
+        self.deadline = inf
+        for depth in range(1, self.search_depth + 1):
+            try:
+                best_move = self.best_option(root, depth, player_opts, opp_opts, best_move)
+            except SearchTimeout:
+                break
+
+            logging.info("ExpectiminimaxPokemonAgent:search:%s:depth:%s:best_move:%s",
+                         self.id, depth, best_move)
+            self.deadline = start_time + self.time_limit
+
+        self.positions.add(self.position(root))
+        self.search_time += time() - start_time
+        return best_move
+
+    def init_search(self):
+        """
+        Reset search data and build the state for the current gamestate.
+
+        Returns:
+            SearchState for the current gamestate.
+
+        """
+        self.values = {}
+        self.options = {}
+        self.opp_moves = {}
+
+        my_gs = self.game_state.gamestate
+        opp_data = self.game_state.opp_gamestate["data"]
+
+        self.search_pokemon = []
+        for poke in [my_gs["active"]] + my_gs["team"]:
+            reset_poke = poke.battle_copy()
+            reset_poke.boosts = default_boosts()
+            self.search_pokemon.append((poke, reset_poke))
+
+        my_active = (0, my_gs["active"].current_hp,
+                     my_gs["active"].boosts != default_boosts())
+        my_team = tuple((slot + 1, poke.current_hp, False)
+                        for slot, poke in enumerate(my_gs["team"]))
+
+        opp_active = (opp_data["active"]["name"], opp_data["active"]["pct_hp"],
+                      opp_data["active"]["status"], opp_data["active"]["status_turns"],
+                      opp_data["active"]["boosts"]["spe"])
+        opp_team = tuple((poke["name"], poke["pct_hp"], poke["status"], poke["status_turns"], 0)
+                         for poke in opp_data["team"])
+
+        return SearchState(my_active, my_team, opp_active, opp_team)
+
+    def best_option(self, state, depth, player_opts, opp_opts, first_opt=None):
+        """
+        Find the player's best option at the root of the search.
+
+        Args:
+            state (SearchState): State at the root of the search.
+            depth (int): Number of turns to search.
+            player_opts (list): List of the player's moves for this turn.
+            opp_opts (list): List of the opponent's moves for this turn.
+            first_opt (tuple): Option to search first, such as the best
+                option from a shallower search.
+
+        Returns:
+            Player option with the highest value.
+
+        """
+        player_opts, opp_opts = self.order_options(state, player_opts, opp_opts)
+        if first_opt in player_opts:
+            player_opts.remove(first_opt)
+            player_opts.insert(0, first_opt)
+
+        best_opt = None
+        best_value = -inf
+        for p_opt in player_opts:
+            value = self.min_value(state, p_opt, opp_opts, depth, best_value)
+            if value > best_value:
+                best_opt = p_opt
+                best_value = value
+
+        return best_opt
+
+    def max_value(self, state, depth):
+        """
+        Value of a state when it is the player's turn to choose.
+
+        Args:
+            state (SearchState): State to find the value of.
+            depth (int): Number of turns left to search.
+
+        Returns:
+            Best value the player can guarantee from this state.
+
+        """
+        key = (state, depth)
+        if key in self.values:
+            return self.values[key]
+
+        self.nodes_searched += 1
+        # Positions already reached in the battle aren't searched again,
+        # since searching them only repeats turns that were already played
+        if depth == 0 or is_terminal(state) or self.position(state) in self.positions:
+            value = self.evaluate(state)
+        else:
+            if time() > self.deadline:
+                raise SearchTimeout("Search passed its deadline.")
+
+            player_opts, opp_opts = self.state_options(state)
+            value = -inf
+            for p_opt in player_opts:
+                value = max(value, self.min_value(state, p_opt, opp_opts, depth, value))
+
+        self.values[key] = value
+        return value
+
+    def min_value(self, state, p_opt, opp_opts, depth, alpha):
+        """
+        Value of a player option when the opponent chooses their response.
+
+        Args:
+            state (SearchState): State the options are chosen in.
+            p_opt (tuple): The player's option.
+            opp_opts (list): The opponent's options, best first.
+            depth (int): Number of turns left to search.
+            alpha (float): Value the player can already guarantee. Once the
+                opponent has a response below this, the rest are skipped.
+
+        Returns:
+            Worst value for the player over the opponent's options, or a value
+                no greater than alpha if the search was cut off.
+
+        """
+        self.nodes_searched += 1
+        p_outcomes = self.option_outcomes(state, p_opt, True)
+
+        value = inf
+        for o_opt in opp_opts:
+            o_outcomes = self.option_outcomes(state, o_opt, False)
+
+            # Average over moves hitting or missing
+            expected_value = 0
+            for p_hit, p_weight in p_outcomes:
+                for o_hit, o_weight in o_outcomes:
+                    next_state = self.transition(state, p_opt, o_opt, p_hit, o_hit)
+                    expected_value += p_weight * o_weight * \
+                        self.max_value(next_state, depth - 1)
+
+            value = min(value, expected_value)
+            if value <= alpha:
+                break
+
+        return value
+
+    def evaluate(self, state):
+        """
+        Battle position of a state.
+
+        Same as BasicPlanningPokemonAgent.position_func, the ratio of the
+        player's remaining HP to the opponent's.
+
+        Args:
+            state (SearchState): State to evaluate.
+
+        Returns:
+            Value of the state for this player.
+
+        """
+        my_posn = 0.01
+        for slot, current_hp, _ in (state.my_active, ) + state.my_team:
+            if current_hp > 0:
+                my_posn += current_hp / self.search_pokemon[slot][0].max_hp
+
+        opp_posn = 0.01
+        for opp_poke in (state.opp_active, ) + state.opp_team:
+            if opp_poke[1] > 0:
+                opp_posn += opp_poke[1]
+
+        return my_posn / opp_posn
+
+    def position(self, state):
+        """
+        Describe a state in a way that can be compared between turns.
+
+        Args:
+            state (SearchState): State to describe.
+
+        Returns:
+            Tuple of the active pokemon and the sorted teams, with this
+                player's slots replaced by names.
+
+        """
+        my_active = (self.search_pokemon[state.my_active[0]][0].name, ) + state.my_active[1:]
+        my_team = tuple(sorted((self.search_pokemon[slot][0].name, current_hp)
+                               for slot, current_hp, _ in state.my_team))
+        return my_active, my_team, state.opp_active, tuple(sorted(state.opp_team))
+
+    def active_pokemon(self, my_entry):
+        """
+        Get the Pokemon for a player entry in a SearchState.
+
+        Args:
+            my_entry (tuple): Player entry of (slot, current_hp, keeps_boosts).
+
+        Returns:
+            This player's Pokemon, with or without its current boosts.
+
+        """
+        if my_entry[2]:
+            return self.search_pokemon[my_entry[0]][0]
+        return self.search_pokemon[my_entry[0]][1]
+
+    def state_options(self, state):
+        """
+        Generate the ordered options for both players in a state.
+
+        Args:
+            state (SearchState): State to generate options for.
+
+        Returns:
+            Lists of player and opponent options, ordered best first with
+                dominated attacks removed.
+
+        """
+        key = (state.my_active[0], state.my_active[2], len(state.my_team),
+               state.opp_active[0], state.opp_active[2], len(state.opp_team))
+        if key not in self.options:
+            my_poke = self.active_pokemon(state.my_active)
+            player_opts = [("ATTACK", move_ind) for move_ind in range(len(my_poke.moves))]
+            player_opts += [("SWITCH", posn) for posn in range(len(state.my_team))]
+
+            opp_name = state.opp_active[0]
+            if opp_name not in self.opp_moves:
+                self.opp_moves[opp_name] = self.infer_opp_moves(opp_name)
+            opp_opts = [("ATTACK", move) for move in self.opp_moves[opp_name]]
+            opp_opts += [("SWITCH", posn) for posn in range(len(state.opp_team))]
+
+            self.options[key] = self.order_options(state, player_opts, opp_opts)
+
+        return self.options[key]
+
+    def order_options(self, state, player_opts, opp_opts):
+        """
+        Order options best first and remove dominated attacks.
+
+        Attacks are ordered by expected damage, followed by switches. An attack
+        is dominated if another attack with the same priority does at least as
+        much damage and hits at least as often, so it can never do better.
+
+        Args:
+            state (SearchState): State the options are chosen in.
+            player_opts (list): The player's options.
+            opp_opts (list): The opponent's options.
+
+        Returns:
+            Ordered lists of player and opponent options.
+
+        """
+        my_poke = self.active_pokemon(state.my_active)
+        opp_name, _, opp_status, _, _ = state.opp_active
+
+        player_attacks = []
+        for p_opt in player_opts:
+            if p_opt[0] == "ATTACK":
+                p_move = my_poke.moves[p_opt[1]]
+                dmg_range = self.attack_dmg_range(p_move=p_move, p_poke=my_poke,
+                                                  o_poke_name=opp_name)
+                player_attacks.append((p_opt, p_move["priority"], sum(dmg_range),
+                                       self.hit_chance(state, p_opt, True)))
+
+        opp_attacks = []
+        for o_opt in opp_opts:
+            if o_opt[0] == "ATTACK":
+                o_move = get_move(o_opt[1])
+                dmg_range = self.defend_dmg_range(my_poke, o_move, opp_name, opp_status)
+                opp_attacks.append((o_opt, o_move["priority"], sum(dmg_range),
+                                    self.hit_chance(state, o_opt, False)))
+
+        return (order_attacks(player_attacks) + [opt for opt in player_opts if opt[0] == "SWITCH"],
+                order_attacks(opp_attacks) + [opt for opt in opp_opts if opt[0] == "SWITCH"])
+
+    def option_outcomes(self, state, opt, player_flag):
+        """
+        Possible hit/miss outcomes of an option.
+
+        Args:
+            state (SearchState): State the option is chosen in.
+            opt (tuple): The option being made.
+            player_flag (bool): Whether this is the player's or the opponent's option.
+
+        Returns:
+            List of (hit, weight) pairs.
+
+        """
+        if opt[0] != "ATTACK":
+            return ((True, 1), )
+
+        if player_flag:
+            move = self.active_pokemon(state.my_active).moves[opt[1]]
+        else:
+            move = get_move(opt[1])
+
+        outcomes, weights = self.turn_cache.get(("calc_move_outcomes", opt, move.id),
+                                                lambda: move_outcomes(opt, move))
+        return tuple((outcome[2], weight) for outcome, weight in zip(outcomes, weights))
+
+    def hit_chance(self, state, opt, player_flag):
+        """
+        Chance of an option's attack hitting.
+
+        Args:
+            state (SearchState): State the option is chosen in.
+            opt (tuple): The option being made.
+            player_flag (bool): Whether this is the player's or the opponent's option.
+
+        Returns:
+            Probability of the attack hitting.
+
+        """
+        return sum(weight for hit, weight in self.option_outcomes(state, opt, player_flag) if hit)
+
+    def transition(self, state, p_opt, o_opt, p_hit, o_hit):
+        """
+        Apply both players' options to a state.
+
+        Follows BasicPlanningPokemonAgent.apply_moves. Afterwards, fainted
+        pokemon are replaced by the healthiest remaining teammate.
+
+        Args:
+            state (SearchState): State the options are chosen in.
+            p_opt (tuple): The player's option.
+            o_opt (tuple): The opponent's option.
+            p_hit (bool): Whether the player's attack hits.
+            o_hit (bool): Whether the opponent's attack hits.
+
+        Returns:
+            SearchState after this turn.
+
+        """
+        my_active, my_team, opp_active, opp_team = state
+
+        # Switches reset the boosts of the pokemon switching out
+        if p_opt[0] == "SWITCH":
+            new_active = my_team[p_opt[1]]
+            my_team = my_team[:p_opt[1]] + my_team[p_opt[1] + 1:] + \
+                ((my_active[0], my_active[1], False), )
+            my_active = new_active
+
+        if o_opt[0] == "SWITCH":
+            new_active = opp_team[o_opt[1]]
+            opp_team = opp_team[:o_opt[1]] + opp_team[o_opt[1] + 1:] + \
+                (opp_active[:4] + (0, ), )
+            opp_active = new_active
+
+        my_poke = self.active_pokemon(my_active)
+        my_hp = my_active[1]
+        opp_name, opp_hp, opp_status, opp_status_turns, opp_spe_boost = opp_active
+
+        # Attacking
+        if p_opt[0] == "ATTACK" and o_opt[0] == "ATTACK":
+            p_move = my_poke.moves[p_opt[1]]
+            o_move = get_move(o_opt[1])
+            if self.is_faster(my_poke, p_move, o_move, opp_name, opp_status, opp_spe_boost):
+                # We attack first, then opponent attacks
+                if p_hit:
+                    opp_hp = self.attacked_pct_hp(my_poke, p_move, opp_name, opp_hp)
+                if opp_hp > 0 and o_hit:
+                    my_hp = self.defended_hp(my_poke, my_hp, o_move, opp_name, opp_status)
+            else:
+                # Opponent attacks first, then us
+                if o_hit:
+                    my_hp = self.defended_hp(my_poke, my_hp, o_move, opp_name, opp_status)
+                if my_hp > 0 and p_hit:
+                    opp_hp = self.attacked_pct_hp(my_poke, p_move, opp_name, opp_hp)
+
+        elif p_opt[0] == "ATTACK" and p_hit:
+            # Only we attack, and we don't miss
+            opp_hp = self.attacked_pct_hp(my_poke, my_poke.moves[p_opt[1]], opp_name, opp_hp)
+
+        elif o_opt[0] == "ATTACK" and o_hit:
+            # Only opponent attacks, and doesn't miss
+            my_hp = self.defended_hp(my_poke, my_hp, get_move(o_opt[1]), opp_name, opp_status)
+
+        # Apply status damage
+        my_hp = max(my_hp - my_hp * calculate_status_damage(my_poke), 0)
+        opp_hp = max(opp_hp - calculate_status_damage({"status": opp_status,
+                                                       "status_turns": opp_status_turns}), 0.0)
+
+        my_active = (my_active[0], my_hp, my_active[2])
+        opp_active = (opp_name, opp_hp, opp_status, opp_status_turns, opp_spe_boost)
+
+        # Replace fainted pokemon
+        if my_hp <= 0 and my_team:
+            my_active = max(my_team, key=lambda entry: entry[1] / self.active_pokemon(entry).max_hp)
+            my_team = tuple(entry for entry in my_team if entry is not my_active)
+        if opp_hp <= 0 and opp_team:
+            opp_active = max(opp_team, key=lambda entry: entry[1])
+            opp_team = tuple(entry for entry in opp_team if entry is not opp_active)
+
+        return SearchState(my_active, my_team, opp_active, opp_team)
+
+    def attacked_pct_hp(self, my_poke, p_move, opp_name, opp_hp):
+        """
+        Calculate the opponent's HP after being attacked.
+
+        Args:
+            my_poke (Pokemon): This player's attacking pokemon.
+            p_move (BaseMove): The move being used.
+            opp_name (str): Name of the opponent's pokemon.
+            opp_hp (float): Opponent's HP as a proportion of their max HP.
+
+        Returns:
+            Opponent's HP after the average damage of the attack.
+
+        """
+        dmg_range = self.attack_dmg_range(my_poke, p_move, opp_name)
+        return max(opp_hp - (dmg_range[0] + dmg_range[1]) / 200, 0)
+
+    def defended_hp(self, my_poke, my_hp, o_move, opp_name, opp_status):
+        """
+        Calculate this player's HP after being attacked.
+
+        Args:
+            my_poke (Pokemon): This player's defending pokemon.
+            my_hp (float): This player's pokemon's current HP.
+            o_move (BaseMove): The move being used by the opponent.
+            opp_name (str): Name of the opponent's pokemon.
+            opp_status (str): Status of the opponent's pokemon.
+
+        Returns:
+            This player's HP after the average damage of the attack.
+
+        """
+        dmg_range = self.defend_dmg_range(my_poke, o_move, opp_name, opp_status)
+        return max(my_hp - my_poke.max_hp * (dmg_range[0] + dmg_range[1]) / 200, 0)
+
+
+def is_terminal(state):
+    """
+    Determine whether either player has no pokemon left.
+
+    Args:
+        state (SearchState): State to check.
+
+    Returns:
+        True if the battle is over in this state.
+
+    """
+    return (state.my_active[1] <= 0 and not state.my_team) or \
+        (state.opp_active[1] <= 0 and not state.opp_team)
+
+
+def order_attacks(attacks):
+    """
+    Order attacks by expected damage and remove dominated attacks.
+
+    Args:
+        attacks (list): Tuples of (option, priority, damage, hit chance).
+
+    Returns:
+        List of the options that are not dominated, most expected damage first.
+
+    """
+    # Attacks that do no damage are the same whether or not they hit
+    attacks = [(opt, priority, damage, hit_chance if damage else 0)
+               for opt, priority, damage, hit_chance in attacks]
+
+    # Most expected damage first; ties keep the original order
+    attacks.sort(key=lambda attack: attack[2] * attack[3], reverse=True)
+
+    kept = []
+    for opt, priority, damage, hit_chance in attacks:
+        dominated = False
+        for _, kept_priority, kept_damage, kept_hit_chance in kept:
+            if kept_priority == priority and kept_damage >= damage and \
+                    kept_hit_chance >= hit_chance:
+                dominated = True
+                break
+
+        if not dominated:
+            kept.append((opt, priority, damage, hit_chance))
+
+    return [attack[0] for attack in kept]
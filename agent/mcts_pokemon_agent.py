@@ -0,0 +1,465 @@
+"""Pokemon agent who chooses moves with Monte Carlo tree search."""
+
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+from random import Random
+from time import time
+import logging
+
+from agent.basic_pokemon_agent import PokemonAgent
+from battle_engine.rollout_engine import RolloutEngine
+from config import USAGE_STATS
+from pokemon_helpers.pokemon import Pokemon
+from pokemon_helpers.pokemon import default_boosts
+
+
+class MCTSNode():
+    """
+    Node of an open loop search tree.
+
+    Nodes are reached by the options both players chose, not by the
+    resulting state, so a node averages over hits, misses and damage rolls.
+    Each player's options are scored separately at every node.
+
+    Attributes:
+        visits (int): Number of searches through this node.
+        my_stats (dict): [visits, total value] for each of this player's options.
+        opp_stats (dict): [visits, total value] for each of the opponent's options.
+        children (dict): Child nodes, keyed by (player option, opponent option).
+
+    """
+
+    __slots__ = ("visits", "my_stats", "opp_stats", "children")
+
+    def __init__(self):
+        """Initialize an unvisited node."""
+        self.visits = 0
+        self.my_stats = {}
+        self.opp_stats = {}
+        self.children = {}
+
+
+class MCTSPokemonAgent(PokemonAgent):
+    """
+    Class for PokemonAgent who chooses moves with Monte Carlo tree search.
+
+    Turns are simulated with a RolloutEngine built from this player's
+    game state. The opponent's moves come from the ones they have used
+    and the tier's usage stats, which are also their priors in the search.
+
+    Attributes:
+        tier (str): Tier to look at usage stats for.
+        rollouts (int): Number of searches per move, or None for no limit.
+        time_limit (float): Seconds allowed per move, or None for no limit.
+        workers (int): Number of processes to search in. With more than one,
+            each process searches its own tree and the results are combined.
+        exploration (float): Weight of the exploration term when choosing options.
+        rollout_turns (int): Maximum number of turns in each rollout.
+        reuse_tree (bool): Whether to keep the subtree for the last turn's
+            options between moves.
+        simulated_turns (int): Total number of turns simulated.
+        search_time (float): Total seconds spent searching.
+
+    """
+
+    def __init__(self, tier, **kwargs):
+        """
+        Initialize a player with a specific tier.
+
+        Args:
+            tier (str): Tier to look at usage stats for.
+            team (list): The team of pokemon this agent uses.
+            rollouts (int): Number of searches per move.
+            time_limit (float): Seconds allowed per move.
+            workers (int): Number of processes to search in.
+            exploration (float): Weight of the exploration term when choosing options.
+            rollout_turns (int): Maximum number of turns in each rollout.
+            reuse_tree (bool): Whether to keep the search tree between moves.
+
+        """
+        team = kwargs["team"]
+        super().__init__(team)
+        self.tier = tier
+        self.rollouts = kwargs.get("rollouts", 500)
+        self.time_limit = kwargs.get("time_limit")
+        self.workers = kwargs.get("workers", 1)
+        self.exploration = kwargs.get("exploration", 0.7)
+        self.rollout_turns = kwargs.get("rollout_turns", 20)
+        self.reuse_tree = kwargs.get("reuse_tree", True)
+
+        if self.rollouts is None and self.time_limit is None:
+            raise AttributeError("Either rollouts or time_limit must be set.")
+        if self.workers < 1:
+            raise AttributeError("Must have at least one worker.")
+
+        self.simulated_turns = 0
+        self.search_time = 0
+        self.executor = None
+
+        # Search tree, and what is needed to find the subtree for the next move
+        self.root = None
+        self.last_key = None
+        self.last_remaining = None
+        self.last_opp_team = []
+        self.opp_pokemon = {}
+
+    def init_opp_gamestate(self, opp_team, opp_active):
+        """
+        Initialize the investment data for the opponent's team.
+
+        Args:
+            opp_team (list): List with the opponent's Pokemon.
+            opp_active (Pokemon): Opponent's active Pokemon.
+
+        """
+        super().init_opp_gamestate(opp_team, opp_active)
+        self.root = None
+        self.last_key = None
+        self.opp_pokemon = {}
+
+    def make_move(self):
+        """
+        Choose the move to make.
+
+        Returns:
+            Tuple of move type (SWITCH or ATTACK) and position.
+
+        """
+        start_time = time()
+        engine = self.build_engine()
+
+        if self.workers > 1:
+            my_stats, turns = self.parallel_search(engine)
+            self.root = None
+        else:
+            root = self.next_root()
+            search(engine, root, self.rollouts, self.time_limit,
+                   self.exploration, self.rollout_turns)
+            my_stats, turns = root.my_stats, engine.turns
+            self.root = root
+
+        engine.reset()
+        move_choice = best_action(my_stats, engine.legal_actions(0))
+
+        # Remember enough to find the subtree for the next move
+        opp_data = self.game_state.opp_gamestate["data"]
+        self.last_key = [move_choice, None]
+        self.last_remaining = (len(self.game_state.gamestate["team"]), len(opp_data["team"]))
+        self.last_opp_team = [opp_poke["name"] for opp_poke in opp_data["team"]]
+
+        self.simulated_turns += turns
+        self.search_time += time() - start_time
+        logging.info("MCTSPokemonAgent:make_move:%s:turns_per_second:%s",
+                     self.id, self.turns_per_second())
+        logging.info("MCTSPokemonAgent:make_move:%s:chosen_move:%s", self.id, move_choice)
+
+        return move_choice
+
+    def new_info(self, raw_turn_info):
+        """
+        Get new info for opponent's game_state, and record the opponent's option.
+
+        Args:
+            raw_turn_info (list): What happened on that turn, who took what damage.
+
+        """
+        super().new_info(raw_turn_info)
+        if self.last_key is None:
+            return
+
+        for info in raw_turn_info:
+            if info["type"] == "SWITCH" and info["player"] != self.id:
+                self.last_key[1] = ("SWITCH", self.last_opp_team.index(info["new_active"]))
+            elif info["type"] == "ATTACK" and info["attacker"] != self.id:
+                self.last_key[1] = ("ATTACK", info["move"]["id"])
+
+    def turns_per_second(self):
+        """
+        Rollout speed of this agent.
+
+        Returns:
+            Number of turns simulated per second, or None if this agent
+                has not searched yet.
+
+        """
+        if not self.search_time:
+            return None
+        return self.simulated_turns / self.search_time
+
+    def print_info(self):
+        """Print information about this agent."""
+        super().print_info()
+        print("\tTurns/Second: {} ({})".format(self.turns_per_second(), self.simulated_turns))
+
+    def next_root(self):
+        """
+        Get the root of the search tree for this move.
+
+        Reuses the subtree for both players' options last turn, unless a
+        pokemon fainted or the opponent's option is not known.
+
+        Returns:
+            MCTSNode to search from.
+
+        """
+        root = None
+        if self.reuse_tree and self.root is not None and self.last_key is not None \
+                and self.last_key[1] is not None:
+            remaining = (len(self.game_state.gamestate["team"]),
+                         len(self.game_state.opp_gamestate["data"]["team"]))
+            if remaining == self.last_remaining:
+                root = self.root.children.get(tuple(self.last_key))
+
+        if root is None:
+            root = MCTSNode()
+        return root
+
+    def parallel_search(self, engine):
+        """
+        Search independent trees in worker processes.
+
+        Args:
+            engine (RolloutEngine): Engine for the current state of the battle.
+
+        Returns:
+            Combined statistics for this player's options at the root, and
+                the number of turns simulated.
+
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        rollouts = None
+        if self.rollouts is not None:
+            rollouts = -(-self.rollouts // self.workers)
+
+        futures = [self.executor.submit(search_worker, engine, rollouts, self.time_limit,
+                                        self.exploration, self.rollout_turns,
+                                        self.rng.getrandbits(32))
+                   for _ in range(self.workers)]
+
+        my_stats = {}
+        turns = 0
+        for future in futures:
+            worker_stats, worker_turns = future.result()
+            turns += worker_turns
+            for action, stats in worker_stats.items():
+                if action not in my_stats:
+                    my_stats[action] = [0, 0]
+                my_stats[action][0] += stats[0]
+                my_stats[action][1] += stats[1]
+
+        return my_stats, turns
+
+    def close(self):
+        """Shut down the worker processes, if there are any."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def build_engine(self):
+        """
+        Build a RolloutEngine for the current state of the battle.
+
+        The opponent's pokemon have the moves from opp_move_weights and
+        no investment, with their HP and status from the game state.
+
+        Returns:
+            RolloutEngine starting from the current state.
+
+        """
+        my_gs = self.game_state.gamestate
+        opp_data = self.game_state.opp_gamestate["data"]
+
+        opp_team = []
+        opp_weights = []
+        for opp_data_poke in [opp_data["active"]] + opp_data["team"]:
+            move_ids, weights = self.opp_move_weights(opp_data_poke["name"])
+            key = (opp_data_poke["name"], tuple(move_ids))
+            if key not in self.opp_pokemon:
+                self.opp_pokemon[key] = Pokemon(name=opp_data_poke["name"], moves=move_ids)
+
+            opp_poke = self.opp_pokemon[key]
+            opp_poke.current_hp = opp_poke.max_hp * opp_data_poke["pct_hp"]
+            opp_poke.status = opp_data_poke["status"]
+            opp_poke.status_turns = opp_data_poke["status_turns"]
+            opp_poke.boosts = dict(opp_data_poke.get("boosts", default_boosts()))
+
+            opp_team.append(opp_poke)
+            opp_weights.append(weights)
+
+        return RolloutEngine([my_gs["active"]] + my_gs["team"], opp_team, opp_weights,
+                             rng=self.rng)
+
+    def opp_move_weights(self, opp_poke_name):
+        """
+        Determine the moves the opponent's pokemon might have, and how likely each is.
+
+        Args:
+            opp_poke_name (str): Name of the opponent's pokemon.
+
+        Returns:
+            List of up to four move IDs, the moves seen so far then the
+                most common moves for this pokemon in the tier, and a
+                list of their usage in the tier.
+
+        """
+        usage = USAGE_STATS[self.tier][opp_poke_name]["Moves"]
+        default_weight = max(usage.values()) if usage else 1
+
+        move_ids = []
+        for move in self.game_state.opp_gamestate["moves"].get(opp_poke_name, []):
+            if move["id"] not in move_ids:
+                move_ids.append(move["id"])
+
+        common_moves = sorted(usage, key=usage.get, reverse=True)
+        for move in common_moves:
+            if len(move_ids) == 4:
+                break
+            if move != "" and move not in move_ids:
+                move_ids.append(move)
+
+        weights = [usage.get(move) or default_weight for move in move_ids]
+        return move_ids, weights
+
+
+def search(engine, root, rollouts, time_limit, exploration, rollout_turns):
+    """
+    Run Monte Carlo tree search from a root node.
+
+    Each search follows the tree by choosing options for both players,
+    expands a new node, and plays out the rest of the game with
+    RolloutEngine.rollout. Searches stop after the rollout budget or the
+    time limit, whichever comes first.
+
+    Args:
+        engine (RolloutEngine): Engine for the state at the root.
+        root (MCTSNode): Node to search from.
+        rollouts (int): Number of searches, or None for no limit.
+        time_limit (float): Seconds to search for, or None for no limit.
+        exploration (float): Weight of the exploration term when choosing options.
+        rollout_turns (int): Maximum number of turns in each rollout.
+
+    """
+    deadline = None
+    if time_limit is not None:
+        deadline = time() + time_limit
+
+    num_rollouts = 0
+    while rollouts is None or num_rollouts < rollouts:
+        if deadline is not None and time() > deadline:
+            break
+        num_rollouts += 1
+
+        engine.reset()
+        node = root
+        path = []
+        while True:
+            if engine.finished():
+                value = engine.value()
+                break
+
+            my_action = select_action(node.my_stats, engine.priors(0),
+                                      node.visits, exploration, False)
+            opp_action = select_action(node.opp_stats, engine.priors(1),
+                                       node.visits, exploration, True)
+            path.append((node, my_action, opp_action))
+            engine.step(my_action, opp_action)
+
+            key = (my_action, opp_action)
+            if key not in node.children:
+                node.children[key] = MCTSNode()
+                value = engine.rollout(rollout_turns)
+                break
+            node = node.children[key]
+
+        # Backpropagate the value for this player
+        for node, my_action, opp_action in path:
+            node.visits += 1
+            for stats, action in ((node.my_stats, my_action), (node.opp_stats, opp_action)):
+                if action not in stats:
+                    stats[action] = [0, 0]
+                stats[action][0] += 1
+                stats[action][1] += value
+
+
+def select_action(stats, priors, visits, exploration, opponent):
+    """
+    Choose an option with PUCT.
+
+    Args:
+        stats (dict): [visits, total value] for each option tried so far.
+        priors (dict): Prior probability of each legal option.
+        visits (int): Number of searches through this node.
+        exploration (float): Weight of the exploration term.
+        opponent (bool): Whether the option is being chosen for the
+            opponent, who minimizes this player's value.
+
+    Returns:
+        The option with the highest score.
+
+    """
+    sqrt_visits = sqrt(visits)
+    best = None
+    best_score = None
+    for action, prior in priors.items():
+        action_stats = stats.get(action)
+        if action_stats is None:
+            mean_value = 0.5
+            action_visits = 0
+        else:
+            action_visits, total_value = action_stats
+            mean_value = total_value / action_visits
+        if opponent:
+            mean_value = 1 - mean_value
+
+        score = mean_value + exploration * prior * sqrt_visits / (1 + action_visits)
+        if best_score is None or score > best_score:
+            best = action
+            best_score = score
+
+    return best
+
+
+def best_action(my_stats, legal_actions):
+    """
+    Choose the move to make from the root of the search.
+
+    Args:
+        my_stats (dict): [visits, total value] for each of this player's options.
+        legal_actions (tuple): This player's options at the root.
+
+    Returns:
+        The most visited option, with ties broken by average value. The
+            first legal option if no search finished.
+
+    """
+    if not my_stats:
+        return legal_actions[0]
+
+    return max(my_stats, key=lambda action: (my_stats[action][0],
+                                             my_stats[action][1] / my_stats[action][0]))
+
+
+def search_worker(engine, rollouts, time_limit, exploration, rollout_turns, random_seed):
+    """
+    Search a new tree in a worker process.
+
+    Args:
+        engine (RolloutEngine): Engine for the current state of the battle.
+        rollouts (int): Number of searches, or None for no limit.
+        time_limit (float): Seconds to search for, or None for no limit.
+        exploration (float): Weight of the exploration term when choosing options.
+        rollout_turns (int): Maximum number of turns in each rollout.
+        random_seed (int): Seed for this search's random numbers, so that
+            workers do not repeat each other's rollouts.
+
+    Returns:
+        Statistics for this player's options at the root, and the number
+            of turns simulated.
+
+    """
+    engine.rng = Random(random_seed)
+    root = MCTSNode()
+    search(engine, root, rollouts, time_limit, exploration, rollout_turns)
+    return root.my_stats, engine.turns
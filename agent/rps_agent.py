@@ -1,5 +1,4 @@
 """Agent class for Rock/Paper/Scissors."""
-from random import random
 import logging
 
 from agent.base_agent import BaseAgent
@@ -63,7 +62,7 @@ class RPSAgent(BaseAgent):
 
         """
         logging.info("RPSAgent:make_move:%s", self.id)
-        num = random()
+        num = self.rng.random()
         logging.debug("RPSAgent:make_move:%s:Move %s", self.id, num)
         for i in range(3):
             threshold = sum(self.strategy[:i + 1])
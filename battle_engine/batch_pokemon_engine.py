@@ -0,0 +1,340 @@
+"""Engine to run many pokemon games between random agents at once."""
+
+from math import floor
+
+import numpy as np
+
+from agent.basic_pokemon_agent import PokemonAgent
+from pokemon_helpers.moves import (OHKOMove, SecondaryEffectMove, BoostingMove,
+                                   VolatileStatusMove, HealingMove)
+
+# Moves that do more than damage, which this engine does not simulate
+UNSUPPORTED_MOVE_CLASSES = (OHKOMove, SecondaryEffectMove, BoostingMove,
+                            VolatileStatusMove, HealingMove)
+
+# Maximum number of pokemon on a team, and moves on a pokemon
+MAX_TEAM_SIZE = 6
+MAX_MOVES = 4
+
+
+class BatchPokemonEngine():
+    """
+    Class to run many pokemon games between random PokemonAgents in lockstep.
+
+    Follows PokemonEngine.run with PokemonAgent's random moves and
+    switches. Every game advances one turn at a time, with each game's
+    state stored in NumPy arrays indexed by [game, player, team position].
+    Finished games are masked out until all games have finished.
+
+    Only moves that just do damage are supported, so boosts and statuses
+    never change and are not stored.
+
+    Attributes:
+        turn_limit (int): Maximum number of turns to play for.
+        num_turns (numpy.array): Number of turns each game in the last batch took.
+        rng (numpy.random.Generator): Source of random numbers.
+
+    """
+
+    def __init__(self, turn_limit=2000, rng=None):
+        """
+        Initialize a new BatchPokemonEngine.
+
+        Args:
+            turn_limit (int): Maximum number of turns to play for.
+            rng (numpy.random.Generator): Source of random numbers.
+                Defaults to a new unseeded generator.
+
+        """
+        self.turn_limit = turn_limit
+        self.num_turns = np.zeros(0, dtype=int)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def run(self, player1, player2, num_games):
+        """
+        Run many games between the same two players.
+
+        Args:
+            player1 (PokemonAgent): Object corresponding to first player.
+            player2 (PokemonAgent): Object corresponding to second player.
+            num_games (int): Number of games to run.
+
+        Returns:
+            Array with the outcome of each game, 1 if player1 won, 0 otherwise.
+
+        """
+        return self.run_battles([(player1, player2)], np.zeros(num_games, dtype=int))
+
+    def run_battles(self, player_pairs, pair_inds=None):
+        """
+        Run a game for each pair of players.
+
+        Args:
+            player_pairs (list): List of (player1, player2) tuples.
+            pair_inds (numpy.array): Which pair plays each game. Defaults
+                to one game for each pair.
+
+        Returns:
+            Array with the outcome of each game, 1 if player1 won, 0 otherwise.
+
+        """
+        if pair_inds is None:
+            pair_inds = np.arange(len(player_pairs))
+
+        data = build_battle_data(player_pairs)
+        num_games = len(pair_inds)
+
+        # Each player leads with the first pokemon on their team
+        hp = data["max_hp"][pair_inds]
+        active = np.zeros((num_games, 2), dtype=int)
+        num_turns = np.zeros(num_games, dtype=int)
+        outcomes = np.zeros(num_games, dtype=int)
+
+        live = np.arange(num_games)
+        while live.size:
+            num_turns[live] += 1
+            self.play_turn(data, pair_inds, hp, active, live)
+
+            # Figure out who lost
+            alive = hp[live] > 0
+            lost = ~alive.any(axis=2)
+            too_many_turns = num_turns[live] > self.turn_limit
+            lost[too_many_turns] = True
+
+            finished = lost.any(axis=1)
+            draw = lost[finished].all(axis=1)
+            outcomes[live[finished]] = np.where(draw, self.rng.random(draw.size) < 0.5,
+                                                lost[finished, 1])
+
+            # Switch in a random pokemon for each fainted active pokemon
+            live = live[~finished]
+            self.switch_fainted(hp, active, live)
+
+        self.num_turns = num_turns
+        return outcomes
+
+    def play_turn(self, data, pair_inds, hp, active, live):
+        """
+        Calculate the results of a turn for each game still being played.
+
+        Args:
+            data (dict): Arrays from build_battle_data for each pair of players.
+            pair_inds (numpy.array): Which pair plays each game.
+            hp (numpy.array): Current HP of each pokemon, updated in place.
+            active (numpy.array): Team position of each player's active
+                pokemon, updated in place.
+            live (numpy.array): Indices of the games still being played.
+
+        """
+        rng = self.rng
+        pairs = pair_inds[live]
+        sides = np.arange(2)[None, :]
+        act = active[live]
+
+        # Each player switches to a random teammate half of the time
+        bench = hp[live] > 0
+        bench[np.arange(live.size)[:, None], sides, act] = False
+        num_bench = bench.sum(axis=2)
+        switch = (num_bench > 0) & (rng.random(num_bench.shape) < 0.5)
+
+        switch_to = random_position(bench, rng)
+        act = np.where(switch, switch_to, act)
+        active[live] = act
+
+        # Otherwise they use a random move
+        num_moves = data["num_moves"][pairs[:, None], sides, act]
+        move = (rng.random(num_moves.shape) * num_moves).astype(int)
+
+        # Faster pokemon moves first, after checking priority then speed
+        priority = data["priority"][pairs[:, None], sides, act, move]
+        speed = data["speed"][pairs[:, None], sides, act]
+        p1_first = np.where(priority[:, 0] != priority[:, 1],
+                            priority[:, 0] > priority[:, 1],
+                            np.where(speed[:, 0] != speed[:, 1],
+                                     speed[:, 0] > speed[:, 1],
+                                     rng.random(live.size) > 0.5))
+        first = np.where(p1_first, 0, 1)
+
+        for attacker in (first, 1 - first):
+            attacks = ~switch[np.arange(live.size), attacker] & \
+                (hp[live, attacker, act[np.arange(live.size), attacker]] > 0)
+            self.attack(data, hp, live[attacks], pairs[attacks], attacker[attacks],
+                        act[attacks], move[attacks])
+
+    def attack(self, data, hp, games, pairs, attacker, act, move):
+        """
+        Attack the opposing pokemon in several games.
+
+        Args:
+            data (dict): Arrays from build_battle_data for each pair of players.
+            hp (numpy.array): Current HP of each pokemon, updated in place.
+            games (numpy.array): Indices of the games with an attack.
+            pairs (numpy.array): Pair of players in each game.
+            attacker (numpy.array): Player attacking in each game.
+            act (numpy.array): Active team positions in each game.
+            move (numpy.array): Move each player is using in each game.
+
+        """
+        rng = self.rng
+        rows = np.arange(games.size)
+        defender = 1 - attacker
+        atk_poke = act[rows, attacker]
+        def_poke = act[rows, defender]
+        atk_move = move[rows, attacker]
+
+        # Check if the move even hit...
+        hits = 100 * rng.random(games.size) < data["accuracy"][pairs, attacker, atk_poke, atk_move]
+
+        # Damage, with a critical hit and random range
+        modifier = data["modifier"][pairs, attacker, atk_poke, atk_move, def_poke]
+        modifier = np.where(rng.random(games.size) < 0.0625, modifier * 1.5, modifier)
+        modifier = modifier * rng.uniform(0.85, 1.00, games.size)
+        damage = np.floor(data["damage"][pairs, attacker, atk_poke, atk_move, def_poke] * modifier)
+
+        hp[games[hits], defender[hits], def_poke[hits]] -= damage[hits]
+
+    def switch_fainted(self, hp, active, live):
+        """
+        Replace each fainted active pokemon with a random teammate.
+
+        Args:
+            hp (numpy.array): Current HP of each pokemon.
+            active (numpy.array): Team position of each player's active
+                pokemon, updated in place.
+            live (numpy.array): Indices of the games still being played.
+
+        """
+        act = active[live]
+        fainted = hp[live[:, None], np.arange(2)[None, :], act] <= 0
+        if fainted.any():
+            switch_to = random_position(hp[live] > 0, self.rng)
+            active[live] = np.where(fainted, switch_to, act)
+
+
+def random_position(available, rng):
+    """
+    Choose a random available team position for each player in each game.
+
+    Args:
+        available (numpy.array): Boolean array of available pokemon,
+            indexed by [game, player, team position].
+        rng (numpy.random.Generator): Source of random numbers.
+
+    Returns:
+        Array of chosen team positions. Players without any available
+            pokemon get position 0.
+
+    """
+    counts = available.sum(axis=2)
+    choice = (rng.random(counts.shape) * counts).astype(int)
+    return (available.cumsum(axis=2) > choice[..., None]).argmax(axis=2)
+
+
+def build_battle_data(player_pairs):
+    """
+    Calculate the data for games between each pair of players.
+
+    Args:
+        player_pairs (list): List of (player1, player2) tuples.
+
+    Returns:
+        Dictionary of arrays indexed by [pair, player, team position, ...]:
+            max_hp, speed, num_moves, priority, accuracy, and the damage
+            before and modifier after random factors for each move against
+            each opposing pokemon.
+
+    """
+    num_pairs = len(player_pairs)
+    shape = (num_pairs, 2, MAX_TEAM_SIZE)
+    data = {
+        "max_hp": np.zeros(shape),
+        "speed": np.zeros(shape),
+        "num_moves": np.ones(shape, dtype=int),
+        "priority": np.zeros(shape + (MAX_MOVES, )),
+        "accuracy": np.zeros(shape + (MAX_MOVES, )),
+        "damage": np.zeros(shape + (MAX_MOVES, MAX_TEAM_SIZE)),
+        "modifier": np.zeros(shape + (MAX_MOVES, MAX_TEAM_SIZE)),
+    }
+
+    for pair_ind, players in enumerate(player_pairs):
+        teams = [validate_player(player) for player in players]
+        for side, team in enumerate(teams):
+            for poke_ind, poke in enumerate(team):
+                data["max_hp"][pair_ind, side, poke_ind] = poke.max_hp
+                data["speed"][pair_ind, side, poke_ind] = poke.effective_stat("spe")
+                data["num_moves"][pair_ind, side, poke_ind] = len(poke.moves)
+
+                for move_ind, move in enumerate(poke.moves):
+                    data["priority"][pair_ind, side, poke_ind, move_ind] = move.priority
+                    accuracy = move.accuracy
+                    if isinstance(accuracy, bool):
+                        accuracy = np.inf if accuracy else 0
+                    data["accuracy"][pair_ind, side, poke_ind, move_ind] = accuracy
+
+                    for def_ind, def_poke in enumerate(teams[1 - side]):
+                        damage, modifier = damage_factors(move, poke, def_poke)
+                        data["damage"][pair_ind, side, poke_ind, move_ind, def_ind] = damage
+                        data["modifier"][pair_ind, side, poke_ind, move_ind, def_ind] = modifier
+
+    return data
+
+
+def validate_player(player):
+    """
+    Check that a player's games can be run by BatchPokemonEngine.
+
+    Args:
+        player (PokemonAgent): Player to check.
+
+    Returns:
+        The player's team.
+
+    """
+    if type(player) is not PokemonAgent:  # pylint: disable=unidiomatic-typecheck
+        raise AttributeError("Only random PokemonAgents are supported.")
+    if len(player.team) > MAX_TEAM_SIZE:
+        raise AttributeError("Teams can have at most {} pokemon.".format(MAX_TEAM_SIZE))
+
+    for poke in player.team:
+        if len(poke.moves) > MAX_MOVES:
+            raise AttributeError("Pokemon can have at most {} moves.".format(MAX_MOVES))
+        for move in poke.moves:
+            if isinstance(move, UNSUPPORTED_MOVE_CLASSES):
+                raise AttributeError("Unsupported move: {}".format(move.id))
+
+    return player.team
+
+
+def damage_factors(move, attacker, defender):
+    """
+    Split BaseMove.calculate_damage around its random factors.
+
+    Args:
+        move (BaseMove): The move being used.
+        attacker (Pokemon): The pokemon using the attack.
+        defender (Pokemon): The pokemon that is recieving the attack.
+
+    Returns:
+        Damage before the modifier, and the modifier before critical
+            hits and the random damage range.
+
+    """
+    if move.category == "Status":
+        return 0, 0
+
+    damage = floor(2*attacker.level/5 + 2)
+    damage = damage * move.base_power
+    if move.category == "Physical":
+        damage = floor(damage * attacker.effective_stat("atk")) / \
+            defender.effective_stat("def")
+    elif move.category == "Special":
+        damage = floor(damage * attacker.effective_stat("spa")) / \
+            defender.effective_stat("spd")
+    damage = floor(damage/50) + 2
+
+    modifier = 1
+    if move.type in attacker.types:
+        modifier = modifier * 1.5
+    modifier = modifier * defender.type_effectiveness.get(move.type, 1)
+
+    return damage, modifier
@@ -0,0 +1,167 @@
+"""Engine to run many matches of rock, paper, scissors at once."""
+
+import numpy as np
+
+from agent.adjusting_rps_agent import AdjustingRPSAgent
+from agent.counter_rps_agent import CounterRPSAgent
+from battle_engine.rockpaperscissors import fixed_strategy, rps_logic
+
+# How each kind of agent picks its moves
+FIXED = 0
+COUNTER = 1
+ADJUSTING = 2
+
+# Config agent_class for each kind of adaptive agent
+AGENT_CLASSES = {
+    "counter": COUNTER,
+    "adjusting": ADJUSTING
+}
+
+
+class BatchRPSEngine():
+    """
+    Class to run many best of <num_games> RPS matches in lockstep.
+
+    Follows RPSEngine.simulate for RPSAgents, CounterRPSAgents and
+    AdjustingRPSAgents. Every match plays one game at a time, with
+    each player's state stored in NumPy arrays indexed by [match, player].
+    Matches that have been decided are masked out until all matches
+    have finished.
+
+    The agents themselves are not changed, since they reset their
+    state at the start of every match anyway.
+
+    Attributes:
+        num_games (int): Number of games in each match.
+        rng (numpy.random.Generator): Source of random numbers.
+
+    """
+
+    def __init__(self, num_games=1, rng=None):
+        """
+        Initialize a new BatchRPSEngine.
+
+        Args:
+            num_games (int): Number of games in each match (Default 1).
+            rng (numpy.random.Generator): Source of random numbers.
+                Defaults to a new unseeded generator.
+
+        """
+        if num_games % 2 == 0:
+            raise AttributeError("num_games must be odd.")
+        if num_games <= 0:
+            raise AttributeError("num_games must be positive.")
+
+        self.num_games = num_games
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def run_matches(self, player_pairs):
+        """
+        Run a match for each pair of players.
+
+        Args:
+            player_pairs (list): List of (player1, player2) tuples.
+
+        Returns:
+            Array with the outcome of each match, 1 if player1 won, 0 otherwise.
+
+        """
+        strategies = np.zeros((len(player_pairs), 2, 3))
+        kinds = np.zeros((len(player_pairs), 2), dtype=int)
+        weights = np.ones((len(player_pairs), 2))
+        for match_ind, pair in enumerate(player_pairs):
+            for side, player in enumerate(pair):
+                kinds[match_ind, side] = agent_kind(player)
+                if kinds[match_ind, side] == ADJUSTING:
+                    strategies[match_ind, side] = player.original_strategy
+                    weights[match_ind, side] = player.weight
+                else:
+                    strategies[match_ind, side] = player.strategy
+
+        return self.run_arrays(strategies, kinds, weights)
+
+    def run_arrays(self, strategies, kinds, weights):
+        """
+        Run a match for each row of player data.
+
+        Args:
+            strategies (numpy.array): Each player's (original) probability to
+                play Rock, Paper, or Scissors, indexed by [match, player, move].
+            kinds (numpy.array): Kind of agent for each player, indexed by
+                [match, player]. One of FIXED, COUNTER or ADJUSTING.
+            weights (numpy.array): Weight of each adjusting player's original
+                strategy, indexed by [match, player].
+
+        Returns:
+            Array with the outcome of each match, 1 if player1 won, 0 otherwise.
+
+        """
+        num_matches = len(strategies)
+        wins_needed = int(self.num_games/2)+1
+
+        # Start of match state, like the agents' reset_state
+        current = np.array(strategies, dtype=float)
+        counts = current * np.asarray(weights, dtype=float)[:, :, None]
+        last_moves = np.full((num_matches, 2), -1)
+        wins = np.zeros((num_matches, 2), dtype=int)
+
+        counter = kinds == COUNTER
+        adjusting = kinds == ADJUSTING
+
+        live = np.arange(num_matches)
+        for _ in range(self.num_games):
+            # Each player picks a move from their current strategy
+            cdf = np.cumsum(current[live], axis=2)
+            draws = self.rng.random((live.size, 2))
+            moves = (draws[:, :, None] >= cdf[:, :, :2]).sum(axis=2)
+
+            # Counter agents play what beats their opponent's last move
+            countering = counter[live] & (last_moves[live] >= 0)
+            moves[countering] = (last_moves[live][countering] + 1) % 3
+
+            results = rps_logic(moves[:, 0], moves[:, 1])
+            wins[live, 0] += results == 1
+            wins[live, 1] += results == 2
+
+            # Each player sees their opponent's move
+            opp_moves = moves[:, ::-1]
+            last_moves[live] = opp_moves
+            adjust_inds = np.nonzero(adjusting[live])
+            matches = live[adjust_inds[0]]
+            # Each player is adjusted once, so there are no repeated indices
+            counts[matches, adjust_inds[1], (opp_moves[adjust_inds] + 1) % 3] += 1
+            current[matches, adjust_inds[1]] = counts[matches, adjust_inds[1]] / \
+                counts[matches, adjust_inds[1]].sum(axis=1, keepdims=True)
+
+            live = live[(wins[live] < wins_needed).all(axis=1)]
+            if not live.size:
+                break
+
+        # Draws are decided randomly
+        outcomes = (wins[:, 0] >= wins_needed).astype(int)
+        draws = (wins < wins_needed).all(axis=1)
+        outcomes[draws] = self.rng.random(draws.sum()) < 0.5
+        return outcomes
+
+
+def agent_kind(player):
+    """
+    Get the kind of agent <player> is, for BatchRPSEngine.
+
+    Args:
+        player (RPSAgent): Player to check.
+
+    Returns:
+        One of FIXED, COUNTER or ADJUSTING.
+
+    Raises:
+        AttributeError: If the player's moves can't be simulated in a batch.
+
+    """
+    if isinstance(player, CounterRPSAgent):
+        return COUNTER
+    if isinstance(player, AdjustingRPSAgent):
+        return ADJUSTING
+    if fixed_strategy(player):
+        return FIXED
+    raise AttributeError("Can't simulate player {} in a batch".format(player.id))
@@ -1,5 +1,5 @@
 """Coin Flip Engine, random chance of winning."""
-from random import random
+import random
 
 
 class CoinFlipEngine:
@@ -8,22 +8,25 @@ class CoinFlipEngine:
 
     Attributes:
         prob_win (float): Probability player1 wins (between 0 and 1).
+        rng (Random): Source of random numbers.
 
     """
 
-    def __init__(self, prob_win=0.5):
+    def __init__(self, prob_win=0.5, rng=random):
         """
         Initialize a random Coin Flip Engine, winner decided by a coin flip.
 
         Args:
             prob_win (float): Probability player1 wins (between 0 and 1).
                 Default is 0.5.
+            rng (Random): Source of random numbers. Defaults to the random module.
 
         """
         if prob_win > 1 or prob_win < 0:
             raise AttributeError("prob_win must be between 0 and 1")
 
         self.prob_win = prob_win
+        self.rng = rng
 
     def run(self, player1, player2):
         """
@@ -40,7 +43,7 @@ class CoinFlipEngine:
 
         """
         # This is my hack around unused-argument
-        draw = random()
+        draw = self.rng.random()
         draw = draw * (player1.elo/player1.elo)
         draw = draw * (player2.elo/player2.elo)
 
@@ -1,13 +1,12 @@
 """Engine to run the turn of a pokemon game."""
 
-from copy import deepcopy
 from uuid import uuid4
 
-from random import random
+import random
 
 from config import (PAR_STATUS, FRZ_STATUS, SLP_STATUS, TOX_STATUS)
 
-from file_manager.log_writer import LogWriter
+from file_manager.turn_log import process_turn_log
 from pokemon_helpers.pokemon import default_boosts
 
 
@@ -19,14 +18,29 @@ class PokemonEngine():
         generation (str): Generation of Pokemon's mechanic to use.
         turn_limit (int): Maximum number of turns to play for.
         log_turn_flag (bool): Flag whether or not to log each game.
+        turn_log (TurnLog): Log the turns are written to. Defaults to
+            this process's turn log the first time a game is logged.
+        directory (str): Directory in the log directory for this process's
+            turn log.
+        game_id (str): Unique id of the current game in the turn log.
+        rng (Random): Source of random numbers for the engine, its
+            moves and the players in its games.
+        agent_rngs (tuple): Sources of random numbers for player1's and
+            player2's choices, if they shouldn't share the engine's.
 
     """
 
-    def __init__(self, generation="gen7", turn_limit=2000, log_turns=False):
+    def __init__(self, generation="gen7", turn_limit=2000, log_turns=False, rng=random,
+                 turn_log=None, directory=""):
         """Initialize a new PokemonEngine."""
         self.generation = generation
         self.turn_limit = turn_limit
         self.log_turn_flag = log_turns
+        self.turn_log = turn_log
+        self.directory = directory
+        self.game_id = None
+        self.rng = rng
+        self.agent_rngs = None
         self.reset_game_state()
 
     def reset_game_state(self):
@@ -53,9 +67,12 @@ class PokemonEngine():
         player1.reset_gamestates()
         player2.reset_gamestates()
 
+        # Players make their choices with this game's random numbers
+        player1.rng, player2.rng = self.agent_rngs or (self.rng, self.rng)
+
         # Initialize the players' teams
-        self.game_state["player1"]["team"] = deepcopy(player1.team)
-        self.game_state["player2"]["team"] = deepcopy(player2.team)
+        self.game_state["player1"]["team"] = [poke.battle_copy() for poke in player1.team]
+        self.game_state["player2"]["team"] = [poke.battle_copy() for poke in player2.team]
 
         # Each player leads with first pokemon on their side
         self.game_state["player1"]["active"] = \
@@ -89,10 +106,9 @@ class PokemonEngine():
         self.reset_game_state()
         self.initialize_battle(player1, player2)
 
-        # Initialize Log Writer to write turn info
-        turn_logwriter = None
-        if self.log_turn_flag:
-            turn_logwriter = init_player_logwriter(player1, player2)
+        # Turns are logged together at the end of the game
+        self.game_id = str(uuid4()) if self.log_turn_flag else None
+        turn_rows = []
 
         # Initial setting of outcome variable
         outcome = self.win_condition_met()
@@ -108,11 +124,16 @@ class PokemonEngine():
                                                       player2_move,
                                                       player1,
                                                       player2)
-            self.log_turn(turn_logwriter, turn_info)
+            self.log_turn(turn_rows, turn_info)
+
+        if self.log_turn_flag:
+            if self.turn_log is None:
+                self.turn_log = process_turn_log(self.directory)
+            self.turn_log.write_game(self.game_id, player1.type, player2.type, turn_rows)
 
         if outcome["draw"]:
             # It was a draw, decide randomly
-            return int(random() < 0.5)
+            return int(self.rng.random() < 0.5)
 
         return outcome["winner"]
 
@@ -203,21 +224,21 @@ class PokemonEngine():
 
         if not p1_switch and not p2_switch:
             turn_info = self.turn_both_attack(move1, move2)
+        elif p1_switch and p2_switch:
+            turn_info.extend(self.switch_pokemon("player1", move1[1]))
+            turn_info.extend(self.switch_pokemon("player2", move2[1]))
         elif p1_switch:
             turn_info.extend(self.switch_pokemon("player1", move1[1]))
             attack = self.game_state["player2"]["active"].moves[move2[1]]
             result = self.attack("player2", attack)
             if result is not None:
                 turn_info.extend(result)
-        elif p2_switch:
+        else:
             turn_info.extend(self.switch_pokemon("player2", move2[1]))
             attack = self.game_state["player1"]["active"].moves[move1[1]]
             result = self.attack("player1", attack)
             if result is not None:
                 turn_info.extend(result)
-        else:
-            turn_info.extend(self.switch_pokemon("player1", move1[1]))
-            turn_info.extend(self.switch_pokemon("player2", move2[1]))
 
         return turn_info
 
@@ -292,19 +313,19 @@ class PokemonEngine():
         def_poke = self.game_state[defender]["active"]
 
         # Check for paralysis
-        if atk_poke.status == PAR_STATUS and random() < 0.25:
+        if atk_poke.status == PAR_STATUS and self.rng.random() < 0.25:
             return None
         # Check for freeze
         if atk_poke.status == FRZ_STATUS:
             # Check for player thaw
-            if random() < 0.2 or move["type"] == "fire" or move["id"] == "scald":
+            if self.rng.random() < 0.2 or move["type"] == "fire" or move["id"] == "scald":
                 atk_poke.status = None
             else:
                 return None
         # Check for sleep
         if atk_poke.status == SLP_STATUS:
             # Check for player wake up
-            if random() < 1.0/3 or atk_poke.status_counter == 3:
+            if self.rng.random() < 1.0/3 or atk_poke.status_counter == 3:
                 atk_poke.status = None
                 atk_poke.status_counter = 0
             # Increment sleep counter
@@ -315,10 +336,10 @@ class PokemonEngine():
         # Check if the move even hit...
         damage = 0
         critical_hit = False
-        move_hits = move.check_hit()
+        move_hits = move.check_hit(rng=self.rng)
         if move_hits:
             # Do Damage
-            damage, critical_hit = move.calculate_damage(atk_poke, def_poke)
+            damage, critical_hit = move.calculate_damage(atk_poke, def_poke, rng=self.rng)
             def_poke.current_hp -= damage
 
             # Thaw opponent if applicable
@@ -329,7 +350,7 @@ class PokemonEngine():
             move.apply_healing(atk_poke, def_poke)
             move.apply_boosts(atk_poke, def_poke)
             move.apply_volatile_status(atk_poke, def_poke)
-            move.apply_secondary_effect(atk_poke, def_poke)
+            move.apply_secondary_effect(atk_poke, def_poke, rng=self.rng)
 
         # Increment VolatileStatus counter for attack Pokemon
         for vol_status in atk_poke.volatile_status:
@@ -450,24 +471,23 @@ class PokemonEngine():
             The anonymized game state for that player.
 
         """
-        data = deepcopy(self.game_state[player_id])
-        return anonymize_gamestate_helper(data)
+        return anonymize_gamestate_helper(self.game_state[player_id])
 
     def turn_order(self, p1_move, p2_move):
         """
         Calculate turn order for when players move.
 
         Args:
-            p1_move (dict): Player 1's move for this turn.
-            p2_move (dict): Player 2's move for this turn.
+            p1_move (BaseMove): Player 1's move for this turn.
+            p2_move (BaseMove): Player 2's move for this turn.
 
         Returns:
             Tuple of 'player1', 'player2' in the order their moves
                 will be made.
 
         """
-        if p1_move["priority"] != p2_move["priority"]:
-            if p1_move["priority"] > p2_move["priority"]:
+        if p1_move.priority != p2_move.priority:
+            if p1_move.priority > p2_move.priority:
                 faster_player = "player1"
                 slower_player = "player2"
             else:
@@ -479,7 +499,7 @@ class PokemonEngine():
 
             if p1_speed == p2_speed:
                 # Speed tie, coin flip
-                if random() > 0.5:
+                if self.rng.random() > 0.5:
                     faster_player = "player1"
                     slower_player = "player2"
                 else:
@@ -510,13 +530,12 @@ class PokemonEngine():
         player2.update_gamestate(
             self.game_state["player2"], self.anonymize_gamestate("player1"))
 
-    def log_turn(self, turn_logwriter, turn_info):
+    def log_turn(self, turn_rows, turn_info):
         """
         Log the information from this turn.
 
         Args:
-            turn_logwriter (LogWriter): The LogWriter responsible for logging this
-                battle's information.
+            turn_rows (list): Rows for this battle's turns in the turn log.
             turn_info (list): The events that happened this turn.
 
         """
@@ -527,14 +546,12 @@ class PokemonEngine():
             if turn["type"] == "SWITCH":
                 continue
 
-            new_line = {}
-            new_line["turn_num"] = self.game_state["num_turns"]
-            new_line["player_id"] = turn["attacker"]
-            new_line["active"] = turn["atk_poke"]
-            new_line["target"] = turn["def_poke"]
-            new_line["move"] = turn["move"]["id"]
-            new_line["damage"] = turn["damage"]
-            turn_logwriter.write_line(new_line)
+            turn_rows.append([self.game_state["num_turns"],
+                              turn["attacker"],
+                              turn["atk_poke"],
+                              turn["def_poke"],
+                              turn["move"]["id"],
+                              turn["damage"]])
 
 
 def anonymize_gamestate_helper(data):
@@ -570,7 +587,7 @@ def anonymize_gamestate_helper(data):
         anon_data["active"] = {
             "name": data["active"].name,
             "pct_hp": data["active"].current_hp/data["active"].max_hp,
-            "boosts": data["active"].boosts,
+            "boosts": dict(data["active"].boosts),
             "status": data["active"].status,
             "dex_num": data["active"].dex_num,
             "status_turns": data["active"].status_turns
@@ -579,24 +596,3 @@ def anonymize_gamestate_helper(data):
         anon_data["active"] = None
 
     return anon_data
-
-
-def init_player_logwriter(player1, player2):
-    """
-    Initialize the log writer to write the turns of this game.
-
-    Args:
-        player1 (PokemonAgent): The object that is Player 1.
-        player2 (PokemonAgent): The object that is Player 2.
-
-    Returns:
-        The log writer for a battle between player1 and player2.
-
-    """
-    header = ["turn_num", "player_id", "active", "target", "move", "damage"]
-    turn_logwriter = LogWriter(header, prefix="PKMNGame_{}_{}_{}".format(
-        player1.type,
-        player2.type,
-        uuid4()))
-
-    return turn_logwriter
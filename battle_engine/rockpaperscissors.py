@@ -1,19 +1,35 @@
 """Engine implementation for Rock, Paper, Scissors."""
-from random import random
+import random
 
+import numpy as np
+
+from agent.rps_agent import RPSAgent
 from agent.counter_rps_agent import CounterRPSAgent
 from agent.adjusting_rps_agent import AdjustingRPSAgent
 
 
 class RPSEngine:
-    """Engine to run a game of rock, paper, scissors."""
+    """
+    Engine to run a game of rock, paper, scissors.
+
+    Attributes:
+        num_games (int): Number of games to play.
+        game_state (dict): Number of ties and wins for each player.
+        win_probs (dict): Chance player1 wins a match, for each pair of
+            fixed strategies that have played. Shared with copies
+            of this engine.
+        rng (Random): Source of random numbers for the engine and
+            the players in its games.
+
+    """
 
-    def __init__(self, num_games=1):
+    def __init__(self, num_games=1, rng=random):
         """
         Init method for this class.
 
         Args:
             num_games (int): Number of games to play (Default 1).
+            rng (Random): Source of random numbers. Defaults to the random module.
 
         """
         if num_games % 2 == 0:
@@ -22,6 +38,8 @@ class RPSEngine:
             raise AttributeError("num_games must be positive.")
 
         self.num_games = num_games
+        self.win_probs = {}
+        self.rng = rng
         self.reset_game_state()
 
     def reset_game_state(self):
@@ -45,6 +63,11 @@ class RPSEngine:
         Returns 1 if player1 wins, 0 if player2 wins.
         In the case of a draw, flip a coin.
 
+        If both players have fixed strategies, the chance player1 wins
+        the match is worked out once for their strategies, and the
+        match is decided with one draw. The game state is not updated
+        for these matches.
+
         Args:
             player1 (BaseAgent): A player in this simulation.
             player2 (BaseAgent): The other player in this simulation.
@@ -52,6 +75,33 @@ class RPSEngine:
         Returns:
             1 if player1 wins, 2 if player2 wins.
 
+        """
+        # Players make their moves with this game's random numbers
+        player1.rng = self.rng
+        player2.rng = self.rng
+
+        if fixed_strategy(player1) and fixed_strategy(player2):
+            key = (tuple(player1.strategy), tuple(player2.strategy))
+            win_prob = self.win_probs.get(key)
+            if win_prob is None:
+                win_prob = float(match_win_probability(player1.strategy, player2.strategy,
+                                                       self.num_games))
+                self.win_probs[key] = win_prob
+            return int(self.rng.random() < win_prob)
+
+        return self.simulate(player1, player2)
+
+    def simulate(self, player1, player2):
+        """
+        Run <self.num_games> games, one move at a time.
+
+        Args:
+            player1 (BaseAgent): A player in this simulation.
+            player2 (BaseAgent): The other player in this simulation.
+
+        Returns:
+            1 if player1 wins, 0 if player2 wins.
+
         """
         self.reset_game_state()
 
@@ -85,7 +135,7 @@ class RPSEngine:
 
         if outcome["draw"]:
             # It was a draw, decide randomly
-            return int(random() < 0.5)
+            return int(self.rng.random() < 0.5)
 
         return outcome["winner"]
 
@@ -114,15 +164,86 @@ class RPSEngine:
         return result
 
 
+def fixed_strategy(player):
+    """
+    Check if <player> plays every move from an unchanging strategy.
+
+    Args:
+        player (BaseAgent): Player to check.
+
+    Returns:
+        True if the player is an RPSAgent that doesn't adjust its moves.
+
+    """
+    return isinstance(player, RPSAgent) and \
+        type(player).make_move is RPSAgent.make_move and \
+        type(player).update_info is RPSAgent.update_info
+
+
+def match_win_probability(p1_strategy, p2_strategy, num_games):
+    """
+    Calculate the chance player1 wins a best of <num_games> match.
+
+    Both players play every move from their strategy, and a match
+    that ends in a draw is decided by a coin flip, like RPSEngine.run.
+    Also works on arrays with a strategy in each row, for many
+    matches at once.
+
+    Args:
+        p1_strategy (list or numpy.array): Player1's probability to play
+            Rock, Paper, or Scissors respectively.
+        p2_strategy (list or numpy.array): Player2's probability to play
+            Rock, Paper, or Scissors respectively.
+        num_games (int): Number of games in the match.
+
+    Returns:
+        Chance player1 wins the match.
+
+    """
+    p1_strategy = np.asarray(p1_strategy, dtype=float)
+    p2_strategy = np.asarray(p2_strategy, dtype=float)
+
+    # Chance of each result in a single game
+    p1_win = (p1_strategy[..., 1]*p2_strategy[..., 0] + p1_strategy[..., 2]*p2_strategy[..., 1] +
+              p1_strategy[..., 0]*p2_strategy[..., 2])
+    p2_win = (p2_strategy[..., 1]*p1_strategy[..., 0] + p2_strategy[..., 2]*p1_strategy[..., 1] +
+              p2_strategy[..., 0]*p1_strategy[..., 2])
+    tie = 1 - p1_win - p2_win
+    wins_needed = int(num_games/2)+1
+
+    # Chance of each (player1 wins, player2 wins) with the match still going
+    states = {(0, 0): 1}
+    match_win = 0
+    for _ in range(num_games):
+        new_states = {}
+        for (p1_wins, p2_wins), prob in states.items():
+            new_states[(p1_wins, p2_wins)] = \
+                new_states.get((p1_wins, p2_wins), 0) + prob*tie
+            if p1_wins + 1 == wins_needed:
+                match_win = match_win + prob*p1_win
+            else:
+                new_states[(p1_wins + 1, p2_wins)] = \
+                    new_states.get((p1_wins + 1, p2_wins), 0) + prob*p1_win
+            if p2_wins + 1 < wins_needed:
+                new_states[(p1_wins, p2_wins + 1)] = \
+                    new_states.get((p1_wins, p2_wins + 1), 0) + prob*p2_win
+        states = new_states
+
+    # Draws are decided by a coin flip
+    return match_win + sum(states.values())/2
+
+
 def rps_logic(p1_move, p2_move):
     """
     Execute logic of RPS Game.
 
     Rock < Paper < Scissors < Rock
 
+    Works on single moves, or on arrays of moves for many games at once.
+
     Args:
-        p1_move (int): Encoded player1 move.
-        p2_move (int): Encoded player2 move.
+        p1_move (int or numpy.array): Encoded player1 move.
+        p2_move (int or numpy.array): Encoded player2 move.
 
     Returns:
         0 if its a tie.
@@ -130,12 +251,7 @@ def rps_logic(p1_move, p2_move):
         2 if Player2 wins.
 
     """
-    if p1_move == p2_move:
-        # Same move, its a draw
-        return 0
-    if (p1_move - p2_move) == 1 or (p1_move - p2_move) == -2:
-        # Player1 wins (Paper vs Rock or Scissors vs Paper or Rock vs Scissors)
-        return 1
-
-    # Player2 wins
-    return 2
+    # Same move is a draw. Player1 wins if they are one move ahead
+    # (Paper vs Rock or Scissors vs Paper or Rock vs Scissors),
+    # otherwise Player2 is one move ahead.
+    return (p1_move - p2_move) % 3
@@ -0,0 +1,415 @@
+"""Stripped down pokemon engine for fast simulated playouts."""
+
+from bisect import bisect
+from math import floor
+import random
+
+from config import (PAR_STATUS, FRZ_STATUS, SLP_STATUS, TOX_STATUS)
+
+from pokemon_helpers.calculate import calculate_status_damage
+from pokemon_helpers.moves import OHKOMove
+
+# Share of the opponent's prior given to switching, split between their teammates
+SWITCH_PRIOR = 0.1
+
+
+class RolloutEngine():
+    """
+    Class to quickly simulate the rest of a pokemon game.
+
+    Follows PokemonEngine.calculate_turn and PokemonEngine.attack, with
+    everything that does not change between turns calculated up front.
+    Moves only do damage; boosts, healing, volatile statuses and secondary
+    effects are ignored, and speeds and statuses keep their starting values.
+    The state is stored in lists that are reused between games, so
+    reset() can be called to start again from the initial state.
+
+    Side 0 is this player, whose attacks are ("ATTACK", move position).
+    Side 1 is the opponent, whose attacks are ("ATTACK", move ID). Both
+    sides switch with ("SWITCH", team position).
+
+    Attributes:
+        turns (int): Number of turns simulated so far.
+        hp (list): Current HP of each side's pokemon.
+        status (list): Current status of each side's pokemon.
+        order (list): Order of each side's pokemon still in battle, by their
+            position in the starting team. The first one is active.
+        rng (Random): Source of random numbers for the playouts.
+
+    """
+
+    def __init__(self, my_team, opp_team, opp_weights=None, rng=random):
+        """
+        Initialize the engine from the current state of a battle.
+
+        Args:
+            my_team (list): This player's Pokemon that have not fainted,
+                starting with the active pokemon.
+            opp_team (list): The opponent's Pokemon that have not fainted,
+                starting with the active pokemon.
+            opp_weights (list): How likely each of the opponent's moves are,
+                for each of the opponent's pokemon. Defaults to equally likely.
+            rng (Random): Source of random numbers for the playouts.
+                Defaults to the random module.
+
+        """
+        if not my_team or not opp_team:
+            raise AttributeError("Both teams must have a pokemon in battle.")
+
+        teams = (my_team, opp_team)
+        if opp_weights is None:
+            opp_weights = [[1] * len(poke.moves) for poke in opp_team]
+
+        self.turns = 0
+        self.rng = rng
+        self.max_hp = tuple(tuple(poke.max_hp for poke in team) for team in teams)
+        self.speed = tuple(tuple(poke.effective_stat("spe") for poke in team) for team in teams)
+
+        self.start_hp = tuple(tuple(poke.current_hp for poke in team) for team in teams)
+        self.start_status = tuple(tuple(poke.status for poke in team) for team in teams)
+        self.start_status_turns = tuple(tuple(poke.status_turns for poke in team)
+                                        for team in teams)
+        self.start_order = tuple(tuple(range(len(team))) for team in teams)
+
+        self.hp = [list(start) for start in self.start_hp]
+        self.status = [list(start) for start in self.start_status]
+        self.status_turns = [list(start) for start in self.start_status_turns]
+        self.status_counter = [[0] * len(team) for team in teams]
+        self.order = [list(start) for start in self.start_order]
+
+        # Damage before critical hits and the random range,
+        # for each [side][attacker][move][defender]
+        self.damage = tuple(
+            tuple(tuple(tuple(move.calculate_damage(atk_poke, def_poke, testing=True)[0]
+                              for def_poke in teams[1 - side])
+                        for move in atk_poke.moves)
+                  for atk_poke in teams[side])
+            for side in range(2))
+        self.ohko = tuple(tuple(tuple(isinstance(move, OHKOMove) for move in poke.moves)
+                                for poke in team) for team in teams)
+        self.accuracy = tuple(tuple(tuple(move_accuracy(move) for move in poke.moves)
+                                    for poke in team) for team in teams)
+        self.priority = tuple(tuple(tuple(move.priority for move in poke.moves)
+                                    for poke in team) for team in teams)
+        self.thaws = tuple(tuple(tuple(move.type == "fire" or move.id == "scald"
+                                       for move in poke.moves)
+                                 for poke in team) for team in teams)
+
+        # Options for each pokemon, and which move each attack uses
+        self.attack_actions = (
+            tuple(tuple(("ATTACK", move_ind) for move_ind in range(len(poke.moves)))
+                  for poke in my_team),
+            tuple(tuple(("ATTACK", move.id) for move in poke.moves) for poke in opp_team))
+        self.switch_actions = tuple(("SWITCH", posn) for posn in range(max(len(my_team),
+                                                                           len(opp_team))))
+        self.move_positions = tuple(
+            tuple({action: move_ind for move_ind, action in enumerate(actions)}
+                  for actions in self.attack_actions[side])
+            for side in range(2))
+
+        # Cumulative weights of the opponent's moves, for sampling
+        self.opp_cum_weights = []
+        self.opp_weights = []
+        for weights in opp_weights:
+            total = sum(weights)
+            self.opp_weights.append(tuple(weight / total for weight in weights))
+            cum_weights = []
+            for weight in weights:
+                cum_weights.append((cum_weights[-1] if cum_weights else 0) + weight / total)
+            self.opp_cum_weights.append(tuple(cum_weights))
+
+        self._legal_actions = ({}, {})
+        self._priors = ({}, {})
+
+    def __getstate__(self):
+        """Leave out the source of random numbers, which may be the random module."""
+        state = dict(self.__dict__)
+        del state["rng"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore the engine, using the random module until given an rng."""
+        self.__dict__.update(state)
+        self.rng = random
+
+    def reset(self):
+        """Return to the state the engine was initialized with."""
+        for side in range(2):
+            self.hp[side][:] = self.start_hp[side]
+            self.status[side][:] = self.start_status[side]
+            self.status_turns[side][:] = self.start_status_turns[side]
+            self.status_counter[side][:] = [0] * len(self.status_counter[side])
+            self.order[side][:] = self.start_order[side]
+
+    def finished(self):
+        """Determine whether either side has no pokemon left."""
+        return not self.order[0] or not self.order[1]
+
+    def value(self):
+        """
+        Value of the current state for this player.
+
+        Returns:
+            1 for a win, 0 for a loss and 0.5 for a draw. Unfinished games
+                are this player's share of the total remaining % HP.
+
+        """
+        if not self.order[1]:
+            return 0.5 if not self.order[0] else 1
+        if not self.order[0]:
+            return 0
+
+        my_posn = sum(self.hp[0][ind] / self.max_hp[0][ind] for ind in self.order[0])
+        opp_posn = sum(self.hp[1][ind] / self.max_hp[1][ind] for ind in self.order[1])
+        return my_posn / (my_posn + opp_posn)
+
+    def legal_actions(self, side):
+        """
+        Options for a side in the current state.
+
+        Args:
+            side (int): 0 for this player, 1 for the opponent.
+
+        Returns:
+            Tuple of the side's attacks and switches.
+
+        """
+        order = self.order[side]
+        key = (order[0], len(order))
+        if key not in self._legal_actions[side]:
+            self._legal_actions[side][key] = self.attack_actions[side][order[0]] + \
+                self.switch_actions[:len(order) - 1]
+        return self._legal_actions[side][key]
+
+    def priors(self, side):
+        """
+        How likely each option is to be chosen in the current state.
+
+        Options are equally likely for this player. The opponent's attacks
+        follow their move weights, and SWITCH_PRIOR is split between
+        their switches.
+
+        Args:
+            side (int): 0 for this player, 1 for the opponent.
+
+        Returns:
+            Dictionary mapping each option in legal_actions to its prior.
+
+        """
+        order = self.order[side]
+        key = (order[0], len(order))
+        if key not in self._priors[side]:
+            attacks = self.attack_actions[side][order[0]]
+            switches = self.switch_actions[:len(order) - 1]
+            if side == 0:
+                priors = {action: 1 / (len(attacks) + len(switches))
+                          for action in attacks + switches}
+            else:
+                attack_share = 1 - SWITCH_PRIOR if switches else 1
+                priors = {action: attack_share * weight for action, weight
+                          in zip(attacks, self.opp_weights[order[0]])}
+                for action in switches:
+                    priors[action] = SWITCH_PRIOR / len(switches)
+            self._priors[side][key] = priors
+        return self._priors[side][key]
+
+    def step(self, my_action, opp_action):
+        """
+        Simulate a turn.
+
+        Args:
+            my_action (tuple): This player's option.
+            opp_action (tuple): The opponent's option.
+
+        """
+        my_move = opp_move = -1
+        my_switch = opp_switch = -1
+        if my_action[0] == "SWITCH":
+            my_switch = my_action[1]
+        else:
+            my_move = self.move_positions[0][self.order[0][0]][my_action]
+        if opp_action[0] == "SWITCH":
+            opp_switch = opp_action[1]
+        else:
+            opp_move = self.move_positions[1][self.order[1][0]][opp_action]
+
+        self.play_turn(my_move, my_switch, opp_move, opp_switch)
+
+    def rollout(self, max_turns):
+        """
+        Play out the game with random attacks.
+
+        This player's attacks are equally likely, and the opponent's follow
+        their move weights. Neither side switches unless they have to.
+
+        Args:
+            max_turns (int): Maximum number of turns to play.
+
+        Returns:
+            Value of the final state for this player.
+
+        """
+        turn = 0
+        while turn < max_turns and self.order[0] and self.order[1]:
+            my_active = self.order[0][0]
+            opp_active = self.order[1][0]
+            my_move = int(self.rng.random() * len(self.damage[0][my_active]))
+            opp_move = bisect(self.opp_cum_weights[opp_active], self.rng.random())
+            opp_move = min(opp_move, len(self.damage[1][opp_active]) - 1)
+
+            self.play_turn(my_move, -1, opp_move, -1)
+            turn += 1
+
+        return self.value()
+
+    def play_turn(self, my_move, my_switch, opp_move, opp_switch):
+        """
+        Simulate a turn, with each side's option as a move or team position.
+
+        Args:
+            my_move (int): Position of this player's move, or -1 if switching.
+            my_switch (int): Team position this player switches to, or -1 if attacking.
+            opp_move (int): Position of the opponent's move, or -1 if switching.
+            opp_switch (int): Team position the opponent switches to, or -1 if attacking.
+
+        """
+        self.turns += 1
+
+        if my_switch >= 0:
+            self.switch(0, my_switch)
+        if opp_switch >= 0:
+            self.switch(1, opp_switch)
+
+        if my_move >= 0 and opp_move >= 0:
+            my_active = self.order[0][0]
+            opp_active = self.order[1][0]
+            my_priority = self.priority[0][my_active][my_move]
+            opp_priority = self.priority[1][opp_active][opp_move]
+            if my_priority != opp_priority:
+                my_first = my_priority > opp_priority
+            elif self.speed[0][my_active] != self.speed[1][opp_active]:
+                my_first = self.speed[0][my_active] > self.speed[1][opp_active]
+            else:
+                my_first = self.rng.random() > 0.5
+
+            if my_first:
+                self.attack(0, my_move)
+                if self.hp[1][opp_active] > 0:
+                    self.attack(1, opp_move)
+            else:
+                self.attack(1, opp_move)
+                if self.hp[0][my_active] > 0:
+                    self.attack(0, my_move)
+        elif my_move >= 0:
+            self.attack(0, my_move)
+        elif opp_move >= 0:
+            self.attack(1, opp_move)
+
+        self.end_turn(0)
+        self.end_turn(1)
+
+    def switch(self, side, position):
+        """
+        Switch a side's active pokemon with one of their teammates.
+
+        Args:
+            side (int): 0 for this player, 1 for the opponent.
+            position (int): Position in the team to switch to.
+
+        """
+        order = self.order[side]
+        old_active = order[0]
+        if self.status[side][old_active] == TOX_STATUS:
+            self.status_turns[side][old_active] = 0
+
+        order[0] = order.pop(position + 1)
+        order.append(old_active)
+
+    def attack(self, side, move):
+        """
+        Attack the opposing pokemon.
+
+        Args:
+            side (int): 0 for this player, 1 for the opponent.
+            move (int): Position of the attacking pokemon's move.
+
+        """
+        atk_ind = self.order[side][0]
+        def_ind = self.order[1 - side][0]
+        atk_status = self.status[side][atk_ind]
+
+        if atk_status is not None:
+            # Check for paralysis
+            if atk_status == PAR_STATUS and self.rng.random() < 0.25:
+                return
+            # Check for freeze
+            if atk_status == FRZ_STATUS:
+                if self.rng.random() < 0.2 or self.thaws[side][atk_ind][move]:
+                    self.status[side][atk_ind] = None
+                else:
+                    return
+            # Check for sleep
+            if atk_status == SLP_STATUS:
+                if self.rng.random() < 1.0/3 or self.status_counter[side][atk_ind] == 3:
+                    self.status[side][atk_ind] = None
+                    self.status_counter[side][atk_ind] = 0
+                else:
+                    self.status_counter[side][atk_ind] += 1
+                    return
+
+        # Check if the move hits
+        if self.rng.random() >= self.accuracy[side][atk_ind][move]:
+            return
+
+        def_hp = self.hp[1 - side]
+        if self.ohko[side][atk_ind][move]:
+            def_hp[def_ind] = 0
+        else:
+            damage = self.damage[side][atk_ind][move][def_ind]
+            if self.rng.random() < 0.0625:
+                damage = damage * 1.5
+            def_hp[def_ind] -= floor(damage * self.rng.uniform(0.85, 1.00))
+
+        # Thaw opponent if applicable
+        if self.status[1 - side][def_ind] == FRZ_STATUS and self.thaws[side][atk_ind][move]:
+            self.status[1 - side][def_ind] = None
+
+    def end_turn(self, side):
+        """
+        Apply status damage, and replace the active pokemon if it fainted.
+
+        Args:
+            side (int): 0 for this player, 1 for the opponent.
+
+        """
+        order = self.order[side]
+        active = order[0]
+        status = self.status[side][active]
+        if status is not None:
+            dmg_pct = calculate_status_damage({"status": status,
+                                               "status_turns": self.status_turns[side][active]})
+            if status == TOX_STATUS:
+                self.status_turns[side][active] += 1
+            self.hp[side][active] -= floor(self.max_hp[side][active] * dmg_pct)
+
+        if self.hp[side][active] <= 0:
+            del order[0]
+            if order:
+                # Switch in a random teammate
+                order.insert(0, order.pop(int(self.rng.random() * len(order))))
+
+
+def move_accuracy(move):
+    """
+    Chance of a move hitting.
+
+    Args:
+        move (BaseMove): The move being used.
+
+    Returns:
+        Probability that the move hits.
+
+    """
+    if isinstance(move.accuracy, bool):
+        return 1.0 if move.accuracy else 0.0
+    return move.accuracy / 100
@@ -10,6 +10,17 @@ LOG_DIR = "logs/"
 if not os.path.isdir(LOG_DIR):
     os.mkdir(LOG_DIR)
 
+# Buffered log writers write this many rows at once, at least this
+# often (in seconds), and make writes wait with this many rows waiting
+LOG_FLUSH_ROWS = 1000
+LOG_FLUSH_INTERVAL = 1.0
+LOG_BUFFER_ROWS = 10000
+
+# Log readers stream logs this many rows at a time, reading this many
+# files at once
+LOG_CHUNK_ROWS = 10000
+LOG_READ_WORKERS = 4
+
 # Store move data
 MOVE_DATA = None
 with open("data/moves/moves.json") as move_file:
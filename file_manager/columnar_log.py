@@ -0,0 +1,364 @@
+"""Columnar binary logs, which can be read back as NumPy arrays."""
+
+from os import makedirs
+from os.path import join, exists, isdir
+import json
+
+import numpy as np
+
+import config
+from file_manager.log_writer import generate_filename, validate_log_args
+
+# Extension of columnar logs, which are directories
+COLUMNAR_EXTENSION = ".cols"
+NUMERIC_DTYPE = "<f8"
+CODE_DTYPE = "<i4"
+
+
+class ColumnarLogWriter():
+    """
+    Class that writes logs one column at a time.
+
+    A columnar log is a directory with a binary file for each column and
+    a meta.json file with the header, the number of rows and each column's
+    type. Numeric columns are stored as float64, with NA as NaN. Other
+    columns are dictionary encoded: each value is stored as an int32 code
+    into the column's list of categories in meta.json.
+
+    Rows are kept in memory and appended to the column files <chunk_rows>
+    at a time, and meta.json is only updated after the rows are written,
+    so it never counts rows that aren't there.
+
+    Has the same write_line, write_columns and close methods as LogWriter.
+
+    Attributes:
+        filename (str): Name of the log directory.
+        path (str): Path to the log directory.
+        header (list): List of columns in this log.
+        chunk_rows (int): Number of rows to keep before writing them.
+        dtypes (dict): Column name to "numeric" or "category", once known.
+        categories (dict): Column name to its list of categories.
+        codes (dict): Column name to a dict from each category to its code.
+        num_rows (int): Number of rows written to the column files.
+        pending (list): Blocks of columns waiting to be written.
+        pending_lines (list): Lines from write_line waiting to be written.
+        pending_rows (int): Number of rows waiting to be written.
+
+    """
+
+    def __init__(self, header, directory="", prefix=None, chunk_rows=10000, dtypes=None):
+        """
+        Create the log directory for a new columnar log.
+
+        Args:
+            header (list): List with column names.
+            directory (str): Directory in the log directory to write to.
+            prefix (str): Optional prefix to lead the name with.
+            chunk_rows (int): Number of rows to keep before writing them.
+            dtypes (dict): Column name to "numeric" or "category". Other
+                columns are numeric if the first rows written are numbers.
+
+        """
+        validate_log_args(header, prefix)
+
+        self.filename = generate_filename(prefix)[:-len(".csv")] + COLUMNAR_EXTENSION
+        self.path = join(config.LOG_DIR, directory, self.filename)
+        makedirs(self.path)
+
+        self.header = header
+        self.chunk_rows = chunk_rows
+        self.dtypes = dict(dtypes or {})
+        self.categories = {col_name: [] for col_name in header}
+        self.codes = {col_name: {} for col_name in header}
+        self.num_rows = 0
+        self.pending = []
+        self.pending_lines = []
+        self.pending_rows = 0
+
+        for col_ind in range(len(header)):
+            open(self.column_file(col_ind), mode="wb").close()
+        self.write_meta()
+
+    def __del__(self):
+        """Delete ColumnarLogWriter."""
+        if hasattr(self, "pending"):
+            self.close()
+
+    def __enter__(self):
+        """Use this ColumnarLogWriter in a with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this ColumnarLogWriter at the end of a with statement."""
+        self.close()
+
+    def column_file(self, col_ind):
+        """
+        Get the path to a column's binary file.
+
+        Args:
+            col_ind (int): Index of the column in the header.
+
+        Returns:
+            Path to the column file.
+
+        """
+        return join(self.path, "{}.bin".format(col_ind))
+
+    def write_line(self, dict_to_write):
+        """Write line to this output.
+
+        Args:
+            dict_to_write (dict): Information to write to file.
+                Keys should be column names.
+
+        """
+        self.pending_lines.append([dict_to_write.get(col_name, "NA")
+                                   for col_name in self.header])
+        self.pending_rows += 1
+        if self.pending_rows >= self.chunk_rows:
+            self.flush()
+
+    def write_columns(self, columns):
+        """Write many lines to this output at once.
+
+        Args:
+            columns (dict): Column name to a list or array with the
+                value for each line. Every column must be the same length.
+
+        """
+        self.collect_lines()
+        num_lines = len(next(iter(columns.values()))) if columns else 0
+        self.pending.append({col_name: columns.get(col_name, ["NA"] * num_lines)
+                             for col_name in self.header})
+        self.pending_rows += num_lines
+        if self.pending_rows >= self.chunk_rows:
+            self.flush()
+
+    def collect_lines(self):
+        """Turn the lines from write_line into a block of columns."""
+        if self.pending_lines:
+            self.pending.append(dict(zip(self.header, zip(*self.pending_lines))))
+            self.pending_lines = []
+
+    def flush(self):
+        """
+        Append the rows waiting to be written to the column files.
+
+        Every column is encoded before any are written, so rows that can't
+        be encoded are dropped without leaving the columns different lengths.
+
+        """
+        self.collect_lines()
+        if not self.pending:
+            return
+
+        pending = self.pending
+        self.pending = []
+        self.pending_rows = 0
+        encoded = [np.concatenate([self.encode(col_name, block[col_name]) for block in pending])
+                   for col_name in self.header]
+
+        for col_ind, values in enumerate(encoded):
+            with open(self.column_file(col_ind), mode="ab") as column_file:
+                values.tofile(column_file)
+
+        self.num_rows += len(encoded[0]) if encoded else 0
+        self.write_meta()
+
+    def encode(self, col_name, values):
+        """
+        Encode a column's values for its binary file.
+
+        Args:
+            col_name (str): Name of the column.
+            values (list): Values to encode, a list or array.
+
+        Returns:
+            Array of float64 values, or int32 category codes.
+
+        """
+        if not isinstance(values, np.ndarray):
+            values = np.array(values, dtype=object)
+        if col_name not in self.dtypes:
+            self.dtypes[col_name] = infer_dtype(values)
+
+        if self.dtypes[col_name] == "numeric":
+            try:
+                return values.astype(NUMERIC_DTYPE)
+            except (TypeError, ValueError):
+                pass
+
+            # Fill in NA one value at a time
+            try:
+                return np.array([np.nan if isinstance(value, str) and value == "NA"
+                                 else float(value) for value in values], dtype=NUMERIC_DTYPE)
+            except (TypeError, ValueError) as err:
+                raise RuntimeError("Column {} can only have numbers".format(col_name)) from err
+
+        # Look up each distinct value once, giving new ones codes in order of appearance
+        uniques, first, inverse = np.unique(values.astype(str), return_index=True,
+                                            return_inverse=True)
+        codes = self.codes[col_name]
+        for value in uniques[np.argsort(first)]:
+            if value not in codes:
+                codes[value] = len(self.categories[col_name])
+                self.categories[col_name].append(str(value))
+        unique_codes = np.array([codes[value] for value in uniques], dtype=CODE_DTYPE)
+        return unique_codes[inverse.reshape(-1)]
+
+    def write_meta(self):
+        """Write the header, number of rows and column types to meta.json."""
+        meta = {
+            "header": self.header,
+            "num_rows": self.num_rows,
+            "columns": [{
+                "dtype": self.dtypes.get(col_name, "numeric"),
+                "categories": self.categories[col_name]
+            } for col_name in self.header]
+        }
+        with open(join(self.path, "meta.json"), mode="w") as meta_file:
+            json.dump(meta, meta_file)
+
+    def close(self):
+        """Write any rows still waiting."""
+        self.flush()
+
+
+class ColumnarLogReader():
+    """
+    Reader for a columnar log, with each column as a NumPy array.
+
+    Attributes:
+        path (str): Path to the log directory.
+        header (list): List of columns in this log.
+        num_rows (int): Number of rows in the log.
+        columns (list): Each column's dtype and categories.
+
+    """
+
+    def __init__(self, path):
+        """
+        Load the metadata for a columnar log.
+
+        Args:
+            path (str): Path to the log directory.
+
+        """
+        self.path = path
+        with open(join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+
+        self.header = meta["header"]
+        self.num_rows = meta["num_rows"]
+        self.columns = meta["columns"]
+
+    def read_column(self, col_name, decode=True):
+        """
+        Read a column without loading the rest of the log.
+
+        Numeric columns and category codes are memory mapped, so they
+        are only read from disk as they are used.
+
+        Args:
+            col_name (str): Name of the column to read.
+            decode (bool): Whether to turn category codes back into values.
+
+        Returns:
+            Read only float64 array for numeric columns. Category columns are
+                an object array of strings if decode is True, otherwise an int32
+                array of codes into the column's categories.
+
+        """
+        if col_name not in self.header:
+            raise AttributeError("Invalid column name: {}".format(col_name))
+
+        col_ind = self.header.index(col_name)
+        column = self.columns[col_ind]
+        dtype = NUMERIC_DTYPE if column["dtype"] == "numeric" else CODE_DTYPE
+        if self.num_rows:
+            values = np.memmap(join(self.path, "{}.bin".format(col_ind)), dtype=dtype,
+                               mode="r", shape=(self.num_rows, ))
+        else:
+            # Empty files can't be memory mapped
+            values = np.zeros(0, dtype=dtype)
+
+        if column["dtype"] == "category" and decode:
+            return np.array(column["categories"], dtype=object)[values]
+        return values
+
+    def iter_chunks(self, colnames, chunk_rows):
+        """
+        Read some columns <chunk_rows> rows at a time.
+
+        Args:
+            colnames (list): Columns to read.
+            chunk_rows (int): Number of rows in each chunk.
+
+        Returns:
+            Generator of dictionaries from each column name to an in memory
+                array of the chunk's values, decoded like read_column.
+
+        """
+        columns = {colname: self.read_column(colname, decode=False) for colname in colnames}
+        categories = {colname: np.array(self.categories(colname), dtype=object)
+                      for colname in colnames
+                      if self.columns[self.header.index(colname)]["dtype"] == "category"}
+
+        for start in range(0, self.num_rows, chunk_rows):
+            chunk = {}
+            for colname, values in columns.items():
+                chunk[colname] = np.array(values[start:start + chunk_rows])
+                if colname in categories:
+                    chunk[colname] = categories[colname][chunk[colname]]
+            yield chunk
+
+    def categories(self, col_name):
+        """
+        Get the categories for a dictionary encoded column.
+
+        Args:
+            col_name (str): Name of the column.
+
+        Returns:
+            List of the column's values, indexed by their codes.
+
+        """
+        return self.columns[self.header.index(col_name)]["categories"]
+
+
+def infer_dtype(values):
+    """
+    Decide how to store a column from its first values.
+
+    Args:
+        values (numpy.array): First values written to the column.
+
+    Returns:
+        "numeric" if the values are all numbers or NA, otherwise "category".
+
+    """
+    if values.dtype.kind in "biuf":
+        return "numeric"
+
+    for value in values:
+        if isinstance(value, str) and value == "NA":
+            continue
+        if not isinstance(value, (int, float, np.number, np.bool_)):
+            return "category"
+    return "numeric"
+
+
+def is_columnar(filename):
+    """
+    Check if a log is a columnar log.
+
+    Args:
+        filename (str): Path to the log.
+
+    Returns:
+        Whether the log is a columnar log directory.
+
+    """
+    return filename.endswith(COLUMNAR_EXTENSION) and isdir(filename) and \
+        exists(join(filename, "meta.json"))
@@ -4,23 +4,37 @@ from os import listdir
 from os.path import isfile, join
 
 from csv import reader
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty, Full
+from threading import Event
+
+import numpy as np
 
 import config
+from file_manager.columnar_log import ColumnarLogReader, is_columnar
 
 
 class LogReader():
     """
     Log reader class.
 
+    Reads CSV logs and columnar logs. Columns from columnar logs are
+    read as NumPy arrays instead of lists of strings.
+
+    read_data loads every column of every file into data. To analyze
+    runs too big for that, iter_chunks streams some of the columns as
+    arrays, a chunk at a time.
+
     Attributes:
         files (list): List of files this reader uses.
         header (list): List of columns in this file.
         data (dict): Column/Data key/value pairs.
         data_keys (list): Columns corresponding to the file they represent.
+        loaded_keys (set): Data keys whose columns have been read into data.
 
     """
 
-    def __init__(self, filenames=None, prefix=None):
+    def __init__(self, filenames=None, prefix=None, directory=""):
         """
         Init method for LogReader.
 
@@ -30,6 +44,8 @@ class LogReader():
         Args:
             filenames (list): List of filenames to read.
             prefix (str): Prefix for filenames to read.
+            directory (str): Directory in the log directory to look for
+                files with the prefix in.
 
         """
         if filenames is None and prefix is None:
@@ -40,9 +56,13 @@ class LogReader():
 
         self.files = []
         if prefix is not None:
-            for fname in listdir(config.LOG_DIR):
-                full_fname = join(config.LOG_DIR, fname)
-                if fname.startswith(prefix) and isfile(full_fname):
+            log_dir = join(config.LOG_DIR, directory)
+            for fname in sorted(listdir(log_dir)):
+                full_fname = join(log_dir, fname)
+                # Only read the CSV files, not the turn logs' indexes
+                if fname.startswith(prefix) and fname.endswith(".csv") and isfile(full_fname):
+                    self.files.append(full_fname)
+                elif fname.startswith(prefix) and is_columnar(full_fname):
                     self.files.append(full_fname)
         else:
             self.files = filenames
@@ -57,6 +77,10 @@ class LogReader():
     def set_header(self):
         """Extract the header information from a file."""
         sample_filename = self.files[0]
+        if is_columnar(sample_filename):
+            self.header = ColumnarLogReader(sample_filename).header
+            return
+
         with open(sample_filename) as sample_file:
             csv_reader = reader(sample_file)
             header_row = next(csv_reader)
@@ -67,6 +91,7 @@ class LogReader():
         self.data = {}
         for colname in self.data_keys:
             self.data[colname] = []
+        self.loaded_keys = set()
 
     def generate_data_keys(self):
         """Generate list of keys for for self.data."""
@@ -76,6 +101,11 @@ class LogReader():
         """Populate the data."""
         index = 0
         for filename in self.files:
+            if is_columnar(filename):
+                self.read_columnar_data(filename, index)
+                index += 1
+                continue
+
             file_ = open(filename)
             csv_reader = reader(file_)
             file_header = next(csv_reader)
@@ -91,9 +121,195 @@ class LogReader():
                     key_name = "{}{}".format(self.header[col_index], index)
                     self.data[key_name].append(row[col_index])
 
+            self.loaded_keys.update("{}{}".format(colname, index) for colname in self.header)
             index += 1
             file_.close()
 
+    def read_columnar_data(self, filename, index, colnames=None):
+        """
+        Read a columnar log's columns as arrays.
+
+        Args:
+            filename (str): Path to the columnar log.
+            index (int): Index of the log in self.files.
+            colnames (list): Columns to read. Defaults to all of them.
+
+        """
+        columnar_reader = ColumnarLogReader(filename)
+        if columnar_reader.header != self.header:
+            # Invalid file, reset data
+            self.init_data()
+            raise RuntimeError(
+                "File {} has an invalid header".format(filename))
+
+        for colname in colnames or self.header:
+            key_name = "{}{}".format(colname, index)
+            self.data[key_name] = columnar_reader.read_column(colname)
+            self.loaded_keys.add(key_name)
+
+    def read_columns(self, colnames):
+        """
+        Read only some columns, as arrays.
+
+        Columnar logs are memory mapped, so the other columns are never
+        read. CSV logs are streamed with iter_chunks, so only the chosen
+        columns are kept. Columns that were already read aren't read again.
+
+        Args:
+            colnames (list): Columns to read.
+
+        Returns:
+            Dictionary from the data key of each column in each file to
+                its array. Numeric columns are float64 arrays.
+
+        """
+        for colname in colnames:
+            if colname not in self.header:
+                raise AttributeError("Invalid column name: {}".format(colname))
+
+        output = {}
+        for index, filename in enumerate(self.files):
+            missing = [colname for colname in colnames
+                       if "{}{}".format(colname, index) not in self.loaded_keys]
+            if missing and is_columnar(filename):
+                self.read_columnar_data(filename, index, missing)
+            elif missing:
+                chunks = [chunk for _, chunk in self.iter_chunks(missing, files=[index])]
+                for colname in missing:
+                    key_name = "{}{}".format(colname, index)
+                    self.data[key_name] = np.concatenate([chunk[colname] for chunk in chunks]) \
+                        if chunks else np.zeros(0)
+                    self.loaded_keys.add(key_name)
+
+            for colname in colnames:
+                key_name = "{}{}".format(colname, index)
+                output[key_name] = column_array(self.data[key_name])
+        return output
+
+    def iter_chunks(self, colnames, chunk_rows=None, workers=None, files=None):
+        """
+        Stream some columns of the logs as arrays, a chunk at a time.
+
+        Files are read at the same time from a thread pool. Each file is
+        read <chunk_rows> rows at a time, and a reader waits while there
+        are <workers> chunks the caller hasn't taken yet, so at most about
+        2 * workers chunks are in memory however big the logs are.
+
+        Chunks from different files can arrive in any order, but the chunks
+        of each file arrive in order.
+
+        Args:
+            colnames (list): Columns to read.
+            chunk_rows (int): Number of rows in each chunk. Defaults to
+                config.LOG_CHUNK_ROWS.
+            workers (int): Number of files to read at once. Defaults to
+                config.LOG_READ_WORKERS.
+            files (list): Indexes in self.files of the files to read.
+                Defaults to every file.
+
+        Returns:
+            Generator of (file index, chunk) tuples. Each chunk is a
+                dictionary from column name to an array of its values.
+                Numeric columns are float64 arrays with NaN where values
+                are missing, and other columns are object arrays of strings.
+
+        """
+        for colname in colnames:
+            if colname not in self.header:
+                raise AttributeError("Invalid column name: {}".format(colname))
+
+        chunk_rows = chunk_rows or config.LOG_CHUNK_ROWS
+        workers = workers or config.LOG_READ_WORKERS
+        if files is None:
+            files = range(len(self.files))
+
+        chunks = Queue(maxsize=workers)
+        stop = Event()
+
+        def read_file(index):
+            """Put the chunks of a file, then None, on the queue."""
+            try:
+                for chunk in self.file_chunks(self.files[index], colnames, chunk_rows):
+                    if not put_chunk(chunks, (index, chunk), stop):
+                        # The caller stopped reading
+                        return
+            except Exception as err:  # pylint: disable=broad-except
+                # Hand the error to the caller to raise
+                put_chunk(chunks, (index, err), stop)
+            put_chunk(chunks, (index, None), stop)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index in files:
+                executor.submit(read_file, index)
+
+            try:
+                num_done = 0
+                while num_done < len(files):
+                    index, chunk = chunks.get()
+                    if chunk is None:
+                        num_done += 1
+                    elif isinstance(chunk, Exception):
+                        raise chunk
+                    else:
+                        yield index, chunk
+            finally:
+                # Stop the readers, and the files not started yet, if the caller stops early
+                stop.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                # Make room for readers waiting on a full queue, so they see the stop now
+                while True:
+                    try:
+                        chunks.get_nowait()
+                    except Empty:
+                        break
+
+    def file_chunks(self, filename, colnames, chunk_rows):
+        """
+        Read some columns of a file, a chunk at a time.
+
+        Args:
+            filename (str): Path to the log.
+            colnames (list): Columns to read.
+            chunk_rows (int): Number of rows in each chunk.
+
+        Returns:
+            Generator of dictionaries from column name to array.
+
+        """
+        if is_columnar(filename):
+            columnar_reader = ColumnarLogReader(filename)
+            if columnar_reader.header != self.header:
+                raise RuntimeError(
+                    "File {} has an invalid header".format(filename))
+            yield from columnar_reader.iter_chunks(colnames, chunk_rows)
+            return
+
+        with open(filename) as file_:
+            csv_reader = reader(file_)
+            if next(csv_reader, None) != self.header:
+                raise RuntimeError(
+                    "File {} has an invalid header".format(filename))
+
+            col_inds = [self.header.index(colname) for colname in colnames]
+            numeric = {}
+            while True:
+                rows = [row for _, row in zip(range(chunk_rows), csv_reader)]
+                if not rows:
+                    return
+
+                chunk = {}
+                for colname, col_ind in zip(colnames, col_inds):
+                    values = [row[col_ind] for row in rows]
+                    if colname not in numeric:
+                        # The first chunk decides if the column is numeric
+                        chunk[colname] = column_array(values)
+                        numeric[colname] = chunk[colname].dtype != object
+                    elif numeric[colname]:
+                        chunk[colname] = numeric_array(values, filename, colname)
+                    else:
+                        chunk[colname] = np.array(values, dtype=object)
+                yield chunk
+
     def to_data_key(self, colnames):
         """
         Convert list of column names into data_keys representation.
@@ -124,6 +340,10 @@ class LogReader():
         for colname in colnames:
             if colname not in self.data_keys:
                 raise AttributeError("Invalid column name: {}".format(colname))
+            if isinstance(self.data[colname], np.ndarray):
+                self.data[colname] = fill_missing(self.data[colname])
+                continue
+
             temp_col = []
             for datum in self.data[colname]:
                 if datum != "NA":
@@ -137,3 +357,90 @@ class LogReader():
                     temp_col.append(1000)
 
             self.data[colname] = temp_col
+
+
+def column_array(column):
+    """
+    Convert a column to an array.
+
+    Args:
+        column (list or numpy.array): Column read by a LogReader.
+
+    Returns:
+        The column if it is already an array. Otherwise a float64 array,
+            with NaN for NA, if every value is a number, or an object array.
+
+    """
+    if isinstance(column, np.ndarray):
+        return column
+
+    try:
+        return np.array([np.nan if datum == "NA" else float(datum) for datum in column])
+    except ValueError:
+        return np.array(column, dtype=object)
+
+
+def numeric_array(values, filename, colname):
+    """
+    Convert the values of a numeric CSV column to an array.
+
+    Args:
+        values (list): Values read from the column.
+        filename (str): Path to the log, for errors.
+        colname (str): Name of the column, for errors.
+
+    Returns:
+        Float64 array, with NaN for NA.
+
+    """
+    try:
+        return np.array([np.nan if datum == "NA" else float(datum) for datum in values])
+    except ValueError as err:
+        raise RuntimeError("Column {} of file {} can only have numbers".format(
+            colname, filename)) from err
+
+
+def put_chunk(chunks, item, stop):
+    """
+    Put an item on a LogReader's chunk queue, unless reading was stopped.
+
+    Args:
+        chunks (Queue): Queue of chunks for the caller.
+        item (tuple): File index and chunk to put on the queue.
+        stop (Event): Event set when the caller stops reading.
+
+    Returns:
+        Whether the item was put on the queue.
+
+    """
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=0.1)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def fill_missing(column):
+    """
+    Fill in the missing values of a numeric column, like LogReader.to_numeric.
+
+    Args:
+        column (numpy.array): Column from a columnar log, with NaN where
+            values are missing.
+
+    Returns:
+        Array with each missing value replaced by the last value read,
+            or 1000 if there is none.
+
+    """
+    column = np.asarray(column, dtype=float)
+    missing = np.isnan(column)
+    if not missing.any():
+        return column
+
+    # Index of the last value read at each row
+    last_read = np.maximum.accumulate(np.where(missing, -1, np.arange(len(column))))
+    column = np.where(last_read >= 0, column[np.maximum(last_read, 0)], 1000.0)
+    return column
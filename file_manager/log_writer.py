@@ -6,6 +6,12 @@ from csv import writer
 
 from datetime import datetime
 
+from threading import Condition, Thread
+from weakref import WeakSet
+import atexit
+
+import numpy as np
+
 import config
 
 
@@ -18,10 +24,12 @@ class LogWriter():
         output_file (file): File stream of the log file.
         output_csv (writer): CSV writer for the log file.
         header (list): List of columns in this csv file.
+        row_buffer (RowBuffer): Buffer of rows for the writer thread,
+            or None if rows are written as they come in.
 
     """
 
-    def __init__(self, header, directory="", prefix=None):
+    def __init__(self, header, directory="", prefix=None, **kwargs):
         """
         Initialize LogWriter for a simulation.
 
@@ -29,18 +37,18 @@ class LogWriter():
             prefix (str): Optional prefix to lead filename with.
             header (list): List with column names. Also defines first
                 row in the output file.
+            buffered (bool): Whether to write rows from a background thread,
+                so writing doesn't wait on the disk (Default False).
+            flush_rows (int): Number of buffered rows to write at once.
+                Defaults to config.LOG_FLUSH_ROWS.
+            flush_interval (float): Maximum seconds a buffered row waits
+                before it is written and flushed to disk.
+                Defaults to config.LOG_FLUSH_INTERVAL.
+            max_rows (int): Number of buffered rows before writes wait
+                for the writer thread. Defaults to config.LOG_BUFFER_ROWS.
 
         """
-        # Invalid prefix name check
-        if prefix is not None:
-            invalid_char_seqs = ["/", "\\", "."]
-            for char_seq in invalid_char_seqs:
-                if char_seq in repr(prefix):
-                    raise AttributeError("Prefix cannot contain slashes")
-
-        # Validate header actually has content
-        if not header:
-            raise AttributeError("Header cannot be empty")
+        validate_log_args(header, prefix)
 
         self.filename = generate_filename(prefix)
         self.output_file = generate_file(self.filename, directory)
@@ -49,11 +57,48 @@ class LogWriter():
         self.header = header
         self.output_csv.writerow(header)
 
+        self.row_buffer = None
+        if kwargs.get("buffered", False):
+            self.row_buffer = RowBuffer(
+                self.output_file, self.output_csv,
+                flush_rows=kwargs.get("flush_rows", config.LOG_FLUSH_ROWS),
+                flush_interval=kwargs.get("flush_interval", config.LOG_FLUSH_INTERVAL),
+                max_rows=kwargs.get("max_rows", config.LOG_BUFFER_ROWS))
+
     def __del__(self):
         """Delete LogWriter."""
-        if hasattr(self, "output_file"):
-            self.output_file.flush()
-            self.output_file.close()
+        self.close()
+
+    def __enter__(self):
+        """Use this LogWriter in a with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this LogWriter at the end of a with statement."""
+        self.close()
+
+    def close(self):
+        """Write any buffered rows and close the log file."""
+        try:
+            if getattr(self, "row_buffer", None) is not None:
+                self.row_buffer.close()
+        finally:
+            if hasattr(self, "output_file") and not self.output_file.closed:
+                self.output_file.flush()
+                self.output_file.close()
+
+    def write_rows(self, rows):
+        """
+        Write rows to the log file, or to the buffer if there is one.
+
+        Args:
+            rows (list): Rows to write, with a value for each column.
+
+        """
+        if self.row_buffer is not None:
+            self.row_buffer.put(rows)
+        else:
+            self.output_csv.writerows(rows)
 
     def write_line(self, dict_to_write):
         """Write line to this output.
@@ -71,7 +116,179 @@ class LogWriter():
             else:
                 line.append("NA")
 
-        self.output_csv.writerow(line)
+        self.write_rows([line])
+
+    def write_columns(self, columns):
+        """Write many lines to this output at once.
+
+        Args:
+            columns (dict): Column name to a list or array with the
+                value for each line. Every column must be the same length.
+
+        """
+        num_lines = len(next(iter(columns.values()))) if columns else 0
+
+        lines = []
+        for col_name in self.header:
+            if col_name in columns:
+                lines.append(np.asarray(columns[col_name]).tolist())
+            else:
+                lines.append(["NA"] * num_lines)
+
+        self.write_rows(list(zip(*lines)))
+
+
+class RowBuffer():
+    """
+    Bounded buffer of rows written to a CSV file by a background thread.
+
+    The writer thread writes the rows in batches of <flush_rows>, or
+    whatever is waiting every <flush_interval> seconds, then flushes the
+    file so a crash loses at most that much data. When <max_rows> are
+    waiting, put() blocks until the thread has caught up.
+
+    The thread only holds a reference to the buffer, not the LogWriter,
+    so LogWriters are still closed when they are deleted. Buffers that
+    are still open when the program exits are closed then.
+
+    If writing fails, the buffer is closed and the error is raised by
+    the next put(), and by close().
+
+    Attributes:
+        output_file (file): File stream of the log file.
+        output_csv (writer): CSV writer for the log file.
+        flush_rows (int): Number of rows to write at once.
+        flush_interval (float): Maximum seconds a row waits to be written.
+        max_rows (int): Number of rows waiting before put() blocks.
+        rows (list): Rows waiting to be written.
+        closed (bool): Whether the buffer has been closed.
+        error (Exception): Error the writer thread stopped on, if any.
+        condition (Condition): Condition guarding rows and closed.
+        thread (Thread): Thread writing the rows.
+
+    """
+
+    def __init__(self, output_file, output_csv, flush_rows=1000, flush_interval=1.0,
+                 max_rows=10000):
+        """
+        Start the writer thread for a log file.
+
+        Args:
+            output_file (file): File stream of the log file.
+            output_csv (writer): CSV writer for the log file.
+            flush_rows (int): Number of rows to write at once.
+            flush_interval (float): Maximum seconds a row waits to be written.
+            max_rows (int): Number of rows waiting before put() blocks.
+
+        """
+        if flush_rows <= 0 or max_rows < flush_rows:
+            raise AttributeError("Need 0 < flush_rows <= max_rows.")
+        if flush_interval <= 0:
+            raise AttributeError("flush_interval must be positive.")
+
+        self.output_file = output_file
+        self.output_csv = output_csv
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.rows = []
+        self.closed = False
+        self.error = None
+        self.condition = Condition()
+
+        self.thread = Thread(target=self.write_batches, daemon=True)
+        self.thread.start()
+        OPEN_BUFFERS.add(self)
+
+    def put(self, rows):
+        """
+        Add rows to be written, waiting while the buffer is full.
+
+        Args:
+            rows (list): Rows to write, with a value for each column.
+
+        """
+        with self.condition:
+            while len(self.rows) >= self.max_rows and not self.closed:
+                self.condition.wait()
+            if self.error is not None:
+                raise self.error
+            if self.closed:
+                raise RuntimeError("Can't write to a closed LogWriter.")
+
+            self.rows.extend(rows)
+            if len(self.rows) >= self.flush_rows:
+                self.condition.notify_all()
+
+    def write_batches(self):
+        """Write the buffered rows until the buffer is closed."""
+        finished = False
+        while not finished:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.closed or len(self.rows) >= self.flush_rows,
+                    timeout=self.flush_interval)
+                rows, self.rows = self.rows, []
+                finished = self.closed
+                # Wake up writers waiting on a full buffer
+                self.condition.notify_all()
+
+            if rows:
+                try:
+                    self.output_csv.writerows(rows)
+                    self.output_file.flush()
+                except Exception as err:  # pylint: disable=broad-except
+                    # Hand the error to the writers instead of leaving them waiting
+                    with self.condition:
+                        self.error = err
+                        self.closed = True
+                        self.condition.notify_all()
+                    return
+
+    def close(self):
+        """Write all the buffered rows and stop the writer thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+        self.thread.join()
+        OPEN_BUFFERS.discard(self)
+        if self.error is not None:
+            # Only raised once, so deleting the LogWriter doesn't raise it again
+            error, self.error = self.error, None
+            raise error
+
+
+# Buffers with a running writer thread
+OPEN_BUFFERS = WeakSet()
+
+
+@atexit.register
+def close_open_buffers():
+    """Write the rows of any buffers still open when the program exits."""
+    for row_buffer in list(OPEN_BUFFERS):
+        row_buffer.close()
+
+
+def validate_log_args(header, prefix):
+    """
+    Check the header and prefix for a new log.
+
+    Args:
+        header (list): List with column names.
+        prefix (str): Prefix for the file name.
+
+    """
+    # Invalid prefix name check
+    if prefix is not None:
+        invalid_char_seqs = ["/", "\\", "."]
+        for char_seq in invalid_char_seqs:
+            if char_seq in repr(prefix):
+                raise AttributeError("Prefix cannot contain slashes")
+
+    # Validate header actually has content
+    if not header:
+        raise AttributeError("Header cannot be empty")
 
 
 def generate_filename(prefix):
@@ -0,0 +1,238 @@
+"""Turn logs for every Pokemon game in a run, with an index by game."""
+
+from os import getpid
+from os.path import join
+from csv import reader, writer
+from io import StringIO
+from threading import Lock
+from multiprocessing.util import Finalize
+
+import config
+from file_manager.log_writer import generate_filename, generate_file
+
+TURN_HEADER = ["game_id", "turn_num", "player_id", "active", "target", "move", "damage"]
+INDEX_HEADER = ["game_id", "offset", "length", "player1.type", "player2.type"]
+
+
+class TurnLog():
+    """
+    Append-only CSV log of the turns of many Pokemon games.
+
+    Each game's turns are written as one block of rows, and an index file
+    next to the log records the byte offset and length of each game's
+    block, so one game can be read without scanning the whole log.
+    Rows are kept in memory and written <flush_rows> at a time; the index
+    is only written after the rows it points to.
+
+    The index file has the same name as the log with a .idx extension.
+
+    Attributes:
+        filename (str): Name of the log file.
+        output_file (file): Binary file stream of the log file.
+        index_file (file): File stream of the index file.
+        index_csv (writer): CSV writer for the index file.
+        flush_rows (int): Number of rows to keep before writing them.
+        offset (int): Byte offset of the end of the log, including
+            blocks that haven't been written yet.
+        pending (list): Blocks of rows waiting to be written.
+        pending_index (list): Index rows waiting to be written.
+        pending_rows (int): Number of rows waiting to be written.
+        lock (Lock): Lock so games can be logged from several threads.
+
+    """
+
+    def __init__(self, directory="", prefix="PKMNTurns", flush_rows=1000):
+        """
+        Create the log and index files for a run.
+
+        Args:
+            directory (str): Directory in the log directory to write to.
+            prefix (str): Prefix to lead the filenames with.
+            flush_rows (int): Number of rows to keep before writing them.
+
+        """
+        self.filename = generate_filename(prefix)
+        self.index_file = generate_file(index_filename(self.filename), directory)
+        self.output_file = open(join(config.LOG_DIR, directory, self.filename), mode="wb")
+        self.index_csv = writer(self.index_file)
+        self.flush_rows = flush_rows
+        self.lock = Lock()
+
+        self.index_csv.writerow(INDEX_HEADER)
+        header = encode_rows([TURN_HEADER])
+        self.output_file.write(header)
+        self.offset = len(header)
+        self.pending = []
+        self.pending_index = []
+        self.pending_rows = 0
+
+    def __del__(self):
+        """Delete TurnLog."""
+        self.close()
+
+    def write_game(self, game_id, player1_type, player2_type, rows):
+        """
+        Log the turns of a game.
+
+        Args:
+            game_id (str): Unique id for the game.
+            player1_type (str): Type of the first player.
+            player2_type (str): Type of the second player.
+            rows (list): The game's turns, with a value for each column
+                of TURN_HEADER after game_id.
+
+        """
+        block = encode_rows([[game_id] + list(row) for row in rows])
+
+        with self.lock:
+            self.pending.append(block)
+            self.pending_index.append([game_id, self.offset, len(block),
+                                       player1_type, player2_type])
+            self.offset += len(block)
+            self.pending_rows += len(rows)
+
+            if self.pending_rows >= self.flush_rows:
+                self.write_pending()
+
+    def write_pending(self):
+        """Write the waiting rows, then their index entries. Call with the lock held."""
+        self.output_file.write(b"".join(self.pending))
+        self.output_file.flush()
+        self.index_csv.writerows(self.pending_index)
+        self.index_file.flush()
+
+        self.pending = []
+        self.pending_index = []
+        self.pending_rows = 0
+
+    def flush(self):
+        """Write every game logged so far."""
+        with self.lock:
+            self.write_pending()
+
+    def close(self):
+        """Write every game logged so far and close the files."""
+        if not hasattr(self, "pending") or self.output_file.closed:
+            return
+
+        self.flush()
+        self.output_file.close()
+        self.index_file.close()
+
+
+class TurnLogReader():
+    """
+    Reader for a TurnLog.
+
+    Attributes:
+        filename (str): Path to the log file.
+        index (dict): Game id to its offset, length and player types.
+
+    """
+
+    def __init__(self, filename):
+        """
+        Load the index for a turn log.
+
+        Args:
+            filename (str): Path to the log file.
+
+        """
+        self.filename = filename
+        self.index = {}
+        with open(index_filename(filename), newline="") as index_file:
+            csv_reader = reader(index_file)
+            if next(csv_reader) != INDEX_HEADER:
+                raise RuntimeError("File {} has an invalid index".format(filename))
+
+            for game_id, offset, length, player1_type, player2_type in csv_reader:
+                self.index[game_id] = {
+                    "offset": int(offset),
+                    "length": int(length),
+                    "player1.type": player1_type,
+                    "player2.type": player2_type
+                }
+
+    def read_game(self, game_id):
+        """
+        Read one game's turns.
+
+        Args:
+            game_id (str): Id of the game to read.
+
+        Returns:
+            List with a dictionary for each row of the game, keyed by
+                the columns of TURN_HEADER.
+
+        """
+        if game_id not in self.index:
+            raise AttributeError("Invalid game_id: {}".format(game_id))
+
+        with open(self.filename, mode="rb") as log_file:
+            log_file.seek(self.index[game_id]["offset"])
+            block = log_file.read(self.index[game_id]["length"])
+
+        rows = reader(StringIO(block.decode("utf-8"), newline=""))
+        return [dict(zip(TURN_HEADER, row)) for row in rows]
+
+
+def encode_rows(rows):
+    """
+    Encode rows as CSV.
+
+    Args:
+        rows (list): Rows to encode.
+
+    Returns:
+        The CSV for the rows, as bytes.
+
+    """
+    output = StringIO(newline="")
+    writer(output).writerows(rows)
+    return output.getvalue().encode("utf-8")
+
+
+def index_filename(filename):
+    """
+    Get the name of the index file for a turn log.
+
+    Args:
+        filename (str): Name of the log file.
+
+    Returns:
+        The log file's name, with a .idx extension instead of .csv.
+
+    """
+    if filename.endswith(".csv"):
+        filename = filename[:-len(".csv")]
+    return filename + ".idx"
+
+
+# Turn log for this process, in each directory
+PROCESS_TURN_LOGS = {}
+# Guards PROCESS_TURN_LOGS, so threads in a process share one turn log
+PROCESS_TURN_LOGS_LOCK = Lock()
+
+
+def process_turn_log(directory=""):
+    """
+    Get this process's turn log for a directory, creating it on first use.
+
+    Each process writes its own log, so worker processes never share a file.
+    The log is closed when the process exits, including worker processes.
+
+    Args:
+        directory (str): Directory in the log directory to write to.
+
+    Returns:
+        The TurnLog for this process.
+
+    """
+    key = (getpid(), directory)
+    with PROCESS_TURN_LOGS_LOCK:
+        if key not in PROCESS_TURN_LOGS:
+            turn_log = TurnLog(directory, prefix="PKMNTurns_{}".format(getpid()))
+            # Worker processes skip atexit, but run multiprocessing's finalizers
+            Finalize(turn_log, turn_log.close, exitpriority=10)
+            PROCESS_TURN_LOGS[key] = turn_log
+        return PROCESS_TURN_LOGS[key]
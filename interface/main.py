@@ -81,8 +81,8 @@ def set_engine():
 
         # Set the response data
         response["outcome"] = ENGINE.win_condition_met()
-        response["player_active"] = ENGINE.game_state["player1"]["active"].__dict__
-        response["opp_active"] = ENGINE.game_state["player2"]["active"].__dict__
+        response["player_active"] = ENGINE.game_state["player1"]["active"].to_json()
+        response["opp_active"] = ENGINE.game_state["player2"]["active"].to_json()
         response["player_opts"] = process_opts(PLAYER, PLAYER.generate_possibilities()[0])
         response["gamestate"] = PLAYER.game_state.to_json()
 
@@ -106,8 +106,8 @@ def make_move():
 
     if not outcome["finished"]:
         response["gamestate"] = PLAYER.game_state.to_json()
-        response["player_active"] = ENGINE.game_state["player1"]["active"].__dict__
-        response["opp_active"] = ENGINE.game_state["player2"]["active"].__dict__
+        response["player_active"] = ENGINE.game_state["player1"]["active"].to_json()
+        response["opp_active"] = ENGINE.game_state["player2"]["active"].to_json()
         response["player_opts"] = process_opts(PLAYER, PLAYER.generate_possibilities()[0])
 
     return jsonify(response)
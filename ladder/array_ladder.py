@@ -0,0 +1,327 @@
+"""Ladder that keeps every player in NumPy arrays, for huge populations."""
+from collections import namedtuple
+
+import numpy as np
+
+from agent.rps_agent import STRATEGIES
+from battle_engine.batch_rps_engine import AGENT_CLASSES, FIXED, BatchRPSEngine
+from battle_engine.coinflip import CoinFlipEngine
+from battle_engine.rockpaperscissors import RPSEngine, match_win_probability
+from ladder.base_ladder import PlayerSnapshot
+from ladder.ratings import EloRating, Glicko2Rating, elo_batch, glicko2_batch
+from ladder.ratings import GLICKO2_DEVIATION, GLICKO2_VOLATILITY
+
+# Players and ratings going into each game of a round, and who won
+RoundResults = namedtuple("RoundResults", ["players", "opponents", "outcomes",
+                                           "player_elos", "opp_elos"])
+
+
+class ArrayLadder:
+    """
+    Ladder for CoinFlip and RPS games with a player per array row.
+
+    Players have no agent objects; each player's rating, record,
+    strategy and type are a row in the ladder's arrays, and their id
+    is their row. Games are played in rounds, with the pairing, games
+    and rating updates for the whole round done at once.
+
+    RPS players can have a fixed strategy, or adjust to their opponent
+    like CounterRPSAgent and AdjustingRPSAgent. Matches between fixed
+    strategies are decided from their chance of winning, and the rest
+    are played one game at a time by a BatchRPSEngine.
+
+    Attributes:
+        game_engine (CoinFlipEngine or RPSEngine): Engine to run the game.
+        num_turns (int): Number of games that have been played.
+        k_value (int): K value to be used for calculating elo changes
+            on this ladder.
+        selection_size (int): Not used, since the whole round is paired at once.
+        weighted (bool): Whether to pair players with similar Elo rankings,
+            or to pair them randomly.
+        rating_system (EloRating or Glicko2Rating): How players' ratings
+            are updated after their games.
+        num_players (int): Number of players on the ladder.
+        elos (numpy.array): Elo ranking for each player.
+        num_wins (numpy.array): Number of games won by each player.
+        num_losses (numpy.array): Number of games lost by each player.
+        strategies (numpy.array): Probability of each player playing
+            Rock, Paper or Scissors.
+        kinds (numpy.array): Kind of RPS agent for each player, as in
+            BatchRPSEngine.
+        weights (numpy.array): Weight of each adjusting player's strategy.
+        types (numpy.array): Index of each player's type in type_names.
+        type_names (list): Name of each player type.
+        deviations (numpy.array): Glicko-2 rating deviation for each player.
+        volatilities (numpy.array): Glicko-2 rating volatility for each player.
+        rng (numpy.random.Generator): Random numbers for pairing and games.
+        batch_engine (BatchRPSEngine): Engine for RPS matches with adaptive players.
+
+    """
+
+    def __init__(self, game=None, K_in=32, selection_size=1, rating_system=None, **kwargs):
+        """
+        Initialize a ladder for a specific game.
+
+        Args:
+            game (CoinFlipEngine or RPSEngine): Game to be played on this ladder.
+            K_in (int): K value to be used for calculating elo changes
+                on this ladder.
+            selection_size (int): Kept for the same arguments as the other
+                ladders, players are paired for a whole round at once.
+            rating_system (EloRating or Glicko2Rating): How players' ratings
+                are updated. Defaults to Elo with K_in as the K value.
+            weighted (bool): Whether to pair players with similar Elo rankings,
+                like WeightedLadder (default), or randomly like RandomLadder.
+            seed (int): Seed for the ladder's random numbers.
+            rng (Random): Source of random numbers to seed the ladder from,
+                like the other ladders' rng, if no seed is given.
+
+        """
+        if game is not None and not isinstance(game, (CoinFlipEngine, RPSEngine)):
+            raise AttributeError("ArrayLadder can only play CoinFlip or RPS games.")
+
+        self.game_engine = game
+        self.num_turns = 0
+        self.k_value = K_in
+        self.selection_size = selection_size
+        self.weighted = kwargs.get("weighted", True)
+        self.rating_system = rating_system if rating_system is not None else EloRating(K_in)
+        seed = kwargs.get("seed")
+        if seed is None and kwargs.get("rng") is not None:
+            seed = kwargs["rng"].getrandbits(64)
+        self.rng = np.random.default_rng(seed)
+        self.batch_engine = None
+        if isinstance(game, RPSEngine):
+            self.batch_engine = BatchRPSEngine(game.num_games, rng=self.rng)
+
+        self.num_players = 0
+        self.elos = np.zeros(0, dtype=int)
+        self.num_wins = np.zeros(0, dtype=int)
+        self.num_losses = np.zeros(0, dtype=int)
+        self.strategies = np.zeros((0, 3))
+        self.kinds = np.zeros(0, dtype=int)
+        self.weights = np.zeros(0)
+        self.types = np.zeros(0, dtype=int)
+        self.type_names = []
+        self.deviations = np.zeros(0)
+        self.volatilities = np.zeros(0)
+
+        if isinstance(self.rating_system, Glicko2Rating):
+            self.elos = self.elos.astype(float)
+
+    def add_players(self, num_players, type_name="Default", strategy="uniform", **kwargs):
+        """
+        Add <num_players> new players of the same type to the ladder.
+
+        Args:
+            num_players (int): Number of players to add.
+            type_name (str): Type of the new players.
+            strategy (str OR list): Either a string corresponding to a strategy,
+                or a vector of probabilities to play Rock, Paper,
+                or Scissors respectively.
+            agent_class (str): counter or adjusting for players who adjust
+                to their opponent, like in RPS configs. Defaults to players
+                with a fixed strategy.
+            weight (int/float): Weight of an adjusting player's strategy.
+
+        Returns:
+            Array with the id of each new player.
+
+        """
+        strategy = strategy_vector(strategy)
+        agent_class = kwargs.get("agent_class")
+        if agent_class is not None and agent_class not in AGENT_CLASSES:
+            raise AttributeError("Invalid agent class: {}".format(agent_class))
+        kind = AGENT_CLASSES.get(agent_class, FIXED)
+        if type_name not in self.type_names:
+            self.type_names.append(type_name)
+
+        new_ids = np.arange(self.num_players, self.num_players + num_players)
+        self.num_players += num_players
+        self.elos = np.concatenate([self.elos, np.full(num_players, 1000, dtype=self.elos.dtype)])
+        self.num_wins = np.concatenate([self.num_wins, np.zeros(num_players, dtype=int)])
+        self.num_losses = np.concatenate([self.num_losses, np.zeros(num_players, dtype=int)])
+        self.strategies = np.concatenate([self.strategies, np.tile(strategy, (num_players, 1))])
+        self.kinds = np.concatenate([self.kinds, np.full(num_players, kind)])
+        self.weights = np.concatenate([self.weights,
+                                       np.full(num_players, float(kwargs.get("weight", 1)))])
+        self.types = np.concatenate([self.types,
+                                     np.full(num_players, self.type_names.index(type_name))])
+        self.deviations = np.concatenate([self.deviations,
+                                          np.full(num_players, float(GLICKO2_DEVIATION))])
+        self.volatilities = np.concatenate([self.volatilities,
+                                            np.full(num_players, GLICKO2_VOLATILITY)])
+
+        return new_ids
+
+    def get_players(self, sort=False):
+        """
+        Return a snapshot of every player on the ladder.
+
+        This makes an object for every player, so is only meant for
+        inspecting the ladder.
+
+        Args:
+            sort (bool): Whether or not to sort the output by Elo raking.
+
+        Returns:
+            List of PlayerSnapshots, either sorted or not sorted.
+
+        """
+        order = np.arange(self.num_players)
+        if sort:
+            order = np.argsort(-self.elos, kind="stable")
+
+        type_names = np.array(self.type_names, dtype=object)
+        return [PlayerSnapshot(*player) for player in zip(
+            order.tolist(), type_names[self.types[order]].tolist(), self.elos[order].tolist())]
+
+    def average_elo(self):
+        """
+        Calculate the average Elo ranking of each player type.
+
+        Returns:
+            Dictionary with average Elo for each type on the ladder.
+
+        """
+        totals = np.bincount(self.types, weights=self.elos, minlength=len(self.type_names))
+        counts = np.bincount(self.types, minlength=len(self.type_names))
+        return {type_name: float(totals[ind] / counts[ind])
+                for ind, type_name in enumerate(self.type_names) if counts[ind]}
+
+    def match_round(self, max_games=None):
+        """
+        Pair up the ladder for a round of games.
+
+        Args:
+            max_games (int): Maximum number of games in the round.
+                Defaults to pairing as many players as possible.
+
+        Returns:
+            Arrays with the id of player 1 and player 2 in each game.
+
+        Raises:
+            RuntimeError: If there are less than two players.
+
+        """
+        if self.num_players < 2:
+            raise RuntimeError("No players left in pool.")
+
+        num_games = self.num_players // 2
+        if max_games is not None:
+            num_games = min(num_games, max_games)
+
+        # Random players sit out if the round isn't full
+        waiting = self.rng.permutation(self.num_players)[:2*num_games]
+        if self.weighted:
+            # Sort by Elo, breaking ties randomly, so neighbours play each other
+            waiting = waiting[np.argsort(self.elos[waiting], kind="stable")]
+            swap = self.rng.random(num_games) < 0.5
+            pairs = waiting.reshape(-1, 2)
+            pairs[swap] = pairs[swap, ::-1]
+            return pairs[:, 0], pairs[:, 1]
+
+        return waiting[0::2], waiting[1::2]
+
+    def play_round(self, players, opponents):
+        """
+        Play the games for a round.
+
+        Args:
+            players (numpy.array): Id of player 1 in each game.
+            opponents (numpy.array): Id of player 2 in each game.
+
+        Returns:
+            Array with the outcome of each game, 1 if player 1 won.
+
+        """
+        if isinstance(self.game_engine, CoinFlipEngine):
+            return (self.rng.random(len(players)) < self.game_engine.prob_win).astype(int)
+
+        # Matches between fixed strategies are one draw each
+        win_probs = match_win_probability(self.strategies[players], self.strategies[opponents],
+                                          self.game_engine.num_games)
+        outcomes = (self.rng.random(len(players)) < win_probs).astype(int)
+
+        adaptive = (self.kinds[players] != FIXED) | (self.kinds[opponents] != FIXED)
+        if adaptive.any():
+            pairs = np.stack([players[adaptive], opponents[adaptive]], axis=1)
+            outcomes[adaptive] = self.batch_engine.run_arrays(
+                self.strategies[pairs], self.kinds[pairs], self.weights[pairs])
+        return outcomes
+
+    def record_round(self, players, opponents, outcomes):
+        """
+        Apply the results of a round.
+
+        Args:
+            players (numpy.array): Id of player 1 in each game.
+            opponents (numpy.array): Id of player 2 in each game.
+            outcomes (numpy.array): Outcome of each game, 1 if player 1 won.
+
+        """
+        outcomes = np.asarray(outcomes)
+        winners = np.where(outcomes == 1, players, opponents)
+        losers = np.where(outcomes == 1, opponents, players)
+        np.add.at(self.num_wins, winners, 1)
+        np.add.at(self.num_losses, losers, 1)
+
+        if isinstance(self.rating_system, Glicko2Rating):
+            # Each round is a rating period
+            self.elos, self.deviations, self.volatilities = glicko2_batch(
+                self.elos, self.deviations, self.volatilities,
+                (winners, losers, np.ones(len(winners))), tau=self.rating_system.tau)
+        else:
+            self.elos = elo_batch(self.elos, winners, losers, np.ones(len(winners)),
+                                  k=self.rating_system.k_value,
+                                  floor=self.rating_system.floor).astype(int)
+
+        self.num_turns += len(outcomes)
+
+    def run_round(self, max_games=None):
+        """
+        Match the players and run a round of games.
+
+        Args:
+            max_games (int): Maximum number of games in the round.
+
+        Returns:
+            RoundResults with the players in each game, their Elo
+                rankings before the game and the outcome.
+
+        """
+        players, opponents = self.match_round(max_games)
+        player_elos = self.elos[players]
+        opp_elos = self.elos[opponents]
+
+        outcomes = self.play_round(players, opponents)
+        self.record_round(players, opponents, outcomes)
+
+        return RoundResults(players, opponents, outcomes, player_elos, opp_elos)
+
+
+def strategy_vector(strategy):
+    """
+    Get the probabilities of playing Rock, Paper and Scissors.
+
+    Args:
+        strategy (str OR list): Either a string corresponding to a strategy,
+            or a vector of probabilities to play Rock, Paper,
+            or Scissors respectively.
+
+    Returns:
+        Array with the probability of playing each move.
+
+    """
+    if isinstance(strategy, str):
+        if strategy not in STRATEGIES:
+            raise AttributeError("Invalid strategy: {}".format(strategy))
+        strategy = STRATEGIES[strategy]
+
+    strategy = np.asarray(strategy, dtype=float)
+    if strategy.shape != (3,):
+        raise AttributeError("Strategy vector must be of length 3")
+    if (strategy < 0).any() or strategy.sum() <= 0:
+        raise AttributeError("Strategy probabilities must be positive")
+
+    return strategy / strategy.sum()
@@ -1,9 +1,14 @@
 """Base Class for ladders to inherit from."""
-from copy import deepcopy
+from collections import namedtuple
+from copy import copy
 from threading import Lock
+import random
 
-from random import randint
-from ladder.elo import elo
+from ladder.player_registry import PlayerRegistry
+from ladder.ratings import EloRating
+
+# Record of a player's state at the start of a game, for logging
+PlayerSnapshot = namedtuple("PlayerSnapshot", ["id", "type", "elo"])
 
 
 class BaseLadder:
@@ -11,19 +16,22 @@ class BaseLadder:
     The class for the ladder.
 
     Attributes:
-        player_pool (list): List of players on this ladder.
+        player_pool (PlayerRegistry): Players on this ladder.
         game_engine (battle_engine): Engine to run the game.
         num_turns (int): Number of games that have been played.
         k_value (int): K value to be used for calculating elo changes
             on this ladder.
         selection_size (int): Number of players to use as potential
             matches (before choosing randomly).
+        rating_system (EloRating or Glicko2Rating): How players' ratings
+            are updated after their games.
         thread_lock (Lock): Lock used in multithreaded simulations.
-        available_players (list): List of players not currently in a game.
+        available_players (PlayerRegistry): Players not currently in a game.
+        rng (Random): Source of random numbers for matching players.
 
     """
 
-    def __init__(self, game=None, K_in=32, selection_size=1):
+    def __init__(self, game=None, K_in=32, selection_size=1, rating_system=None, rng=random):
         """
         Initialize a ladder for a specific game.
 
@@ -33,15 +41,21 @@ class BaseLadder:
                 on this ladder.
             selection_size (int): Number of players to use as potential
             matches (before choosing randomly).
+            rating_system (EloRating or Glicko2Rating): How players' ratings
+                are updated. Defaults to Elo with K_in as the K value.
+            rng (Random): Source of random numbers for matching players.
+                Defaults to the random module.
 
         """
-        self.player_pool = []
-        self.available_players = []
+        self.player_pool = PlayerRegistry()
+        self.available_players = PlayerRegistry()
         self.game_engine = game
         self.num_turns = 0
         self.k_value = K_in
         self.selection_size = selection_size
+        self.rating_system = rating_system if rating_system is not None else EloRating(K_in)
         self.thread_lock = Lock()
+        self.rng = rng
 
     def add_player(self, player):
         """
@@ -54,30 +68,79 @@ class BaseLadder:
         self.thread_lock.acquire()
 
         # Check that player is not already in the pool
-        for player_tuple in self.player_pool:
-            if player_tuple[0].id == player.id:
-                player.in_game = False
-                self.player_pool.remove(player_tuple)
-
-                # Try to remove from available_players
-                try:
-                    self.available_players.remove(player_tuple)
-                except ValueError:
-                    # Value not found
-                    pass
+        player_tuple = self.player_pool.get(player.id)
+        if player_tuple is not None:
+            player.in_game = False
+            self.player_pool.remove(player_tuple)
+
+            # Try to remove from available_players
+            try:
+                self.make_unavailable(player_tuple)
+            except ValueError:
+                # Value not found
+                pass
 
         # Add the player to the pools
         self.player_pool.append((
             player,
             self.num_turns
         ))
-        self.available_players.append((
+        self.make_available((
             player,
             self.num_turns
         ))
 
         self.thread_lock.release()
 
+    def remove_player(self, player, available_only=False):
+        """
+        Remove a player from the ladder.
+
+        Args:
+            player (BaseAgent): Player to be removed from the ladder pool.
+            available_only (bool): Only remove the player if they are
+                not currently in a game.
+
+        Returns:
+            Whether or not the player was removed.
+
+        """
+        self.thread_lock.acquire()
+
+        player_tuple = self.player_pool.get(player.id)
+        available = player_tuple is not None and player_tuple in self.available_players
+        removed = player_tuple is not None and (available or not available_only)
+        if removed:
+            self.player_pool.remove(player_tuple)
+            if available:
+                self.make_unavailable(player_tuple)
+
+        self.thread_lock.release()
+        return removed
+
+    def make_available(self, player_pair):
+        """
+        Add a player to the players who can be matched.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        """
+        self.available_players.append(player_pair)
+
+    def make_unavailable(self, player_pair):
+        """
+        Remove a player from the players who can be matched.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        Raises:
+            ValueError: If the player is not available.
+
+        """
+        self.available_players.remove(player_pair)
+
     def get_players(self, sort=False):
         """
         Return the players currently in the pool.
@@ -119,25 +182,159 @@ class BaseLadder:
             self.thread_lock.release()
             raise RuntimeError("No players left in pool.")
 
+        player, opponent = self.match_available()
+
+        self.thread_lock.release()
+
+        self.num_turns += 1
+        return (player, opponent)
+
+    def match_available(self):
+        """
+        Match a random available player with an opponent.
+
+        Should only be called while holding thread_lock, with at least
+        two players available.
+
+        Returns:
+            A pair of players matched by the ladder's match_func.
+
+        """
         # Select a random player
-        available_ind = randint(a=0, b=(len(self.available_players)-1))
-        player = self.available_players[available_ind][0]
-        del self.available_players[available_ind]
+        player_pair = self.available_players.choice(self.rng)
+        player = player_pair[0]
+        self.make_unavailable(player_pair)
         player.in_game = True
 
         # Get that player's opponent
         candidate_opponents = self.get_candidate_matches(player)
 
-        opponent_choice = randint(0, len(candidate_opponents)-1)
+        opponent_choice = self.rng.randint(0, len(candidate_opponents)-1)
         opponent_pair = candidate_opponents[opponent_choice]
-        self.available_players.remove(opponent_pair)
+        self.make_unavailable(opponent_pair)
         opponent = opponent_pair[0]
         opponent.in_game = True
 
+        return (player, opponent)
+
+    def match_round(self, max_games=None):
+        """
+        Pair up the whole available pool at once for a round of games.
+
+        Args:
+            max_games (int): Maximum number of games in the round.
+                Defaults to pairing as many players as possible.
+
+        Returns:
+            List of pairs of players to play each other.
+
+        Raises:
+            RuntimeError: If either no players in the pool or
+                only a single player available.
+
+        """
+        self.thread_lock.acquire()
+
+        # Check if no players ready
+        if len(self.available_players) < 2:
+            self.thread_lock.release()
+            raise RuntimeError("No players left in pool.")
+
+        num_games = len(self.available_players) // 2
+        if max_games is not None:
+            num_games = min(num_games, max_games)
+
+        matches = self.pair_round(num_games)
+        for player, opponent in matches:
+            player.in_game = True
+            opponent.in_game = True
+
         self.thread_lock.release()
 
-        self.num_turns += 1
-        return (player, opponent)
+        self.num_turns += len(matches)
+        return matches
+
+    def pair_round(self, num_games):
+        """
+        Choose the pairs of players for a round and make them unavailable.
+
+        Matches one player at a time like match_players, so child
+        classes should override this with something faster.
+
+        Args:
+            num_games (int): Number of games in the round.
+
+        Returns:
+            List of pairs of players to play each other.
+
+        """
+        return [self.match_available() for _ in range(num_games)]
+
+    def play_round(self, matches, rngs=None):
+        """
+        Play the games for a round.
+
+        Args:
+            matches (list): Pairs of players to play each other.
+            rngs (list): Source of random numbers for each game.
+                Defaults to the engine's.
+
+        Returns:
+            List of the outcome of each game, 1 if player 1 won.
+
+        """
+        outcomes = []
+        for match_ind, (player, opp) in enumerate(matches):
+            temp_engine = copy(self.game_engine)
+            if rngs is not None:
+                temp_engine.rng = rngs[match_ind]
+            outcomes.append(temp_engine.run(player, opp))
+        return outcomes
+
+    def record_round(self, matches, outcomes):
+        """
+        Apply the results of a round and return the players to the pool.
+
+        Ratings are updated together once every game in the round has
+        finished, so the whole round is played at the same ratings.
+
+        Args:
+            matches (list): Pairs of players who played each other.
+            outcomes (list): Outcome of each game, 1 if player 1 won.
+
+        """
+        results = []
+        for (player, opp), outcome in zip(matches, outcomes):
+            if outcome == 1:
+                results.append((player, opp))
+            else:
+                results.append((opp, player))
+        self.update_results(results)
+
+        for player, opp in matches:
+            self.add_player(player)
+            self.add_player(opp)
+
+    def run_round(self, max_games=None):
+        """
+        Match the available players and run a round of games.
+
+        Args:
+            max_games (int): Maximum number of games in the round.
+
+        Returns:
+            List of tuples with the winner of each game, as well as
+                data on the players involved in the game.
+
+        """
+        matches = self.match_round(max_games)
+        snapshots = [(snapshot(player), snapshot(opp)) for player, opp in matches]
+
+        outcomes = self.play_round(matches)
+        self.record_round(matches, outcomes)
+
+        return [(outcome, player_copy, opp_copy)
+                for outcome, (player_copy, opp_copy) in zip(outcomes, snapshots)]
 
     def get_candidate_matches(self, player):
         """
@@ -164,10 +361,14 @@ class BaseLadder:
         """IMPLEMENT IN CHILD CLASS."""
         raise NotImplementedError("Implement in child class")
 
-    def run_game(self):
+    def run_game(self, rng=None):
         """
         Match players and run a game.
 
+        Args:
+            rng (Random): Source of random numbers for the game.
+                Defaults to the engine's.
+
         Returns:
             Tuple with the winner of the game, as well as data on the
                 players involved in the game.
@@ -175,13 +376,33 @@ class BaseLadder:
         """
         player, opp = self.match_players()
 
-        player_copy = deepcopy(player)
-        opp_copy = deepcopy(opp)
+        player_copy = snapshot(player)
+        opp_copy = snapshot(opp)
 
-        # Make a copy to be thread safe(?)
-        temp_engine = deepcopy(self.game_engine)
+        # Engines reset their game state at the start of a game,
+        # so a shallow copy is enough for each thread to have its own.
+        temp_engine = copy(self.game_engine)
+        if rng is not None:
+            temp_engine.rng = rng
         outcome = temp_engine.run(player, opp)
 
+        self.record_result(player, opp, outcome)
+
+        return (outcome, player_copy, opp_copy)
+
+    def record_result(self, player, opp, outcome):
+        """
+        Apply the result of a game and return both players to the pool.
+
+        Used by run_game, as well as by simulations that play the
+        game itself somewhere else (eg: in a worker process).
+
+        Args:
+            player (BaseAgent): Player 1 in this game.
+            opp (BaseAgent): Player 2 in this game.
+            outcome (int): 1 if player won, 0 if opp won.
+
+        """
         if outcome == 1:
             self.update_player_stats(player, opp)
         else:
@@ -190,8 +411,6 @@ class BaseLadder:
         self.add_player(player)
         self.add_player(opp)
 
-        return (outcome, player_copy, opp_copy)
-
     def update_player_stats(self, winner, loser):
         """
         Update values for winner and loser.
@@ -201,9 +420,45 @@ class BaseLadder:
             loser (BaseAgent): The player who lost.
 
         """
-        new_winner_elo = elo(winner, loser, 1, self.k_value)
-        new_loser_elo = elo(loser, winner, 0, self.k_value)
-        winner.elo = new_winner_elo
-        winner.num_wins += 1
-        loser.elo = new_loser_elo
-        loser.num_losses += 1
+        self.update_results([(winner, loser)])
+
+    def update_results(self, results):
+        """
+        Update values for the players in a batch of games.
+
+        Args:
+            results (list): List of (winner, loser) tuples.
+
+        """
+        for winner, loser in results:
+            winner.num_wins += 1
+            loser.num_losses += 1
+
+        updated = self.rating_system.add_results(results)
+        self.update_index(updated)
+
+    def update_index(self, players):
+        """
+        Update anything that depends on these players' ratings.
+
+        BaseLadder doesn't keep anything sorted by rating, so there is
+        nothing to do.
+
+        Args:
+            players (list): Players whose ratings have changed.
+
+        """
+
+
+def snapshot(player):
+    """
+    Take a snapshot of the player's identifying info and rating.
+
+    Args:
+        player (BaseAgent): Player to take a snapshot of.
+
+    Returns:
+        PlayerSnapshot with the player's id, type and elo.
+
+    """
+    return PlayerSnapshot(player.id, player.type, player.elo)
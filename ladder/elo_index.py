@@ -0,0 +1,160 @@
+"""Index of available players sorted by Elo, for fast matching."""
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from heapq import heappush, heappushpop
+from itertools import count
+
+
+class EloIndex:
+    """
+    Available players bucketed by Elo ranking.
+
+    Each bucket holds the players with one Elo ranking, in the order they
+    were added. Since the ladder's turn count never decreases, players
+    earlier in a bucket have been waiting at least as long as the later
+    ones. This lets the best matches be found by only searching outward
+    from a player's Elo until no further bucket can beat them.
+
+    Attributes:
+        elos (list): Sorted list of the Elo rankings with a bucket.
+        buckets (dict): Elo ranking to an OrderedDict of the players
+            with that ranking, keyed by the order they were added.
+        entries (dict): Player id to that player's (elo, seq, pair).
+        order (OrderedDict): Every player pair, keyed by the order
+            they were added.
+
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.elos = []
+        self.buckets = {}
+        self.entries = {}
+        self.order = OrderedDict()
+        self.counter = count()
+
+    def __len__(self):
+        """Return the number of players in the index."""
+        return len(self.entries)
+
+    def add(self, player_pair):
+        """
+        Add a player to the index.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        """
+        seq = next(self.counter)
+        self.insert(player_pair[0].elo, seq, player_pair)
+        self.order[seq] = player_pair
+
+    def remove(self, player_pair):
+        """
+        Remove a player from the index, if they are in it.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        """
+        entry = self.entries.get(player_pair[0].id)
+        if entry is None:
+            return
+
+        elo, seq, _ = entry
+        self.delete(elo, seq, player_pair[0].id)
+        del self.order[seq]
+
+    def update(self, player):
+        """
+        Move a player to the bucket for their current Elo ranking.
+
+        Args:
+            player (BaseAgent): Player whose Elo ranking may have changed.
+
+        """
+        entry = self.entries.get(player.id)
+        if entry is None or entry[0] == player.elo:
+            return
+
+        elo, seq, player_pair = entry
+        self.delete(elo, seq, player.id)
+        self.insert(player.elo, seq, player_pair)
+
+    def insert(self, elo, seq, player_pair):
+        """Put a player pair in the bucket for <elo>."""
+        bucket = self.buckets.get(elo)
+        if bucket is None:
+            bucket = self.buckets[elo] = OrderedDict()
+            insort(self.elos, elo)
+
+        # Keep the bucket in the order players were added
+        bucket[seq] = player_pair
+        if len(bucket) > 1 and next(reversed(bucket)) != seq:
+            for later_seq in [key for key in bucket if key > seq]:
+                bucket.move_to_end(later_seq)
+
+        self.entries[player_pair[0].id] = (elo, seq, player_pair)
+
+    def delete(self, elo, seq, player_id):
+        """Take a player out of the bucket for <elo>."""
+        bucket = self.buckets[elo]
+        del bucket[seq]
+        if not bucket:
+            del self.buckets[elo]
+            del self.elos[bisect_left(self.elos, elo)]
+
+        del self.entries[player_id]
+
+    def best_matches(self, player, num_turns, selection_size):
+        """
+        Get the best matches for <player>, as scored by WeightedLadder.
+
+        Matches are scored as <Turns_waiting>/abs(<Difference in Elo scores>),
+        with both terms at least 1. Ties go to whoever was added first.
+
+        Args:
+            player (BaseAgent): Player for whom we are matching.
+            num_turns (int): Number of games that have been played.
+            selection_size (int): Number of matches to return.
+
+        Returns:
+            List of up to <selection_size> player pairs, best match first.
+
+        """
+        if not self.order or selection_size < 1:
+            return []
+
+        # Nobody has been waiting longer than the first player added
+        max_wait = max(num_turns - next(iter(self.order.values()))[1], 1)
+
+        # Min heap of the best matches, so the worst is at the front
+        best = []
+        elos = self.elos
+        high = bisect_left(elos, player.elo)
+        low = high - 1
+        while low >= 0 or high < len(elos):
+            if high >= len(elos) or \
+                    (low >= 0 and player.elo - elos[low] <= elos[high] - player.elo):
+                elo = elos[low]
+                low -= 1
+            else:
+                elo = elos[high]
+                high += 1
+
+            elo_factor = 1/max(abs(player.elo - elo), 1)
+            if len(best) == selection_size and elo_factor*max_wait < best[0][0]:
+                break
+
+            for seq, player_pair in self.buckets[elo].items():
+                score = (elo_factor*max((num_turns - player_pair[1]), 1), -seq)
+                if len(best) < selection_size:
+                    heappush(best, score + (player_pair, ))
+                elif score > best[0][:2]:
+                    heappushpop(best, score + (player_pair, ))
+                else:
+                    # Later players in this bucket have waited less
+                    break
+
+        best.sort(key=lambda match: (match[0], match[1]), reverse=True)
+        return [match[2] for match in best]
@@ -0,0 +1,136 @@
+"""Collection of player pairs on a ladder, keyed by player id."""
+import random
+
+
+class PlayerRegistry:
+    """
+    Player & turn pairs keyed by player id.
+
+    Iterates in the order players were added, like a list that players
+    are appended to and removed from. Adding, removing, looking up and
+    randomly choosing a player all take constant time.
+
+    Attributes:
+        pairs (dict): Player id to that player's pair, in the order
+            they were added.
+        ids (list): Player ids in no particular order, to choose from.
+        positions (dict): Player id to their position in ids.
+
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.pairs = {}
+        self.ids = []
+        self.positions = {}
+
+    def __len__(self):
+        """Return the number of players in the registry."""
+        return len(self.pairs)
+
+    def __iter__(self):
+        """Iterate over the player pairs in the order they were added."""
+        return iter(self.pairs.values())
+
+    def __contains__(self, player_pair):
+        """Check if <player_pair> is in the registry."""
+        return self.pairs.get(player_pair[0].id) == player_pair
+
+    def __getitem__(self, index):
+        """
+        Get the player pair at <index>, in the order they were added.
+
+        This takes linear time, so is only meant for inspecting the registry.
+
+        Args:
+            index (int): Position of the pair.
+
+        Returns:
+            The player pair at that position.
+
+        """
+        return list(self.pairs.values())[index]
+
+    def get(self, player_id):
+        """
+        Get the pair for the player with <player_id>.
+
+        Args:
+            player_id (str): Id of the player to look up.
+
+        Returns:
+            The player's pair, or None if they are not in the registry.
+
+        """
+        return self.pairs.get(player_id)
+
+    def append(self, player_pair):
+        """
+        Add a player pair, replacing any pair with the same player id.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        """
+        player_id = player_pair[0].id
+        if player_id in self.pairs:
+            self.pop(player_id)
+
+        self.pairs[player_id] = player_pair
+        self.positions[player_id] = len(self.ids)
+        self.ids.append(player_id)
+
+    def remove(self, player_pair):
+        """
+        Remove a player pair.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        Raises:
+            ValueError: If the pair is not in the registry.
+
+        """
+        if player_pair not in self:
+            raise ValueError("Player not in registry.")
+        self.pop(player_pair[0].id)
+
+    def pop(self, player_id):
+        """
+        Remove and return the pair for the player with <player_id>.
+
+        Args:
+            player_id (str): Id of the player to remove.
+
+        Returns:
+            The removed player pair.
+
+        """
+        player_pair = self.pairs.pop(player_id)
+
+        # Fill the gap in ids with the last id
+        position = self.positions.pop(player_id)
+        last_id = self.ids.pop()
+        if last_id != player_id:
+            self.ids[position] = last_id
+            self.positions[last_id] = position
+
+        return player_pair
+
+    def choice(self, rng=random):
+        """
+        Choose a random player pair.
+
+        Args:
+            rng (Random): Source of random numbers. Defaults to the random module.
+
+        Returns:
+            A uniformly random pair from the registry.
+
+        Raises:
+            IndexError: If the registry is empty.
+
+        """
+        if not self.ids:
+            raise IndexError("Cannot choose from an empty registry.")
+        return self.pairs[self.ids[rng.randint(0, len(self.ids) - 1)]]
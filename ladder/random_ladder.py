@@ -1,13 +1,13 @@
 """Ladder that randomly pairs two agents."""
 
-from random import random
+import random
 from ladder.base_ladder import BaseLadder
 
 
 class RandomLadder(BaseLadder):
     """Ladder that matches players randomly."""
 
-    def __init__(self, game=None, K_in=32, selection_size=1):
+    def __init__(self, game=None, K_in=32, selection_size=1, rating_system=None, rng=random):
         """
         Initialize a ladder for a specific game.
 
@@ -15,9 +15,14 @@ class RandomLadder(BaseLadder):
             game (battle_engine): Game to be played on this ladder.
             K_in (int): K value to be used for calculating elo changes
                 on this ladder.
+            rating_system (EloRating or Glicko2Rating): How players' ratings
+                are updated. Defaults to Elo with K_in as the K value.
+            rng (Random): Source of random numbers for matching players.
+                Defaults to the random module.
 
         """
-        super().__init__(game=game, K_in=K_in, selection_size=selection_size)
+        super().__init__(game=game, K_in=K_in, selection_size=selection_size,
+                         rating_system=rating_system, rng=rng)
 
     def match_func(self, player1, player2_pair):
         """
@@ -34,4 +39,26 @@ class RandomLadder(BaseLadder):
             The score for a match; in this case a random number.
 
         """
-        return random()
+        return self.rng.random()
+
+    def pair_round(self, num_games):
+        """
+        Pair players for a round from a random permutation.
+
+        Args:
+            num_games (int): Number of games in the round.
+
+        Returns:
+            List of pairs of players to play each other.
+
+        """
+        waiting = list(self.available_players)
+        self.rng.shuffle(waiting)
+
+        matches = []
+        for ind in range(0, 2*num_games, 2):
+            self.make_unavailable(waiting[ind])
+            self.make_unavailable(waiting[ind + 1])
+            matches.append((waiting[ind][0], waiting[ind + 1][0]))
+
+        return matches
@@ -0,0 +1,342 @@
+"""Rating systems that update many players' ratings at once."""
+from math import pi
+from threading import Lock
+
+import numpy as np
+
+from ladder.elo import elo
+
+# Lowest Elo rating a player can drop to
+ELO_FLOOR = 1000
+
+# Conversion between Glicko and Glicko-2 scales
+GLICKO2_SCALE = 173.7178
+GLICKO2_CENTER = 1500
+
+# Starting rating deviation and volatility for Glicko-2
+GLICKO2_DEVIATION = 350
+GLICKO2_VOLATILITY = 0.06
+
+# Tolerance for the Glicko-2 volatility iteration
+GLICKO2_EPSILON = 1e-6
+
+
+def elo_batch(ratings, players, opponents, outcomes, k=32, floor=ELO_FLOOR):
+    """
+    Apply a batch of games to an array of Elo ratings.
+
+    Every game uses the ratings from before the batch, like a player
+    playing each game at once. Each game changes a rating by the same
+    amount as ladder.elo.elo, and the rating can't drop below the floor.
+
+    Args:
+        ratings (numpy.array): Elo rating for each player.
+        players (numpy.array): Index of player 1 in each game.
+        opponents (numpy.array): Index of player 2 in each game.
+        outcomes (numpy.array): 1 if player 1 won each game, 0 otherwise.
+        k (int): K value used in the calculation.
+        floor (int): Lowest rating a player can drop to.
+
+    Returns:
+        Array with the new rating for each player.
+
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    outcomes = np.asarray(outcomes, dtype=float)
+    player_ratings = ratings[players]
+    opp_ratings = ratings[opponents]
+
+    exp = 1 / (1 + 10 ** ((opp_ratings - player_ratings) / 400))
+    change = np.floor(player_ratings + k * (outcomes - exp)) - player_ratings
+    opp_change = np.floor(opp_ratings + k * (exp - outcomes)) - opp_ratings
+
+    new_ratings = ratings.copy()
+    np.add.at(new_ratings, players, change)
+    np.add.at(new_ratings, opponents, opp_change)
+    return np.maximum(new_ratings, floor)
+
+
+def glicko2_batch(ratings, deviations, volatilities, games, tau=0.5):
+    """
+    Apply a Glicko-2 rating period to arrays of player ratings.
+
+    Follows http://www.glicko.net/glicko/glicko2.pdf, with every
+    player's ratings updated together.
+
+    Args:
+        ratings (numpy.array): Glicko rating for each player.
+        deviations (numpy.array): Rating deviation for each player.
+        volatilities (numpy.array): Rating volatility for each player.
+        games (tuple): Arrays with the index of player 1, the index of
+            player 2 and whether player 1 won, for each game in the period.
+        tau (float): System constant limiting changes in volatility.
+
+    Returns:
+        Tuple of arrays with each player's new rating, deviation and volatility.
+
+    """
+    players, opponents, outcomes = games
+    num_players = len(ratings)
+    mu = (np.asarray(ratings, dtype=float) - GLICKO2_CENTER) / GLICKO2_SCALE
+    phi = np.asarray(deviations, dtype=float) / GLICKO2_SCALE
+    sigma = np.asarray(volatilities, dtype=float)
+
+    # Look at each game from both players' sides
+    outcomes = np.asarray(outcomes, dtype=float)
+    rows = np.concatenate([players, opponents])
+    opps = np.concatenate([opponents, players])
+    scores = np.concatenate([outcomes, 1 - outcomes])
+
+    g_opp = 1 / np.sqrt(1 + 3 * phi[opps]**2 / pi**2)
+    exp = 1 / (1 + np.exp(-g_opp * (mu[rows] - mu[opps])))
+
+    played = np.bincount(rows, minlength=num_players) > 0
+    inv_variance = np.bincount(rows, weights=g_opp**2 * exp * (1 - exp), minlength=num_players)
+    score_sum = np.bincount(rows, weights=g_opp * (scores - exp), minlength=num_players)
+
+    # Only players with games have an estimated variance and improvement
+    variance = 1 / inv_variance[played]
+    delta = variance * score_sum[played]
+
+    new_sigma = sigma.copy()
+    new_sigma[played] = glicko2_volatility(delta, phi[played], variance, sigma[played], tau)
+
+    # Players who didn't play only become less certain
+    new_phi = np.sqrt(phi**2 + new_sigma**2)
+    new_phi[played] = 1 / np.sqrt(1 / new_phi[played]**2 + 1 / variance)
+    new_mu = mu + new_phi**2 * score_sum
+
+    return (new_mu * GLICKO2_SCALE + GLICKO2_CENTER, new_phi * GLICKO2_SCALE, new_sigma)
+
+
+def glicko2_volatility(delta, phi, variance, sigma, tau):
+    """
+    Find each player's new volatility, with the Illinois algorithm.
+
+    Args:
+        delta (numpy.array): Estimated improvement in each player's rating.
+        phi (numpy.array): Each player's rating deviation, on the Glicko-2 scale.
+        variance (numpy.array): Estimated variance of each player's rating.
+        sigma (numpy.array): Each player's volatility.
+        tau (float): System constant limiting changes in volatility.
+
+    Returns:
+        Array with each player's new volatility.
+
+    """
+    log_sigma = np.log(sigma**2)
+
+    def func(x_val):
+        """Evaluate the function whose root is the new log volatility squared."""
+        exp_x = np.exp(x_val)
+        return exp_x * (delta**2 - phi**2 - variance - exp_x) / \
+            (2 * (phi**2 + variance + exp_x)**2) - (x_val - log_sigma) / tau**2
+
+    # Bracket the root
+    lower = log_sigma.copy()
+    upper = np.where(delta**2 > phi**2 + variance,
+                     np.log(np.maximum(delta**2 - phi**2 - variance, 1e-300)), np.nan)
+    need_upper = np.isnan(upper)
+    step = 1
+    upper[need_upper] = log_sigma[need_upper] - tau
+    while True:
+        below = need_upper & (func(upper) < 0)
+        if not below.any():
+            break
+        step += 1
+        upper[below] = log_sigma[below] - step * tau
+
+    # Lower and upper are the A and B of the paper
+    f_lower = func(lower)
+    f_upper = func(upper)
+    active = np.abs(upper - lower) > GLICKO2_EPSILON
+    while active.any():
+        new = lower + (lower - upper) * f_lower / (f_upper - f_lower)
+        f_new = func(new)
+
+        crossed = f_new * f_upper <= 0
+        lower = np.where(active & crossed, upper, lower)
+        f_lower = np.where(active & crossed, f_upper, np.where(active, f_lower / 2, f_lower))
+        upper = np.where(active, new, upper)
+        f_upper = np.where(active, f_new, f_upper)
+        active = np.abs(upper - lower) > GLICKO2_EPSILON
+
+    return np.exp(lower / 2)
+
+
+class EloRating:
+    """
+    Elo ratings, stored as each player's elo.
+
+    Attributes:
+        k_value (int): K value to be used for calculating elo changes.
+        floor (int): Lowest rating a player can drop to.
+
+    """
+
+    def __init__(self, k_value=32, floor=ELO_FLOOR):
+        """
+        Initialize Elo ratings.
+
+        Args:
+            k_value (int): K value to be used for calculating elo changes.
+            floor (int): Lowest rating a player can drop to.
+
+        """
+        self.k_value = k_value
+        self.floor = floor
+
+    def add_results(self, results):
+        """
+        Update ratings for a batch of games.
+
+        Args:
+            results (list): List of (winner, loser) tuples.
+
+        Returns:
+            List of the players whose ratings were updated.
+
+        """
+        if len(results) == 1 and self.floor == ELO_FLOOR:
+            winner, loser = results[0]
+            new_winner_elo = elo(winner, loser, 1, self.k_value)
+            new_loser_elo = elo(loser, winner, 0, self.k_value)
+            winner.elo = new_winner_elo
+            loser.elo = new_loser_elo
+            return [winner, loser]
+
+        players, rows = index_players(results)
+        new_ratings = elo_batch([player.elo for player in players],
+                                rows[:, 0], rows[:, 1], np.ones(len(results)),
+                                k=self.k_value, floor=self.floor)
+        for player, rating in zip(players, new_ratings):
+            player.elo = int(rating)
+        return players
+
+
+class Glicko2Rating:
+    """
+    Glicko-2 ratings, updated once every rating period.
+
+    Each player's rating is stored as their elo, and their rating
+    deviation and volatility are kept here. Games are saved until
+    <period_length> have been played, then every player's ratings
+    are updated at once.
+
+    Attributes:
+        period_length (int): Number of games in each rating period.
+        tau (float): System constant limiting changes in volatility.
+        players (list): Every player who has played a game.
+        rows (dict): Player id to that player's position in players.
+        deviations (list): Rating deviation for each player.
+        volatilities (list): Rating volatility for each player.
+        pending (list): (winner, loser) tuples for this rating period.
+        lock (Lock): Lock used when results are added from several threads.
+
+    """
+
+    def __init__(self, period_length=100, tau=0.5):
+        """
+        Initialize Glicko-2 ratings.
+
+        Args:
+            period_length (int): Number of games in each rating period.
+            tau (float): System constant limiting changes in volatility.
+
+        """
+        self.period_length = period_length
+        self.tau = tau
+        self.players = []
+        self.rows = {}
+        self.deviations = []
+        self.volatilities = []
+        self.pending = []
+        self.lock = Lock()
+
+    def add_results(self, results):
+        """
+        Save the results of a batch of games, ending the period if it's full.
+
+        Args:
+            results (list): List of (winner, loser) tuples.
+
+        Returns:
+            List of the players whose ratings were updated.
+
+        """
+        self.lock.acquire()
+        self.pending.extend(results)
+        updated = []
+        if len(self.pending) >= self.period_length:
+            updated = self.end_period()
+        self.lock.release()
+        return updated
+
+    def end_period(self):
+        """
+        Update every player's ratings with the games in this rating period.
+
+        Returns:
+            List of the players whose ratings were updated.
+
+        """
+        for result in self.pending:
+            for player in result:
+                if player.id not in self.rows:
+                    self.rows[player.id] = len(self.players)
+                    self.players.append(player)
+                    self.deviations.append(GLICKO2_DEVIATION)
+                    self.volatilities.append(GLICKO2_VOLATILITY)
+
+        games = np.array([[self.rows[winner.id], self.rows[loser.id]]
+                          for winner, loser in self.pending], dtype=int).reshape(-1, 2)
+        ratings, deviations, volatilities = glicko2_batch(
+            [player.elo for player in self.players], self.deviations, self.volatilities,
+            (games[:, 0], games[:, 1], np.ones(len(games))), tau=self.tau)
+
+        for player, rating in zip(self.players, ratings):
+            player.elo = float(rating)
+        self.deviations = list(deviations)
+        self.volatilities = list(volatilities)
+        self.pending = []
+
+        return list(self.players)
+
+    def deviation(self, player):
+        """
+        Get <player>'s rating deviation.
+
+        Args:
+            player (BaseAgent): Player to look up.
+
+        Returns:
+            The player's rating deviation.
+
+        """
+        row = self.rows.get(player.id)
+        return GLICKO2_DEVIATION if row is None else self.deviations[row]
+
+
+def index_players(results):
+    """
+    Give each player in a batch of games a row.
+
+    Args:
+        results (list): List of (winner, loser) tuples.
+
+    Returns:
+        List of the players in the games, and an array with the
+            rows of the winner and loser in each game.
+
+    """
+    players = []
+    player_rows = {}
+    rows = np.zeros((len(results), 2), dtype=int)
+    for game_ind, result in enumerate(results):
+        for side, player in enumerate(result):
+            if player.id not in player_rows:
+                player_rows[player.id] = len(players)
+                players.append(player)
+            rows[game_ind, side] = player_rows[player.id]
+
+    return players, rows
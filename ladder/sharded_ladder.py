@@ -0,0 +1,363 @@
+"""Ladder split into Elo range shards that are matched independently."""
+from bisect import bisect_right
+from itertools import count
+import random
+
+from ladder.base_ladder import BaseLadder
+from ladder.weighted_ladder import WeightedLadder
+
+
+class ShardedLadder(BaseLadder):
+    """
+    Ladder that splits players into shards by Elo ranking.
+
+    Each shard is a ladder with its own lock, so matching and adding
+    players in different shards doesn't wait on one lock. Players who
+    tie on Elo are spread between shards by a random tiebreak, so the
+    shards are still balanced while everyone has the starting Elo.
+
+    Every <rebalance_delay> games, the shard boundaries are moved to
+    keep the shards the same size, and players whose rating has drifted
+    out of their shard's range are moved to the right shard. Players in
+    a game are moved when they are added back to the ladder.
+
+    Attributes:
+        shards (list): The ladder for each shard, lowest Elo first.
+        bounds (list): Lowest (elo, tiebreak) for each shard after the first.
+        shard_of (dict): Player id to the index of that player's shard.
+        tiebreaks (dict): Player id to that player's random tiebreak.
+        rebalance_delay (int): Number of games between rebalancing shards.
+        game_counter (count): Counter for the number of games matched.
+        thread_lock (Lock): Lock held while rebalancing the shards.
+        player_pool (ShardedView): Players in every shard.
+        available_players (ShardedView): Available players in every shard.
+
+    """
+
+    def __init__(self, game=None, K_in=32, selection_size=1, rating_system=None, **kwargs):
+        """
+        Initialize a ladder for a specific game.
+
+        Args:
+            game (battle_engine): Game to be played on this ladder.
+            K_in (int): K value to be used for calculating elo changes
+                on this ladder.
+            selection_size (int): Number of players to use as potential
+                matches (before choosing randomly).
+            rating_system (EloRating or Glicko2Rating): How players' ratings
+                are updated. Defaults to Elo with K_in as the K value.
+            num_shards (int): Number of shards to split players into.
+            ladder_class (class): Ladder class to use for each shard.
+            rebalance_delay (int): Number of games between rebalancing shards.
+            rng (Random): Source of random numbers for matching players,
+                shared with the shards. Defaults to the random module.
+
+        """
+        super().__init__(game=game, K_in=K_in, selection_size=selection_size,
+                         rating_system=rating_system, rng=kwargs.get("rng", random))
+        num_shards = kwargs.get("num_shards", 4)
+        ladder_class = kwargs.get("ladder_class", WeightedLadder)
+        self.rebalance_delay = kwargs.get("rebalance_delay", 1000)
+
+        if num_shards < 1:
+            raise AttributeError("Need at least one shard.")
+
+        self.shards = [ladder_class(game=game, K_in=K_in, selection_size=selection_size,
+                                    rating_system=self.rating_system, rng=self.rng)
+                       for _ in range(num_shards)]
+        # Everyone starts at 1000 Elo, so split them by tiebreak until rebalancing
+        self.bounds = [(1000, ind / num_shards) for ind in range(1, num_shards)]
+        self.shard_of = {}
+        self.tiebreaks = {}
+        self.game_counter = count(1)
+        self.player_pool = ShardedView(self.shards, "player_pool")
+        self.available_players = ShardedView(self.shards, "available_players")
+
+    def shard_key(self, player):
+        """
+        Get the key used to place <player> in a shard.
+
+        Args:
+            player (BaseAgent): Player to place.
+
+        Returns:
+            Tuple of the player's Elo and their tiebreak.
+
+        """
+        tiebreak = self.tiebreaks.get(player.id)
+        if tiebreak is None:
+            tiebreak = self.tiebreaks.setdefault(player.id, self.rng.random())
+        return (player.elo, tiebreak)
+
+    def shard_index(self, player):
+        """
+        Get the index of the shard for <player>'s current rating.
+
+        Args:
+            player (BaseAgent): Player to place.
+
+        Returns:
+            Index of the shard in self.shards.
+
+        """
+        return bisect_right(self.bounds, self.shard_key(player))
+
+    def add_player(self, player):
+        """
+        Add a player to the shard for their rating.
+
+        Args:
+            player (BaseAgent): Player to be added to the ladder pool
+
+        """
+        shard_ind = self.shard_index(player)
+        old_ind = self.shard_of.get(player.id)
+        if old_ind is not None and old_ind != shard_ind:
+            self.shards[old_ind].remove_player(player)
+
+        self.shard_of[player.id] = shard_ind
+        self.shards[shard_ind].add_player(player)
+
+    def match_func(self, player1, player2_pair):
+        """
+        Calculate the match score for two players with <player1>'s shard.
+
+        Args:
+            player1 (BaseAgent): The player who is being matched.
+            player2_pair (tuple): The candidate player & turns waiting pair for a match.
+
+        Returns:
+            The score from match_func of <player1>'s shard.
+
+        """
+        shard_ind = self.shard_of.get(player1.id)
+        if shard_ind is None:
+            shard_ind = self.shard_index(player1)
+        return self.shards[shard_ind].match_func(player1, player2_pair)
+
+    def get_players(self, sort=False):
+        """
+        Return the players currently in every shard.
+
+        Args:
+            sort (bool): Whether or not to sort the output by Elo raking.
+
+        Returns:
+            List of players, either sorted or not sorted.
+
+        """
+        output = []
+        for shard in self.shards:
+            output.extend(shard.get_players())
+
+        if sort:
+            output = sorted(output,
+                            key=lambda player: player.elo, reverse=True)
+        return output
+
+    def match_players(self):
+        """
+        Return a pair of players to play, from the same shard if possible.
+
+        Shards are tried starting from a random one, chosen in proportion
+        to the number of players available in each.
+
+        Returns:
+            A pair of players matched by a shard's match_func.
+
+        Raises:
+            RuntimeError: If either no players in the pool or
+                only a single player available.
+
+        """
+        num_shards = len(self.shards)
+        sizes = [len(shard.available_players) for shard in self.shards]
+        start_ind = 0
+        if sum(sizes) > 0:
+            choice = self.rng.randint(0, sum(sizes) - 1)
+            while choice >= sizes[start_ind]:
+                choice -= sizes[start_ind]
+                start_ind += 1
+
+        match = None
+        for offset in range(num_shards):
+            try:
+                match = self.shards[(start_ind + offset) % num_shards].match_players()
+                break
+            except RuntimeError:
+                pass
+
+        if match is None:
+            match = self.match_across_shards()
+
+        self.count_game()
+        return match
+
+    def match_across_shards(self):
+        """
+        Match the players left over in different shards.
+
+        Locks every shard, in order, so the players available in each
+        can't change while choosing.
+
+        Returns:
+            A random available player and the available player closest
+                to them in Elo.
+
+        Raises:
+            RuntimeError: If less than two players are available.
+
+        """
+        for shard in self.shards:
+            shard.thread_lock.acquire()
+
+        candidates = [(shard, player_pair) for shard in self.shards
+                      for player_pair in shard.available_players]
+        if len(candidates) < 2:
+            for shard in self.shards:
+                shard.thread_lock.release()
+            raise RuntimeError("No players left in pool.")
+
+        player_shard, player_pair = candidates.pop(self.rng.randint(0, len(candidates) - 1))
+        opp_shard, opp_pair = min(candidates,
+                                  key=lambda cand: abs(cand[1][0].elo - player_pair[0].elo))
+
+        player_shard.make_unavailable(player_pair)
+        opp_shard.make_unavailable(opp_pair)
+        player_pair[0].in_game = True
+        opp_pair[0].in_game = True
+
+        for shard in self.shards:
+            shard.thread_lock.release()
+
+        return (player_pair[0], opp_pair[0])
+
+    def match_round(self, max_games=None):
+        """
+        Pair up the available players in each shard for a round of games.
+
+        Args:
+            max_games (int): Maximum number of games in the round.
+
+        Returns:
+            List of pairs of players to play each other.
+
+        Raises:
+            RuntimeError: If less than two players are available.
+
+        """
+        matches = []
+        for shard in self.shards:
+            games_left = None if max_games is None else max_games - len(matches)
+            if games_left == 0:
+                break
+
+            try:
+                matches.extend(shard.match_round(games_left))
+            except RuntimeError:
+                pass
+
+        if not matches:
+            matches.append(self.match_across_shards())
+
+        for _ in matches:
+            self.count_game()
+        return matches
+
+    def update_index(self, players):
+        """
+        Update each shard's index for players whose ratings have changed.
+
+        Players stay in their shard until the next rebalance.
+
+        Args:
+            players (list): Players whose ratings have changed.
+
+        """
+        by_shard = {}
+        for player in players:
+            shard_ind = self.shard_of.get(player.id)
+            if shard_ind is not None:
+                by_shard.setdefault(shard_ind, []).append(player)
+
+        for shard_ind, shard_players in by_shard.items():
+            self.shards[shard_ind].update_index(shard_players)
+
+    def count_game(self):
+        """Count a matched game, and rebalance the shards if it's time."""
+        self.num_turns = next(self.game_counter)
+        if self.num_turns % self.rebalance_delay == 0:
+            self.rebalance()
+
+    def rebalance(self):
+        """
+        Even out the shard sizes, and move players to their shard.
+
+        Only available players are moved, players in a game are moved
+        when they are added back to the ladder.
+        """
+        # Only one thread needs to rebalance at a time
+        if not self.thread_lock.acquire(blocking=False):
+            return
+
+        keys = sorted(self.shard_key(player) for player in self.get_players())
+        if keys:
+            num_shards = len(self.shards)
+            self.bounds = [keys[len(keys) * ind // num_shards] for ind in range(1, num_shards)]
+
+        for shard_ind, shard in enumerate(self.shards):
+            for player in shard.get_players():
+                new_ind = self.shard_index(player)
+                if new_ind != shard_ind and shard.remove_player(player, available_only=True):
+                    self.shard_of[player.id] = new_ind
+                    self.shards[new_ind].add_player(player)
+
+        self.thread_lock.release()
+
+
+class ShardedView:
+    """
+    Read only view of the same player pool in every shard.
+
+    Attributes:
+        shards (list): The ladders for each shard.
+        pool_name (str): Name of the pool attribute on each shard.
+
+    """
+
+    def __init__(self, shards, pool_name):
+        """
+        Initialize a view of each shard's <pool_name>.
+
+        Args:
+            shards (list): The ladders for each shard.
+            pool_name (str): Name of the pool attribute on each shard.
+
+        """
+        self.shards = shards
+        self.pool_name = pool_name
+
+    def __len__(self):
+        """Return the number of players in every shard's pool."""
+        return sum(len(getattr(shard, self.pool_name)) for shard in self.shards)
+
+    def __iter__(self):
+        """Iterate over every shard's pool, lowest Elo shard first."""
+        for shard in self.shards:
+            shard.thread_lock.acquire()
+            player_pairs = list(getattr(shard, self.pool_name))
+            shard.thread_lock.release()
+            yield from player_pairs
+
+    def __getitem__(self, index):
+        """
+        Get the player pair at <index>, lowest Elo shard first.
+
+        Args:
+            index (int): Position of the pair.
+
+        Returns:
+            The player pair at that position.
+
+        """
+        return list(self)[index]
@@ -1,11 +1,21 @@
 """Methods for matching players together by elo ranking."""
+import random
+
 from ladder.base_ladder import BaseLadder
+from ladder.elo_index import EloIndex
 
 
 class WeightedLadder(BaseLadder):
-    """Ladder that matches players by Elo ranking."""
+    """
+    Ladder that matches players by Elo ranking.
+
+    Attributes:
+        elo_index (EloIndex): Available players indexed by Elo ranking,
+            so matches don't need to sort every available player.
+
+    """
 
-    def __init__(self, game=None, K_in=32, selection_size=1):
+    def __init__(self, game=None, K_in=32, selection_size=1, rating_system=None, rng=random):
         """
         Initialize a ladder for a specific game.
 
@@ -13,9 +23,100 @@ class WeightedLadder(BaseLadder):
             game (battle_engine): Game to be played on this ladder.
             K_in (int): K value to be used for calculating elo changes
                 on this ladder.
+            rating_system (EloRating or Glicko2Rating): How players' ratings
+                are updated. Defaults to Elo with K_in as the K value.
+            rng (Random): Source of random numbers for matching players.
+                Defaults to the random module.
+
+        """
+        super().__init__(game=game, K_in=K_in, selection_size=selection_size,
+                         rating_system=rating_system, rng=rng)
+        self.elo_index = EloIndex()
+
+    def make_available(self, player_pair):
+        """
+        Add a player to the players who can be matched.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        """
+        super().make_available(player_pair)
+        self.elo_index.add(player_pair)
+
+    def make_unavailable(self, player_pair):
+        """
+        Remove a player from the players who can be matched.
+
+        Args:
+            player_pair (tuple): The player & turn they were added pair.
+
+        Raises:
+            ValueError: If the player is not available.
+
+        """
+        super().make_unavailable(player_pair)
+        self.elo_index.remove(player_pair)
+
+    def get_candidate_matches(self, player):
+        """
+        Get the selection of players who are closest to <player>.
+
+        Gives the same players as sorting by match_func, without
+        looking at every available player.
+
+        Args:
+            player (BaseAgent): Player for whom we are matching.
+
+        Returns:
+            List of length self.selection_size of potential opponents.
+
+        """
+        return self.elo_index.best_matches(player, self.num_turns, self.selection_size)
+
+    def pair_round(self, num_games):
+        """
+        Pair players for a round by sorting and sweeping over Elo rankings.
+
+        The players who have waited the longest get to play. They are
+        sorted by Elo, and each pair of neighbours plays each other,
+        with a random player going first.
+
+        Args:
+            num_games (int): Number of games in the round.
+
+        Returns:
+            List of pairs of players to play each other.
+
+        """
+        # Available players are in the order they were added
+        waiting = list(self.available_players)[:2*num_games]
+        waiting.sort(key=lambda player_pair: player_pair[0].elo)
+
+        matches = []
+        for ind in range(0, len(waiting), 2):
+            player_pair, opponent_pair = waiting[ind], waiting[ind + 1]
+            if self.rng.random() < 0.5:
+                player_pair, opponent_pair = opponent_pair, player_pair
+
+            self.make_unavailable(player_pair)
+            self.make_unavailable(opponent_pair)
+            matches.append((player_pair[0], opponent_pair[0]))
+
+        return matches
+
+    def update_index(self, players):
+        """
+        Move players whose ratings have changed in the Elo index.
+
+        Args:
+            players (list): Players whose ratings have changed.
 
         """
-        super().__init__(game=game, K_in=K_in, selection_size=selection_size)
+        self.thread_lock.acquire()
+        for player in players:
+            self.elo_index.update(player)
+        self.thread_lock.release()
 
     def match_func(self, player1, player2_pair):
         """
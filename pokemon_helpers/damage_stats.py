@@ -4,22 +4,40 @@ Class for calculating damage stats for a pokemon.
 Based on https://www.smogon.com/smog/issue4/damage_stats
 """
 
-from math import inf
+from bisect import bisect_right
 from math import ceil
 from math import floor
 
+import numpy as np
+
 from pokemon_helpers.calculate import calculate_modifier
 from pokemon_helpers.calculate import calc_boost_factor
 from config import BRN_STATUS
 
+# Columns of the investment combinations for DamageStatCalc.calculate_ranges
+ATK_MAX_EVS = 0
+ATK_POSITIVE_NATURE = 1
+DEF_MAX_EVS = 2
+DEF_POSITIVE_NATURE = 3
+HP_MAX_EVS = 4
+NUM_INVESTMENT_COLUMNS = 5
+
+# Kinds of statistic in DMG_VAL_TABLE
+DMG_VAL_OTHER = 0
+DMG_VAL_HP = 1
+DMG_VAL_ATK = 2
+
+# Range of base stat values in DMG_VAL_TABLE
+MIN_STAT_VAL = 1
+MAX_STAT_VAL = 255
+
 
 class DamageStatCalc():
     """Class to estimate damage taken/given."""
 
     def __init__(self):
         """Initialize the calculator."""
-        self.damage_stats = {}
-        self.build_stats()
+        self.damage_stats = DAMAGE_STATS
 
     def calculate_range(self, move, attacker, defender, params):
         """
@@ -64,6 +82,75 @@ class DamageStatCalc():
         # Ceiling/Floor so we get a conservative estimate
         return (floor(0.85*max_dmg), ceil(max_dmg))
 
+    def calculate_ranges(self, move, attacker, defender, combinations):
+        """
+        Calculate the damage ranges for many investment combinations at once.
+
+        Args:
+            move (dict): Dictionary with attacking move's data
+            attacker (dict or Pokemon): Stats and boosts for attacking Pokemon.
+                Must support [] lookup.
+            defender (dict or Pokemon): Stats and boosts for defending Pokemon.
+                Must support [] lookup.
+            combinations (array-like): Boolean array with one row per investment
+                combination. Columns are ATK_MAX_EVS, ATK_POSITIVE_NATURE,
+                DEF_MAX_EVS, DEF_POSITIVE_NATURE and HP_MAX_EVS.
+
+        Returns:
+            Array with a (min, max) damage range for each combination,
+                matching calculate_range for the same investment.
+
+        """
+        combinations = np.asarray(combinations, dtype=bool)
+        combinations = combinations.reshape(-1, NUM_INVESTMENT_COLUMNS)
+
+        move_cat = ("atk", "def")
+        if move["category"] != "Physical":
+            move_cat = ("spa", "spd")
+
+        modifier = calculate_modifier(move, attacker, defender)
+        modifier = modifier * boost_modifier(move, attacker, defender)
+
+        # Look up each stat's damage value by its investment
+        d_atk = self.estimate_dmg_options(attacker["baseStats"][move_cat[0]], is_atk=True)
+        d_hp = self.estimate_dmg_options(defender["baseStats"]["hp"], is_hp=True)
+        d_def = self.estimate_dmg_options(defender["baseStats"][move_cat[1]])
+
+        d_atk = d_atk[2*combinations[:, ATK_MAX_EVS] + combinations[:, ATK_POSITIVE_NATURE]]
+        d_hp = d_hp[2*combinations[:, HP_MAX_EVS]]
+        d_def = d_def[2*combinations[:, DEF_MAX_EVS] + combinations[:, DEF_POSITIVE_NATURE]]
+
+        max_dmg = d_atk * modifier * move["base_power"]
+        max_dmg = max_dmg / (d_hp * d_def)
+
+        # Burned attackers have their damage halved
+        if attacker.get("status") == BRN_STATUS and move_cat[0] == "atk":
+            max_dmg = 0.5 * max_dmg
+
+        # Ceiling/Floor so we get a conservative estimate
+        return np.stack((np.floor(0.85*max_dmg), np.ceil(max_dmg)), axis=1)
+
+    def estimate_dmg_options(self, stat_val, **kwargs):
+        """
+        Estimate a damage statistic for every EV and nature investment.
+
+        Args:
+            stat_val (int): The pokemon's base value for this statistic.
+            is_hp (bool): Whether or not we are calculating the HP statisitc.
+            is_atk (bool): Whether or not we are calculating an Attack statistic.
+
+        Returns:
+            Array of the damage statistic with no investment, positive nature,
+                max EVs, and both max EVs and positive nature.
+
+        """
+        stat_kind = dmg_val_kind(kwargs.get("is_hp", False), kwargs.get("is_atk", False))
+
+        if MIN_STAT_VAL <= stat_val <= MAX_STAT_VAL:
+            return DMG_VAL_TABLE[stat_val, stat_kind].ravel()
+
+        return build_dmg_val_options(stat_val, stat_kind)
+
     def estimate_dmg_val(self, stat_val, **kwargs):
         """
         Estimate the value of a damage_statistic.
@@ -85,30 +172,11 @@ class DamageStatCalc():
         max_evs = kwargs.get("max_evs", False)
         positive_nature = kwargs.get("positive_nature", False)
 
-        dmg_val = None
-        if stat_val in self.damage_stats:
-            dmg_val = self.damage_stats[stat_val]
-        else:
-            closest_num, offset = self.find_closest_level(stat_val)
-            dmg_val = self.damage_stats[closest_num]
-            dmg_val += 0.19*offset/2
-
-        if max_evs:
-            dmg_val += 3
-
-        if is_hp:
-            dmg_val = dmg_val + 5
-        elif is_atk:
-            dmg_val = dmg_val * 4
+        if MIN_STAT_VAL <= stat_val <= MAX_STAT_VAL:
+            return DMG_VAL_TABLE.item(stat_val, dmg_val_kind(is_hp, is_atk),
+                                      int(max_evs), int(positive_nature))
 
-        if positive_nature:
-            dmg_val *= 1.1
-
-        # Hacky way to get around the .499999
-        # not rounding properly.
-        dmg_val = round(round(dmg_val, 3), 2)
-
-        return dmg_val
+        return calculate_dmg_val(stat_val, is_hp, is_atk, max_evs, positive_nature)
 
     def find_closest_level(self, number):
         """
@@ -123,70 +191,177 @@ class DamageStatCalc():
             Tuple of closest stat value, and the difference.
 
         """
-        closest_num = None
-        offset = None
-        values = list(self.damage_stats.keys())
-
-        if number < values[0]:
-            return values[0], number - values[0]
-
-        differences = [number - val for val in values]
-
-        smallest_diff_ind = None
-        smallest_diff = inf
-        index = 0
-        for diff in differences:
-            if abs(diff) < smallest_diff:
-                smallest_diff = diff
-                smallest_diff_ind = index
-            index += 1
-
-        closest_num = values[smallest_diff_ind]
-        offset = smallest_diff
-
-        return closest_num, offset
-
-    def build_stats(self):
-        """Build the dictionary for the stat numbers."""
-        self.damage_stats[5] = 2.19
-        self.damage_stats[10] = 2.67
-        self.damage_stats[15] = 3.14
-        self.damage_stats[20] = 3.62
-        self.damage_stats[25] = 4.10
-        self.damage_stats[30] = 4.57
-        self.damage_stats[35] = 5.05
-        self.damage_stats[40] = 5.52
-        self.damage_stats[45] = 6.00
-        self.damage_stats[50] = 6.48
-        self.damage_stats[55] = 6.95
-        self.damage_stats[60] = 7.43
-        self.damage_stats[65] = 7.90
-        self.damage_stats[70] = 8.38
-        self.damage_stats[75] = 8.86
-        self.damage_stats[80] = 9.33
-        self.damage_stats[85] = 9.81
-        self.damage_stats[90] = 10.29
-        self.damage_stats[95] = 10.76
-        self.damage_stats[100] = 11.24
-        self.damage_stats[105] = 11.71
-        self.damage_stats[110] = 12.19
-        self.damage_stats[115] = 12.67
-        self.damage_stats[120] = 13.14
-        self.damage_stats[125] = 13.62
-        self.damage_stats[130] = 14.10
-        self.damage_stats[135] = 14.57
-        self.damage_stats[140] = 15.05
-        self.damage_stats[145] = 15.52
-        self.damage_stats[150] = 16.00
-        self.damage_stats[160] = 16.95
-        self.damage_stats[165] = 17.43
-        self.damage_stats[170] = 17.90
-        self.damage_stats[180] = 18.86
-        self.damage_stats[190] = 19.81
-        self.damage_stats[200] = 20.76
-        self.damage_stats[230] = 23.62
-        self.damage_stats[250] = 25.52
-        self.damage_stats[255] = 260
+        return find_closest_level(number)
+
+
+def build_damage_stats():
+    """Build the dictionary for the stat numbers."""
+    damage_stats = {}
+    damage_stats[5] = 2.19
+    damage_stats[10] = 2.67
+    damage_stats[15] = 3.14
+    damage_stats[20] = 3.62
+    damage_stats[25] = 4.10
+    damage_stats[30] = 4.57
+    damage_stats[35] = 5.05
+    damage_stats[40] = 5.52
+    damage_stats[45] = 6.00
+    damage_stats[50] = 6.48
+    damage_stats[55] = 6.95
+    damage_stats[60] = 7.43
+    damage_stats[65] = 7.90
+    damage_stats[70] = 8.38
+    damage_stats[75] = 8.86
+    damage_stats[80] = 9.33
+    damage_stats[85] = 9.81
+    damage_stats[90] = 10.29
+    damage_stats[95] = 10.76
+    damage_stats[100] = 11.24
+    damage_stats[105] = 11.71
+    damage_stats[110] = 12.19
+    damage_stats[115] = 12.67
+    damage_stats[120] = 13.14
+    damage_stats[125] = 13.62
+    damage_stats[130] = 14.10
+    damage_stats[135] = 14.57
+    damage_stats[140] = 15.05
+    damage_stats[145] = 15.52
+    damage_stats[150] = 16.00
+    damage_stats[160] = 16.95
+    damage_stats[165] = 17.43
+    damage_stats[170] = 17.90
+    damage_stats[180] = 18.86
+    damage_stats[190] = 19.81
+    damage_stats[200] = 20.76
+    damage_stats[230] = 23.62
+    damage_stats[250] = 25.52
+    damage_stats[255] = 260
+    return damage_stats
+
+
+def find_closest_level(number):
+    """
+    Find the closest stat value in DAMAGE_STATS to this number.
+
+    Rounds down on ties, so 215 mathces to 200.
+
+    Args:
+        number (int): The number we are looking for a match for.
+
+    Returns:
+        Tuple of closest stat value, and the difference.
+
+    """
+    if number < STAT_LEVELS[0]:
+        return STAT_LEVELS[0], number - STAT_LEVELS[0]
+
+    # Largest stat value not above the number, unless the next one is closer
+    index = bisect_right(STAT_LEVELS, number) - 1
+    closest_num = STAT_LEVELS[index]
+    if index + 1 < len(STAT_LEVELS) and \
+            STAT_LEVELS[index + 1] - number < number - closest_num:
+        closest_num = STAT_LEVELS[index + 1]
+
+    return closest_num, number - closest_num
+
+
+def dmg_val_kind(is_hp, is_atk):
+    """
+    Get the index in DMG_VAL_TABLE for the type of statistic.
+
+    Args:
+        is_hp (bool): Whether or not this is the HP statisitc.
+        is_atk (bool): Whether or not this is an Attack statistic.
+
+    Returns:
+        One of DMG_VAL_HP, DMG_VAL_ATK or DMG_VAL_OTHER.
+
+    """
+    if is_hp:
+        return DMG_VAL_HP
+    if is_atk:
+        return DMG_VAL_ATK
+    return DMG_VAL_OTHER
+
+
+def calculate_dmg_val(stat_val, is_hp, is_atk, max_evs, positive_nature):
+    """
+    Calculate the value of a damage statistic.
+
+    Args:
+        stat_val (int): The pokemon's base value for this statistic.
+        is_hp (bool): Whether or not we are calculating the HP statisitc.
+        is_atk (bool): Whether or not we are calculating an Attack statistic.
+        max_evs (bool): Whether or not this stat has the maximum number of EVs.
+        positive_nature (bool): Whether or not this stat has a positive nature
+            associated with it.
+
+    Returns:
+        Calculated Damage Statistic for the stat in question.
+
+    """
+    dmg_val = None
+    if stat_val in DAMAGE_STATS:
+        dmg_val = DAMAGE_STATS[stat_val]
+    else:
+        closest_num, offset = find_closest_level(stat_val)
+        dmg_val = DAMAGE_STATS[closest_num]
+        dmg_val += 0.19*offset/2
+
+    if max_evs:
+        dmg_val += 3
+
+    if is_hp:
+        dmg_val = dmg_val + 5
+    elif is_atk:
+        dmg_val = dmg_val * 4
+
+    if positive_nature:
+        dmg_val *= 1.1
+
+    # Hacky way to get around the .499999
+    # not rounding properly.
+    dmg_val = round(round(dmg_val, 3), 2)
+
+    return dmg_val
+
+
+def build_dmg_val_options(stat_val, stat_kind):
+    """
+    Calculate a damage statistic for every EV and nature investment.
+
+    Args:
+        stat_val (int): The pokemon's base value for this statistic.
+        stat_kind (int): One of DMG_VAL_HP, DMG_VAL_ATK or DMG_VAL_OTHER.
+
+    Returns:
+        2x2 array of the damage statistic indexed by [max_evs, positive_nature].
+
+    """
+    is_hp = stat_kind == DMG_VAL_HP
+    is_atk = stat_kind == DMG_VAL_ATK
+
+    return np.array([
+        [calculate_dmg_val(stat_val, is_hp, is_atk, max_evs, positive_nature)
+         for positive_nature in (False, True)]
+        for max_evs in (False, True)
+    ])
+
+
+def build_dmg_val_table():
+    """
+    Build the table of damage statistics.
+
+    Returns:
+        Array indexed by [stat value, stat kind, max_evs, positive_nature].
+
+    """
+    table = np.zeros((MAX_STAT_VAL + 1, 3, 2, 2))
+    for stat_val in range(MIN_STAT_VAL, MAX_STAT_VAL + 1):
+        for stat_kind in (DMG_VAL_OTHER, DMG_VAL_HP, DMG_VAL_ATK):
+            table[stat_val, stat_kind] = build_dmg_val_options(stat_val, stat_kind)
+
+    return table
 
 
 def boost_modifier(move, attacker, defender):
@@ -214,3 +389,9 @@ def boost_modifier(move, attacker, defender):
         def_boost = calc_boost_factor(defender, stats[1])
 
     return atk_boost/def_boost
+
+
+# Damage statistic tables, shared between all DamageStatCalcs
+DAMAGE_STATS = build_damage_stats()
+STAT_LEVELS = sorted(DAMAGE_STATS)
+DMG_VAL_TABLE = build_dmg_val_table()
@@ -1,10 +1,45 @@
 """Classes defining Pokemon moves."""
 
 from math import floor
-from random import uniform
-from random import random
+import random
 
-from config import WEAKNESS_CHART, STATUS_IMMUNITIES
+from config import MOVE_DATA, WEAKNESS_CHART, STATUS_IMMUNITIES
+
+# Move classes, keyed by the move types they inherit from
+MOVE_CLASSES = {}
+
+# Shared Move instances, keyed by move ID
+MOVES = {}
+
+# Cache of type effectiveness multipliers for each attacking type,
+# keyed by the types of the defending pokemon
+TYPE_EFFECTIVENESS = {}
+
+
+def type_effectiveness(def_types):
+    """
+    Get the type effectiveness multipliers against a pokemon.
+
+    Args:
+        def_types (list): Types of the pokemon recieving the attack.
+
+    Returns:
+        Dictionary mapping each attacking type to the damage multiplier
+            from the defender's weaknesses and resistances.
+
+    """
+    key = tuple(def_types)
+    if key not in TYPE_EFFECTIVENESS:
+        multipliers = {}
+        for move_type in WEAKNESS_CHART:
+            multiplier = 1
+            for def_type in def_types:
+                if move_type in WEAKNESS_CHART[def_type]:
+                    multiplier = multiplier * WEAKNESS_CHART[def_type][move_type]
+            multipliers[move_type] = multiplier
+        TYPE_EFFECTIVENESS[key] = multipliers
+
+    return TYPE_EFFECTIVENESS[key]
 
 
 class BaseMove():
@@ -13,6 +48,9 @@ class BaseMove():
     # pylint: disable=R0902
     # I need all these attributes.
 
+    # Shared moves from get_move cannot be modified
+    frozen = False
+
     def __init__(self, **kwargs):
         """
         Initialize a move.
@@ -89,7 +127,7 @@ class BaseMove():
         self.target = kwargs.get("target")
         self.priority = kwargs.get("priority")
 
-    def calculate_damage(self, attacker, defender, testing=False):
+    def calculate_damage(self, attacker, defender, testing=False, rng=random):
         """
         Calculate damage of a move.
 
@@ -97,6 +135,8 @@ class BaseMove():
             move (dict): Information on the move being used.
             attacker (Pokemon): The pokemon using the attack.
             defender (Pokemon): The pokemon that is recieving the attack.
+            rng (Random): Source of random numbers for crits and the
+                damage roll. Defaults to the random module.
 
         Returns:
             The damage dealt by this move, as well as a flag whether or not
@@ -110,7 +150,7 @@ class BaseMove():
             return damage, critical_hit
 
         # Calculate actual damage
-        damage = floor(2*attacker["level"]/5 + 2)
+        damage = floor(2*attacker.level/5 + 2)
         damage = damage * self.base_power
         if self.category == "Physical":
             damage = floor(damage * attacker.effective_stat("atk")) / \
@@ -126,12 +166,12 @@ class BaseMove():
         # Only apply crits & random range when not testing
         if not testing:
             # Critical Hit
-            if random() < 0.0625:
+            if rng.random() < 0.0625:
                 critical_hit = True
                 modifier = modifier * 1.5
 
             # Random Damage range
-            modifier = modifier * uniform(0.85, 1.00)
+            modifier = modifier * rng.uniform(0.85, 1.00)
 
         damage = floor(damage*modifier)
 
@@ -155,23 +195,23 @@ class BaseMove():
         modifier = 1
 
         # STAB Modifier
-        if self.type in attacker["types"]:
+        if self.type in attacker.types:
             modifier = modifier * 1.5
 
         # Weakness modifier
-        for def_type in defender["types"]:
-            if self.type in WEAKNESS_CHART[def_type]:
-                modifier = modifier * WEAKNESS_CHART[def_type][self.type]
+        modifier = modifier * defender.type_effectiveness.get(self.type, 1)
 
         return modifier
 
-    def apply_secondary_effect(self, attacker, defender):
+    def apply_secondary_effect(self, attacker, defender, rng=random):
         """
         Apply secondary effects of this move.
 
         Args:
             attacker (Pokemon): The pokemon using the attack.
             defender (Pokemon): The pokemon that is recieving the attack.
+            rng (Random): Source of random numbers for the effect's chance.
+                Defaults to the random module.
 
         """
 
@@ -205,13 +245,19 @@ class BaseMove():
 
         """
 
-    def check_hit(self):
-        """Check if the move hits."""
+    def check_hit(self, rng=random):
+        """
+        Check if the move hits.
+
+        Args:
+            rng (Random): Source of random numbers. Defaults to the random module.
+
+        """
         move_acc = self.accuracy
         if isinstance(move_acc, bool):
             return move_acc
 
-        return 100*random() < move_acc
+        return 100*rng.random() < move_acc
 
     def get(self, key, default=None):
         """
@@ -264,11 +310,28 @@ class BaseMove():
             key = "base_stats"
         return self.__getattribute__(key)
 
+    def __setattr__(self, key, value):
+        """Prevent modifying moves shared through get_move."""
+        if self.frozen:
+            raise AttributeError("Cannot modify shared move: {}".format(self.id))
+        super().__setattr__(key, value)
+
+    def __reduce_ex__(self, protocol):
+        """
+        Copy and pickle shared moves by their ID.
+
+        Copies of a shared move are the shared move itself, and
+        unpickling one returns the shared move from this process.
+        """
+        if self.frozen:
+            return (get_move, (self.id,))
+        return super().__reduce_ex__(protocol)
+
 
 class OHKOMove(BaseMove):
     """Class for OHKO moves."""
 
-    def calculate_damage(self, attacker, defender, testing=False):
+    def calculate_damage(self, attacker, defender, testing=False, rng=random):
         """Damage for an OHKO move is the target's HP."""
         return defender.current_hp, False
 
@@ -276,14 +339,14 @@ class OHKOMove(BaseMove):
 class SecondaryEffectMove(BaseMove):
     """Class for moves with secondary effects."""
 
-    def apply_secondary_effect(self, attacker, defender):
+    def apply_secondary_effect(self, attacker, defender, rng=random):
         """Apply secondary effects for this move."""
         # Check for type immunity (will be told by damage modifier)
         if self.calculate_modifier(attacker, defender) == 0:
             return
 
         secondary_effects = self.secondary
-        if uniform(0, 100) < secondary_effects["chance"]:
+        if rng.uniform(0, 100) < secondary_effects["chance"]:
             # Apply secondary effect to player
             if "self" in secondary_effects:
                 secondary_effect_logic(attacker, secondary_effects["self"])
@@ -368,15 +431,20 @@ def secondary_effect_logic(target_poke, secondary_effects):
             target_poke.status = secondary_effects["status"]
 
 
-def generate_move(move_config):
+def move_class(move_config):
     """
-    Dynamically generate a Move's class given its config.
+    Get the class for a Move given its config.
+
+    Classes are cached by the combination of move types they inherit
+    from, so each combination is only defined once.
 
     Args:
         move_config (dict): JSON config for move from moves.json
 
+    Returns:
+        Class inheriting from the move types for this move.
+
     """
-    output = None
     classes = [BaseMove]
 
     if move_config.get("volatileStatus") or move_config.get("_self", {}).get("volatileStatus"):
@@ -398,9 +466,47 @@ def generate_move(move_config):
     if len(classes) > 1:
         classes.remove(BaseMove)
 
-    class NewClass(*classes):
-        """Dynamically define a class inheriting from chosen classes above."""
+    classes = tuple(classes)
+    if classes not in MOVE_CLASSES:
+        class NewClass(*classes):
+            """Dynamically define a class inheriting from chosen classes above."""
+
+        MOVE_CLASSES[classes] = NewClass
+
+    return MOVE_CLASSES[classes]
+
+
+def generate_move(move_config):
+    """
+    Dynamically generate a Move's class given its config.
+
+    Args:
+        move_config (dict): JSON config for move from moves.json
+
+    """
+    return move_class(move_config)(**move_config)
+
+
+def get_move(move_id):
+    """
+    Get the shared instance of a move.
+
+    Moves are built once from config.MOVE_DATA and shared between all
+    pokemon and agents, so they cannot be modified.
+
+    Args:
+        move_id (str): ID of the move in config.MOVE_DATA
+
+    Returns:
+        The Move for this ID.
+
+    """
+    if move_id not in MOVES:
+        if move_id not in MOVE_DATA:
+            raise AttributeError("Invalid move chosen: {}.".format(move_id))
 
-    output = NewClass(**move_config)
+        move = generate_move(MOVE_DATA[move_id])
+        object.__setattr__(move, "frozen", True)
+        MOVES[move_id] = move
 
-    return output
+    return MOVES[move_id]
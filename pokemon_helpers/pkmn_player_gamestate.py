@@ -1,11 +1,16 @@
 """Class defining an Engine's Game State."""
 
+import numpy as np
+
 from config import POKEMON_DATA
 
 from pokemon_helpers.pokemon import Pokemon
 from pokemon_helpers.calculate import calculate_spe_range
 from pokemon_helpers.calculate import generate_all_ev_combinations
-from pokemon_helpers.damage_stats import DamageStatCalc
+from pokemon_helpers.damage_stats import (DamageStatCalc, ATK_MAX_EVS,
+                                          ATK_POSITIVE_NATURE, DEF_MAX_EVS,
+                                          DEF_POSITIVE_NATURE, HP_MAX_EVS,
+                                          NUM_INVESTMENT_COLUMNS)
 
 
 class PokemonPlayerGameState:
@@ -176,16 +181,6 @@ class PokemonPlayerGameState:
         my_poke = POKEMON_DATA[turn_info["def_poke"]]
         opp_poke = POKEMON_DATA[turn_info["atk_poke"]]
 
-        params = {}
-        params["atk"] = {}
-        if self.gamestate["active"].evs.get("atk", 0) > 124:
-            params["atk"]["max_evs"] = True
-        if self.gamestate["active"].increase_stat == "attack":
-            params["atk"]["positive_nature"] = True
-
-        params["def"] = {}
-        params["hp"] = {}
-
         combinations = []
         combinations.append((False, False, False))
         combinations.append((False, False, True))
@@ -195,16 +190,13 @@ class PokemonPlayerGameState:
         combinations.append((False, True, True))
         combinations.append((True, True, False))
         combinations.append((True, True, True))
-        num_combinations = len(combinations)
 
-        results = []
-        for comb_ind in range(num_combinations):
-            comb = combinations[comb_ind]
-            params["def"]["max_evs"] = comb[0]
-            params["def"]["positive_nature"] = comb[1]
-            params["hp"]["max_evs"] = comb[2]
+        params = np.zeros((len(combinations), NUM_INVESTMENT_COLUMNS), dtype=bool)
+        params[:, ATK_MAX_EVS] = self.gamestate["active"].evs.get("atk", 0) > 124
+        params[:, ATK_POSITIVE_NATURE] = self.gamestate["active"].increase_stat == "attack"
+        params[:, [DEF_MAX_EVS, DEF_POSITIVE_NATURE, HP_MAX_EVS]] = combinations
 
-            results.append(self.dmg_stat_calc.calculate_range(move, opp_poke, my_poke, params))
+        results = self.dmg_stat_calc.calculate_ranges(move, opp_poke, my_poke, params)
 
         return results, combinations
 
@@ -223,33 +215,19 @@ class PokemonPlayerGameState:
         my_poke = POKEMON_DATA[turn_info["def_poke"]]
         opp_poke = POKEMON_DATA[turn_info["atk_poke"]]
 
-        params = {}
-        params["atk"] = {}
-
-        params["def"] = {}
-        if self.gamestate["active"].evs.get("def", 0) > 124:
-            params["def"]["max_evs"] = True
-        if self.gamestate["active"].increase_stat == "defense":
-            params["def"]["positive_nature"] = True
-
-        params["hp"] = {}
-        if self.gamestate["active"].evs.get("hp", 0) > 124:
-            params["hp"]["max_evs"] = True
-
         combinations = []
         combinations.append((False, False))
         combinations.append((True, False))
         combinations.append((False, True))
         combinations.append((True, True))
 
-        results = []
-        for comb_ind in range(4):
-            comb = combinations[comb_ind]
-            params["atk"]["max_evs"] = comb[0]
-            params["atk"]["positive_nature"] = comb[1]
+        params = np.zeros((len(combinations), NUM_INVESTMENT_COLUMNS), dtype=bool)
+        params[:, [ATK_MAX_EVS, ATK_POSITIVE_NATURE]] = combinations
+        params[:, DEF_MAX_EVS] = self.gamestate["active"].evs.get("def", 0) > 124
+        params[:, DEF_POSITIVE_NATURE] = self.gamestate["active"].increase_stat == "defense"
+        params[:, HP_MAX_EVS] = self.gamestate["active"].evs.get("hp", 0) > 124
 
-            results.append(self.dmg_stat_calc.calculate_range(
-                move, opp_poke, my_poke, params))
+        results = self.dmg_stat_calc.calculate_ranges(move, opp_poke, my_poke, params)
 
         return results, combinations
 
@@ -1,5 +1,6 @@
 """Class for a pokemon used by a PokemonAgent."""
 
+from copy import copy
 from math import floor
 
 from config import MOVE_DATA
@@ -9,15 +10,56 @@ from config import (PAR_STATUS, BRN_STATUS, TOX_STATUS)
 
 from pokemon_helpers.calculate import calculate_hp_stat
 from pokemon_helpers.calculate import calculate_stat
-from pokemon_helpers.moves import generate_move
+from pokemon_helpers.moves import get_move, type_effectiveness
 from pokemon_helpers.calculate import calculate_status_damage
 
 
+# Positions of each statistic in Pokemon.stats
+ATK = 0
+DEF = 1
+SPA = 2
+SPD = 3
+SPE = 4
+
+# Boost codes and attribute names mapped to positions in Pokemon.stats
+STAT_INDEX = {
+    "atk": ATK,
+    "def": DEF,
+    "spa": SPA,
+    "spd": SPD,
+    "spe": SPE
+}
+STAT_ATTRIBUTES = {
+    "attack": ATK,
+    "defense": DEF,
+    "sp_attack": SPA,
+    "sp_defense": SPD,
+    "speed": SPE
+}
+
+# Stat multiplier for each boost stage from -6 to +6;
+# use BOOST_MULTIPLIERS[boost + 6]
+BOOST_MULTIPLIERS = tuple(
+    (2 + boost) / 2 if boost >= 0 else 2 / (2 - boost)
+    for boost in range(-6, 7)
+)
+
+# Multipliers for each stat given a pokemon's status
+NO_STATUS_MODIFIERS = (1, 1, 1, 1, 1)
+STATUS_MODIFIERS = {
+    BRN_STATUS: (0.5, 1, 1, 1, 1),
+    PAR_STATUS: (1, 1, 1, 1, 0.5)
+}
+
+
 class Pokemon:
     """The pokemon class."""
 
-    # pylint: disable=too-many-instance-attributes
-    # Packaging values as a dictionary is kind of pointless
+    __slots__ = ("name", "level", "moves", "types", "type_effectiveness",
+                 "base_stats", "dex_num", "_status", "status_modifiers",
+                 "status_turns", "status_counter", "evs", "increase_stat",
+                 "max_hp", "current_hp", "stats", "boosts", "volatile_status")
+
     def __init__(self, **kwargs):
         """
         Initialize a pokemon.
@@ -72,18 +114,76 @@ class Pokemon:
         self.level = level
         self.moves = []
         for move in moves:
-            self.moves.append(generate_move(MOVE_DATA[move]))
+            self.moves.append(get_move(move))
         self.types = POKEMON_DATA[self.name]["types"]
+        self.type_effectiveness = type_effectiveness(self.types)
         self.base_stats = POKEMON_DATA[self.name]["baseStats"]
         self.dex_num = POKEMON_DATA[self.name]["num"]
         self.status = None
         self.status_turns = 0
+        self.status_counter = 0
         self.evs = evs
         self.increase_stat = None
         self.set_stats(nature, evs)
         self.boosts = default_boosts()
         self.volatile_status = {}
 
+    @property
+    def status(self):
+        """Non-volatile status of this pokemon, None if it has no status."""
+        return self._status
+
+    @status.setter
+    def status(self, new_status):
+        """Set the status, and cache the stat modifiers that come with it."""
+        self._status = new_status
+        self.status_modifiers = STATUS_MODIFIERS.get(new_status, NO_STATUS_MODIFIERS)
+
+    @property
+    def attack(self):
+        """Attack statistic."""
+        return self.stats[ATK]
+
+    @attack.setter
+    def attack(self, value):
+        self.stats[ATK] = value
+
+    @property
+    def defense(self):
+        """Defense statistic."""
+        return self.stats[DEF]
+
+    @defense.setter
+    def defense(self, value):
+        self.stats[DEF] = value
+
+    @property
+    def sp_attack(self):
+        """Special Attack statistic."""
+        return self.stats[SPA]
+
+    @sp_attack.setter
+    def sp_attack(self, value):
+        self.stats[SPA] = value
+
+    @property
+    def sp_defense(self):
+        """Special Defense statistic."""
+        return self.stats[SPD]
+
+    @sp_defense.setter
+    def sp_defense(self, value):
+        self.stats[SPD] = value
+
+    @property
+    def speed(self):
+        """Speed statistic."""
+        return self.stats[SPE]
+
+    @speed.setter
+    def speed(self, value):
+        self.stats[SPE] = value
+
     def set_stats(self, nature, evs):
         """
         Calculate stats for the pokemon.
@@ -99,26 +199,20 @@ class Pokemon:
         self.max_hp = calculate_hp_stat(
             base_stats["hp"], evs.get("hp", 0), self.level)
         self.current_hp = self.max_hp
-        self.attack = calculate_stat(
-            base_stats["atk"], evs.get("atk", 0), self.level)
-        self.defense = calculate_stat(
-            base_stats["def"], evs.get("def", 0), self.level)
-        self.sp_attack = calculate_stat(
-            base_stats["spa"], evs.get("spa", 0), self.level)
-        self.sp_defense = calculate_stat(
-            base_stats["spd"], evs.get("spd", 0), self.level)
-        self.speed = calculate_stat(
-            base_stats["spe"], evs.get("spe", 0), self.level)
+        self.stats = [
+            calculate_stat(base_stats[stat], evs.get(stat, 0), self.level)
+            for stat in ("atk", "def", "spa", "spd", "spe")
+        ]
 
         # Update with nature modifiers
         if NATURES[nature]["increase"] is not None:
             increase_stat = NATURES[nature]["increase"]
             decrease_stat = NATURES[nature]["decrease"]
-            mod_inc = floor(self.__getattribute__(increase_stat)*1.1)
-            mod_dec = floor(self.__getattribute__(decrease_stat)*0.9)
+            increase_ind = STAT_ATTRIBUTES[increase_stat]
+            decrease_ind = STAT_ATTRIBUTES[decrease_stat]
             self.increase_stat = increase_stat
-            self.__setattr__(increase_stat, mod_inc)
-            self.__setattr__(decrease_stat, mod_dec)
+            self.stats[increase_ind] = floor(self.stats[increase_ind]*1.1)
+            self.stats[decrease_ind] = floor(self.stats[decrease_ind]*0.9)
 
     def effective_stat(self, stat):
         """
@@ -131,37 +225,10 @@ class Pokemon:
             Pokemon's stat factoring in boosts and status effects.
 
         """
-        status_modifier = 1
-        if stat == "atk":
-            stat_name = "attack"
-            if self.status == BRN_STATUS:
-                status_modifier = 0.5
-        elif stat == "def":
-            stat_name = "defense"
-        elif stat == "spa":
-            stat_name = "sp_attack"
-        elif stat == "spd":
-            stat_name = "sp_defense"
-        elif stat == "spe":
-            stat_name = "speed"
-            if self.status == PAR_STATUS:
-                status_modifier = 0.5
-
-        # Apply boosts
-        val = self[stat_name]
-        boost = self.boosts[stat]
-        if boost > 0:
-            val = val*(2+boost)/2
-        elif boost < 0:
-            val = val*(2/(2-boost))
-
-        # Apply status modifier
-        val = val * status_modifier
-
-        # Round down
-        val = floor(val)
-
-        return val
+        stat_ind = STAT_INDEX[stat]
+        return floor(self.stats[stat_ind] *
+                     BOOST_MULTIPLIERS[self.boosts[stat] + 6] *
+                     self.status_modifiers[stat_ind])
 
     def apply_status_damage(self):
         """Apply damage for status conditions when appropriate."""
@@ -188,10 +255,9 @@ class Pokemon:
                 specified in default.
 
         """
-        if self.__contains__(key):
-            return self.__getitem__(key)
-
-        return default
+        if key == "baseStats":
+            key = "base_stats"
+        return getattr(self, key, default)
 
     def __getitem__(self, key):
         """
@@ -206,7 +272,7 @@ class Pokemon:
         """
         if key == "baseStats":
             key = "base_stats"
-        return self.__getattribute__(key)
+        return getattr(self, key)
 
     def __contains__(self, key):
         """
@@ -219,16 +285,36 @@ class Pokemon:
             True if this object has 'key' as an attribute.
 
         """
-        try:
-            self.__getattribute__(key)
-        except AttributeError:
-            return False
+        return hasattr(self, key)
 
-        return True
+    def battle_copy(self):
+        """
+        Copy this pokemon for use in a single battle.
+
+        Species, move and stat data is never changed during a battle, so
+        it is shared with this pokemon. Only the per-battle fields (HP,
+        status, boosts and volatile status) get their own copies.
+
+        Returns:
+            Pokemon that can be modified without affecting this one.
+
+        """
+        battle_poke = copy(self)
+        battle_poke.boosts = dict(self.boosts)
+        battle_poke.volatile_status = {
+            key: copy(value) for key, value in self.volatile_status.items()
+        }
+        return battle_poke
 
     def to_json(self):
         """Return JSON serializable version of self."""
-        return self.__dict__
+        output = {}
+        for attr in ("name", "level", "moves", "types", "base_stats", "dex_num",
+                     "status", "status_turns", "status_counter", "evs", "increase_stat", "max_hp",
+                     "current_hp", "attack", "defense", "sp_attack", "sp_defense",
+                     "speed", "boosts", "volatile_status"):
+            output[attr] = getattr(self, attr)
+        return output
 
     def set_boost(self, stat, stages):
         """
@@ -0,0 +1,83 @@
+"""Least recently used cache for results calculated while planning turns."""
+
+from collections import OrderedDict
+
+
+class TurnCache():
+    """
+    Cache of turn calculation results with LRU eviction.
+
+    Keys should be small tuples made of the parts of the gamestate that
+    the cached calculation depends on.
+
+    Attributes:
+        max_size (int): Maximum number of results to store.
+        hits (int): Number of lookups that found a result.
+        misses (int): Number of lookups that did not find a result.
+
+    """
+
+    def __init__(self, max_size=4096):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of results to store.
+
+        """
+        if max_size < 1:
+            raise AttributeError("Cache must be able to hold at least one result.")
+
+        self.max_size = max_size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, calculate):
+        """
+        Get the result for a key, calculating it if not already stored.
+
+        Args:
+            key (tuple): Hashable description of the calculation.
+            calculate (function): Function with no arguments that calculates
+                the result for this key.
+
+        Returns:
+            The result for this key.
+
+        """
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+
+        self.misses += 1
+        result = calculate()
+        self.results[key] = result
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
+
+        return result
+
+    def hit_rate(self):
+        """
+        Proportion of lookups that found a stored result.
+
+        Returns:
+            Hits divided by total lookups, or None if there were no lookups.
+
+        """
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return None
+        return self.hits / lookups
+
+    def clear(self):
+        """Remove all stored results and reset the hit/miss counts."""
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Return the number of results stored."""
+        return len(self.results)
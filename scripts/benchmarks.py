@@ -0,0 +1,782 @@
+"""Microbenchmarks for performance sensitive code."""
+import sys
+import os
+# Hack to add parent directory to path
+# This is duplicated code but I can't avoid it
+for loc in sys.path:
+    if os.path.abspath(__file__).startswith(loc):
+        parent_dir = "/".join(loc.split("/")[:-1])
+        sys.path.append(parent_dir)
+        break
+
+# pylint: disable=C0413
+# Have to manipulate syspath
+from contextlib import redirect_stdout  # noqa
+from functools import partial  # noqa
+from io import StringIO  # noqa
+from random import randint  # noqa
+from shutil import rmtree  # noqa
+from threading import Thread  # noqa
+from time import time  # noqa
+from timeit import timeit  # noqa
+
+import click  # noqa
+import numpy as np  # noqa
+
+from agent.base_agent import BaseAgent  # noqa
+from agent.basic_planning_pokemon_agent import BasicPlanningPokemonAgent  # noqa
+from agent.basic_planning_pokemon_agent import def_param_combinations  # noqa
+from agent.basic_pokemon_agent import PokemonAgent  # noqa
+from agent.mcts_pokemon_agent import MCTSPokemonAgent  # noqa
+from agent.adjusting_rps_agent import AdjustingRPSAgent  # noqa
+from agent.counter_rps_agent import CounterRPSAgent  # noqa
+from agent.rps_agent import RPSAgent  # noqa
+from battle_engine.batch_pokemon_engine import BatchPokemonEngine  # noqa
+from battle_engine.batch_rps_engine import BatchRPSEngine  # noqa
+from battle_engine.coinflip import CoinFlipEngine  # noqa
+from battle_engine.pokemon_engine import PokemonEngine  # noqa
+from battle_engine.pokemon_engine import anonymize_gamestate_helper  # noqa
+from battle_engine.rockpaperscissors import RPSEngine  # noqa
+from battle_engine.rollout_engine import RolloutEngine  # noqa
+from config import LOG_DIR, POKEMON_DATA  # noqa
+from file_manager.columnar_log import ColumnarLogWriter  # noqa
+from file_manager.log_reader import LogReader  # noqa
+from file_manager.log_writer import LogWriter  # noqa
+from ladder.array_ladder import ArrayLadder  # noqa
+from ladder.base_ladder import BaseLadder  # noqa
+from ladder.ratings import EloRating, elo_batch, glicko2_batch  # noqa
+from ladder.ratings import GLICKO2_DEVIATION, GLICKO2_VOLATILITY  # noqa
+from ladder.sharded_ladder import ShardedLadder  # noqa
+from ladder.weighted_ladder import WeightedLadder  # noqa
+from pokemon_helpers.calculate import generate_all_ev_combinations  # noqa
+from pokemon_helpers.damage_stats import DamageStatCalc  # noqa
+from pokemon_helpers.moves import get_move  # noqa
+from pokemon_helpers.pokemon import Pokemon  # noqa
+from stats.calc import MatchupCounts, calculate_matchups, stream_matchups  # noqa
+
+
+def bench_calculate_damage(number):
+    """
+    Time BaseMove.calculate_damage.
+
+    Args:
+        number (int): Number of times to run the function.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    exploud = Pokemon(name="exploud", moves=["return"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowball"])
+    move = exploud.moves[0]
+
+    return timeit(lambda: move.calculate_damage(exploud, floatzel), number=number)
+
+
+def bench_turn_order(number):
+    """
+    Time PokemonEngine.turn_order.
+
+    Args:
+        number (int): Number of times to run the function.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    exploud = Pokemon(name="exploud", moves=["return"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowball"])
+    engine = PokemonEngine()
+    engine.initialize_battle(PokemonAgent([exploud]), PokemonAgent([floatzel]))
+    p1_move = engine.game_state["player1"]["active"].moves[0]
+    p2_move = engine.game_state["player2"]["active"].moves[0]
+
+    return timeit(lambda: engine.turn_order(p1_move, p2_move), number=number)
+
+
+def bench_damage_ranges(number):
+    """
+    Time DamageStatCalc.calculate_ranges for every investment of an attacker.
+
+    Args:
+        number (int): Number of times to run the function.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    dsc = DamageStatCalc()
+    exploud = Pokemon(name="exploud", moves=["return"])
+    move = get_move("shadowball")
+    attacker = POKEMON_DATA["floatzel"]
+    combinations = def_param_combinations(exploud, generate_all_ev_combinations(), move)
+
+    return timeit(lambda: dsc.calculate_ranges(move, attacker, exploud, combinations),
+                  number=number)
+
+
+def bench_rollout_turns(number):
+    """
+    Time turns simulated by RolloutEngine.rollout.
+
+    Args:
+        number (int): Number of turns to simulate.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    my_team = [Pokemon(name=name, moves=["tackle", "superpower", "shadowball", "icebeam"])
+               for name in ["exploud", "regirock", "gengar"]]
+    opp_team = [Pokemon(name=name, moves=["tackle", "superpower", "shadowball", "icebeam"])
+                for name in ["spinda", "floatzel", "ivysaur"]]
+    engine = RolloutEngine(my_team, opp_team)
+
+    start_time = time()
+    while engine.turns < number:
+        engine.reset()
+        engine.rollout(number - engine.turns)
+    return time() - start_time
+
+
+def init_decision_agent(agent_class, **kwargs):
+    """
+    Set up an agent to choose its first move of a battle.
+
+    Args:
+        agent_class (class): Class of agent to set up.
+
+    Returns:
+        Agent with its gamestate initialized.
+
+    """
+    spinda = Pokemon(name="spinda", moves=["tackle", "frustration"])
+    magikarp = Pokemon(name="magikarp", moves=["tackle"])
+    exploud = Pokemon(name="exploud", moves=["tackle"])
+
+    gamestate = {"team": [exploud, magikarp], "active": spinda}
+    opp_gamestate = anonymize_gamestate_helper(gamestate)
+
+    agent = agent_class(tier="pu", team=[spinda], **kwargs)
+    agent.update_gamestate(gamestate, opp_gamestate)
+    agent.init_opp_gamestate(opp_gamestate["team"], opp_gamestate["active"])
+    return agent
+
+
+def bench_planning_decision(number):
+    """
+    Time BasicPlanningPokemonAgent.make_move.
+
+    Decisions are much slower than the other benchmarks, so only one
+    in every 1000 calls is run, and the time is scaled up to match.
+
+    Args:
+        number (int): Number of times to run the function.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    agent = init_decision_agent(BasicPlanningPokemonAgent)
+
+    num_calls = max(1, number // 1000)
+    return timeit(agent.make_move, number=num_calls) * number / num_calls
+
+
+def bench_mcts_decision(number):
+    """
+    Time MCTSPokemonAgent.make_move with 500 rollouts, without reusing trees.
+
+    Decisions are much slower than the other benchmarks, so only one
+    in every 1000 calls is run, and the time is scaled up to match.
+
+    Args:
+        number (int): Number of times to run the function.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    agent = init_decision_agent(MCTSPokemonAgent, rollouts=500, reuse_tree=False)
+
+    num_calls = max(1, number // 1000)
+    return timeit(agent.make_move, number=num_calls) * number / num_calls
+
+
+def init_random_players():
+    """
+    Set up two random players for full games.
+
+    Returns:
+        Tuple of the two PokemonAgents.
+
+    """
+    player1 = PokemonAgent([Pokemon(name="spinda", moves=["tackle", "frustration"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+    player2 = PokemonAgent([Pokemon(name="floatzel", moves=["aquajet", "tackle"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+    return player1, player2
+
+
+def bench_engine_games(number):
+    """
+    Time PokemonEngine.run between random agents.
+
+    Games are much slower than the other benchmarks, so only one
+    in every 100 calls is run, and the time is scaled up to match.
+
+    Args:
+        number (int): Number of games to run.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    player1, player2 = init_random_players()
+    engine = PokemonEngine()
+
+    num_calls = max(1, number // 100)
+    return timeit(lambda: engine.run(player1, player2), number=num_calls) * number / num_calls
+
+
+def bench_batch_games(number):
+    """
+    Time games between random agents run by BatchPokemonEngine.
+
+    Args:
+        number (int): Number of games to run.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    player1, player2 = init_random_players()
+    engine = BatchPokemonEngine()
+
+    return timeit(lambda: engine.run(player1, player2, number), number=1)
+
+
+def bench_ladder_match(number, pool_size, indexed=True):
+    """
+    Time WeightedLadder.match_players with <pool_size> available players.
+
+    Matches are much slower than the other benchmarks, so only one
+    in every 1000 calls is run, and the time is scaled up to match.
+
+    Args:
+        number (int): Number of times to run the function.
+        pool_size (int): Number of players on the ladder.
+        indexed (bool): Whether to use the ladder's Elo index, or
+            sort every available player like BaseLadder.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    ladder = WeightedLadder(selection_size=5)
+    if not indexed:
+        ladder.get_candidate_matches = partial(BaseLadder.get_candidate_matches, ladder)
+
+    for ind in range(pool_size):
+        player = BaseAgent()
+        player.elo = randint(1000, 1500)
+        ladder.num_turns = ind // 10
+        ladder.add_player(player)
+
+    total_time = 0
+    num_calls = max(1, number // 1000)
+    for _ in range(num_calls):
+        start_time = time()
+        players = ladder.match_players()
+        total_time += time() - start_time
+
+        for player in players:
+            ladder.add_player(player)
+
+    return total_time * number / num_calls
+
+
+def bench_ladder_add(number, pool_size):
+    """
+    Time BaseLadder.add_player re-adding players to a pool of <pool_size>.
+
+    Args:
+        number (int): Number of times to run the function.
+        pool_size (int): Number of players on the ladder.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    ladder = BaseLadder()
+    players = [BaseAgent() for _ in range(pool_size)]
+    for player in players:
+        ladder.add_player(player)
+
+    return timeit(lambda: ladder.add_player(players[randint(0, pool_size - 1)]),
+                  number=number)
+
+
+def bench_ladder_threads(number, ladder_class, num_threads):
+    """
+    Time BaseLadder.run_game for coin flips from several threads at once.
+
+    Args:
+        number (int): Total number of games to run.
+        ladder_class (class): Ladder class to run the games on.
+        num_threads (int): Number of threads running games.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    ladder = ladder_class(game=CoinFlipEngine())
+    for _ in range(1000):
+        ladder.add_player(BaseAgent())
+
+    def run_games():
+        """Run this thread's share of the games."""
+        for _ in range(number // num_threads):
+            ladder.run_game()
+
+    threads = [Thread(target=run_games) for _ in range(num_threads)]
+    start_time = time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time() - start_time
+
+
+def bench_ladder_round(number, game):
+    """
+    Time WeightedLadder.run_round for a round of <number> games.
+
+    Args:
+        number (int): Number of games in the round.
+        game (str): Game to play, either cf or rps.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    if game == "cf":
+        ladder = WeightedLadder(game=CoinFlipEngine())
+        players = [BaseAgent() for _ in range(2 * number)]
+    else:
+        ladder = WeightedLadder(game=RPSEngine(num_games=3))
+        players = [RPSAgent() for _ in range(2 * number)]
+
+    for player in players:
+        ladder.add_player(player)
+    return timeit(ladder.run_round, number=1)
+
+
+def bench_rps_match(number, simulate=False):
+    """
+    Time RPSEngine.run for best of 3 matches between fixed strategies.
+
+    Args:
+        number (int): Number of matches to run.
+        simulate (bool): Whether to simulate every move instead.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    engine = RPSEngine(num_games=3)
+    player1 = RPSAgent(strategy_in=[0.5, 0.3, 0.2])
+    player2 = RPSAgent()
+
+    run_match = engine.simulate if simulate else engine.run
+    return timeit(lambda: run_match(player1, player2), number=number)
+
+
+def bench_adaptive_match(number, batch=False):
+    """
+    Time best of 3 RPS matches between a CounterRPSAgent and an AdjustingRPSAgent.
+
+    Args:
+        number (int): Number of matches to run.
+        batch (bool): Whether to run every match at once with BatchRPSEngine.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    player_pair = (CounterRPSAgent(), AdjustingRPSAgent(weight=2))
+    if batch:
+        engine = BatchRPSEngine(num_games=3)
+        return timeit(lambda: engine.run_matches([player_pair] * number), number=1)
+
+    engine = RPSEngine(num_games=3)
+    return timeit(lambda: engine.run(*player_pair), number=number)
+
+
+def bench_array_round(number, game):
+    """
+    Time ArrayLadder.run_round for a round of <number> games.
+
+    Args:
+        number (int): Number of games in the round.
+        game (str): Game to play, either cf or rps.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    if game == "cf":
+        ladder = ArrayLadder(game=CoinFlipEngine())
+    else:
+        ladder = ArrayLadder(game=RPSEngine(num_games=3))
+
+    ladder.add_players(2 * number)
+    return timeit(ladder.run_round, number=1)
+
+
+def bench_elo_updates(number):
+    """
+    Time EloRating.add_results one game at a time.
+
+    Args:
+        number (int): Number of games to update ratings for.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    rating = EloRating()
+    players = [BaseAgent() for _ in range(1000)]
+    results = [(players[randint(0, 999)], players[randint(0, 999)]) for _ in range(1000)]
+
+    num_calls = max(1, number // 1000)
+    return timeit(lambda: [rating.add_results([result]) for result in results],
+                  number=num_calls) * number / (num_calls * 1000)
+
+
+def init_rating_batch(number, num_players=100000):
+    """
+    Set up random games between players with random ratings.
+
+    Args:
+        number (int): Number of games.
+        num_players (int): Number of players.
+
+    Returns:
+        Array of ratings, and a tuple of arrays with player 1,
+            player 2 and the outcome of each game.
+
+    """
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(1000, 2000, num_players).astype(float)
+    games = (rng.integers(0, num_players, number), rng.integers(0, num_players, number),
+             rng.integers(0, 2, number))
+    return ratings, games
+
+
+def bench_elo_batch(number):
+    """
+    Time elo_batch for a batch of games.
+
+    Args:
+        number (int): Number of games in the batch.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    ratings, games = init_rating_batch(number)
+    return timeit(lambda: elo_batch(ratings, *games), number=1)
+
+
+def bench_log_lines(number, buffered=False):
+    """
+    Time LogWriter.write_line for player log lines.
+
+    Only the time spent in write_line is counted, not closing the log.
+
+    Args:
+        number (int): Number of lines to write.
+        buffered (bool): Whether to write the lines from a background thread.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    header = ["player1.type", "player1.elo", "player2.type", "player2.elo", "outcome"]
+    datum = dict(zip(header, ["RandomSpinda", 1016, "PlanningSpinda", 984, 1]))
+    log_writer = LogWriter(header, prefix="benchmark", buffered=buffered)
+
+    start_time = time()
+    for _ in range(number):
+        log_writer.write_line(datum)
+    total_time = time() - start_time
+
+    log_writer.close()
+    os.remove(os.path.join(LOG_DIR, log_writer.filename))
+    return total_time
+
+
+def bench_read_log(number, log_format="csv"):
+    """
+    Time reading the Elo and outcome columns of a player log as arrays.
+
+    Args:
+        number (int): Number of lines in the log.
+        log_format (str): Whether the log is a "csv" or "columnar" log.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    header = ["player1.type", "player1.elo", "player2.type", "player2.elo", "outcome"]
+    prefix = "benchmark_{}".format(log_format)
+    columns = {
+        "player1.type": np.array(["RandomSpinda", "PlanningSpinda"] * (number // 2 + 1),
+                                 dtype=object)[:number],
+        "player1.elo": np.random.normal(1000, 50, number),
+        "player2.type": np.array(["PlanningSpinda", "RandomSpinda"] * (number // 2 + 1),
+                                 dtype=object)[:number],
+        "player2.elo": np.random.normal(1000, 50, number),
+        "outcome": np.random.randint(0, 2, number)
+    }
+    if log_format == "columnar":
+        log_writer = ColumnarLogWriter(header, prefix=prefix)
+        log_writer.write_columns(columns)
+    else:
+        log_writer = LogWriter(header, prefix=prefix)
+        for line_ind in range(number):
+            log_writer.write_line({col_name: values[line_ind]
+                                   for col_name, values in columns.items()})
+    log_writer.close()
+
+    start_time = time()
+    LogReader(prefix=prefix).read_columns(["player1.elo", "outcome"])
+    total_time = time() - start_time
+
+    path = os.path.join(LOG_DIR, log_writer.filename)
+    if log_format == "columnar":
+        rmtree(path)
+    else:
+        os.remove(path)
+    return total_time
+
+
+def bench_matchups(number, streamed=False):
+    """
+    Time counting the matchups in a type log.
+
+    Args:
+        number (int): Number of lines in the log.
+        streamed (bool): Whether to stream the log with stream_matchups
+            instead of loading it with read_data for calculate_matchups.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    header = ["player1.type", "player1.elo", "player2.type", "player2.elo", "outcome"]
+    types = np.array(["RandomSpinda", "PlanningSpinda", "MCTSSpinda", "RandomFloatzel"],
+                     dtype=object)
+    log_writer = LogWriter(header, prefix="benchmark_matchups")
+    log_writer.write_columns({
+        "player1.type": types[np.random.randint(0, len(types), number)],
+        "player1.elo": np.random.normal(1000, 50, number),
+        "player2.type": types[np.random.randint(0, len(types), number)],
+        "player2.elo": np.random.normal(1000, 50, number),
+        "outcome": np.random.randint(0, 2, number)
+    })
+    log_writer.close()
+
+    start_time = time()
+    log_reader = LogReader(prefix="benchmark_matchups")
+    with redirect_stdout(StringIO()):
+        if streamed:
+            stream_matchups(log_reader)
+        else:
+            log_reader.read_data()
+            log_reader.to_numeric(log_reader.to_data_key(["player1.elo", "player2.elo",
+                                                          "outcome"]))
+            calculate_matchups(log_reader)
+    total_time = time() - start_time
+
+    os.remove(os.path.join(LOG_DIR, log_writer.filename))
+    return total_time
+
+
+def bench_matchup_counts(number):
+    """
+    Time MatchupCounts.add_games for games already in memory.
+
+    Args:
+        number (int): Number of games to count.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    types = np.array(["RandomSpinda", "PlanningSpinda", "MCTSSpinda", "RandomFloatzel"],
+                     dtype=object)
+    p1_types = types[np.random.randint(0, len(types), number)]
+    p2_types = types[np.random.randint(0, len(types), number)]
+    outcomes = np.random.randint(0, 2, number).astype(float)
+
+    start_time = time()
+    MatchupCounts().add_games(p1_types, p2_types, outcomes)
+    return time() - start_time
+
+
+def bench_glicko2_batch(number):
+    """
+    Time glicko2_batch for a rating period.
+
+    Args:
+        number (int): Number of games in the rating period.
+
+    Returns:
+        Total time taken, in seconds.
+
+    """
+    ratings, games = init_rating_batch(number)
+    deviations = np.full(len(ratings), GLICKO2_DEVIATION, dtype=float)
+    volatilities = np.full(len(ratings), GLICKO2_VOLATILITY)
+    return timeit(lambda: glicko2_batch(ratings, deviations, volatilities, games), number=1)
+
+
+def rating_convergence(num_players=1000, num_rounds=50):
+    """
+    Measure how quickly Elo and Glicko-2 ratings find players' true skill.
+
+    Every round, each player plays one game against a random opponent,
+    and wins with the Elo expected score from their true skills. One
+    round is one Glicko-2 rating period.
+
+    Args:
+        num_players (int): Number of players.
+        num_rounds (int): Number of rounds to play.
+
+    Returns:
+        Dictionary of rating system to a list of the rank correlation
+            between true skill and rating after each round.
+
+    """
+    rng = np.random.default_rng(0)
+    skills = rng.normal(1200, 200, num_players)
+    elo_ratings = np.full(num_players, 1000.0)
+    glicko_ratings = np.full(num_players, 1000.0)
+    deviations = np.full(num_players, GLICKO2_DEVIATION, dtype=float)
+    volatilities = np.full(num_players, GLICKO2_VOLATILITY)
+
+    results = {"elo": [], "glicko2": []}
+    for _ in range(num_rounds):
+        order = rng.permutation(num_players)
+        players, opponents = order[::2], order[1::2]
+        expected = 1 / (1 + 10 ** ((skills[opponents] - skills[players]) / 400))
+        outcomes = (rng.random(len(players)) < expected).astype(int)
+
+        elo_ratings = elo_batch(elo_ratings, players, opponents, outcomes)
+        glicko_ratings, deviations, volatilities = glicko2_batch(
+            glicko_ratings, deviations, volatilities, (players, opponents, outcomes))
+
+        results["elo"].append(rank_correlation(skills, elo_ratings))
+        results["glicko2"].append(rank_correlation(skills, glicko_ratings))
+
+    return results
+
+
+def rank_correlation(values1, values2):
+    """
+    Calculate the Spearman rank correlation of two arrays.
+
+    Args:
+        values1 (numpy.array): First array of values.
+        values2 (numpy.array): Second array of values.
+
+    Returns:
+        Correlation between the ranks of the values, with ties ranked randomly.
+
+    """
+    ranks1 = np.argsort(np.argsort(values1 + np.random.random(len(values1)) * 1e-6))
+    ranks2 = np.argsort(np.argsort(values2 + np.random.random(len(values2)) * 1e-6))
+    return np.corrcoef(ranks1, ranks2)[0, 1]
+
+
+BENCHMARKS = {
+    "calculate_damage": bench_calculate_damage,
+    "turn_order": bench_turn_order,
+    "damage_ranges": bench_damage_ranges,
+    "rollout_turns": bench_rollout_turns,
+    "planning_decision": bench_planning_decision,
+    "mcts_decision": bench_mcts_decision,
+    "engine_games": bench_engine_games,
+    "batch_games": bench_batch_games,
+    "ladder_add_1k": partial(bench_ladder_add, pool_size=1000),
+    "ladder_add_100k": partial(bench_ladder_add, pool_size=100000),
+    "ladder_match_1k": partial(bench_ladder_match, pool_size=1000),
+    "ladder_match_10k": partial(bench_ladder_match, pool_size=10000),
+    "ladder_match_100k": partial(bench_ladder_match, pool_size=100000),
+    "sorted_match_1k": partial(bench_ladder_match, pool_size=1000, indexed=False),
+    "sorted_match_10k": partial(bench_ladder_match, pool_size=10000, indexed=False),
+    "sorted_match_100k": partial(bench_ladder_match, pool_size=100000, indexed=False),
+    "weighted_threads_1": partial(bench_ladder_threads, ladder_class=WeightedLadder, num_threads=1),
+    "weighted_threads_8": partial(bench_ladder_threads, ladder_class=WeightedLadder, num_threads=8),
+    "sharded_threads_1": partial(bench_ladder_threads, ladder_class=ShardedLadder, num_threads=1),
+    "sharded_threads_8": partial(bench_ladder_threads, ladder_class=ShardedLadder, num_threads=8),
+    "ladder_cf_round": partial(bench_ladder_round, game="cf"),
+    "ladder_rps_round": partial(bench_ladder_round, game="rps"),
+    "rps_match": bench_rps_match,
+    "rps_simulate": partial(bench_rps_match, simulate=True),
+    "adaptive_match": bench_adaptive_match,
+    "adaptive_batch": partial(bench_adaptive_match, batch=True),
+    "array_cf_round": partial(bench_array_round, game="cf"),
+    "array_rps_round": partial(bench_array_round, game="rps"),
+    "elo_updates": bench_elo_updates,
+    "elo_batch": bench_elo_batch,
+    "glicko2_batch": bench_glicko2_batch,
+    "log_lines": bench_log_lines,
+    "log_lines_buffered": partial(bench_log_lines, buffered=True),
+    "read_csv_log": bench_read_log,
+    "read_columnar_log": partial(bench_read_log, log_format="columnar"),
+    "matchups": bench_matchups,
+    "matchups_streamed": partial(bench_matchups, streamed=True),
+    "matchup_counts": bench_matchup_counts
+}
+
+
+@click.command()
+@click.option("-b", "--benchmark", multiple=True,
+              help="Benchmark to run. Runs all benchmarks if not specified.")
+@click.option("-n", "--number", default=100000)
+@click.option("-c", "--convergence", is_flag=True,
+              help="Print how quickly each rating system converges instead.")
+def run(benchmark, number, convergence):
+    """
+    Run the microbenchmarks and print the time per call.
+
+    Args:
+        benchmark (tuple): Names of the benchmarks to run.
+        number (int): Number of times to run each benchmark.
+        convergence (bool): Whether to measure rating convergence instead.
+
+    """
+    if convergence:
+        results = rating_convergence()
+        for round_num in [1, 2, 5, 10, 20, 50]:
+            print("Round {}: Elo {:.3f}, Glicko-2 {:.3f}".format(
+                round_num, results["elo"][round_num - 1], results["glicko2"][round_num - 1]))
+        return
+
+    if not benchmark:
+        benchmark = tuple(BENCHMARKS.keys())
+
+    for name in benchmark:
+        if name not in BENCHMARKS:
+            raise RuntimeError("Invalid benchmark: {}".format(name))
+
+        total_time = BENCHMARKS[name](number)
+        print("{}: {:.3f} us/call".format(name, total_time/number*1e6))
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    run()
@@ -0,0 +1,62 @@
+"""Script to compare two agent variants on the same seeded games."""
+import sys
+import os
+# Hack to add parent directory to path
+# This is duplicated code but I can't avoid it
+for loc in sys.path:
+    if os.path.abspath(__file__).startswith(loc):
+        parent_dir = "/".join(loc.split("/")[:-1])
+        sys.path.append(parent_dir)
+        break
+
+# pylint: disable=C0413
+# Have to manipulate syspath
+import click  # noqa
+
+from simulation.paired_evaluation import PairedEvaluation  # noqa
+
+
+@click.command()
+@click.option("-c", "--config", default="sample_simulations/sim_configs/sample_pkmn_config.json")
+@click.option("-v", "--variant", multiple=True)
+@click.option("-o", "--opponent")
+@click.option("-n", "--num_pairs", default=500)
+@click.option("-sd", "--seed", default=0)
+@click.option("-na", "--no_antithetic", is_flag=True)
+def run(**kwargs):
+    r"""
+    Compare two agent variants with common random numbers.
+
+    Arguments are as follows:\n
+    --config/-c:         Population config with the agents to compare.\n
+    --variant/-v:        agent_type of a variant to compare. Give it twice.\n
+    --opponent/-o:       agent_type of the opponent both variants play.\n
+    --num_pairs/-n:      Number of seeded games for each variant.\n
+                             Default is 500.\n
+    --seed/-sd:          Seed for the games. Default is 0.\n
+    --no_antithetic/-na: Don't replay each game with the sides swapped.\n
+
+    """
+    evaluation = PairedEvaluation(config=kwargs["config"],
+                                  variants=kwargs["variant"],
+                                  opponent=kwargs["opponent"],
+                                  num_pairs=int(kwargs["num_pairs"]),
+                                  seed=int(kwargs["seed"]),
+                                  antithetic=not kwargs["no_antithetic"])
+    summary = evaluation.summarize(evaluation.run())
+    evaluation.close()
+
+    print("{} - {}: {} ± {} (independent games ± {})".format(
+        kwargs["variant"][0], kwargs["variant"][1],
+        round(summary["difference"], 3),
+        round(summary["moe"]*2.58, 3),
+        round(summary["independent_moe"]*2.58, 3)))
+    if summary["variance_reduction"] is not None:
+        print("Variance reduction: {}x, {}% of the games for the same margin of error".format(
+            round(summary["variance_reduction"], 2),
+            round(100/summary["variance_reduction"], 1)))
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    run()
@@ -31,6 +31,12 @@ from simulation.pkmn_simulation import PokemonSimulation  # noqa
 @click.option("-l", "--ladder", default=0)
 @click.option("-f", "--file", is_flag=True)
 @click.option("-ss", "--selection_size", default=1)
+@click.option("-w", "--workers", default=1)
+@click.option("-rb", "--round_based", is_flag=True)
+@click.option("-r", "--rating", default="elo")
+@click.option("-sd", "--seed", default=None, type=int)
+@click.option("-lf", "--log_format", default="csv")
+@click.option("-lt", "--log_turns", is_flag=True)
 @click.argument("proportions", nargs=-1)
 def run(**kwargs):
     r"""
@@ -49,6 +55,8 @@ def run(**kwargs):
     --ladder/-l:         Which ladder matching to use. Options are:\n
                              [0] Weighted (default)\n
                              [1] Random\n
+                             [2] Sharded by Elo\n
+                             [3] Array (Coin Flip and RPS only, in rounds)\n
     --game_choice/-g:   Choice of game to play. Options are:\n
                              [0] Coin Flip\n
                              [1] Balanced Population RPS\n
@@ -58,7 +66,21 @@ def run(**kwargs):
     --data_delay/-dd:    Number of iterations between generating data.\n
                              Default is 10\n
     --selection_size/-s: Number of players to put in the pool for candidate\n
-                             opponents. Default is 1.
+                             opponents. Default is 1.\n
+    --workers/-w:        Number of processes to run Pokemon battles in.\n
+                             Default is 1.\n
+    --round_based/-rb:   Pair the whole ladder at once and play games in rounds.\n
+    --rating/-r:         Rating system to use. Options are:\n
+                             elo (default)\n
+                             glicko2\n
+    --seed/-sd:          Seed to reproduce the simulation. Seeded runs give\n
+                             the same logs for any number of workers, and\n
+                             are never multithreaded.\n
+    --log_format/-lf:    Format of the logs. Options are:\n
+                             csv (default)\n
+                             columnar (binary, read back as NumPy arrays)\n
+    --log_turns/-lt:     Log the turns of each Pokemon battle, to a turn log\n
+                             for each process.\n
 
     """
     if kwargs.get("file"):
@@ -82,6 +104,13 @@ def run(**kwargs):
     params["num_rounds"] = int(params.get("num_rounds", None))
     params["multithread"] = int(params.get("multithread", 0))
     params["selection_size"] = int(params.get("selection_size", 1))
+    params["workers"] = int(params.get("workers", 1))
+    params["round_based"] = bool(params.get("round_based", False))
+    params["rating"] = params.get("rating", "elo")
+    params["log_format"] = params.get("log_format", "csv")
+    params["log_turns"] = bool(params.get("log_turns", False))
+    if params.get("seed") is not None:
+        params["seed"] = int(params["seed"])
 
     if not params["proportions"] and (game_choice in [2, 3]) and not params.get("config"):
         raise RuntimeError("No proportions specified.")
@@ -89,28 +118,34 @@ def run(**kwargs):
     if game_choice == 0:
         cf_sim = CFSimulation(**params)
         cf_sim.run()
+        cf_sim.close_log_writers()
     elif game_choice == 1:
         params["proportions"] = (0.25, 0.25, 0.25, 0.25, 0)
         rps_sim = RPSSimulation(**params)
         rps_sim.add_agents()
         rps_sim.init_type_log_writer()
         rps_sim.run()
+        rps_sim.close_log_writers()
     elif game_choice == 2:
         params["num_rounds"] = 1
         rps_sim = RPSSimulation(**params)
         rps_sim.add_agents()
         rps_sim.init_type_log_writer()
         rps_sim.run()
+        rps_sim.close_log_writers()
     elif game_choice == 3:
         mtrps_sim = RPSSimulation(**params)
         mtrps_sim.add_agents()
         mtrps_sim.init_type_log_writer()
         mtrps_sim.run()
+        mtrps_sim.close_log_writers()
     elif game_choice == 4:
         pkmn_sim = PokemonSimulation(**params)
         pkmn_sim.add_agents()
         pkmn_sim.init_type_log_writer()
         pkmn_sim.run()
+        pkmn_sim.close_log_writers()
+        pkmn_sim.close_agents()
     else:
         raise RuntimeError("Invalid Game Choice")
 
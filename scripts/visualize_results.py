@@ -28,16 +28,25 @@ from stats import calc  # noqa
 @click.option("-m",
               "--method",
               help="What type of visualization to do.")
+@click.option("-d",
+              "--directory",
+              default="",
+              help="Directory in the log directory with the files.")
 @click.argument("numeric_columns", nargs=-1)
-def run(prefix, method, numeric_columns):
+def run(prefix, method, directory, numeric_columns):
     """
     Visualize the data from a LogReader.
 
+    Only the columns each method needs are read, and matchups are
+    counted a chunk at a time, so a whole run's logs don't have to fit
+    in memory.
+
     Args:
         prefix (str): Prefix to specify for LogReader's files.
         numeric_columns (tuple): Which columns to convert to numeric (for the analysis)
         method (str): Which type data visualization to use.
             Either 'elo' or 'matchup'
+        directory (str): Directory in the log directory to find prefix in.
 
     """
     if method is None:
@@ -57,29 +66,18 @@ def run(prefix, method, numeric_columns):
             raise RuntimeError("You must specify a prefix or select files.")
 
     # Initialize LogReader with files/prefix
-    log_reader = LogReader(prefix=prefix, filenames=filenames)
-    log_reader.read_data()
+    log_reader = LogReader(prefix=prefix, filenames=filenames, directory=directory)
 
     if method == "elo":
         if numeric_columns == ():
-            log_reader.to_numeric(log_reader.data_keys)
-        else:
-            num_col_keys = log_reader.to_data_key(numeric_columns)
-            log_reader.to_numeric(num_col_keys)
+            numeric_columns = log_reader.header
+        log_reader.read_columns(numeric_columns)
+        log_reader.to_numeric(log_reader.to_data_key(numeric_columns))
 
         plot.plot_log_reader_data(log_reader)
 
     elif method == "matchups":
-        num_col_keys = None
-        if numeric_columns == ():
-            num_col_keys = log_reader.to_data_key(
-                ["player1.elo", "player2.elo", "outcome"])
-            log_reader.to_numeric(num_col_keys)
-        else:
-            num_col_keys = log_reader.to_data_key(numeric_columns)
-            log_reader.to_numeric(num_col_keys)
-
-        results = calc.calculate_matchups(log_reader)
+        results = calc.stream_matchups(log_reader)
         colnames, matchup_matrix = calc.calculate_matchup_matrix(results)
 
         plot.plot_matchup_matrix(colnames, matchup_matrix)
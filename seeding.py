@@ -0,0 +1,41 @@
+"""Seeded random number streams, so simulations can be reproduced."""
+import random
+
+
+def stream(run_seed, *key):
+    """
+    Get an independent random number stream for part of a run.
+
+    Each stream is seeded from the run seed and its key, so it doesn't
+    depend on what any other stream has drawn, or on which thread or
+    process it is used in.
+
+    Args:
+        run_seed (int): Seed for the whole run, or None for an unseeded run.
+        key (tuple): Values identifying the stream within the run.
+
+    Returns:
+        A random.Random for the stream. If run_seed is None, the random
+            module itself, so unseeded runs share the global stream.
+
+    """
+    if run_seed is None:
+        return random
+
+    # String seeds are hashed with SHA-512, which is the same in every process
+    return random.Random(":".join(str(part) for part in (run_seed, ) + key))
+
+
+def game_rng(run_seed, game_ind):
+    """
+    Get the random number stream for one game.
+
+    Args:
+        run_seed (int): Seed for the whole run, or None for an unseeded run.
+        game_ind (int): Index of the game in the run.
+
+    Returns:
+        The random number stream for the game's engine, moves and agents.
+
+    """
+    return stream(run_seed, "game", game_ind)
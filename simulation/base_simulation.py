@@ -4,14 +4,24 @@ from uuid import uuid4
 from time import time
 import json
 
+import numpy as np
+
+from ladder.array_ladder import ArrayLadder
+from ladder.base_ladder import snapshot
+from ladder.ratings import Glicko2Rating
 from ladder.random_ladder import RandomLadder
+from ladder.sharded_ladder import ShardedLadder
 from ladder.weighted_ladder import WeightedLadder
 
+from file_manager.columnar_log import ColumnarLogWriter
 from file_manager.log_writer import LogWriter
+from seeding import stream, game_rng
 
 LADDER_CHOICES = [
     WeightedLadder,
-    RandomLadder
+    RandomLadder,
+    ShardedLadder,
+    ArrayLadder
 ]
 
 
@@ -26,10 +36,20 @@ class BaseSimulation():
             num_games (int): Total number of games to simulate.
             num_players (int): Approximate number of players to have on the ladder.
             game (class defined in battle_engine): Game to play in this simulation.
-            ladder_choice (int): Whether to use WeightedLadder (0) or RandomLadder (1)
-                for ladder matching.
+            ladder_choice (int): Whether to use WeightedLadder (0), RandomLadder (1),
+                ShardedLadder (2) or ArrayLadder (3) for ladder matching.
+                ArrayLadder only plays CoinFlip and RPS games, in rounds.
             prefix (str): Prefix to use for these filenames.
             directory (str): Directory in which to store simulation results.
+            round_based (bool): Whether to pair the whole ladder at once and
+                play the games in rounds.
+            rating (str): Rating system to use, either elo (default) or glicko2.
+                Glicko-2 rating periods are one game for every two players.
+            seed (int): Seed for the run, so it can be reproduced. Each game
+                gets its own random number stream from the seed and its index.
+                Defaults to None, for the global random stream.
+            log_format (str): Format of the player and type logs, either
+                csv (default) or columnar.
 
         """
         self.directory = kwargs.get("directory", str(uuid4()))
@@ -37,20 +57,45 @@ class BaseSimulation():
         self.num_games = kwargs["num_games"]
         self.game = kwargs["game"]
         self.ladder_choice = kwargs["ladder_choice"]
+        self.seed = kwargs.get("seed")
+        rating_system = self.init_rating_system(kwargs.get("rating", "elo"))
         self.ladder = LADDER_CHOICES[self.ladder_choice](self.game,
-                                                         selection_size=kwargs["selection_size"])
+                                                         selection_size=kwargs["selection_size"],
+                                                         rating_system=rating_system,
+                                                         rng=stream(self.seed, "ladder"))
 
         self.prefix = kwargs.get("prefix", "")
+        self.log_format = kwargs.get("log_format", "csv")
+        if self.log_format not in ["csv", "columnar"]:
+            raise AttributeError("Invalid log_format: {}".format(self.log_format))
+        self.round_based = kwargs.get("round_based", False)
         self.init_player_log_writer()
 
+    def init_rating_system(self, rating):
+        """
+        Create the rating system for this simulation's ladder.
+
+        Args:
+            rating (str): Rating system to use, either elo or glicko2.
+
+        Returns:
+            The rating system, or None for the ladder's default Elo.
+
+        """
+        if rating == "elo":
+            return None
+        if rating == "glicko2":
+            return Glicko2Rating(period_length=max(self.num_players // 2, 1))
+        raise AttributeError("Invalid rating system: {}".format(rating))
+
     def write_player_log(self, outcome, player1, player2):
         """
         Write the log of an individual game to a file.
 
         Args:
             outcome (int): Results of the game.
-            player1 (BaseAgent): Player in this game.
-            player2 (BaseAgent): Other player in this game.
+            player1 (BaseAgent or PlayerSnapshot): Player in this game.
+            player2 (BaseAgent or PlayerSnapshot): Other player in this game.
 
         """
         datum = {
@@ -78,7 +123,29 @@ class BaseSimulation():
 
         log_prefix = "{}Players".format(self.prefix)
 
-        self.player_log_writer = LogWriter(header, self.directory, prefix=log_prefix)
+        self.player_log_writer = self.create_log_writer(header, log_prefix)
+
+    def create_log_writer(self, header, prefix):
+        """
+        Create a LogWriter for one of this simulation's logs.
+
+        Args:
+            header (list): List with column names.
+            prefix (str): Prefix to lead the filename with.
+
+        Returns:
+            A buffered LogWriter for csv logs, or a ColumnarLogWriter.
+
+        """
+        if self.log_format == "columnar":
+            return ColumnarLogWriter(header, self.directory, prefix=prefix)
+        return LogWriter(header, self.directory, prefix=prefix, buffered=True)
+
+    def close_log_writers(self):
+        """Write everything still buffered and close this simulation's logs."""
+        self.player_log_writer.close()
+        if getattr(self, "type_log_writer", None) is not None:
+            self.type_log_writer.close()
 
     def print_progress_bar(self, iter_num, start_time):
         """
@@ -118,6 +185,76 @@ class BaseSimulation():
         """Run this simulation."""
         raise NotImplementedError("Implement in inherited class")
 
+    def run_rounds(self):
+        """
+        Run this simulation in rounds.
+
+        Each round pairs every available player at once, plays all the
+        games, then updates the ratings together.
+        """
+        if isinstance(self.ladder, ArrayLadder):
+            self.run_array_rounds()
+            return
+
+        start_time = time()
+        games_played = 0
+        while games_played < self.num_games:
+            matches = self.ladder.match_round(max_games=self.num_games - games_played)
+            snapshots = [(snapshot(player), snapshot(opp)) for player, opp in matches]
+
+            outcomes = self.play_round(matches, range(games_played, games_played + len(matches)))
+            self.ladder.record_round(matches, outcomes)
+
+            for outcome, (player1, player2) in zip(outcomes, snapshots):
+                self.print_progress_bar(games_played, start_time)
+                self.write_player_log(outcome, player1, player2)
+                games_played += 1
+
+            self.end_round()
+
+    def run_array_rounds(self):
+        """
+        Run this simulation in rounds on an ArrayLadder.
+
+        Each round is logged all at once, to the same player log
+        as the other ladders.
+        """
+        start_time = time()
+        games_played = 0
+        type_names = np.array(self.ladder.type_names, dtype=object)
+        while games_played < self.num_games:
+            results = self.ladder.run_round(max_games=self.num_games - games_played)
+
+            self.player_log_writer.write_columns({
+                "player1.type": type_names[self.ladder.types[results.players]],
+                "player1.elo": results.player_elos,
+                "player2.type": type_names[self.ladder.types[results.opponents]],
+                "player2.elo": results.opp_elos,
+                "outcome": results.outcomes
+            })
+            games_played += len(results.outcomes)
+            self.print_progress_bar(games_played - 1, start_time)
+
+            self.end_round()
+
+    def play_round(self, matches, game_inds):
+        """
+        Play the games for a round.
+
+        Args:
+            matches (list): Pairs of players to play each other.
+            game_inds (range): Index of each game in the run.
+
+        Returns:
+            List of the outcome of each game, 1 if player 1 won.
+
+        """
+        return self.ladder.play_round(matches, [game_rng(self.seed, game_ind)
+                                                for game_ind in game_inds])
+
+    def end_round(self):
+        """Record anything needed at the end of a round."""
+
 
 def load_config(config_filename):
     """
@@ -2,7 +2,9 @@
 
 from time import time
 from simulation.base_simulation import BaseSimulation
+from ladder.array_ladder import ArrayLadder
 from stats.calc import calculate_avg_elo
+from seeding import game_rng
 
 
 class BaseLoggingSimulation(BaseSimulation):
@@ -20,9 +22,13 @@ class BaseLoggingSimulation(BaseSimulation):
 
     def run(self):
         """Run this simulation."""
+        if self.round_based or isinstance(self.ladder, ArrayLadder):
+            self.run_rounds()
+            return
+
         start_time = time()
         for game_ind in range(self.num_games):
-            outcome, player1, player2 = self.ladder.run_game()
+            outcome, player1, player2 = self.ladder.run_game(rng=game_rng(self.seed, game_ind))
 
             self.print_progress_bar(game_ind, start_time)
             self.write_player_log(outcome, player1, player2)
@@ -31,3 +37,7 @@ class BaseLoggingSimulation(BaseSimulation):
                 # Calculate the average ranking statistics
                 # every <data_delay> iterations
                 self.type_log_writer.write_line(calculate_avg_elo(self.ladder))
+
+    def end_round(self):
+        """Calculate the average ranking statistics after every round."""
+        self.type_log_writer.write_line(calculate_avg_elo(self.ladder))
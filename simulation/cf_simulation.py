@@ -5,6 +5,8 @@ from time import time
 from simulation.base_simulation import BaseSimulation
 from battle_engine.coinflip import CoinFlipEngine
 from agent.base_agent import BaseAgent
+from ladder.array_ladder import ArrayLadder
+from seeding import game_rng
 
 
 class CFSimulation(BaseSimulation):
@@ -21,14 +23,22 @@ class CFSimulation(BaseSimulation):
 
     def add_agents(self):
         """Add agents to the ladder."""
+        if isinstance(self.ladder, ArrayLadder):
+            self.ladder.add_players(self.num_players)
+            return
+
         for _ in range(self.num_players):
             player = BaseAgent()
             self.ladder.add_player(player)
 
     def run(self):
         """Run the CF Simulation."""
+        if self.round_based or isinstance(self.ladder, ArrayLadder):
+            self.run_rounds()
+            return
+
         start_time = time()
         for game_ind in range(self.num_games):
-            outcome, player1, player2 = self.ladder.run_game()
+            outcome, player1, player2 = self.ladder.run_game(rng=game_rng(self.seed, game_ind))
             self.print_progress_bar(game_ind, start_time)
             self.write_player_log(outcome, player1, player2)
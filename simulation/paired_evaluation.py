@@ -0,0 +1,190 @@
+"""Compare two Pokemon agent variants on the same seeded games."""
+
+from math import sqrt
+from time import time
+
+import numpy as np
+
+from battle_engine.pokemon_engine import PokemonEngine
+from file_manager.team_reader import TeamReader
+from simulation.base_simulation import load_config
+from simulation.pkmn_simulation import create_agent
+from stats.calc import calc_ratios
+from seeding import stream, game_rng
+
+
+class PairedEvaluation():
+    """
+    Class to compare two agent variants with common random numbers.
+
+    Both variants play the same opponent in the same games: game i is
+    played with the same random number stream for the engine and the
+    same streams for each side's choices, so crits, accuracy, damage rolls,
+    paralysis and speed ties line up until the variants' choices differ.
+    Antithetic pairs also replay each game with the sides swapped.
+
+    When both variants see the same luck, the difference in their win
+    rates has a smaller variance than if they played independent games,
+    so it needs fewer games for the same margin of error. How much
+    smaller depends on the matchup, so summarize() reports it.
+
+    Attributes:
+        variants (list): Population config entries for the two variants.
+        opponent (dict): Population config entry for the opponent.
+        num_pairs (int): Number of seeded games to play each variant in.
+        seed (int): Seed for the evaluation.
+        antithetic (bool): Whether to also play each game with the sides swapped.
+        players (list): Agents for the two variants and the opponent.
+
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Initialize a paired evaluation.
+
+        Args:
+            config (str): Filename for the population configs.
+            variants (list): The agent_type of the two variants to compare.
+            opponent (str): The agent_type of the opponent they both play.
+            num_pairs (int): Number of seeded games to play each variant in.
+            seed (int): Seed for the evaluation (Default 0).
+            antithetic (bool): Whether to also play each game with the sides
+                swapped (Default True).
+
+        """
+        config = {conf["agent_type"]: conf for conf in load_config(kwargs["config"])}
+        if len(kwargs["variants"]) != 2:
+            raise AttributeError("Need exactly two variants to compare.")
+        for agent_type in list(kwargs["variants"]) + [kwargs["opponent"]]:
+            if agent_type not in config:
+                raise AttributeError("Invalid agent_type: {}".format(agent_type))
+
+        self.variants = [config[agent_type] for agent_type in kwargs["variants"]]
+        self.opponent = config[kwargs["opponent"]]
+        self.num_pairs = kwargs["num_pairs"]
+        self.seed = kwargs.get("seed", 0)
+        self.antithetic = kwargs.get("antithetic", True)
+
+        self.players = []
+        for conf in self.variants + [self.opponent]:
+            conf_tr = TeamReader(prefix=conf["team_file"])
+            conf_tr.process_files()
+            self.players.append(create_agent(conf, conf_tr.teams[0]))
+
+    def play_game(self, variant_ind, pair_ind, swapped=False):
+        """
+        Play seeded game <pair_ind> between a variant and the opponent.
+
+        Args:
+            variant_ind (int): Index of the variant in self.variants.
+            pair_ind (int): Index of the game.
+            swapped (bool): Whether the variant plays as player2.
+
+        Returns:
+            1 if the variant won, 0 otherwise.
+
+        """
+        engine = PokemonEngine(rng=game_rng(self.seed, pair_ind))
+        variant_rng = stream(self.seed, "variant", pair_ind)
+        opp_rng = stream(self.seed, "opponent", pair_ind)
+
+        if swapped:
+            engine.agent_rngs = (opp_rng, variant_rng)
+            return 1 - engine.run(self.players[2], self.players[variant_ind])
+
+        engine.agent_rngs = (variant_rng, opp_rng)
+        return engine.run(self.players[variant_ind], self.players[2])
+
+    def run(self):
+        """
+        Play every game for both variants.
+
+        Returns:
+            Array with each variant's score in each game, indexed by
+                [pair, variant]. With antithetic pairs, the score is the
+                average of the two sides.
+
+        """
+        sides = [False, True] if self.antithetic else [False]
+        scores = np.zeros((self.num_pairs, 2))
+
+        start_time = time()
+        for pair_ind in range(self.num_pairs):
+            for variant_ind in range(2):
+                scores[pair_ind, variant_ind] = np.mean([
+                    self.play_game(variant_ind, pair_ind, swapped) for swapped in sides])
+            print_progress(pair_ind, self.num_pairs, start_time)
+
+        return scores
+
+    def close(self):
+        """Release what the agents hold, like MCTS worker processes."""
+        for player in self.players:
+            player.close()
+
+    def summarize(self, scores):
+        """
+        Compare the variants, and how much pairing the games helped.
+
+        The independent margins of error are what calc_ratios reports for
+        the same number of games, as if they were played without common
+        random numbers.
+
+        Args:
+            scores (numpy.array): Scores generated by run().
+
+        Returns:
+            Dictionary with the calc_ratios results for each variant under
+                "matchups", and the difference in the variants' win rates
+                with its paired and independent margins of error. The
+                variance reduction is the ratio of their variances, so
+                the fraction of games needed is its inverse.
+
+        """
+        num_pairs = len(scores)
+        games_per_pair = 2 if self.antithetic else 1
+        opp_type = self.opponent["agent_type"]
+
+        results = {}
+        for variant_ind, conf in enumerate(self.variants):
+            results[conf["agent_type"]] = {opp_type: {
+                "wins": scores[:, variant_ind].sum() * games_per_pair,
+                "total": num_pairs * games_per_pair
+            }}
+        results = calc_ratios(results)
+
+        for variant_ind, conf in enumerate(self.variants):
+            results[conf["agent_type"]][opp_type]["paired_moe"] = \
+                scores[:, variant_ind].std(ddof=1) / sqrt(num_pairs)
+
+        differences = scores[:, 0] - scores[:, 1]
+        paired_var = differences.var(ddof=1) / num_pairs
+        independent_var = sum(results[conf["agent_type"]][opp_type]["moe"]**2
+                              for conf in self.variants)
+
+        summary = {}
+        summary["matchups"] = results
+        summary["difference"] = differences.mean()
+        summary["moe"] = sqrt(paired_var)
+        summary["independent_moe"] = sqrt(independent_var)
+        summary["variance_reduction"] = independent_var / paired_var if paired_var else None
+        return summary
+
+
+def print_progress(iter_num, total, start_time):
+    """
+    Print the progress of an evaluation.
+
+    Args:
+        iter_num (int): Number of pairs played so far, minus one.
+        total (int): Total number of pairs.
+        start_time (time): Time the evaluation started.
+
+    """
+    elapsed = time() - start_time
+    eta = elapsed / (iter_num + 1) * (total - iter_num - 1)
+    print("Pairs: {}/{} | ETA: {}s".format(iter_num + 1, total, round(eta)), end="\r")
+
+    # Print New Line on Complete
+    if iter_num + 1 >= total:
+        print()
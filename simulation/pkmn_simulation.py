@@ -1,17 +1,27 @@
 """Script for running Pokemon Simulation."""
 
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import repeat
+from multiprocessing.util import Finalize
 from threading import Thread
 from queue import Queue
 from time import time
+from uuid import uuid4
 
 from agent.basic_pokemon_agent import PokemonAgent
 from agent.basic_planning_pokemon_agent import BasicPlanningPokemonAgent
+from agent.expectiminimax_pokemon_agent import ExpectiminimaxPokemonAgent
+from agent.mcts_pokemon_agent import MCTSPokemonAgent
 from battle_engine.pokemon_engine import PokemonEngine
-from file_manager.log_writer import LogWriter
 from file_manager.team_reader import TeamReader
+from ladder.base_ladder import snapshot
 from simulation.base_type_logging_simulation import BaseLoggingSimulation
 from simulation.base_simulation import load_config
 from stats.calc import calculate_avg_elo
+from seeding import game_rng
+
+# Games in flight at once in seeded process runs, whatever the number of workers
+SEEDED_IN_FLIGHT = 8
 
 
 class PokemonSimulation(BaseLoggingSimulation):
@@ -25,16 +35,28 @@ class PokemonSimulation(BaseLoggingSimulation):
             config (str): Filename for the population configs.
             data_delay (int): Number of matches between gathering type data.
             multithread (bool): Whether or not to run this simulation multithreaded.
+                Seeded simulations are never multithreaded, so they can be reproduced.
+            workers (int): Number of worker processes to run battles in. Values
+                greater than 1 take precedence over multithread.
+            log_turns (bool): Whether or not to log the turns of each battle,
+                to a turn log for each process in the simulation's directory.
 
         """
         pkmn_kwargs = kwargs
-        pkmn_kwargs["game"] = PokemonEngine()
+        pkmn_kwargs.setdefault("directory", str(uuid4()))
+        # Worker processes build their engines with the same options
+        self.engine_kwargs = {"log_turns": kwargs.get("log_turns", False),
+                              "directory": pkmn_kwargs["directory"]}
+        pkmn_kwargs["game"] = PokemonEngine(**self.engine_kwargs)
         pkmn_kwargs["prefix"] = "PKMN"
 
         self.config = load_config(kwargs["config"])
         self.type_log_writer = None
         self.data_delay = kwargs["data_delay"]
         self.multithread = kwargs.get("multithread", False)
+        self.workers = kwargs.get("workers", 1)
+        self.executor = None
+        self.agent_descriptors = {}
         super().__init__(pkmn_kwargs)
 
     def add_agents(self):
@@ -44,24 +66,37 @@ class PokemonSimulation(BaseLoggingSimulation):
             conf_tr.process_files()
             conf_team = conf_tr.teams[0]
             for _ in range(int(self.num_players * conf["proportion"])):
-                pkmn_agent = None
-                if conf["agent_class"] == "basic":
-                    pkmn_agent = PokemonAgent(
-                        team=conf_team
-                    )
-                    pkmn_agent.type = conf["agent_type"]
-
-                elif conf["agent_class"] == "basicplanning":
-                    pkmn_agent = BasicPlanningPokemonAgent(
-                        tier=conf["agent_tier"],
-                        team=conf_team
-                    )
-                    pkmn_agent.type = conf["agent_type"]
+                pkmn_agent = create_agent(conf, conf_team)
+                self.agent_descriptors[pkmn_agent.id] = {
+                    "agent_class": conf["agent_class"],
+                    "agent_type": conf["agent_type"],
+                    "agent_tier": conf.get("agent_tier"),
+                    "search_depth": conf.get("search_depth"),
+                    "time_limit": conf.get("time_limit"),
+                    "rollouts": conf.get("rollouts"),
+                    "team_file": conf["team_file"]
+                }
+                self.ladder.add_player(pkmn_agent)
 
-                else:
-                    raise RuntimeError("Invalid agent_class: {}".format(conf["agent_class"]))
+    def describe_agent(self, player):
+        """
+        Build the descriptor a worker process uses to rebuild a player.
 
-                self.ladder.add_player(pkmn_agent)
+        Args:
+            player (PokemonAgent): Player on this simulation's ladder.
+
+        Returns:
+            Dictionary with the player's agent class, type, tier, team file and elo.
+
+        """
+        descriptor = dict(self.agent_descriptors[player.id])
+        descriptor["elo"] = player.elo
+        return descriptor
+
+    def close_agents(self):
+        """Release what the ladder's agents hold, like MCTS worker processes."""
+        for player in self.ladder.get_players():
+            player.close()
 
     def init_type_log_writer(self):
         """Initialize Type Average Elo LogWriter."""
@@ -69,11 +104,16 @@ class PokemonSimulation(BaseLoggingSimulation):
         for conf in self.config:
             header.append(conf["agent_type"])
 
-        self.type_log_writer = LogWriter(header, prefix="PKMNTypes", directory=self.directory)
+        self.type_log_writer = self.create_log_writer(header, "PKMNTypes")
 
     def run(self):
         """Run this simulation."""
-        if not self.multithread:
+        # Seeded runs use the same schedule for any number of workers
+        if self.workers > 1 or (self.seed is not None and not self.round_based):
+            self.run_processes()
+            return
+
+        if not self.multithread or self.round_based:
             super().run()
             return
 
@@ -105,6 +145,248 @@ class PokemonSimulation(BaseLoggingSimulation):
             self.type_log_writer.write_line(data_line)
             type_results_queue.task_done()
 
+    def run_processes(self):
+        """
+        Run this simulation's battles in a pool of worker processes.
+
+        The ladder stays in this process; it matches the players and
+        applies the results, so Elo is updated in one place. Workers only
+        get a descriptor for each player and return the outcome.
+
+        Seeded runs keep SEEDED_IN_FLIGHT games going and apply the results
+        in the order the games were started, so the ladder sees the same
+        results in the same order for any number of workers. With one
+        worker, the games are played in this process on the same schedule.
+        """
+        if self.round_based:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                self.executor = executor
+                self.run_rounds()
+            self.executor = None
+            return
+
+        start_time = time()
+        max_in_flight = 2 * self.workers if self.seed is None else SEEDED_IN_FLIGHT
+        games_started = 0
+        games_finished = 0
+        in_flight = {}
+
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            executor = InlineExecutor()
+
+        with executor:
+            while games_finished < self.num_games:
+                # Keep the workers busy with as many games as the pool allows
+                while games_started < self.num_games and len(in_flight) < max_in_flight:
+                    try:
+                        player1, player2 = self.ladder.match_players()
+                    except RuntimeError:
+                        break
+
+                    future = executor.submit(process_battle,
+                                             self.describe_agent(player1),
+                                             self.describe_agent(player2),
+                                             self.seed, games_started, self.engine_kwargs)
+                    in_flight[future] = (player1, player2, snapshot(player1), snapshot(player2))
+                    games_started += 1
+
+                if not in_flight:
+                    raise RuntimeError("Not enough players on the ladder to run a game.")
+
+                if self.seed is None:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                else:
+                    # Dicts keep insertion order, so this is the oldest game
+                    done = [next(iter(in_flight))]
+                for future in done:
+                    player1, player2, player1_snap, player2_snap = in_flight.pop(future)
+                    results = future.result()
+                    self.ladder.record_result(player1, player2, results["outcome"])
+
+                    self.print_progress_bar(games_finished, start_time)
+                    self.write_player_log(results["outcome"], player1_snap, player2_snap)
+                    if games_finished % self.data_delay == 0:
+                        self.type_log_writer.write_line(calculate_avg_elo(self.ladder))
+                    games_finished += 1
+
+    def play_round(self, matches, game_inds):
+        """
+        Play the games for a round, in the worker processes if there are any.
+
+        Args:
+            matches (list): Pairs of players to play each other.
+            game_inds (range): Index of each game in the run.
+
+        Returns:
+            List of the outcome of each game, 1 if player 1 won.
+
+        """
+        if self.executor is None:
+            return super().play_round(matches, game_inds)
+
+        results = self.executor.map(process_battle,
+                                    [self.describe_agent(player) for player, _ in matches],
+                                    [self.describe_agent(opp) for _, opp in matches],
+                                    repeat(self.seed), game_inds,
+                                    repeat(self.engine_kwargs))
+        return [result["outcome"] for result in results]
+
+
+class InlineExecutor():
+    """Executor that plays each battle in this process as it is submitted."""
+
+    def __enter__(self):
+        """Use this InlineExecutor in a with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Nothing to shut down at the end of a with statement."""
+
+    @staticmethod
+    def submit(func, *args):
+        """
+        Call a function now.
+
+        Args:
+            func (function): Function to call.
+            args (list): Arguments to call it with.
+
+        Returns:
+            Future that is already done, with the function's result.
+
+        """
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as err:  # pylint: disable=broad-except
+            future.set_exception(err)
+        return future
+
+
+def create_agent(conf, team):
+    """
+    Create an agent from a population config entry.
+
+    Args:
+        conf (dict): Population config entry, with "agent_class" and "agent_type"
+            keys. "agent_tier" is required for planning agents. "search_depth"
+            and "time_limit" are optional for expectiminimax agents, and
+            "rollouts" and "time_limit" for MCTS agents.
+        team (list): Team of Pokemon for this agent.
+
+    Returns:
+        The new PokemonAgent.
+
+    """
+    pkmn_agent = None
+    if conf["agent_class"] == "basic":
+        pkmn_agent = PokemonAgent(
+            team=team
+        )
+
+    elif conf["agent_class"] == "basicplanning":
+        pkmn_agent = BasicPlanningPokemonAgent(
+            tier=conf["agent_tier"],
+            team=team
+        )
+
+    elif conf["agent_class"] == "expectiminimax":
+        search_kwargs = {}
+        if conf.get("search_depth") is not None:
+            search_kwargs["search_depth"] = int(conf["search_depth"])
+        if conf.get("time_limit") is not None:
+            search_kwargs["time_limit"] = float(conf["time_limit"])
+
+        pkmn_agent = ExpectiminimaxPokemonAgent(
+            tier=conf["agent_tier"],
+            team=team,
+            **search_kwargs
+        )
+
+    elif conf["agent_class"] == "mcts":
+        search_kwargs = {}
+        if conf.get("rollouts") is not None:
+            search_kwargs["rollouts"] = int(conf["rollouts"])
+        if conf.get("time_limit") is not None:
+            search_kwargs["time_limit"] = float(conf["time_limit"])
+            # Only limit rollouts if both are given
+            search_kwargs["rollouts"] = search_kwargs.get("rollouts")
+
+        pkmn_agent = MCTSPokemonAgent(
+            tier=conf["agent_tier"],
+            team=team,
+            **search_kwargs
+        )
+
+    else:
+        raise RuntimeError("Invalid agent_class: {}".format(conf["agent_class"]))
+
+    pkmn_agent.type = conf["agent_type"]
+    return pkmn_agent
+
+
+# Agents built by this (worker) process, keyed by their descriptor
+WORKER_AGENTS = {}
+
+
+def worker_agent(descriptor, position):
+    """
+    Get an agent for a descriptor, building it on first use in this process.
+
+    Args:
+        descriptor (dict): Descriptor generated by PokemonSimulation.describe_agent.
+        position (int): Which side of the battle the agent is on, so that
+            mirror matches get two seperate agents.
+
+    Returns:
+        PokemonAgent matching the descriptor.
+
+    """
+    key = (descriptor["agent_class"], descriptor["agent_type"],
+           descriptor["agent_tier"], descriptor["team_file"], position)
+    if key not in WORKER_AGENTS:
+        conf_tr = TeamReader(prefix=descriptor["team_file"])
+        conf_tr.process_files()
+        pkmn_agent = create_agent(descriptor, conf_tr.teams[0])
+        # Agents live as long as the worker process, so close them when it exits
+        Finalize(pkmn_agent, pkmn_agent.close, exitpriority=10)
+        WORKER_AGENTS[key] = pkmn_agent
+
+    pkmn_agent = WORKER_AGENTS[key]
+    pkmn_agent.elo = descriptor["elo"]
+    return pkmn_agent
+
+
+def process_battle(player1_descriptor, player2_descriptor, run_seed=None, game_ind=0,
+                   engine_kwargs=None):
+    """
+    Run a single battle in a worker process.
+
+    Args:
+        player1_descriptor (dict): Descriptor for the first player.
+        player2_descriptor (dict): Descriptor for the second player.
+        run_seed (int): Seed for the simulation, or None if it isn't seeded.
+        game_ind (int): Index of the game in the simulation.
+        engine_kwargs (dict): Options for the PokemonEngine, like whether
+            to log turns and the directory to log them to.
+
+    Returns:
+        Dictionary with the outcome of the battle and the number of turns played.
+
+    """
+    player1 = worker_agent(player1_descriptor, 1)
+    player2 = worker_agent(player2_descriptor, 2)
+
+    engine = PokemonEngine(rng=game_rng(run_seed, game_ind), **(engine_kwargs or {}))
+    outcome = engine.run(player1, player2)
+
+    results = {}
+    results["outcome"] = outcome
+    results["num_turns"] = engine.game_state["num_turns"]
+    return results
+
 
 def battle(main_sim, battle_queue, output_queue, type_queue, start_time):
     """
@@ -2,13 +2,17 @@
 
 from math import ceil
 
+import numpy as np
+
 from simulation.base_simulation import load_config
 from simulation.base_type_logging_simulation import BaseLoggingSimulation
+from battle_engine.batch_rps_engine import BatchRPSEngine
 from battle_engine.rockpaperscissors import RPSEngine
 from agent.rps_agent import RPSAgent
 from agent.counter_rps_agent import CounterRPSAgent
 from agent.adjusting_rps_agent import AdjustingRPSAgent
-from file_manager.log_writer import LogWriter
+from ladder.array_ladder import ArrayLadder
+from seeding import stream
 
 
 class RPSSimulation(BaseLoggingSimulation):
@@ -32,12 +36,18 @@ class RPSSimulation(BaseLoggingSimulation):
         super().__init__(rps_kwargs)
 
         self.proportions = [float(val) for val in kwargs.get("proportions", [])]
+        batch_rng = np.random.default_rng(stream(self.seed, "batch").getrandbits(64))
+        self.batch_engine = BatchRPSEngine(kwargs["num_rounds"], rng=batch_rng)
         self.type_log_writer = None
         self.data_delay = kwargs["data_delay"]
         self.config = load_config(kwargs.get("config"))
 
     def add_agents_config(self):
         """Logic for adding agents from a specified config."""
+        if isinstance(self.ladder, ArrayLadder):
+            self.add_array_agents_config()
+            return
+
         for conf in self.config:
             num_agents = ceil(float(conf["proportion"]*self.num_players))
             for agent_ind in range(num_agents):
@@ -55,6 +65,15 @@ class RPSSimulation(BaseLoggingSimulation):
                 player.type = conf["agent_type"]
                 self.ladder.add_player(player)
 
+    def add_array_agents_config(self):
+        """Logic for adding agents from a specified config to an ArrayLadder."""
+        for conf in self.config:
+            num_agents = ceil(float(conf["proportion"]*self.num_players))
+            self.ladder.add_players(num_agents, conf["agent_type"],
+                                    conf.get("agent_strategy") or "uniform",
+                                    agent_class=conf.get("agent_class"),
+                                    weight=conf.get("weight", 1))
+
     def add_agents_proportions(self):
         """Logic for adding agents based on proportions vector."""
         num_rock = ceil(float(self.proportions[0])*self.num_players)
@@ -63,6 +82,15 @@ class RPSSimulation(BaseLoggingSimulation):
         num_mixed = ceil(float(self.proportions[3])*self.num_players)
         num_counter = ceil(float(self.proportions[4])*self.num_players)
 
+        if isinstance(self.ladder, ArrayLadder):
+            for num_agents, strategy in zip([num_rock, num_paper, num_scissors, num_mixed],
+                                            ["rock", "paper", "scissors", "uniform"]):
+                if num_agents:
+                    self.ladder.add_players(num_agents, strategy, strategy)
+            if num_counter:
+                self.ladder.add_players(num_counter, "counter", agent_class="counter")
+            return
+
         for rock_ind in range(num_rock):
             agent_id = 'rock_{}'.format(rock_ind)
             player = RPSAgent(id_in=agent_id, strategy_in='rock')
@@ -95,6 +123,23 @@ class RPSSimulation(BaseLoggingSimulation):
         else:
             self.add_agents_proportions()
 
+    def play_round(self, matches, game_inds):
+        """
+        Play every match in a round at once with a BatchRPSEngine.
+
+        The engine has one random number stream for the whole run, since
+        the matches are played together.
+
+        Args:
+            matches (list): Pairs of players to play each other.
+            game_inds (range): Index of each game in the run.
+
+        Returns:
+            List of the outcome of each game, 1 if player 1 won.
+
+        """
+        return self.batch_engine.run_matches(matches).tolist()
+
     def init_type_log_writer(self):
         """Initialize Type Average Elo LogWriter."""
         header = []
@@ -115,4 +160,4 @@ class RPSSimulation(BaseLoggingSimulation):
             if self.proportions[4] != 0:
                 header.append("counter")
 
-        self.type_log_writer = LogWriter(header, prefix="RPSTypes", directory=self.directory)
+        self.type_log_writer = self.create_log_writer(header, "RPSTypes")
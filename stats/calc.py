@@ -4,6 +4,8 @@ from math import sqrt
 
 import numpy as np
 
+from ladder.array_ladder import ArrayLadder
+
 
 def calculate_avg_elo(ladder, group_by="type"):
     """
@@ -17,6 +19,9 @@ def calculate_avg_elo(ladder, group_by="type"):
         Dictionary with average Elo grouped by group_by attribute.
 
     """
+    if isinstance(ladder, ArrayLadder) and group_by == "type":
+        return ladder.average_elo()
+
     player_pool = ladder.get_players()
     output = {}
 
@@ -38,6 +43,141 @@ def calculate_avg_elo(ladder, group_by="type"):
     return output
 
 
+class MatchupCounts():
+    """
+    Wins and totals for every pair of player types, on a type x type grid.
+
+    Types are given integer codes in order of appearance, and games are
+    added a batch at a time with np.bincount, so counting doesn't loop
+    over the games in Python.
+
+    Each game counts for both cells of its matchup, so a game between
+    players of the same type counts twice in that type's cell, with one
+    win, like the results dict from calculate_matchups().
+
+    Attributes:
+        names (list): Each type, indexed by its code.
+        codes (dict): Each type to its code.
+        wins (numpy.array): Wins of the row type against the column type.
+        totals (numpy.array): Games between the row type and column type.
+
+    """
+
+    def __init__(self):
+        """Initialize empty MatchupCounts."""
+        self.names = []
+        self.codes = {}
+        self.wins = np.zeros((0, 0))
+        self.totals = np.zeros((0, 0), dtype=np.int64)
+
+    def encode(self, types):
+        """
+        Get the codes for a column of types, adding any new types.
+
+        Args:
+            types (list): Type of a player in each game.
+
+        Returns:
+            Integer array with the code of each type.
+
+        """
+        for name in dict.fromkeys(types):
+            if name not in self.codes:
+                self.codes[name] = len(self.names)
+                self.names.append(name)
+        return np.fromiter(map(self.codes.__getitem__, types), dtype=np.intp, count=len(types))
+
+    def add_games(self, p1_type_data, p2_type_data, outcome_data):
+        """
+        Add games to the counts.
+
+        Args:
+            p1_type_data (list): Type of the first player in each game.
+            p2_type_data (list): Type of the second player in each game.
+            outcome_data (list): Outcome of each game, 1 if player1 won.
+
+        """
+        p1_codes = self.encode(p1_type_data)
+        p2_codes = self.encode(p2_type_data)
+        outcomes = np.asarray(outcome_data, dtype=float)
+
+        # Grow the grid for new types
+        num_types = len(self.names)
+        if num_types > len(self.wins):
+            old_types = len(self.wins)
+            wins = np.zeros((num_types, num_types))
+            totals = np.zeros((num_types, num_types), dtype=np.int64)
+            wins[:old_types, :old_types] = self.wins
+            totals[:old_types, :old_types] = self.totals
+            self.wins = wins
+            self.totals = totals
+
+        # Flat index of each game's cell, and of the cell for the other side
+        p1_cells = p1_codes * num_types + p2_codes
+        p2_cells = p2_codes * num_types + p1_codes
+        num_cells = num_types * num_types
+
+        self.totals += (np.bincount(p1_cells, minlength=num_cells) +
+                        np.bincount(p2_cells, minlength=num_cells)).reshape(self.totals.shape)
+        # (outcome+1)%2 turns 0 to 1 and 1 to 0
+        self.wins += (np.bincount(p1_cells, weights=outcomes, minlength=num_cells) +
+                      np.bincount(p2_cells, weights=(outcomes + 1) % 2,
+                                  minlength=num_cells)).reshape(self.wins.shape)
+
+    def ratios(self):
+        """
+        Calculate the win ratio and margin of error of every matchup.
+
+        Returns:
+            Arrays with the ratio and the margin of error for each cell,
+                NaN for matchups that weren't played.
+
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = self.wins / self.totals
+            margins_of_error = np.sqrt(ratios * (1 - ratios) / self.totals)
+        return ratios, margins_of_error
+
+    def results(self):
+        """
+        View the counts as a results dict.
+
+        Returns:
+            Dictionary with matchup matrix broken down by type, with
+                every pair of types and their ratio and margin of error,
+                like calculate_matchups().
+
+        """
+        ratios, margins_of_error = self.ratios()
+
+        results = {}
+        for row_ind, p1_type in enumerate(self.names):
+            results[p1_type] = {}
+            for col_ind, p2_type in enumerate(self.names):
+                num_total = int(self.totals[row_ind, col_ind])
+                results[p1_type][p2_type] = {
+                    "wins": float(self.wins[row_ind, col_ind]),
+                    "total": num_total,
+                    "ratio": float(ratios[row_ind, col_ind]) if num_total else None,
+                    "moe": float(margins_of_error[row_ind, col_ind]) if num_total else None
+                }
+        return results
+
+    def matrix(self):
+        """
+        Convert the counts to a matchup matrix.
+
+        Returns:
+            Sorted list of types, and the 2xNxN matrix from
+                calculate_matchup_matrix() for them.
+
+        """
+        order = sorted(range(len(self.names)), key=self.names.__getitem__)
+        ratios, _ = self.ratios()
+        grid = np.ix_(order, order)
+        return [self.names[ind] for ind in order], np.array([ratios[grid], self.totals[grid]])
+
+
 def calculate_matchups(log_reader):
     """
     Calculate matchup results for player types.
@@ -49,49 +189,50 @@ def calculate_matchups(log_reader):
         Dictionary with matchup matrix broken down by type in file.
 
     """
-    num_games = len(log_reader.data[log_reader.data_keys[0]])
     num_files = len(log_reader.files)
 
-    results = {}
+    counts = MatchupCounts()
 
     for file_ind in range(num_files):
         outcome_key = "{}{}".format("outcome", file_ind)
         p1_type_key = "{}{}".format("player1.type", file_ind)
         p2_type_key = "{}{}".format("player2.type", file_ind)
 
-        outcome_data = log_reader.data[outcome_key]
-        p1_type_data = log_reader.data[p1_type_key]
-        p2_type_data = log_reader.data[p2_type_key]
-        for game_ind in range(num_games):
-            outcome = outcome_data[game_ind]
-            p1_type = p1_type_data[game_ind]
-            p2_type = p2_type_data[game_ind]
+        counts.add_games(log_reader.data[p1_type_key],
+                         log_reader.data[p2_type_key],
+                         log_reader.data[outcome_key])
 
-            # Initialize the data for the types
-            if p1_type not in results:
-                results[p1_type] = {}
-            if p2_type not in results:
-                results[p2_type] = {}
+    results = counts.results()
+    print_ratios(results)
+    return results
 
-            if p2_type not in results[p1_type]:
-                results[p1_type][p2_type] = {}
-                results[p1_type][p2_type]["wins"] = 0
-                results[p1_type][p2_type]["total"] = 0
-            if p1_type not in results[p2_type]:
-                results[p2_type][p1_type] = {}
-                results[p2_type][p1_type]["wins"] = 0
-                results[p2_type][p1_type]["total"] = 0
-
-            results[p1_type][p2_type]["total"] += 1
-            results[p2_type][p1_type]["total"] += 1
-
-            # Increment the counter of whoever won
-            # (outcome+1)%2 turns 0 to 1 and 1 to 0
-            results[p1_type][p2_type]["wins"] += outcome
-            results[p2_type][p1_type]["wins"] += (outcome + 1) % 2
-
-    results = validate_results(results)
-    results = calc_ratios(results)
+
+def stream_matchups(log_reader, chunk_rows=None, workers=None):
+    """
+    Calculate matchup results for player types, streaming the logs.
+
+    Only the type and outcome columns are read, a chunk at a time, so
+    the logs don't have to fit in memory.
+
+    Args:
+        log_reader (LogReader): LogReader for the logs, without data loaded.
+        chunk_rows (int): Number of rows to read at a time.
+        workers (int): Number of files to read at once.
+
+    Returns:
+        Dictionary with matchup matrix broken down by type, like
+            calculate_matchups().
+
+    """
+    counts = MatchupCounts()
+
+    chunks = log_reader.iter_chunks(["player1.type", "player2.type", "outcome"],
+                                    chunk_rows=chunk_rows, workers=workers)
+    for _, chunk in chunks:
+        counts.add_games(chunk["player1.type"], chunk["player2.type"], chunk["outcome"])
+
+    results = counts.results()
+    print_ratios(results)
     return results
 
 
@@ -136,12 +277,7 @@ def calc_ratios(results):
             if num_total != 0:
                 ratio = num_wins/num_total
                 margin_of_error = sqrt(ratio*(1-ratio)/num_total)
-
-                # TODO: Put this in its own function/method
-                print("{} vs {}: {} ± {}".format(p1_type,
-                                                 p2_type,
-                                                 round(ratio, 2),
-                                                 round(margin_of_error*2.58, 2)))
+                print_ratio(p1_type, p2_type, ratio, margin_of_error)
 
                 results[p1_type][p2_type]["ratio"] = ratio
                 results[p1_type][p2_type]["moe"] = margin_of_error
@@ -152,32 +288,59 @@ def calc_ratios(results):
     return results
 
 
+def print_ratios(results):
+    """
+    Print the ratio and margin of error of every matchup that was played.
+
+    Args:
+        results (dict): Results with ratios, from calculate_matchups().
+
+    """
+    for p1_type in results:
+        for p2_type in results[p1_type]:
+            if results[p1_type][p2_type]["total"] != 0:
+                print_ratio(p1_type, p2_type, results[p1_type][p2_type]["ratio"],
+                            results[p1_type][p2_type]["moe"])
+
+
+def print_ratio(p1_type, p2_type, ratio, margin_of_error):
+    """
+    Print a matchup's ratio, with its 99% margin of error.
+
+    Args:
+        p1_type (str): Type the ratio is for.
+        p2_type (str): Type of the opponent.
+        ratio (float): Fraction of the games p1_type won.
+        margin_of_error (float): Standard error of the ratio.
+
+    """
+    print("{} vs {}: {} ± {}".format(p1_type,
+                                     p2_type,
+                                     round(ratio, 2),
+                                     round(margin_of_error*2.58, 2)))
+
+
 def calculate_matchup_matrix(results):
     """
     Convert matchups from dict to a numpy matrix.
 
     Args:
-        results (dict): Dictionary with matchup calculations.
-            Generated by calculate_matchups().
+        results (dict or MatchupCounts): Dictionary with matchup calculations,
+            generated by calculate_matchups(), or the counts themselves.
 
     Returns:
         2xNxN matrix where N is the number of types. First slice is rations,
             second slice is the totals.
 
     """
-    names = sorted(list(results.keys()))
-    num_cols = len(names)
+    if isinstance(results, MatchupCounts):
+        return results.matrix()
 
-    output = [[[0 for _ in range(num_cols)] for _ in range(num_cols)] for _ in range(2)]
-    output = np.zeros((2, num_cols, num_cols))
+    names = sorted(list(results.keys()))
 
     # Generate matchup matrix
-    for col_ind in range(num_cols):
-        for row_ind in range(num_cols):
-            rowname = names[row_ind]
-            colname = names[col_ind]
-
-            output[0, row_ind, col_ind] = results[rowname][colname]["ratio"]
-            output[1, row_ind, col_ind] = results[rowname][colname]["total"]
+    output = np.array([[[results[rowname][colname][key] for colname in names]
+                        for rowname in names]
+                       for key in ["ratio", "total"]], dtype=float)
 
     return names, output
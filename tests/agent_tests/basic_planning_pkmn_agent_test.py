@@ -51,6 +51,12 @@ def test_make_move():
     assert move[0] == "ATTACK"
     assert move[1] == 1
 
+    # Damage ranges are reused for each of the opponent's options
+    assert bppa.turn_cache.hits > 0
+
+    # Same choice with results from the cache
+    assert bppa.make_move() == move
+
 
 def test_determine_faster():
     """
@@ -0,0 +1,150 @@
+"""Test script for ExpectiminimaxPokemonAgent."""
+
+from agent.expectiminimax_pokemon_agent import ExpectiminimaxPokemonAgent
+from agent.expectiminimax_pokemon_agent import order_attacks
+from pokemon_helpers.pokemon import Pokemon
+from battle_engine.pokemon_engine import anonymize_gamestate_helper
+
+from config import set_logging_level
+
+
+def init_empa(**kwargs):
+    """Initialize the Player for these tests."""
+    spinda = Pokemon(name="spinda", moves=["tackle", "frustration"])
+    magikarp = Pokemon(name="magikarp", moves=["tackle"])
+    exploud = Pokemon(name="exploud", moves=["tackle"])
+
+    gamestate = {}
+    gamestate["team"] = [exploud, magikarp]
+    gamestate["active"] = spinda
+
+    opp_gamestate = anonymize_gamestate_helper(gamestate)
+
+    # Update the gamestate
+    empa = ExpectiminimaxPokemonAgent(tier="pu", team=[spinda], **kwargs)
+    empa.update_gamestate(gamestate, opp_gamestate)
+    empa.init_opp_gamestate(opp_gamestate["team"], opp_gamestate["active"])
+    return empa
+
+
+def test_make_move():
+    """Test the results of make_move()."""
+    empa = init_empa(search_depth=1)
+    move = empa.make_move()
+
+    # We choose Frustration not Tackle
+    assert move[0] == "ATTACK"
+    assert move[1] == 1
+
+    assert empa.nodes_searched > 0
+    assert empa.nodes_per_second() > 0
+
+    # Deeper searches still choose a valid move
+    empa = init_empa(search_depth=3)
+    player_opts, _ = empa.generate_possibilities()
+    assert empa.make_move() in player_opts
+
+
+def test_time_limit():
+    """Test that the first search finishes even without any time."""
+    empa = init_empa(search_depth=10, time_limit=0)
+    move = empa.make_move()
+
+    # Only the one turn search ran
+    assert move == ("ATTACK", 1)
+    assert empa.nodes_per_second() is not None
+
+
+def test_transition():
+    """Test applying options to a SearchState."""
+    empa = init_empa()
+    state = empa.init_search()
+
+    assert state.my_active[0] == 0
+    assert state.opp_active[0] == "spinda"
+    assert len(state.my_team) == 2
+    assert len(state.opp_team) == 2
+
+    # Both players switch to their second pokemon
+    next_state = empa.transition(state, ("SWITCH", 1), ("SWITCH", 1), True, True)
+    assert next_state.my_active[0] == 2
+    assert next_state.my_team[-1][0] == 0
+    assert next_state.opp_active[0] == "magikarp"
+    assert next_state.opp_team[-1][0] == "spinda"
+
+    # Original state is unchanged
+    assert state.my_active[0] == 0
+    assert state.opp_active[0] == "spinda"
+
+    # Opponent attacks and hits
+    next_state = empa.transition(state, ("SWITCH", 0), ("ATTACK", "superpower"), True, True)
+    assert next_state.my_active[0] == 1
+    assert next_state.my_active[1] < state.my_team[0][1]
+    assert next_state.opp_active == state.opp_active
+
+    # Attacks hit the pokemon switching in
+    next_state = empa.transition(state, ("ATTACK", 1), ("SWITCH", 1), True, True)
+    assert next_state.opp_active[0] == "magikarp"
+    assert next_state.opp_active[1] < 1
+
+    # Opponent attacks and misses
+    next_state = empa.transition(state, ("SWITCH", 0), ("ATTACK", "superpower"), True, False)
+    assert next_state.my_active[1] == state.my_team[0][1]
+
+    # Fainted pokemon are replaced by the healthiest teammate
+    state = state._replace(opp_active=("spinda", 0.01, None, 0, 0),
+                           opp_team=(("exploud", 0.5, None, 0, 0), ("magikarp", 1, None, 0, 0)))
+    next_state = empa.transition(state, ("ATTACK", 1), ("ATTACK", "tackle"), True, True)
+    assert next_state.opp_active[0] == "magikarp"
+    assert next_state.opp_team == (("exploud", 0.5, None, 0, 0), )
+
+
+def test_repetition():
+    """Test that earlier positions are evaluated instead of searched again."""
+    empa = init_empa()
+    state = empa.init_search()
+    state = state._replace(opp_active=("spinda", 0.5, None, 0, 0))
+
+    # Switching out and back in again reaches the same position
+    next_state = empa.transition(state, ("SWITCH", 0), ("SWITCH", 0), True, True)
+    next_state = empa.transition(next_state, ("SWITCH", 1), ("SWITCH", 1), True, True)
+    assert empa.position(next_state) == empa.position(state)
+
+    empa.max_value(next_state, 2)
+    assert empa.nodes_searched > 1
+
+    empa.values = {}
+    empa.nodes_searched = 0
+    empa.positions.add(empa.position(state))
+    assert empa.max_value(next_state, 2) == empa.evaluate(next_state)
+    assert empa.nodes_searched == 1
+
+
+def test_order_attacks():
+    """Test ordering attacks and removing dominated attacks."""
+    attacks = [
+        (("ATTACK", 0), 0, 50, 1),
+        (("ATTACK", 1), 0, 100, 0.7),
+        (("ATTACK", 2), 0, 40, 0.9),
+        (("ATTACK", 3), 1, 30, 1),
+    ]
+
+    # Attack 2 is weaker and less accurate than attack 0
+    assert order_attacks(attacks) == [("ATTACK", 1), ("ATTACK", 0), ("ATTACK", 3)]
+
+    # Attacks without damage are always dominated by the same priority
+    attacks = [(("ATTACK", 0), 0, 0, 1), (("ATTACK", 1), 0, 10, 0.5)]
+    assert order_attacks(attacks) == [("ATTACK", 1)]
+
+    # Identical attacks keep the first
+    attacks = [(("ATTACK", 0), 0, 10, 1), (("ATTACK", 1), 0, 10, 1)]
+    assert order_attacks(attacks) == [("ATTACK", 0)]
+
+
+set_logging_level()
+
+test_make_move()
+test_time_limit()
+test_transition()
+test_repetition()
+test_order_attacks()
@@ -0,0 +1,142 @@
+"""Test script for MCTSPokemonAgent."""
+
+from agent.mcts_pokemon_agent import MCTSPokemonAgent
+from agent.mcts_pokemon_agent import select_action
+from pokemon_helpers.moves import get_move
+from pokemon_helpers.pokemon import Pokemon
+from battle_engine.pokemon_engine import anonymize_gamestate_helper
+
+from config import set_logging_level
+
+
+def init_mcts(**kwargs):
+    """Initialize the Player for these tests."""
+    spinda = Pokemon(name="spinda", moves=["tackle", "frustration"])
+    magikarp = Pokemon(name="magikarp", moves=["tackle"])
+    exploud = Pokemon(name="exploud", moves=["tackle"])
+
+    gamestate = {}
+    gamestate["team"] = [exploud, magikarp]
+    gamestate["active"] = spinda
+
+    opp_gamestate = anonymize_gamestate_helper(gamestate)
+
+    # Update the gamestate
+    mcts = MCTSPokemonAgent(tier="pu", team=[spinda], **kwargs)
+    mcts.update_gamestate(gamestate, opp_gamestate)
+    mcts.init_opp_gamestate(opp_gamestate["team"], opp_gamestate["active"])
+    return mcts
+
+
+def test_init():
+    """Test validating the search budget."""
+    spinda = Pokemon(name="spinda", moves=["tackle"])
+
+    try:
+        MCTSPokemonAgent(tier="pu", team=[spinda], rollouts=None)
+        assert False
+    except AttributeError:
+        pass
+
+    try:
+        MCTSPokemonAgent(tier="pu", team=[spinda], workers=0)
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_make_move():
+    """Test the results of make_move()."""
+    # Floatzel uses tackle because it guarantees to kill
+    floatzel = Pokemon(name="floatzel", moves=["hydropump", "tackle"])
+    opp_stunfisk = Pokemon(name="stunfisk", moves=["discharge"])
+    floatzel.current_hp = 1
+    opp_stunfisk.current_hp = 1
+
+    player_gs = {"team": [], "active": floatzel}
+    opp_gs = anonymize_gamestate_helper({"team": [], "active": opp_stunfisk})
+    mcts = MCTSPokemonAgent(tier="pu", team=[floatzel], rollouts=300)
+    mcts.update_gamestate(player_gs, opp_gs)
+    mcts.init_opp_gamestate(opp_gs["team"], opp_gs["active"])
+
+    move = mcts.make_move()
+    assert move[0] == "ATTACK"
+    assert move[1] == 1
+    assert mcts.root.visits == 300
+    assert mcts.turns_per_second() > 0
+
+    # Time limit instead of rollouts
+    mcts = init_mcts(rollouts=None, time_limit=0.01)
+    assert mcts.make_move() in mcts.root.my_stats
+
+    # No time for any searches
+    mcts = init_mcts(rollouts=None, time_limit=0)
+    assert mcts.make_move() == ("ATTACK", 0)
+    assert not mcts.root.my_stats
+
+
+def test_close():
+    """Test shutting down the worker processes."""
+    mcts = init_mcts(rollouts=20, workers=2)
+    assert mcts.make_move()[0] in ["ATTACK", "SWITCH"]
+    executor = mcts.executor
+    assert executor is not None
+
+    mcts.close()
+    assert mcts.executor is None
+    try:
+        executor.submit(print)
+        assert False
+    except RuntimeError:
+        pass
+
+    # Closing again, or closing an agent without workers, does nothing
+    mcts.close()
+    init_mcts(rollouts=20).close()
+
+
+def test_reuse_tree():
+    """Test reusing the subtree for the last turn's options."""
+    mcts = init_mcts(rollouts=300)
+    move = mcts.make_move()
+
+    # Opponent attacks with a move searched after our move
+    opp_move = [key[1] for key in mcts.root.children if key[0] == move and key[1][0] == "ATTACK"][0]
+    mcts.new_info([{"type": "ATTACK", "move": get_move(opp_move[1]), "critical_hit": False,
+                    "damage": 0, "pct_damage": 0, "attacker": "opp", "defender": mcts.id,
+                    "atk_poke": "spinda", "def_poke": "spinda", "move_hits": False}])
+    child = mcts.root.children[(move, opp_move)]
+    assert mcts.next_root() is child
+
+    # Not reused when the opponent's option is unknown
+    mcts.new_info([])
+    mcts.last_key[1] = None
+    assert mcts.next_root() is not child
+
+    # New battle starts a new tree
+    mcts.last_key[1] = ("SWITCH", 0)
+    mcts.init_opp_gamestate(mcts.game_state.opp_gamestate["data"]["team"],
+                            mcts.game_state.opp_gamestate["data"]["active"])
+    assert mcts.next_root().visits == 0
+
+
+def test_select_action():
+    """Test choosing options with PUCT."""
+    priors = {"a": 0.5, "b": 0.5}
+
+    # Unvisited options are tried
+    assert select_action({"a": [10, 9]}, priors, 10, 1, False) == "b"
+
+    # Good options are chosen by this player and avoided by the opponent
+    stats = {"a": [10, 9], "b": [10, 1]}
+    assert select_action(stats, priors, 20, 0.1, False) == "a"
+    assert select_action(stats, priors, 20, 0.1, True) == "b"
+
+
+set_logging_level()
+
+test_init()
+test_make_move()
+test_close()
+test_reuse_tree()
+test_select_action()
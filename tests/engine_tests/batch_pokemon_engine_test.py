@@ -0,0 +1,124 @@
+"""Unit tests for the batched pokemon engine."""
+
+import numpy as np
+
+from agent.basic_pokemon_agent import PokemonAgent
+from agent.basic_planning_pokemon_agent import BasicPlanningPokemonAgent
+from pokemon_helpers.pokemon import Pokemon
+from battle_engine.pokemon_engine import PokemonEngine
+from battle_engine.batch_pokemon_engine import BatchPokemonEngine
+from battle_engine.batch_pokemon_engine import damage_factors
+
+
+def init_players():
+    """Initialize two evenly matched players."""
+    player1 = PokemonAgent([Pokemon(name="spinda", moves=["tackle", "frustration"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+    player2 = PokemonAgent([Pokemon(name="floatzel", moves=["aquajet", "tackle"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+    return player1, player2
+
+
+def test_run():
+    """Test running one pair of players many times."""
+    exploud = Pokemon(name="exploud", moves=["return"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowclaw"])
+
+    b_eng = BatchPokemonEngine(rng=np.random.default_rng(0))
+    outcomes = b_eng.run(PokemonAgent([exploud]), PokemonAgent([floatzel]), 100)
+
+    # Shadow Claw can't hit Exploud
+    assert outcomes.shape == (100, )
+    assert outcomes.all()
+    assert b_eng.num_turns.shape == (100, )
+    assert (b_eng.num_turns > 0).all()
+
+
+def test_run_battles():
+    """Test running games between different pairs of players."""
+    exploud = Pokemon(name="exploud", moves=["return"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowclaw"])
+    player1 = PokemonAgent([exploud])
+    player2 = PokemonAgent([floatzel])
+
+    b_eng = BatchPokemonEngine()
+    outcomes = b_eng.run_battles([(player1, player2), (player2, player1)],
+                                 np.array([0, 1, 1, 0, 1]))
+    assert list(outcomes) == [1, 0, 0, 1, 0]
+
+    # One game for each pair by default
+    outcomes = b_eng.run_battles([(player1, player2), (player2, player1)])
+    assert list(outcomes) == [1, 0]
+
+
+def test_turn_limit():
+    """Test that games which never end are draws."""
+    exploud = Pokemon(name="exploud", moves=["shadowclaw"])
+    spinda = Pokemon(name="spinda", moves=["shadowclaw"])
+
+    b_eng = BatchPokemonEngine(turn_limit=5)
+    outcomes = b_eng.run(PokemonAgent([exploud]), PokemonAgent([spinda]), 200)
+    assert (b_eng.num_turns == 6).all()
+    assert 0 < outcomes.mean() < 1
+
+
+def test_same_results():
+    """Test that the results are consistent with PokemonEngine."""
+    player1, player2 = init_players()
+
+    num_games = 300
+    p_eng = PokemonEngine()
+    wins = []
+    turns = []
+    for _ in range(num_games):
+        wins.append(p_eng.run(player1, player2))
+        turns.append(p_eng.game_state["num_turns"])
+
+    b_eng = BatchPokemonEngine()
+    outcomes = b_eng.run(player1, player2, 20000)
+
+    # Within about 5 standard errors of the engine's results
+    assert abs(np.mean(wins) - outcomes.mean()) < 0.15
+    assert abs(np.mean(turns) - b_eng.num_turns.mean()) < 1.5
+
+
+def test_damage_factors():
+    """Test splitting damage around the random factors."""
+    exploud = Pokemon(name="exploud", moves=["return"])
+    spinda = Pokemon(name="spinda", moves=["tackle"])
+    attack = exploud.moves[0]
+
+    damage, modifier = damage_factors(attack, exploud, spinda)
+    max_dmg, _ = attack.calculate_damage(exploud, spinda, testing=True)
+    assert modifier == 1.5
+    assert np.floor(damage * modifier) == max_dmg
+
+
+def test_unsupported():
+    """Test that unsupported games raise errors."""
+    b_eng = BatchPokemonEngine()
+    player1, player2 = init_players()
+
+    # Moves which do more than damage
+    bulk_up = PokemonAgent([Pokemon(name="exploud", moves=["bulkup"])])
+    try:
+        b_eng.run(player1, bulk_up, 10)
+        assert False
+    except AttributeError:
+        pass
+
+    # Agents which aren't random
+    planner = BasicPlanningPokemonAgent(tier="pu", team=player2.team)
+    try:
+        b_eng.run(player1, planner, 10)
+        assert False
+    except AttributeError:
+        pass
+
+
+test_run()
+test_run_battles()
+test_turn_limit()
+test_same_results()
+test_damage_factors()
+test_unsupported()
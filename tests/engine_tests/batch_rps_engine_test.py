@@ -0,0 +1,80 @@
+"""Unit tests for the batched RPS engine."""
+
+from math import sqrt
+
+import numpy as np
+
+from agent.base_agent import BaseAgent
+from agent.rps_agent import RPSAgent
+from agent.counter_rps_agent import CounterRPSAgent
+from agent.adjusting_rps_agent import AdjustingRPSAgent
+from battle_engine.rockpaperscissors import RPSEngine
+from battle_engine.batch_rps_engine import BatchRPSEngine, agent_kind
+from battle_engine.batch_rps_engine import FIXED, COUNTER, ADJUSTING
+
+
+def test_param_validation():
+    """Test that invalid parameters are caught."""
+    for num_games in [2, -1, 0]:
+        try:
+            BatchRPSEngine(num_games=num_games)
+            assert False
+        except AttributeError:
+            pass
+
+    # Only RPS agents can be played in a batch
+    try:
+        agent_kind(BaseAgent())
+        assert False
+    except AttributeError:
+        pass
+
+    assert agent_kind(RPSAgent()) == FIXED
+    assert agent_kind(CounterRPSAgent()) == COUNTER
+    assert agent_kind(AdjustingRPSAgent()) == ADJUSTING
+
+
+def test_basic_results():
+    """Test that fixed strategies always get the same result."""
+    b_eng = BatchRPSEngine(num_games=3, rng=np.random.default_rng(0))
+    rock_player = RPSAgent(strategy_in="rock")
+    paper_player = RPSAgent(strategy_in="paper")
+    scissors_player = RPSAgent(strategy_in="scissors")
+
+    outcomes = b_eng.run_matches([(rock_player, scissors_player),
+                                  (rock_player, paper_player),
+                                  (scissors_player, paper_player),
+                                  (paper_player, scissors_player)])
+    assert list(outcomes) == [1, 0, 1, 0]
+
+    # Draws are decided randomly
+    outcomes = b_eng.run_matches([(rock_player, rock_player)] * 1000)
+    assert 400 < outcomes.sum() < 600
+
+
+def test_adaptive_agents():
+    """Test that adaptive agents win as often as when simulated one at a time."""
+    num_matches = 4000
+    player_pairs = [
+        (CounterRPSAgent(), RPSAgent(strategy_in="rock")),
+        (RPSAgent(strategy_in=[2, 1, 1]), AdjustingRPSAgent(strategy_in="uniform")),
+        (AdjustingRPSAgent(strategy_in="rock", weight=3), CounterRPSAgent())
+    ]
+
+    for num_games in [3, 5]:
+        b_eng = BatchRPSEngine(num_games=num_games, rng=np.random.default_rng(0))
+        engine = RPSEngine(num_games=num_games)
+
+        outcomes = b_eng.run_matches(player_pairs * num_matches).reshape(num_matches, -1)
+        for pair_ind, (player1, player2) in enumerate(player_pairs):
+            batch_rate = outcomes[:, pair_ind].mean()
+            sim_rate = sum(engine.simulate(player1, player2) for _ in range(num_matches))
+            sim_rate /= num_matches
+
+            margin = 4*sqrt(2*max(sim_rate*(1 - sim_rate), 0.01)/num_matches)
+            assert abs(batch_rate - sim_rate) < margin
+
+
+test_param_validation()
+test_basic_results()
+test_adaptive_agents()
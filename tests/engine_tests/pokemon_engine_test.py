@@ -312,6 +312,29 @@ def test_accuracy():
     assert num_misses == 0
 
 
+def test_both_switch():
+    """Test that both players can switch on the same turn."""
+    player1 = PokemonAgent([Pokemon(name="exploud", moves=["tackle"]),
+                            Pokemon(name="spinda", moves=["tackle"])])
+    player2 = PokemonAgent([Pokemon(name="floatzel", moves=["tackle"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+
+    p_eng = PokemonEngine()
+    p_eng.initialize_battle(player1, player2)
+
+    player_move = ("SWITCH", 0)
+    turn_info = p_eng.run_single_turn(player_move, player_move, player1, player2)[1]
+
+    # Both switched, and nobody attacked
+    assert all(info["type"] == "SWITCH" for info in turn_info)
+    assert p_eng.game_state["player1"]["active"].name == "spinda"
+    assert p_eng.game_state["player2"]["active"].name == "magikarp"
+    assert p_eng.game_state["player1"]["team"][0].current_hp == \
+        p_eng.game_state["player1"]["team"][0].max_hp
+    assert p_eng.game_state["player2"]["team"][0].current_hp == \
+        p_eng.game_state["player2"]["team"][0].max_hp
+
+
 def test_volatile_status():
     """Test to ensure volatile statuses work."""
     test_vs_switch()
@@ -413,4 +436,5 @@ test_heal()
 test_status_dmg()
 test_engine_secondary_effects()
 test_accuracy()
+test_both_switch()
 test_volatile_status()
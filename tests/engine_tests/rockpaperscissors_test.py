@@ -1,7 +1,11 @@
 """Test for RPS Engine."""
 
-from battle_engine.rockpaperscissors import RPSEngine
+from math import sqrt
+
+from battle_engine.rockpaperscissors import RPSEngine, fixed_strategy, match_win_probability
 from agent.rps_agent import RPSAgent
+from agent.counter_rps_agent import CounterRPSAgent
+from agent.adjusting_rps_agent import AdjustingRPSAgent
 
 
 def test_param_validation():
@@ -59,6 +63,39 @@ def test_basic_results(rps_engine):
     assert sr_outcome == 0
 
 
+def test_fixed_strategy():
+    """Test that only players with unchanging strategies skip simulation."""
+    assert fixed_strategy(RPSAgent())
+    assert fixed_strategy(RPSAgent(strategy_in=[1, 2, 3]))
+    assert not fixed_strategy(CounterRPSAgent())
+    assert not fixed_strategy(AdjustingRPSAgent())
+
+
+def test_match_win_probability():
+    """Test that sampled matches agree with simulating every move."""
+    num_matches = 10000
+    for num_games in [1, 3, 5]:
+        rps_engine = RPSEngine(num_games=num_games)
+        player1 = RPSAgent(strategy_in=[0.5, 0.3, 0.2])
+        player2 = RPSAgent(strategy_in=[0.2, 0.3, 0.5])
+        win_prob = match_win_probability(player1.strategy, player2.strategy, num_games)
+        margin = 4*sqrt(win_prob*(1 - win_prob)/num_matches)
+
+        fast_wins = sum(rps_engine.run(player1, player2) for _ in range(num_matches))
+        slow_wins = sum(rps_engine.simulate(player1, player2) for _ in range(num_matches))
+        assert abs(fast_wins/num_matches - win_prob) < margin
+        assert abs(slow_wins/num_matches - win_prob) < margin
+
+        # The probability is saved for the next match
+        key = (tuple(player1.strategy), tuple(player2.strategy))
+        assert rps_engine.win_probs[key] == win_prob
+
+    # Mirror matches are even
+    assert abs(match_win_probability([0.5, 0.3, 0.2], [0.5, 0.3, 0.2], 3) - 0.5) < 1e-12
+
+
 test_basic_results(RPSEngine())
 test_basic_results(RPSEngine(num_games=3))
 test_param_validation()
+test_fixed_strategy()
+test_match_win_probability()
@@ -0,0 +1,88 @@
+"""Unit tests for rollout engine."""
+
+from random import seed
+
+from battle_engine.rollout_engine import RolloutEngine
+from pokemon_helpers.pokemon import Pokemon
+
+from config import PSN_STATUS
+
+
+def test_init():
+    """Test initializing the engine from a battle."""
+    exploud = Pokemon(name="exploud", moves=["return", "shadowball"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowball"])
+    spinda = Pokemon(name="spinda", moves=["tackle"])
+
+    engine = RolloutEngine([exploud], [floatzel, spinda])
+    assert engine.legal_actions(0) == (("ATTACK", 0), ("ATTACK", 1))
+    assert engine.legal_actions(1) == (("ATTACK", "shadowball"), ("SWITCH", 0))
+
+    # Shadowball doesn't affect exploud
+    assert engine.damage[1][0][0][0] == 0
+    assert engine.damage[0][0][0][0] > 0
+
+    # Opponent's switch takes its share of the prior
+    priors = engine.priors(1)
+    assert priors[("SWITCH", 0)] < priors[("ATTACK", "shadowball")]
+    assert abs(sum(priors.values()) - 1) < 1e-9
+
+    # No pokemon
+    try:
+        RolloutEngine([], [floatzel])
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_step():
+    """Test simulating turns."""
+    exploud = Pokemon(name="exploud", moves=["return"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowball"])
+    spinda = Pokemon(name="spinda", moves=["tackle"])
+    spinda.status = PSN_STATUS
+
+    # Seeded so that a critical hit doesn't faint spinda
+    seed(0)
+    engine = RolloutEngine([exploud], [floatzel, spinda])
+
+    # Opponent switches, and spinda takes damage from the attack and poison
+    engine.step(("ATTACK", 0), ("SWITCH", 0))
+    assert engine.order[1] == [1, 0]
+    assert engine.hp[1][1] < spinda.current_hp
+    assert engine.hp[1][0] == floatzel.current_hp
+    assert engine.turns == 1
+
+    # Pokemon used to build the engine don't change
+    assert spinda.current_hp == spinda.max_hp
+
+    # Start again
+    engine.reset()
+    assert engine.order[1] == [0, 1]
+    assert engine.hp[1][1] == spinda.max_hp
+
+
+def test_rollout():
+    """Test playing out a game."""
+    exploud = Pokemon(name="exploud", moves=["return"])
+    floatzel = Pokemon(name="floatzel", moves=["shadowball"])
+
+    # Exploud always wins, since shadowball doesn't affect it
+    engine = RolloutEngine([exploud], [floatzel])
+    assert engine.rollout(100) == 1
+    assert engine.finished()
+    assert not engine.order[1]
+
+    # Same result from the start again
+    engine.reset()
+    assert not engine.finished()
+    assert engine.rollout(100) == 1
+
+    # Unfinished games are valued by remaining HP
+    engine.reset()
+    assert engine.rollout(0) == 0.5
+
+
+test_init()
+test_step()
+test_rollout()
@@ -0,0 +1,134 @@
+"""Tests for ArrayLadder."""
+
+import numpy as np
+
+from battle_engine.coinflip import CoinFlipEngine
+from battle_engine.pokemon_engine import PokemonEngine
+from battle_engine.rockpaperscissors import RPSEngine, rps_logic
+from ladder.array_ladder import ArrayLadder
+from ladder.ratings import Glicko2Rating
+from stats.calc import calculate_avg_elo
+
+
+def test_add_players():
+    """Test adding blocks of players to the ladder."""
+    lad = ArrayLadder(game=RPSEngine())
+    rock_ids = lad.add_players(3, "rock", "rock")
+    mixed_ids = lad.add_players(2, "mixed", [1, 1, 2])
+
+    assert list(rock_ids) == [0, 1, 2]
+    assert list(mixed_ids) == [3, 4]
+    assert lad.num_players == 5
+    assert (lad.elos == 1000).all()
+    assert lad.type_names == ["rock", "mixed"]
+    assert list(lad.types) == [0, 0, 0, 1, 1]
+    assert list(lad.strategies[3]) == [0.25, 0.25, 0.5]
+
+    players = lad.get_players()
+    assert [player.id for player in players] == [0, 1, 2, 3, 4]
+    assert players[3].type == "mixed"
+
+    try:
+        lad.add_players(1, "bad", "lizard")
+        assert False
+    except AttributeError:
+        pass
+
+    try:
+        lad.add_players(1, "bad", [1, 0])
+        assert False
+    except AttributeError:
+        pass
+
+    # Only CoinFlip and RPS games can be played
+    try:
+        ArrayLadder(game=PokemonEngine())
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_match_round():
+    """Test that rounds pair every player once."""
+    lad = ArrayLadder(game=CoinFlipEngine(), seed=0)
+    lad.add_players(11)
+
+    players, opponents = lad.match_round()
+    assert len(players) == 5
+    assert len(set(players) | set(opponents)) == 10
+
+    # Rounds can be limited to a number of games
+    players, opponents = lad.match_round(max_games=3)
+    assert len(players) == 3
+
+    # Weighted ladders pair neighbours by Elo
+    lad.elos = np.arange(11) * 100
+    players, opponents = lad.match_round()
+    assert (abs(lad.elos[players] - lad.elos[opponents]) <= 200).all()
+
+    try:
+        ArrayLadder(game=CoinFlipEngine()).match_round()
+        assert False
+    except RuntimeError:
+        pass
+
+
+def test_run_round():
+    """Test that a round updates every player's record and rating."""
+    lad = ArrayLadder(game=CoinFlipEngine(), weighted=False, seed=0)
+    lad.add_players(1000)
+
+    results = lad.run_round()
+    assert lad.num_turns == 500
+    assert (results.player_elos == 1000).all()
+    assert lad.num_wins.sum() == 500
+    assert lad.num_losses.sum() == 500
+    assert (lad.num_wins + lad.num_losses == 1).all()
+
+    # Winners go up, and losers are at the Elo floor
+    winners = np.where(results.outcomes == 1, results.players, results.opponents)
+    assert (lad.elos[winners] == 1016).all()
+    assert calculate_avg_elo(lad) == {"Default": 1008}
+
+    # Glicko-2 ratings are updated with each round as a rating period
+    lad = ArrayLadder(game=CoinFlipEngine(), rating_system=Glicko2Rating(), seed=0)
+    lad.add_players(10)
+    results = lad.run_round()
+    assert (lad.deviations < 350).all()
+    assert abs(lad.elos.mean() - 1000) < 1e-6
+
+
+def test_rps_round():
+    """Test that RPS games are played with each player's strategy."""
+    lad = ArrayLadder(game=RPSEngine(num_games=3), seed=0)
+    lad.add_players(500, "rock", "rock")
+    lad.add_players(500, "paper", "paper")
+
+    for _ in range(20):
+        results = lad.run_round()
+        player_types = lad.types[results.players]
+        opp_types = lad.types[results.opponents]
+
+        # Paper always beats rock
+        mixed = player_types != opp_types
+        assert (results.outcomes[mixed] == player_types[mixed]).all()
+
+    avg_elo = calculate_avg_elo(lad)
+    assert avg_elo["paper"] > avg_elo["rock"]
+
+
+def test_rps_logic_arrays():
+    """Test that rps_logic gives the same results for arrays of moves."""
+    p1_moves = np.repeat(np.arange(3), 3)
+    p2_moves = np.tile(np.arange(3), 3)
+    results = rps_logic(p1_moves, p2_moves)
+
+    for p1_move, p2_move, result in zip(p1_moves, p2_moves, results):
+        assert rps_logic(int(p1_move), int(p2_move)) == result
+
+
+test_add_players()
+test_match_round()
+test_run_round()
+test_rps_round()
+test_rps_logic_arrays()
@@ -32,6 +32,29 @@ def test_duplicate_add():
     assert len(lad.player_pool) == 1
 
 
+def test_remove_player():
+    """Test removing players from the ladder."""
+    lad = BaseLadder()
+    lad.match_func = mock_match_func
+    ba1 = BaseAgent()
+    ba2 = BaseAgent()
+    ba3 = BaseAgent()
+    lad.add_player(ba1)
+    lad.add_player(ba2)
+    lad.add_player(ba3)
+
+    assert lad.remove_player(ba1)
+    assert not lad.remove_player(ba1)
+    assert len(lad.player_pool) == 2
+    assert len(lad.available_players) == 2
+
+    # Players in a game are only removed if asked
+    lad.match_players()
+    assert not lad.remove_player(ba2, available_only=True)
+    assert lad.remove_player(ba2)
+    assert len(lad.player_pool) == 1
+
+
 def test_available_players():
     """Test that available players picks out players not in games."""
     lad = BaseLadder()
@@ -123,7 +146,9 @@ def test_run_game():
     lad.add_player(ba2)
 
     # Run the game
-    lad.run_game()
+    _, player1_snap, player2_snap = lad.run_game()
+    assert player1_snap.elo == player2_snap.elo == 1000
+    assert {player1_snap.id, player2_snap.id} == {ba1.id, ba2.id}
 
     # Check that the ladder updated properly
     players = lad.get_players()
@@ -171,10 +196,73 @@ def test_get_players_sorted():
     assert (player1.num_losses == 0 and player2.num_losses == 1)
 
 
+def test_record_result():
+    """Test that record_result updates players and returns them to the pool."""
+    ba1 = BaseAgent()
+    ba2 = BaseAgent()
+    lad = BaseLadder()
+    lad.match_func = mock_match_func
+
+    lad.add_player(ba1)
+    lad.add_player(ba2)
+    player1, player2 = lad.match_players()
+    assert not lad.available_players
+
+    lad.record_result(player1, player2, 0)
+
+    assert len(lad.available_players) == 2
+    assert player2.num_wins == 1 and player2.elo > 1000
+    assert player1.num_losses == 1 and player1.elo == 1000
+
+
+def test_run_round():
+    """Test that a round pairs every available player at once."""
+    cfe = CoinFlipEngine()
+    lad = BaseLadder(game=cfe)
+    lad.match_func = mock_match_func
+
+    players = [BaseAgent() for _ in range(7)]
+    for player in players:
+        lad.add_player(player)
+
+    matches = lad.match_round()
+    assert len(matches) == 3
+    assert len(lad.available_players) == 1
+    assert lad.num_turns == 3
+    assert len({player.id for match in matches for player in match}) == 6
+    for player1, player2 in matches:
+        assert player1.in_game and player2.in_game
+
+    lad.record_round(matches, lad.play_round(matches))
+    assert len(lad.available_players) == 7
+    assert sum(player.num_wins for player in players) == 3
+    assert sum(player.num_losses for player in players) == 3
+
+    # Rounds can be limited to a number of games
+    results = lad.run_round(max_games=2)
+    assert len(results) == 2
+    for outcome, player1_snap, player2_snap in results:
+        assert outcome in [0, 1]
+        assert player1_snap.id != player2_snap.id
+    assert lad.num_turns == 5
+
+    # Error thrown when only one player available
+    lad = BaseLadder(game=cfe)
+    lad.add_player(BaseAgent())
+    try:
+        lad.match_round()
+        assert False
+    except RuntimeError:
+        pass
+
+
 test_add()
 test_duplicate_add()
+test_remove_player()
 test_available_players()
 test_match_basic()
 test_match_error()
 test_run_game()
 test_get_players_sorted()
+test_record_result()
+test_run_round()
@@ -0,0 +1,69 @@
+"""Tests for PlayerRegistry."""
+
+from agent.base_agent import BaseAgent
+from ladder.player_registry import PlayerRegistry
+
+
+def test_append():
+    """Test adding players keeps them in the order they were added."""
+    registry = PlayerRegistry()
+    ba1 = BaseAgent()
+    ba2 = BaseAgent()
+
+    registry.append((ba1, 0))
+    registry.append((ba2, 0))
+    assert len(registry) == 2
+    assert list(registry) == [(ba1, 0), (ba2, 0)]
+    assert registry.get(ba1.id) == (ba1, 0)
+
+    # Adding a player again replaces them at the end
+    registry.append((ba1, 5))
+    assert len(registry) == 2
+    assert list(registry) == [(ba2, 0), (ba1, 5)]
+    assert registry[0] == (ba2, 0)
+    assert (ba1, 0) not in registry
+    assert (ba1, 5) in registry
+
+
+def test_remove():
+    """Test removing players."""
+    registry = PlayerRegistry()
+    players = [BaseAgent() for _ in range(5)]
+    for player in players:
+        registry.append((player, 0))
+
+    registry.remove((players[1], 0))
+    assert registry.pop(players[3].id) == (players[3], 0)
+    assert list(registry) == [(players[0], 0), (players[2], 0), (players[4], 0)]
+    assert sorted(registry.ids) == sorted([players[0].id, players[2].id, players[4].id])
+    assert registry.get(players[1].id) is None
+
+    # Removing a player not in the registry
+    try:
+        registry.remove((players[1], 0))
+        assert False
+    except ValueError:
+        pass
+
+
+def test_choice():
+    """Test randomly choosing players."""
+    registry = PlayerRegistry()
+    try:
+        registry.choice()
+        assert False
+    except IndexError:
+        pass
+
+    players = [BaseAgent() for _ in range(3)]
+    for player in players:
+        registry.append((player, 0))
+    registry.remove((players[0], 0))
+
+    chosen = {registry.choice()[0].id for _ in range(100)}
+    assert chosen == {players[1].id, players[2].id}
+
+
+test_append()
+test_remove()
+test_choice()
@@ -0,0 +1,29 @@
+"""Tests for RandomLadder."""
+
+from agent.base_agent import BaseAgent
+from battle_engine.coinflip import CoinFlipEngine
+from ladder.random_ladder import RandomLadder
+
+
+def test_pair_round():
+    """Test that rounds randomly pair every available player."""
+    lad = RandomLadder(game=CoinFlipEngine())
+    for _ in range(10):
+        lad.add_player(BaseAgent())
+
+    matches = lad.match_round()
+    assert len(matches) == 5
+    assert not lad.available_players
+    assert len({player.id for match in matches for player in match}) == 10
+
+    # Everyone is back after the round
+    lad.record_round(matches, lad.play_round(matches))
+    assert len(lad.available_players) == 10
+
+    # Rounds can be limited to a number of games
+    matches = lad.match_round(max_games=3)
+    assert len(matches) == 3
+    assert len(lad.available_players) == 4
+
+
+test_pair_round()
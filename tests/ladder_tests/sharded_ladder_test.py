@@ -0,0 +1,139 @@
+"""Tests for ShardedLadder."""
+
+from threading import Thread
+
+from agent.base_agent import BaseAgent
+from battle_engine.coinflip import CoinFlipEngine
+from ladder.sharded_ladder import ShardedLadder
+from stats.calc import calculate_avg_elo
+
+
+def test_add():
+    """Test that players are spread between the shards."""
+    lad = ShardedLadder(num_shards=4)
+    players = [BaseAgent() for _ in range(200)]
+    for player in players:
+        lad.add_player(player)
+
+    # Everyone has the same Elo, but the shards are still used
+    assert all(shard.player_pool for shard in lad.shards)
+    assert len(lad.player_pool) == 200
+    assert len(lad.available_players) == 200
+    assert {player.id for player in lad.get_players()} == {player.id for player in players}
+
+    # Adding a player again doesn't duplicate them
+    lad.add_player(players[0])
+    assert len(lad.get_players()) == 200
+
+
+def test_run_game():
+    """Test running games on the ladder."""
+    lad = ShardedLadder(game=CoinFlipEngine(), num_shards=3, rebalance_delay=10)
+    for _ in range(30):
+        lad.add_player(BaseAgent())
+
+    for _ in range(100):
+        outcome, player1_snap, player2_snap = lad.run_game()
+        assert outcome in [0, 1]
+        assert player1_snap.id != player2_snap.id
+
+    assert lad.num_turns == 100
+    assert len(lad.get_players()) == 30
+    assert len(lad.available_players) == 30
+    assert sum(player.num_wins for player in lad.get_players()) == 100
+
+    # Everyone is in the shard for their rating
+    for shard_ind, shard in enumerate(lad.shards):
+        for player in shard.get_players():
+            assert lad.shard_index(player) == shard_ind
+
+    # The unified view still works for type logging
+    assert len(calculate_avg_elo(lad)) == 1
+
+
+def test_candidate_matches():
+    """Test matching a player against every shard."""
+    lad = ShardedLadder(num_shards=2, selection_size=2)
+    players = [BaseAgent() for _ in range(6)]
+    for ind, player in enumerate(players):
+        player.elo = 1000 + 100*ind
+        lad.add_player(player)
+
+    candidates = lad.get_candidate_matches(players[2])
+    assert len(candidates) == 2
+    nearby_ids = {players[1].id, players[2].id, players[3].id}
+    assert {player.id for player, _ in candidates} <= nearby_ids
+
+
+def test_rebalance():
+    """Test that rebalancing evens out the shards."""
+    lad = ShardedLadder(num_shards=2)
+    players = [BaseAgent() for _ in range(10)]
+    lad.tiebreaks[players[0].id] = 0
+    for ind, player in enumerate(players):
+        player.elo = 1000 + 10*ind
+        lad.add_player(player)
+
+    # Every player above the starting Elo is in the last shard
+    assert len(lad.shards[1].player_pool) == 9
+
+    lad.rebalance()
+    assert len(lad.shards[0].player_pool) == 5
+    assert len(lad.shards[1].player_pool) == 5
+    assert {player.elo for player in lad.shards[0].get_players()} == \
+        {1000, 1010, 1020, 1030, 1040}
+    for player in players:
+        assert lad.shard_of[player.id] == lad.shard_index(player)
+
+
+def test_match_across_shards():
+    """Test that players left alone in their shards still get matched."""
+    lad = ShardedLadder(num_shards=2)
+    ba1 = BaseAgent()
+    ba2 = BaseAgent()
+    ba2.elo = 1500
+    lad.tiebreaks[ba1.id] = 0
+    lad.add_player(ba1)
+    lad.add_player(ba2)
+    assert lad.shard_of[ba1.id] != lad.shard_of[ba2.id]
+
+    player1, player2 = lad.match_players()
+    assert {player1.id, player2.id} == {ba1.id, ba2.id}
+    assert not lad.available_players
+
+    try:
+        lad.match_players()
+        assert False
+    except RuntimeError:
+        pass
+
+
+def test_threads():
+    """Test running games from several threads at once."""
+    lad = ShardedLadder(game=CoinFlipEngine(), num_shards=4, rebalance_delay=25)
+    for _ in range(40):
+        lad.add_player(BaseAgent())
+
+    def run_games():
+        """Run games on the ladder."""
+        for _ in range(50):
+            lad.run_game()
+
+    threads = [Thread(target=run_games) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    players = lad.get_players()
+    assert len(players) == 40
+    assert len(lad.available_players) == 40
+    assert sum(player.num_wins for player in players) == 200
+
+
+test_add()
+test_run_game()
+test_candidate_matches()
+test_rebalance()
+test_match_across_shards()
+test_threads()
@@ -1,6 +1,9 @@
 """Script to test functioning of ladder."""
 
+from random import randint
+
 from agent.base_agent import BaseAgent
+from ladder.base_ladder import BaseLadder
 from ladder.weighted_ladder import WeightedLadder
 
 
@@ -64,5 +67,69 @@ def test_selection_size():
     assert len(lad.get_candidate_matches(base_player)) == 15
 
 
+def test_elo_index():
+    """Test that the Elo index gives the same matches as sorting."""
+    lad = WeightedLadder(selection_size=4)
+    for _ in range(60):
+        new_player = BaseAgent()
+        new_player.elo = randint(1000, 1050)
+        lad.add_player(new_player)
+        lad.num_turns += randint(0, 2)
+
+    for _ in range(100):
+        player, opp = lad.match_players()
+        lad.record_result(player, opp, randint(0, 1))
+
+        base_player = BaseAgent()
+        base_player.elo = randint(990, 1060)
+        assert lad.get_candidate_matches(base_player) == \
+            BaseLadder.get_candidate_matches(lad, base_player)
+
+    assert len(lad.elo_index) == len(lad.available_players)
+
+
+def test_elo_index_update():
+    """Test that changing an available player's Elo moves them in the index."""
+    lad = WeightedLadder()
+    ba1 = BaseAgent()
+    ba2 = BaseAgent()
+    ba2.elo = 1200
+    lad.add_player(ba1)
+    lad.add_player(ba2)
+
+    base_player = BaseAgent()
+    base_player.elo = 1210
+    assert lad.get_candidate_matches(base_player)[0][0] is ba2
+
+    # ba1 wins while still in the pool
+    ba1.elo = 1190
+    lad.update_player_stats(ba1, ba2)
+    assert lad.get_candidate_matches(base_player)[0][0] is ba1
+    assert sorted(lad.elo_index.elos) == lad.elo_index.elos
+
+
+def test_pair_round():
+    """Test that rounds pair the longest waiting players by Elo."""
+    lad = WeightedLadder()
+    players = []
+    for elo in [1300, 1000, 1310, 1005, 1200]:
+        new_player = BaseAgent()
+        new_player.elo = elo
+        lad.add_player(new_player)
+        players.append(new_player)
+
+    matches = lad.match_round()
+    assert len(matches) == 2
+    assert {frozenset([player1.elo, player2.elo]) for player1, player2 in matches} == \
+        {frozenset([1000, 1005]), frozenset([1300, 1310])}
+
+    # The last player added sits out, and is still in the index
+    assert lad.available_players[0][0] is players[-1]
+    assert len(lad.elo_index) == 1
+
+
 test_match_func()
 test_selection_size()
+test_elo_index()
+test_elo_index_update()
+test_pair_round()
@@ -0,0 +1,132 @@
+"""Unit tests for columnar logs."""
+
+from os import listdir, remove
+from os.path import isfile, join
+from shutil import rmtree
+
+from uuid import uuid4
+
+import numpy as np
+
+from file_manager.columnar_log import ColumnarLogWriter, ColumnarLogReader
+from file_manager.log_reader import LogReader
+from file_manager.log_writer import LogWriter
+import config
+
+# Prefix for files generated by this function
+TEST_ID = str(uuid4())
+READER_ID = str(uuid4())
+INVALID_ID = str(uuid4())
+CSV_ID = str(uuid4())
+HEADER = ["player1.type", "player1.elo", "outcome"]
+
+
+def write_log(prefix):
+    """Write a log with both write_line and write_columns."""
+    with ColumnarLogWriter(HEADER, prefix=prefix, chunk_rows=3) as c_writer:
+        c_writer.write_line({"player1.type": "rock", "player1.elo": 1000, "outcome": 1})
+        c_writer.write_line({"player1.type": "paper", "outcome": 0})
+        c_writer.write_columns({
+            "player1.type": np.array(["paper", "scissors"], dtype=object),
+            "player1.elo": np.array([1016, 984]),
+            "outcome": [1, 0]
+        })
+        c_writer.write_line({"player1.type": "rock", "player1.elo": 1032.5, "outcome": 1})
+    return c_writer
+
+
+def test_writer():
+    """Test that columns are read back with their types."""
+    c_writer = write_log(TEST_ID)
+    assert c_writer.num_rows == 5
+    assert c_writer.dtypes == {"player1.type": "category",
+                               "player1.elo": "numeric",
+                               "outcome": "numeric"}
+
+    c_reader = ColumnarLogReader(c_writer.path)
+    assert c_reader.num_rows == 5
+
+    elos = c_reader.read_column("player1.elo")
+    assert isinstance(elos, np.memmap)
+    assert elos.dtype == np.float64
+    assert np.isnan(elos[1])
+    assert list(elos[[0, 2, 3, 4]]) == [1000, 1016, 984, 1032.5]
+
+    types = c_reader.read_column("player1.type")
+    assert list(types) == ["rock", "paper", "paper", "scissors", "rock"]
+    codes = c_reader.read_column("player1.type", decode=False)
+    assert list(codes) == [0, 1, 1, 2, 0]
+    assert c_reader.categories("player1.type") == ["rock", "paper", "scissors"]
+
+    try:
+        c_reader.read_column("player2.type")
+        assert False
+    except AttributeError:
+        pass
+
+    # Numeric columns can't take other values
+    c_writer = ColumnarLogWriter(HEADER, prefix=INVALID_ID)
+    c_writer.write_line({"player1.type": "rock", "player1.elo": 1000})
+    c_writer.flush()
+    c_writer.write_line({"player1.type": "rock", "player1.elo": "rock"})
+    try:
+        c_writer.flush()
+        assert False
+    except RuntimeError:
+        pass
+
+    # The rows that couldn't be written are dropped from every column
+    c_writer.close()
+    c_reader = ColumnarLogReader(c_writer.path)
+    assert c_reader.num_rows == 1
+    assert list(c_reader.read_column("player1.type")) == ["rock"]
+
+
+def test_log_reader():
+    """Test reading columnar logs with LogReader."""
+    write_log(READER_ID)
+    log_reader = LogReader(prefix=READER_ID)
+    assert log_reader.header == HEADER
+
+    # Only the chosen columns are read
+    columns = log_reader.read_columns(["outcome"])
+    assert list(columns) == ["outcome0"]
+    assert list(columns["outcome0"]) == [1, 0, 1, 0, 1]
+    assert not log_reader.data["player1.type0"]
+
+    # Missing values are filled in like CSV logs
+    log_reader.read_data()
+    log_reader.to_numeric(["player1.elo0"])
+    assert list(log_reader.data["player1.elo0"]) == [1000, 1000, 1016, 984, 1032.5]
+    assert list(log_reader.data["player1.type0"]) == ["rock", "paper", "paper", "scissors",
+                                                      "rock"]
+
+    # CSV logs give the same arrays
+    with LogWriter(HEADER, prefix=CSV_ID) as log_writer:
+        log_writer.write_line({"player1.type": "rock", "player1.elo": 1000, "outcome": 1})
+        log_writer.write_line({"player1.type": "paper", "outcome": 0})
+    csv_reader = LogReader(prefix=CSV_ID)
+    columns = csv_reader.read_columns(["player1.type", "player1.elo"])
+    assert list(columns["player1.type0"]) == ["rock", "paper"]
+    assert columns["player1.elo0"][0] == 1000
+    assert np.isnan(columns["player1.elo0"][1])
+
+    # Columns already read are kept when more are read
+    more_columns = csv_reader.read_columns(["player1.elo", "outcome"])
+    assert more_columns["player1.elo0"] is columns["player1.elo0"]
+    assert list(more_columns["outcome0"]) == [1, 0]
+
+
+def cleanup():
+    """Clean up logs for this run."""
+    for filename in listdir(config.LOG_DIR):
+        if filename.startswith((TEST_ID, READER_ID, INVALID_ID)):
+            rmtree(join(config.LOG_DIR, filename))
+        elif filename.startswith(CSV_ID) and isfile(join(config.LOG_DIR, filename)):
+            remove(join(config.LOG_DIR, filename))
+
+
+test_writer()
+test_log_reader()
+
+cleanup()
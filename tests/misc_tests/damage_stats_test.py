@@ -1,7 +1,9 @@
 """Unit tests for damage_stats calculator."""
 
 from pokemon_helpers.pokemon import Pokemon
-from pokemon_helpers.damage_stats import DamageStatCalc
+from pokemon_helpers.damage_stats import (DamageStatCalc, ATK_MAX_EVS,
+                                          DEF_POSITIVE_NATURE, HP_MAX_EVS,
+                                          NUM_INVESTMENT_COLUMNS)
 from pokemon_helpers.moves import generate_move
 
 from config import MOVE_DATA
@@ -22,6 +24,20 @@ def test_nearest_num():
     assert dsc.find_closest_level(4) == (5, -1)
     assert dsc.find_closest_level(215) == (200, 15)
     assert dsc.find_closest_level(17) == (15, 2)
+    assert dsc.find_closest_level(243) == (250, -7)
+    assert dsc.find_closest_level(300) == (255, 45)
+
+
+def test_shared_tables():
+    """Make sure calculators share the damage statistic tables."""
+    dsc1 = DamageStatCalc()
+    dsc2 = DamageStatCalc()
+
+    assert dsc1.damage_stats is dsc2.damage_stats
+    assert dsc1.estimate_dmg_val(77) == dsc2.estimate_dmg_val(77)
+
+    # Values outside the table are still calculated
+    assert dsc1.estimate_dmg_val(300) > dsc1.estimate_dmg_val(255)
 
 
 def test_estimate_dmg_val():
@@ -197,7 +213,43 @@ def range_status():
     assert dmg_range[1] == 10
 
 
+def test_calculate_ranges():
+    """Test that batched damage ranges match single calculations."""
+    dsc = DamageStatCalc()
+    move = generate_move(MOVE_DATA["tackle"])
+    attacker = POKEMON_DATA["exploud"]
+    defender = POKEMON_DATA["floatzel"]
+
+    combinations = []
+    for comb_ind in range(2**NUM_INVESTMENT_COLUMNS):
+        combinations.append([bool(comb_ind & (1 << col))
+                             for col in range(NUM_INVESTMENT_COLUMNS)])
+
+    dmg_ranges = dsc.calculate_ranges(move, attacker, defender, combinations)
+    assert len(dmg_ranges) == len(combinations)
+
+    for comb, dmg_range in zip(combinations, dmg_ranges):
+        params = {}
+        params["atk"] = {"max_evs": comb[0], "positive_nature": comb[1]}
+        params["def"] = {"max_evs": comb[2], "positive_nature": comb[3]}
+        params["hp"] = {"max_evs": comb[4]}
+        assert tuple(dmg_range) == dsc.calculate_range(move, attacker, defender, params)
+
+    # Investment changes the damage in the right direction
+    no_investment = dsc.calculate_ranges(move, attacker, defender,
+                                         [False] * NUM_INVESTMENT_COLUMNS)
+    comb = [False] * NUM_INVESTMENT_COLUMNS
+    comb[ATK_MAX_EVS] = True
+    assert dsc.calculate_ranges(move, attacker, defender, comb)[0][1] > no_investment[0][1]
+    comb[ATK_MAX_EVS] = False
+    comb[DEF_POSITIVE_NATURE] = True
+    comb[HP_MAX_EVS] = True
+    assert dsc.calculate_ranges(move, attacker, defender, comb)[0][1] < no_investment[0][1]
+
+
 test_init()
 test_nearest_num()
+test_shared_tables()
 test_estimate_dmg_val()
 test_dmg_range()
+test_calculate_ranges()
@@ -1,18 +1,28 @@
 """Unit tests for LogWriter."""
 
-from os import listdir, remove
+from os import listdir, mkdir, remove
 from os.path import isfile, join
+from shutil import rmtree
 
-from time import sleep
+from time import sleep, time
+from threading import Thread
 
 from uuid import uuid4
+
+import numpy as np
+
+from file_manager.columnar_log import ColumnarLogWriter
 from file_manager.log_writer import LogWriter
 from file_manager.log_reader import LogReader
+from stats.calc import calculate_matchups, stream_matchups
 import config
 
 # Prefix for files generated by this function
 TEST_ID = str(uuid4())
 EMPTY_ID = str(uuid4())
+COLUMNS_ID = str(uuid4())
+BUFFERED_ID = str(uuid4())
+CHUNKS_ID = str(uuid4())
 HEADER = ["X", "Y", "pew"]
 
 
@@ -29,6 +39,100 @@ def test_writer_basic():
     lw1.write_line(dict_to_write)
 
 
+def test_writer_columns():
+    """Test writing many lines at once."""
+    lw1 = LogWriter(header=HEADER, prefix=COLUMNS_ID)
+    lw1.write_columns({
+        "X": np.array([1, 2, 3]),
+        "Y": [4.5, 5.5, 6.5]
+    })
+    lw1.output_file.flush()
+
+    log_reader = LogReader(prefix=COLUMNS_ID)
+    log_reader.read_data()
+    assert log_reader.data["X0"] == ["1", "2", "3"]
+    assert log_reader.data["Y0"] == ["4.5", "5.5", "6.5"]
+    assert log_reader.data["pew0"] == ["NA", "NA", "NA"]
+
+
+class FailingWriter():
+    """CSV writer for a disk that is full."""
+
+    def writerows(self, rows):
+        """Fail to write the rows."""
+        raise OSError("No space left on device")
+
+
+def test_writer_buffered():
+    """Test writing lines from a background thread."""
+    dict_to_write = {"X": 10, "Y": 20}
+
+    def write_lines(log_writer):
+        for _ in range(50):
+            log_writer.write_line(dict_to_write)
+
+    # Rows are all written by the end of the with statement
+    with LogWriter(header=HEADER, prefix=BUFFERED_ID, buffered=True,
+                   flush_rows=8, max_rows=16) as lw1:
+        threads = [Thread(target=write_lines, args=(lw1,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        lw1.write_columns({"X": np.arange(100)})
+    assert lw1.output_file.closed
+
+    log_reader = LogReader(prefix=BUFFERED_ID)
+    log_reader.read_data()
+    assert log_reader.data["X0"] == ["10"] * 200 + [str(val) for val in range(100)]
+    assert log_reader.data["pew0"] == ["NA"] * 300
+
+    # Closed LogWriters can't be written to
+    try:
+        lw1.write_line(dict_to_write)
+        assert False
+    except RuntimeError:
+        pass
+
+    # Rows are flushed to disk without waiting for a full batch
+    lw2 = LogWriter(header=HEADER, prefix=BUFFERED_ID, buffered=True,
+                    flush_rows=100, flush_interval=0.01)
+    lw2.write_line(dict_to_write)
+    num_lines = 0
+    deadline = time() + 10
+    while num_lines < 2 and time() < deadline:
+        sleep(0.01)
+        with open(join(config.LOG_DIR, lw2.filename)) as log_file:
+            num_lines = len(log_file.readlines())
+    assert num_lines == 2
+    lw2.close()
+    lw2.close()
+
+    # Errors writing rows are raised instead of leaving writes waiting
+    lw3 = LogWriter(header=HEADER, prefix=BUFFERED_ID, buffered=True,
+                    flush_rows=1, max_rows=1)
+    lw3.row_buffer.output_csv = FailingWriter()
+    try:
+        for _ in range(3):
+            lw3.write_line(dict_to_write)
+        assert False
+    except OSError:
+        pass
+    try:
+        lw3.close()
+        assert False
+    except OSError:
+        pass
+    assert lw3.output_file.closed
+    lw3.close()
+
+    try:
+        LogWriter(header=HEADER, prefix=BUFFERED_ID, buffered=True, flush_rows=0)
+        assert False
+    except AttributeError:
+        pass
+
+
 def test_prefix_handling():
     """Test prefix validation for LogWriter."""
     # Invalid tab character
@@ -135,17 +239,102 @@ def test_reader_data_err():
     assert False
 
 
+def test_reader_chunks():
+    """Test streaming some columns from several files."""
+    mkdir(join(config.LOG_DIR, CHUNKS_ID))
+    header = ["player1.type", "player2.type", "player1.elo", "outcome"]
+    types = ["rock", "paper", "scissors"]
+    with LogWriter(header, directory=CHUNKS_ID, prefix=CHUNKS_ID) as log_writer:
+        for game_ind in range(25):
+            log_writer.write_line({"player1.type": types[game_ind % 3],
+                                   "player2.type": types[game_ind % 2],
+                                   "outcome": game_ind % 2})
+    with ColumnarLogWriter(header, directory=CHUNKS_ID, prefix=CHUNKS_ID) as c_writer:
+        c_writer.write_columns({"player1.type": ["paper"] * 12,
+                                "player2.type": ["rock", "scissors"] * 6,
+                                "player1.elo": np.arange(12),
+                                "outcome": [1, 0, 0] * 4})
+
+    log_reader = LogReader(prefix=CHUNKS_ID, directory=CHUNKS_ID)
+    assert len(log_reader.files) == 2
+
+    chunks = {0: [], 1: []}
+    for file_ind, chunk in log_reader.iter_chunks(["player1.type", "player1.elo"],
+                                                  chunk_rows=10, workers=2):
+        assert list(chunk) == ["player1.type", "player1.elo"]
+        chunks[file_ind].append(chunk)
+    assert [len(chunk["player1.elo"]) for chunk in chunks[0]] == [10, 10, 5]
+    assert [len(chunk["player1.elo"]) for chunk in chunks[1]] == [10, 2]
+    assert chunks[0][1]["player1.type"].dtype == object
+    assert list(chunks[0][1]["player1.type"][:3]) == ["paper", "scissors", "rock"]
+    assert np.isnan(chunks[0][2]["player1.elo"]).all()
+    assert list(chunks[1][1]["player1.elo"]) == [10, 11]
+
+    try:
+        next(log_reader.iter_chunks(["pew"]))
+        assert False
+    except AttributeError:
+        pass
+
+    # Streamed matchups match the ones from the loaded data
+    streamed = stream_matchups(log_reader, chunk_rows=4)
+    log_reader.read_data()
+    log_reader.to_numeric(log_reader.to_data_key(["outcome"]))
+    assert streamed == calculate_matchups(log_reader)
+    assert streamed["paper"]["rock"]["total"] == 14
+
+
+def test_reader_chunks_stop():
+    """Test that streaming stops reading when the caller stops early."""
+    header = ["player1.type", "player2.type", "player1.elo", "outcome"]
+    for _ in range(2):
+        with LogWriter(header, directory=CHUNKS_ID, prefix="big") as log_writer:
+            for game_ind in range(1000):
+                log_writer.write_line({"outcome": game_ind % 2})
+    log_reader = LogReader(prefix="big", directory=CHUNKS_ID)
+
+    # Count the chunks the readers read
+    read_chunks = []
+    file_chunks = log_reader.file_chunks
+
+    def counted_chunks(*args):
+        for chunk in file_chunks(*args):
+            read_chunks.append(chunk)
+            yield chunk
+    log_reader.file_chunks = counted_chunks
+
+    # Only the chunks already queued are read, and the second file isn't started
+    chunk_iter = log_reader.iter_chunks(["outcome"], chunk_rows=1, workers=1)
+    next(chunk_iter)
+    chunk_iter.close()
+    assert len(read_chunks) <= 4
+
+    # Empty files have an invalid header
+    empty_filename = join(config.LOG_DIR, CHUNKS_ID, "empty.csv")
+    with open(empty_filename, "w"):
+        pass
+    empty_reader = LogReader(filenames=log_reader.files[:1] + [empty_filename])
+    try:
+        list(empty_reader.iter_chunks(["outcome"], files=[1]))
+        assert False
+    except RuntimeError as err:
+        assert "invalid header" in str(err)
+
+
 def cleanup():
     """Clean up logs for this run."""
     log_files = [f for f in listdir(config.LOG_DIR)
                  if isfile(join(config.LOG_DIR, f))]
     for filename in log_files:
-        if filename.startswith(TEST_ID) or filename.startswith(EMPTY_ID):
+        if filename.startswith((TEST_ID, EMPTY_ID, COLUMNS_ID, BUFFERED_ID)):
             remove(join(config.LOG_DIR, filename))
+    rmtree(join(config.LOG_DIR, CHUNKS_ID), ignore_errors=True)
 
 
 # Run writer test cases
 test_writer_basic()
+test_writer_columns()
+test_writer_buffered()
 test_prefix_handling()
 test_header_validation()
 
@@ -154,5 +343,7 @@ test_reader_basic()
 test_reader_no_files()
 test_reader_data()
 test_reader_data_err()
+test_reader_chunks()
+test_reader_chunks_stop()
 
 cleanup()
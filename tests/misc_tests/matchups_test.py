@@ -0,0 +1,81 @@
+"""Unit tests for matchup calculations."""
+
+from random import Random
+
+import numpy as np
+
+from stats.calc import MatchupCounts, calculate_matchup_matrix
+
+TYPES = ["rock", "paper", "scissors", "lizard"]
+
+
+def count_games(games):
+    """Count games one at a time, for the counts to match."""
+    results = {}
+    for p1_type, p2_type, outcome in games:
+        for type1, type2, win in [(p1_type, p2_type, outcome), (p2_type, p1_type, 1 - outcome)]:
+            results.setdefault(type1, {}).setdefault(type2, {"wins": 0, "total": 0})
+            results[type1][type2]["wins"] += win
+            results[type1][type2]["total"] += 1
+    return results
+
+
+def test_add_games():
+    """Test that counts match counting one game at a time."""
+    rng = Random(0)
+    counts = MatchupCounts()
+    games = []
+    # The last type only shows up in later batches
+    for num_types in [2, 3, 4]:
+        batch = [(rng.choice(TYPES[:num_types]), rng.choice(TYPES[:num_types]),
+                  rng.randint(0, 1)) for _ in range(200)]
+        games.extend(batch)
+        counts.add_games(*[list(column) for column in zip(*batch)])
+
+    # Types get codes in order of appearance
+    assert sorted(counts.names[:2]) == ["paper", "rock"]
+    assert counts.names[2:] == ["scissors", "lizard"]
+
+    expected = count_games(games)
+    results = counts.results()
+    for p1_type in TYPES:
+        for p2_type in TYPES:
+            cell = results[p1_type][p2_type]
+            assert cell["wins"] == expected[p1_type][p2_type]["wins"]
+            assert cell["total"] == expected[p1_type][p2_type]["total"]
+            ratio = cell["wins"] / cell["total"]
+            assert cell["ratio"] == ratio
+            assert abs(cell["moe"] - np.sqrt(ratio * (1 - ratio) / cell["total"])) < 1e-12
+
+    # Games between the same types count twice, with one win
+    same_games = [game for game in games if game[0] == game[1] == "rock"]
+    assert results["rock"]["rock"]["total"] == 2 * len(same_games)
+    assert results["rock"]["rock"]["wins"] == len(same_games)
+
+
+def test_matrix():
+    """Test the matchup matrix from counts and from their results dict."""
+    counts = MatchupCounts()
+    counts.add_games(np.array(["rock", "paper"], dtype=object),
+                     np.array(["scissors", "rock"], dtype=object),
+                     np.array([1.0, 1.0]))
+
+    names, matrix = calculate_matchup_matrix(counts)
+    assert names == ["paper", "rock", "scissors"]
+    assert matrix.shape == (2, 3, 3)
+    assert matrix[0, 0, 1] == 1
+    assert matrix[0, 1, 2] == 1
+    assert matrix[1, 1, 0] == 1
+    # Matchups that weren't played have no ratio
+    assert np.isnan(matrix[0, 0, 2])
+    assert matrix[1, 0, 2] == 0
+
+    results = counts.results()
+    assert results["scissors"]["paper"]["ratio"] is None
+    dict_names, dict_matrix = calculate_matchup_matrix(results)
+    assert dict_names == names
+    assert np.array_equal(dict_matrix, matrix, equal_nan=True)
+
+
+test_add_games()
+test_matrix()
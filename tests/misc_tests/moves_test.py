@@ -1,5 +1,6 @@
 """Test script for Moves."""
 
+from copy import deepcopy
 from math import floor
 
 from pokemon_helpers.pokemon import Pokemon
@@ -10,7 +11,8 @@ from pokemon_helpers.moves import (BaseMove,
                                    BoostingMove,
                                    VolatileStatusMove,
                                    HealingMove,
-                                   generate_move)
+                                   generate_move,
+                                   get_move)
 from config import (MOVE_DATA, PAR_STATUS, PSN_STATUS)
 
 
@@ -296,6 +298,31 @@ def test_generate_move():
     assert pup_move.__class__.__bases__ == (SecondaryEffectMove, )
     assert nuzzle_move.__class__.__bases__ == (SecondaryEffectMove, )
 
+    # Classes are reused for moves with the same move types
+    assert lowsweep_move.__class__ is pup_move.__class__
+    assert tackle_move is not generate_move(MOVE_DATA["tackle"])
+
+
+def test_get_move():
+    """Test that get_move returns a shared, unmodifiable move."""
+    tackle_move = get_move("tackle")
+
+    assert tackle_move is get_move("tackle")
+    assert tackle_move is deepcopy(tackle_move)
+    assert tackle_move.id == "tackle"
+
+    try:
+        tackle_move.base_power = 100
+        assert False
+    except AttributeError:
+        pass
+
+    try:
+        get_move("DOOT")
+        assert False
+    except AttributeError:
+        pass
+
 
 def test_healing():
     """Make sure healing is applied."""
@@ -333,4 +360,5 @@ test_secondary_effects()
 test_boosting_moves()
 test_volatile_status()
 test_generate_move()
+test_get_move()
 test_healing()
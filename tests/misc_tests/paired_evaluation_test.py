@@ -0,0 +1,75 @@
+"""Unit tests for paired evaluations."""
+
+import numpy as np
+
+from simulation.paired_evaluation import PairedEvaluation
+
+CONFIG = "sample_simulations/sim_configs/sample_pkmn_config.json"
+
+
+def test_param_validation():
+    """Test that invalid parameters are caught."""
+    try:
+        PairedEvaluation(config=CONFIG, variants=["RandomSpinda"],
+                         opponent="RandomFloatzel", num_pairs=1)
+        assert False
+    except AttributeError:
+        pass
+
+    try:
+        PairedEvaluation(config=CONFIG, variants=["RandomSpinda", "PlanningSpinda"],
+                         opponent="Missingno", num_pairs=1)
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_run():
+    """Test that the same seed plays the same games."""
+    evaluation = PairedEvaluation(config=CONFIG,
+                                  variants=["RandomSpinda", "RandomSpinda"],
+                                  opponent="RandomFloatzel",
+                                  num_pairs=20,
+                                  seed=4)
+    scores = evaluation.run()
+    assert scores.shape == (20, 2)
+    assert np.isin(scores, [0, 0.5, 1]).all()
+
+    # The same agent type makes the same choices with the same luck
+    assert (scores[:, 0] == scores[:, 1]).all()
+    assert (evaluation.run() == scores).all()
+
+    # Without antithetic pairs each game is a win or a loss
+    evaluation.antithetic = False
+    assert np.isin(evaluation.run(), [0, 1]).all()
+
+
+def test_summarize():
+    """Test the paired and independent margins of error."""
+    evaluation = PairedEvaluation(config=CONFIG,
+                                  variants=["RandomSpinda", "PlanningSpinda"],
+                                  opponent="RandomFloatzel",
+                                  num_pairs=4,
+                                  antithetic=False)
+    scores = np.array([[1, 1], [0, 1], [0, 0], [0, 1]])
+    summary = evaluation.summarize(scores)
+
+    matchups = summary["matchups"]
+    assert matchups["RandomSpinda"]["RandomFloatzel"]["wins"] == 1
+    assert matchups["PlanningSpinda"]["RandomFloatzel"]["ratio"] == 0.75
+    assert summary["difference"] == -0.5
+
+    # Independent games have the variance of both ratios
+    assert abs(summary["independent_moe"]**2 - (0.25*0.75/4)*2) < 1e-9
+    assert abs(summary["moe"]**2 - np.var([0, -1, 0, -1], ddof=1)/4) < 1e-9
+    assert abs(summary["variance_reduction"] -
+               summary["independent_moe"]**2 / summary["moe"]**2) < 1e-9
+
+    # Variants that always agree have no paired variance
+    summary = evaluation.summarize(np.array([[1, 1], [0, 0]]))
+    assert summary["variance_reduction"] is None
+
+
+test_param_validation()
+test_run()
+test_summarize()
@@ -231,6 +231,37 @@ def status_dmg_test():
     assert pkmn.max_hp > pkmn.current_hp
 
 
+def test_battle_copy():
+    """Test that battle copies share static data but not battle state."""
+    pkmn = Pokemon(name="spinda", moves=["tackle", "watergun"], level=50)
+    battle_pkmn = pkmn.battle_copy()
+
+    assert battle_pkmn.moves is pkmn.moves
+    assert battle_pkmn.base_stats is pkmn.base_stats
+
+    battle_pkmn.current_hp -= 10
+    battle_pkmn.status = BRN_STATUS
+    battle_pkmn.boosts["atk"] = 2
+    battle_pkmn.volatile_status["confusion"] = 0
+
+    assert pkmn.current_hp == pkmn.max_hp
+    assert pkmn.status is None
+    assert pkmn.boosts["atk"] == 0
+    assert not pkmn.volatile_status
+
+
+def test_to_json():
+    """Test the JSON representation of a Pokemon."""
+    pkmn = Pokemon(name="spinda", moves=["tackle"], level=50)
+    pkmn.status = PAR_STATUS
+    pkmn_json = pkmn.to_json()
+
+    assert pkmn_json["name"] == "spinda"
+    assert pkmn_json["status"] == PAR_STATUS
+    assert pkmn_json["speed"] == pkmn.speed
+    assert pkmn_json["boosts"] == pkmn.boosts
+
+
 test_init()
 test_param_validation()
 test_stats_calculation()
@@ -240,3 +271,5 @@ test_status()
 test_get_method()
 test_possible_moves()
 status_dmg_test()
+test_battle_copy()
+test_to_json()
@@ -0,0 +1,105 @@
+"""Test functionality of the batch rating systems."""
+
+import numpy as np
+
+from agent.base_agent import BaseAgent
+from battle_engine.coinflip import CoinFlipEngine
+from ladder.elo import elo
+from ladder.ratings import EloRating, Glicko2Rating
+from ladder.ratings import elo_batch, glicko2_batch
+from ladder.weighted_ladder import WeightedLadder
+
+
+def test_elo_batch():
+    """Test that batch Elo updates match ladder.elo.elo."""
+    ratings = np.array([1619, 1609, 1000, 1000])
+    new_ratings = elo_batch(ratings, np.array([1, 2]), np.array([0, 3]), np.array([1, 0]))
+    assert list(new_ratings) == [1602, 1625, 1000, 1016]
+
+    # Same as updating one game at a time
+    player1 = BaseAgent()
+    player2 = BaseAgent()
+    player1.elo = 1619
+    player2.elo = 1609
+    assert new_ratings[1] == elo(player2, player1, 1)
+    assert new_ratings[0] == elo(player1, player2, 0)
+
+    # Each game a player plays uses their rating from before the batch
+    new_ratings = elo_batch(np.array([1200, 1200, 1200]), np.array([0, 0]),
+                            np.array([1, 2]), np.array([1, 1]))
+    assert list(new_ratings) == [1232, 1184, 1184]
+
+
+def test_elo_rating():
+    """Test updating players with EloRating."""
+    players = [BaseAgent() for _ in range(4)]
+    for ind, player in enumerate(players):
+        player.elo = 1100 + 100*ind
+
+    rating = EloRating()
+    updated = rating.add_results([(players[0], players[1]), (players[2], players[3])])
+    assert len(updated) == 4
+    assert [player.elo for player in players] == [1120, 1179, 1320, 1379]
+
+    # Single games are the same as ladder.elo.elo
+    updated = rating.add_results([(players[0], players[1])])
+    assert [player.elo for player in players[:2]] == [1138, 1160]
+
+
+def test_glicko2():
+    """Test Glicko-2 with the example from the Glicko-2 paper."""
+    games = (np.array([0, 2, 3]), np.array([1, 0, 0]), np.array([1, 1, 1]))
+    ratings, deviations, volatilities = glicko2_batch(
+        [1500, 1400, 1550, 1700], [200, 30, 100, 300], [0.06]*4, games)
+
+    assert abs(ratings[0] - 1464.06) < 0.05
+    assert abs(deviations[0] - 151.52) < 0.05
+    assert abs(volatilities[0] - 0.05999) < 1e-5
+
+    # Players who didn't play only become less certain
+    ratings, deviations, volatilities = glicko2_batch(
+        [1500, 1400, 1600], [200, 30, 100], [0.06]*3, (np.array([0]), np.array([1]), np.array([1])))
+    assert ratings[2] == 1600
+    assert deviations[2] > 100
+    assert volatilities[2] == 0.06
+
+
+def test_glicko2_rating():
+    """Test that Glicko2Rating waits for the end of a rating period."""
+    players = [BaseAgent() for _ in range(4)]
+    rating = Glicko2Rating(period_length=2)
+
+    assert not rating.add_results([(players[0], players[1])])
+    assert players[0].elo == 1000
+
+    updated = rating.add_results([(players[2], players[3])])
+    assert len(updated) == 4
+    assert players[0].elo > 1000 > players[1].elo
+    assert players[2].elo > 1000 > players[3].elo
+    assert rating.deviation(players[0]) < 350
+    assert rating.deviation(BaseAgent()) == 350
+
+
+def test_ladder_rating_system():
+    """Test plugging Glicko-2 into a ladder."""
+    lad = WeightedLadder(game=CoinFlipEngine(), rating_system=Glicko2Rating(period_length=5))
+    players = [BaseAgent() for _ in range(10)]
+    for player in players:
+        lad.add_player(player)
+
+    for _ in range(50):
+        lad.run_game()
+
+    assert sum(player.num_wins for player in players) == 50
+    assert any(player.elo < 1000 for player in players)
+
+    # Available players are in the index at their new ratings
+    for player in players:
+        assert lad.elo_index.entries[player.id][0] == player.elo
+
+
+test_elo_batch()
+test_elo_rating()
+test_glicko2()
+test_glicko2_rating()
+test_ladder_rating_system()
@@ -0,0 +1,134 @@
+"""Unit tests for seeded random number streams."""
+
+from concurrent.futures import ProcessPoolExecutor
+from os import listdir, mkdir
+from os.path import join
+from shutil import rmtree
+import random
+
+from uuid import uuid4
+
+from agent.base_agent import BaseAgent
+from agent.basic_pokemon_agent import PokemonAgent
+from battle_engine.coinflip import CoinFlipEngine
+from battle_engine.pokemon_engine import PokemonEngine
+from ladder.weighted_ladder import WeightedLadder
+from pokemon_helpers.pokemon import Pokemon
+from simulation.pkmn_simulation import PokemonSimulation, process_battle
+from seeding import stream, game_rng
+import config
+
+
+def test_stream():
+    """Test that streams only depend on the run seed and their key."""
+    stream1 = stream(12, "game", 3)
+    stream2 = stream(12, "game", 3)
+    assert [stream1.random() for _ in range(10)] == [stream2.random() for _ in range(10)]
+
+    # Drawing from one stream doesn't change another
+    ladder_rng = stream(12, "ladder")
+    game_rng(12, 4).random()
+    assert ladder_rng.random() == stream(12, "ladder").random()
+
+    assert game_rng(12, 3).random() != game_rng(12, 4).random()
+    assert game_rng(12, 3).random() != game_rng(13, 3).random()
+
+    # Unseeded runs use the global stream
+    assert stream(None, "ladder") is random
+    assert game_rng(None, 3) is random
+
+
+def pokemon_game(rng):
+    """Play a pokemon game with <rng>, returning the outcome and final state."""
+    player1 = PokemonAgent([Pokemon(name="spinda", moves=["thunderwave", "tackle"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+    player2 = PokemonAgent([Pokemon(name="floatzel", moves=["hydropump", "scald"])])
+
+    p_eng = PokemonEngine(rng=rng)
+    outcome = p_eng.run(player1, player2)
+    return outcome, p_eng.game_state["num_turns"], p_eng.game_state["player2"]["active"].current_hp
+
+
+def test_seeded_game():
+    """Test that a game's random numbers all come from its stream."""
+    outcome, num_turns, current_hp = pokemon_game(game_rng(5, 0))
+    random.seed(1)
+    assert pokemon_game(game_rng(5, 0)) == (outcome, num_turns, current_hp)
+
+    # Different games get different random numbers
+    results = {pokemon_game(game_rng(5, game_ind)) for game_ind in range(10)}
+    assert len(results) > 1
+
+
+def test_seeded_ladder():
+    """Test that a seeded ladder plays the same games."""
+    runs = []
+    for _ in range(2):
+        lad = WeightedLadder(game=CoinFlipEngine(), rng=stream(5, "ladder"))
+        for _ in range(10):
+            lad.add_player(BaseAgent())
+
+        outcomes = []
+        for game_ind in range(200):
+            outcome, player1, player2 = lad.run_game(rng=game_rng(5, game_ind))
+            outcomes.append((outcome, player1.elo, player2.elo))
+        runs.append(outcomes)
+
+    assert runs[0] == runs[1]
+
+
+def test_process_battle():
+    """Test that seeded battles have the same results in any process."""
+    descriptors = [{
+        "agent_class": "basic",
+        "agent_type": agent_type,
+        "agent_tier": None,
+        "team_file": team_file,
+        "elo": 1000
+    } for agent_type, team_file in [("spinda", "simulation_spinda.txt"),
+                                    ("floatzel", "simulation_floatzel.txt")]]
+
+    local_results = [process_battle(descriptors[0], descriptors[1], 5, game_ind)
+                     for game_ind in range(4)]
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        worker_results = list(executor.map(process_battle,
+                                           [descriptors[0]] * 4, [descriptors[1]] * 4,
+                                           [5] * 4, range(4)))
+
+    assert local_results == worker_results
+
+
+def seeded_simulation_logs(workers, multithread=False):
+    """Run a seeded Pokemon simulation, returning the contents of each log."""
+    directory = str(uuid4())
+    mkdir(join(config.LOG_DIR, directory))
+    pkmn_sim = PokemonSimulation(config="sample_simulations/sim_configs/sample_pkmn_config.json",
+                                 num_players=10, num_games=30, ladder_choice=0,
+                                 selection_size=1, data_delay=5, directory=directory,
+                                 seed=7, workers=workers, multithread=multithread)
+    pkmn_sim.add_agents()
+    pkmn_sim.init_type_log_writer()
+    pkmn_sim.run()
+    pkmn_sim.close_log_writers()
+
+    logs = {}
+    for filename in listdir(join(config.LOG_DIR, directory)):
+        with open(join(config.LOG_DIR, directory, filename)) as log_file:
+            logs[filename.split("_")[0]] = log_file.read()
+    rmtree(join(config.LOG_DIR, directory))
+    return logs
+
+
+def test_seeded_simulation():
+    """Test that seeded simulations write the same logs for any number of workers."""
+    logs = seeded_simulation_logs(1)
+    assert sorted(logs) == ["PKMNPlayers", "PKMNTypes"]
+    assert seeded_simulation_logs(2) == logs
+    assert seeded_simulation_logs(1, multithread=True) == logs
+
+
+test_stream()
+test_seeded_game()
+test_seeded_ladder()
+test_process_battle()
+test_seeded_simulation()
@@ -0,0 +1,60 @@
+"""Tests for the TurnCache."""
+
+from pokemon_helpers.turn_cache import TurnCache
+
+
+def test_init():
+    """Make sure the cache initializes properly."""
+    cache = TurnCache(max_size=2)
+    assert cache.max_size == 2
+    assert not cache
+    assert cache.hit_rate() is None
+
+    try:
+        TurnCache(max_size=0)
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_get():
+    """Test that results are stored and counted."""
+    cache = TurnCache()
+    calls = []
+
+    def calculate():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get(("a", 1), calculate) == 1
+    assert cache.get(("a", 1), calculate) == 1
+    assert cache.get(("a", 2), calculate) == 2
+
+    assert len(calls) == 2
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert cache.hit_rate() == 1/3
+
+    cache.clear()
+    assert not cache
+    assert cache.hit_rate() is None
+
+
+def test_lru_eviction():
+    """Test that the least recently used result is removed first."""
+    cache = TurnCache(max_size=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+
+    # Use "a" so "b" is the least recently used
+    cache.get("a", lambda: 3)
+    cache.get("c", lambda: 4)
+
+    assert len(cache) == 2
+    assert cache.get("a", lambda: 5) == 1
+    assert cache.get("b", lambda: 6) == 6
+
+
+test_init()
+test_get()
+test_lru_eviction()
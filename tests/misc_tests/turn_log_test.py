@@ -0,0 +1,128 @@
+"""Unit tests for TurnLog."""
+
+from os import listdir, remove
+from os.path import isfile, join
+from shutil import rmtree
+from threading import Thread
+
+from uuid import uuid4
+
+from agent.basic_pokemon_agent import PokemonAgent
+from battle_engine.pokemon_engine import PokemonEngine
+from file_manager.log_reader import LogReader
+from file_manager.turn_log import TurnLog, TurnLogReader, process_turn_log
+from pokemon_helpers.pokemon import Pokemon
+from simulation.pkmn_simulation import PokemonSimulation
+import config
+
+# Prefix for files generated by this function
+TEST_ID = str(uuid4())
+
+
+def test_write_games():
+    """Test that each game's turns can be read back by its id."""
+    turn_log = TurnLog(prefix=TEST_ID, flush_rows=5)
+    player1 = PokemonAgent([Pokemon(name="spinda", moves=["tackle"]),
+                            Pokemon(name="magikarp", moves=["tackle"])])
+    player2 = PokemonAgent([Pokemon(name="floatzel", moves=["watergun"])])
+    player1.type = "spinda"
+    player2.type = "floatzel"
+
+    p_eng = PokemonEngine(log_turns=True, turn_log=turn_log)
+    games = {}
+    for _ in range(5):
+        p_eng.run(player1, player2)
+        games[p_eng.game_id] = p_eng.game_state["num_turns"]
+    turn_log.close()
+
+    log_file = join(config.LOG_DIR, turn_log.filename)
+    turn_reader = TurnLogReader(log_file)
+    assert set(turn_reader.index) == set(games)
+
+    for game_id, num_turns in games.items():
+        rows = turn_reader.read_game(game_id)
+        assert {row["game_id"] for row in rows} == {game_id}
+        assert int(rows[-1]["turn_num"]) == num_turns
+        assert turn_reader.index[game_id]["player1.type"] == "spinda"
+        assert turn_reader.index[game_id]["player2.type"] == "floatzel"
+
+    # The log is one CSV for all the games, and the index isn't read with it
+    log_reader = LogReader(prefix=TEST_ID)
+    log_reader.read_data()
+    assert len(log_reader.files) == 1
+    assert set(log_reader.data["game_id0"]) == set(games)
+
+    try:
+        turn_reader.read_game("missingno")
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_process_turn_log():
+    """Test that a process uses one turn log for each directory."""
+    turn_log = process_turn_log(TEST_ID)
+    assert process_turn_log(TEST_ID) is turn_log
+    assert turn_log.filename.startswith("PKMNTurns_")
+
+    # Engines log to the turn log for their directory
+    player1 = PokemonAgent([Pokemon(name="spinda", moves=["tackle"])])
+    player2 = PokemonAgent([Pokemon(name="floatzel", moves=["watergun"])])
+    p_eng = PokemonEngine(log_turns=True, directory=TEST_ID)
+    p_eng.run(player1, player2)
+    assert p_eng.turn_log is turn_log
+
+    # Games that aren't logged don't get an id
+    p_eng = PokemonEngine()
+    p_eng.run(player1, player2)
+    assert p_eng.game_id is None
+    turn_log.close()
+
+    # Threads starting at once share one turn log
+    directory = "{}_threads".format(TEST_ID)
+    turn_logs = []
+    threads = [Thread(target=lambda: turn_logs.append(process_turn_log(directory)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(thread_log) for thread_log in turn_logs}) == 1
+    turn_logs[0].close()
+
+
+def test_worker_turn_logs():
+    """Test that simulations log the turns of battles in worker processes."""
+    directory = "{}_workers".format(TEST_ID)
+    pkmn_sim = PokemonSimulation(config="sample_simulations/sim_configs/sample_pkmn_config.json",
+                                 num_players=10, num_games=12, ladder_choice=0,
+                                 selection_size=1, data_delay=5, directory=directory,
+                                 seed=3, workers=2, log_turns=True)
+    pkmn_sim.add_agents()
+    pkmn_sim.init_type_log_writer()
+    pkmn_sim.run()
+    pkmn_sim.close_log_writers()
+
+    # Each worker wrote its own turn log, and every game is in one of them
+    turn_files = [join(config.LOG_DIR, directory, filename)
+                  for filename in listdir(join(config.LOG_DIR, directory))
+                  if filename.startswith("PKMNTurns_") and filename.endswith(".csv")]
+    assert turn_files
+    assert sum(len(TurnLogReader(filename).index) for filename in turn_files) == 12
+
+
+def cleanup():
+    """Clean up logs for this run."""
+    for filename in listdir(config.LOG_DIR):
+        if filename.startswith(TEST_ID) and isfile(join(config.LOG_DIR, filename)):
+            remove(join(config.LOG_DIR, filename))
+    for filename in listdir(config.LOG_DIR):
+        if filename.startswith(TEST_ID) and not isfile(join(config.LOG_DIR, filename)):
+            rmtree(join(config.LOG_DIR, filename))
+
+
+test_write_games()
+test_process_turn_log()
+test_worker_turn_logs()
+
+cleanup()